@@ -10,7 +10,16 @@ import threading
 from flask import Flask, request, jsonify, render_template
 
 from prompt_transformer import PromptTransformer
+from filter_engine import get_shared_filter_engine
+from filter_pushdown import get_shared_pushdown_metrics
 from harvester import Harvester
+from high_water_marks import feed_key
+from interpreter import parse_command_locally
+from parameter_extraction import scan_parameters
+from models import FetchedPost
+from post_archive import get_shared_archive
+from post_batch import PostBatch
+from rate_limiter import get_rate_limiter
 
 app = Flask(__name__)
 
@@ -18,6 +27,51 @@ app = Flask(__name__)
 execution_status = {}
 execution_results = {}
 
+def make_harvester(data):
+    """
+    Harvester for a request.
+
+    'apply_filters' enables config/filters.yaml, pushed down unless 'push_down_filters'
+    is false. 'deduplicate' drops posts near-duplicating ones harvested earlier;
+    'skip_seen' (on by default for 'incremental' requests) drops posts an earlier harvest returned;
+    'rank' returns only the best posts of a fetch (see post_ranking).
+    """
+    options = {'deduplicate': data.get('deduplicate', False),
+               'skip_seen': data.get('skip_seen', data.get('incremental', False)),
+               'rank': data.get('rank', False)}
+    if data.get('apply_filters', False):
+        options.update(filters=get_shared_filter_engine(), push_down=data.get('push_down_filters', True))
+    return Harvester(**options)
+
+def request_command(prompt):
+    """The user's prompt parsed by the local grammar (no LLM call), or None outside it."""
+    command = parse_command_locally(prompt) if prompt else None
+    return command if command is not None and command.is_valid else None
+
+def request_author(prompt):
+    """The person ("by/from First Last") whose posts the user's prompt is about, if any."""
+    return scan_parameters(prompt).get('target_person') if prompt else None
+
+def request_feed(data, command):
+    """High-water mark key for an 'incremental' request: the command's topic search, else the home feed."""
+    if not data.get('incremental', False):
+        return None
+    return feed_key(command.topic if command is not None else None)
+
+def archive_harvest(agent_result, feed=None):
+    """Append post results to the archive when POST_ARCHIVE_DIR is set; never fails the request."""
+    archive = get_shared_archive()
+    if archive is None or not isinstance(agent_result, list):
+        return
+    records = [item.model_dump(mode='json') if isinstance(item, FetchedPost) else item
+               for item in agent_result if isinstance(item, (dict, FetchedPost))]
+    if not records:
+        return
+    try:
+        archive.append(PostBatch.from_records(records), feed=feed)
+    except Exception as e:
+        app.logger.warning(f"Could not archive harvest results: {e}")
+
 @app.route('/')
 def index():
     """Serve the main application page."""
@@ -28,6 +82,16 @@ def health():
     """Health check endpoint."""
     return jsonify({'status': 'healthy', 'message': 'LinkedIn AI Agent is running'}), 200
 
+@app.route('/api/metrics/rate-limits')
+def rate_limit_metrics():
+    """Per-model OpenAI rate limiter metrics: capacity, queue depth and waits by priority."""
+    return jsonify(get_rate_limiter().metrics()), 200
+
+@app.route('/api/metrics/pushdown')
+def pushdown_metrics():
+    """Agent steps and post-harvest rejections per run, with and without filter pushdown."""
+    return jsonify(get_shared_pushdown_metrics().summary()), 200
+
 @app.route('/api/enhance', methods=['POST'])
 def enhance_prompt():
     """
@@ -113,8 +177,12 @@ def process_prompt():
         
         if execute_immediately:
             # Execute harvesting immediately (blocking)
-            harvester = Harvester()
-            agent_result = asyncio.run(harvester.harvest(transformed_prompt))
+            harvester = make_harvester(data)
+            command = request_command(original_prompt)
+            feed = request_feed(data, command)
+            agent_result = asyncio.run(harvester.harvest(transformed_prompt, feed=feed, command=command,
+                                                         author=request_author(original_prompt)))
+            archive_harvest(agent_result, feed)
             
             # Extract structured posts if result is a list of dictionaries
             extracted_posts = []
@@ -203,8 +271,12 @@ def execute_enhanced_prompt():
         original_prompt = data.get('original_prompt', enhanced_prompt)
         
         # Execute the harvesting with enhanced prompt
-        harvester = Harvester()
-        agent_result = asyncio.run(harvester.harvest(enhanced_prompt))
+        harvester = make_harvester(data)
+        command = request_command(original_prompt)
+        feed = request_feed(data, command)
+        agent_result = asyncio.run(harvester.harvest(enhanced_prompt, feed=feed, command=command,
+                                                     author=request_author(original_prompt)))
+        archive_harvest(agent_result, feed)
         
         # Extract structured posts if result is a list of dictionaries
         extracted_posts = []
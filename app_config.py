@@ -0,0 +1,306 @@
+"""
+Typed, hot-reloadable application configuration.
+
+Loads config/settings.yaml, config/filters.yaml and config/persona.md
+into one frozen AppConfig:
+
+- ``${VAR}`` and ``${VAR:-default}`` in YAML values are replaced from the
+  environment. A value that is a single reference is re-read as YAML, so
+  ``port: ${FLASK_PORT:-5000}`` is an int; unset variables without a
+  default become empty (None for a whole value).
+- Everything is validated up front (ValueError on a bad value), with the
+  ranking, rate limit and filter sections parsed by RankingConfig,
+  RateLimitSettings and FilterRules.
+
+ConfigStore keeps the current AppConfig in a plain attribute, so hot
+paths pay one attribute access per read. reload() re-parses only files
+whose mtime or size changed, builds a complete new AppConfig and swaps
+the reference in one assignment: readers see the old or the new config,
+never a mix. A file edited into an invalid state is logged and the last
+good config stays in place. watch() polls for changes in a daemon
+thread, so retuning needs no restart.
+"""
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import yaml
+
+from filter_engine import FilterRules
+from post_ranking import RankingConfig
+from rate_limiter import RateLimitSettings
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+SETTINGS_PATH = os.path.join(CONFIG_DIR, "settings.yaml")
+FILTERS_PATH = os.path.join(CONFIG_DIR, "filters.yaml")
+PERSONA_PATH = os.path.join(CONFIG_DIR, "persona.md")
+
+MODES = ("supervised", "autonomous")
+
+_REFERENCE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
+
+logger = logging.getLogger(__name__)
+
+
+def interpolate(value: Any, environ: Optional[Mapping[str, str]] = None) -> Any:
+    """Replace ``${VAR}`` / ``${VAR:-default}`` references in every string of a parsed YAML document."""
+    environ = os.environ if environ is None else environ
+    if isinstance(value, dict):
+        return {key: interpolate(item, environ) for key, item in value.items()}
+    if isinstance(value, list):
+        return [interpolate(item, environ) for item in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+
+    def substitute(match: re.Match) -> str:
+        name, default = match.groups()
+        return environ.get(name) or (default or "")
+
+    whole = _REFERENCE.fullmatch(value.strip())
+    if whole:
+        # A value that is just a reference takes the type of what it expands to
+        substituted = substitute(whole)
+        if not substituted:
+            return None
+        try:
+            typed = yaml.safe_load(substituted)
+        except yaml.YAMLError:
+            return substituted
+        return typed if isinstance(typed, (bool, int, float)) else substituted
+    return _REFERENCE.sub(substitute, value)
+
+
+def _integer(section: Mapping[str, Any], name: str, default: int, minimum: int, maximum: Optional[int] = None) -> int:
+    value = section.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum or (maximum is not None and value > maximum):
+        bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise ValueError(f"Setting '{name}' must be an integer {bounds}")
+    return value
+
+
+def _section(settings: Mapping[str, Any], name: str) -> Mapping[str, Any]:
+    section = settings.get(name) or {}
+    if not isinstance(section, Mapping):
+        raise ValueError(f"Setting '{name}' must be a mapping")
+    return section
+
+
+@dataclass(frozen=True)
+class ChromeSettings:
+    """The Chrome instance the harvester drives over CDP."""
+    debug_port: int = 9222
+    host: str = "localhost"
+    connection_timeout: float = 10.0
+    max_retries: int = 3
+
+    @property
+    def cdp_url(self) -> str:
+        return f"http://{self.host}:{self.debug_port}"
+
+    @classmethod
+    def from_settings(cls, section: Mapping[str, Any]) -> "ChromeSettings":
+        timeout = section.get("connection_timeout", cls.connection_timeout)
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError("Setting 'connection_timeout' must be a positive number")
+        return cls(debug_port=_integer(section, "debug_port", cls.debug_port, 1, 65535),
+                   host=str(section.get("host") or cls.host), connection_timeout=float(timeout),
+                   max_retries=_integer(section, "max_retries", cls.max_retries, 1))
+
+
+@dataclass(frozen=True)
+class WebSettings:
+    """Where the launcher serves the Flask UI."""
+    host: str = "localhost"
+    port: int = 5000
+
+    @classmethod
+    def from_settings(cls, section: Mapping[str, Any]) -> "WebSettings":
+        return cls(host=str(section.get("host") or cls.host), port=_integer(section, "port", cls.port, 1, 65535))
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """Everything in config/, validated."""
+    openai_api_key: Optional[str] = None
+    mode_default: str = "supervised"
+    scroll_limit: int = 30
+    post_limit: int = 5
+    engagement_types: Tuple[str, ...] = ("comment", "like")
+    chrome: ChromeSettings = field(default_factory=ChromeSettings)
+    web: WebSettings = field(default_factory=WebSettings)
+    ranking: RankingConfig = field(default_factory=RankingConfig)
+    rate_limits: RateLimitSettings = field(default_factory=RateLimitSettings)
+    filters: FilterRules = field(default_factory=FilterRules)
+    persona: str = ""
+
+    @classmethod
+    def from_documents(cls, settings: Mapping[str, Any], filters: Optional[Mapping[str, Any]] = None,
+                       persona: str = "") -> "AppConfig":
+        """
+        Build the config from parsed (already interpolated) settings and filters documents.
+
+        Raises:
+            ValueError: If a setting or filter rule is invalid
+        """
+        mode = settings.get("mode_default", cls.mode_default)
+        if mode not in MODES:
+            raise ValueError(f"Setting 'mode_default' must be one of {list(MODES)}")
+        engagement_types = settings.get("engagement_types", list(cls.engagement_types))
+        if isinstance(engagement_types, str) or not isinstance(engagement_types, list):
+            raise ValueError("Setting 'engagement_types' must be a list")
+        api_key = settings.get("openai_api_key")
+        ranking = RankingConfig.from_settings(settings)
+        return cls(openai_api_key=str(api_key) if api_key else None, mode_default=mode,
+                   scroll_limit=_integer(settings, "scroll_limit", cls.scroll_limit, 1),
+                   post_limit=ranking.post_limit,
+                   engagement_types=tuple(str(kind) for kind in engagement_types),
+                   chrome=ChromeSettings.from_settings(_section(settings, "chrome")),
+                   web=WebSettings.from_settings(_section(settings, "web")),
+                   ranking=ranking, rate_limits=RateLimitSettings.from_settings(_section(settings, "rate_limits")),
+                   filters=FilterRules.from_mapping(filters or {}), persona=persona)
+
+
+class ConfigStore:
+    """
+    The current AppConfig, reloaded when its files change.
+
+    Args:
+        settings_path: settings.yaml
+        filters_path: filters.yaml (optional file)
+        persona_path: persona.md (optional file)
+
+    Raises:
+        ValueError: If the files are invalid when the store is created
+        FileNotFoundError: If settings_path does not exist
+    """
+
+    def __init__(self, settings_path: str = SETTINGS_PATH, filters_path: str = FILTERS_PATH,
+                 persona_path: str = PERSONA_PATH):
+        self.paths = {"settings": settings_path, "filters": filters_path, "persona": persona_path}
+        self._lock = threading.Lock()
+        # Parsed file contents by name, with the (mtime_ns, size) they were read at
+        self._parsed: Dict[str, Tuple[Optional[Tuple[int, int]], Any]] = {}
+        self._listeners: List[Callable[[AppConfig], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.reloads = 0
+        self.config: AppConfig = self._build()
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self, name: str) -> Any:
+        """Contents of one file, parsed once per version of it."""
+        path = self.paths[name]
+        signature = self._signature(path)
+        cached = self._parsed.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        if signature is None:
+            if name == "settings":
+                raise FileNotFoundError(path)
+            contents: Any = {} if name == "filters" else ""
+        else:
+            with open(path, "r", encoding="utf-8") as handle:
+                text = handle.read()
+            if name == "persona":
+                contents = text
+            else:
+                contents = yaml.safe_load(text) or {}
+                if not isinstance(contents, Mapping):
+                    raise ValueError(f"Config file {path} must contain a mapping")
+        self._parsed[name] = (signature, contents)
+        return contents
+
+    def _build(self) -> AppConfig:
+        return AppConfig.from_documents(interpolate(self._read("settings")), interpolate(self._read("filters")),
+                                        self._read("persona"))
+
+    def changed(self) -> bool:
+        """Whether any file differs from the version the current config was built from."""
+        return any(self._parsed.get(name, (None,))[0] != self._signature(path) for name, path in self.paths.items())
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the config if a file changed (or always, with ``force``), and swap it in.
+
+        Returns:
+            Whether a new config was swapped in; False if nothing changed or
+            the files are invalid (the current config is kept and the error logged)
+        """
+        with self._lock:
+            if not force and not self.changed():
+                return False
+            if force:
+                self._parsed.clear()
+            try:
+                config = self._build()
+            except (OSError, ValueError, yaml.YAMLError) as error:
+                logger.error(f"Keeping the current configuration; reload failed: {error}")
+                return False
+            self.config = config
+            self.reloads += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(config)
+            except Exception as error:
+                logger.error(f"Configuration listener failed: {error}")
+        return True
+
+    def subscribe(self, listener: Callable[[AppConfig], None]) -> None:
+        """Call ``listener(config)`` after every reload that swaps in a new config."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def watch(self, interval: float = 2.0) -> None:
+        """Poll for file changes every ``interval`` seconds in a daemon thread (idempotent)."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                self.reload()
+
+        self._watcher = threading.Thread(target=poll, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread, if any."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+@lru_cache(maxsize=1)
+def get_shared_config_store() -> ConfigStore:
+    """
+    Return the process-wide config store, watching config/ for changes.
+
+    Set SETTINGS_PATH, FILTERS_PATH or PERSONA_PATH to read another file,
+    and CONFIG_RELOAD_INTERVAL to change the polling interval in seconds
+    (0 disables hot reloading).
+    """
+    store = ConfigStore(os.getenv("SETTINGS_PATH") or SETTINGS_PATH, os.getenv("FILTERS_PATH") or FILTERS_PATH,
+                        os.getenv("PERSONA_PATH") or PERSONA_PATH)
+    interval = float(os.getenv("CONFIG_RELOAD_INTERVAL") or 2.0)
+    if interval > 0:
+        store.watch(interval)
+    return store
+
+
+def get_config() -> AppConfig:
+    """The current configuration; keep the result only as long as one operation needs consistent values."""
+    return get_shared_config_store().config
@@ -0,0 +1,4 @@
+# Benchmarks for LinkedIn AI Agent hot paths.
+#
+# Run from the repository root, e.g.:
+#     python -m benchmarks.bench_parameter_extraction
@@ -0,0 +1,69 @@
+"""
+Benchmark: parsing scraped engagement counts.
+
+Renders the counts of a synthetic harvest the way the feed shows them
+("1,204", "1.2K", "12 comments") and compares converting them back to ints:
+
+- per value:   engagement_counts.parse_count without its memo table, row by row
+- batched:     engagement_counts.parse_counts (distinct strings parsed once)
+- fill:        engagement_counts.fill_counts over whole post dicts
+
+Usage:
+    python -m benchmarks.bench_engagement_counts [--posts 100000] [--locale en]
+"""
+
+import argparse
+import random
+import time
+
+from engagement_counts import COUNT_FIELDS, fill_counts, format_count, parse_count, parse_counts
+
+SUFFIXES = {"likes_count": "", "comments_count": " comments", "reposts_count": " reposts", "views_count": " views"}
+
+
+def make_records(count, rng, locale):
+    records = []
+    for _ in range(count):
+        record = {}
+        for name in COUNT_FIELDS:
+            value = int(rng.paretovariate(1.2) * 3) - 3
+            compact = value >= 10_000 or (value >= 1000 and rng.random() < 0.5)
+            record[name] = format_count(value, locale, compact) + SUFFIXES[name]
+        records.append(record)
+    return records
+
+
+def measure(label, fn, values, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<12} {best * 1e3:9.2f} ms  {values / best / 1e6:6.2f} M values/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--locale", default="en")
+    args = parser.parse_args()
+
+    records = make_records(args.posts, random.Random(7), args.locale)
+    columns = {name: [record[name] for record in records] for name in COUNT_FIELDS}
+    total = args.posts * len(COUNT_FIELDS)
+    print(f"{total} values, {len({value for column in columns.values() for value in column})} distinct strings\n")
+
+    unmemoised = parse_count.__wrapped__
+    per_value = measure("per value", lambda: {name: [unmemoised(value, args.locale) for value in column]
+                                              for name, column in columns.items()}, total)
+    parse_count.cache_clear()
+    batched = measure("batched", lambda: {name: parse_counts(column, args.locale) for name, column in columns.items()}, total)
+    filled = measure("fill", lambda: fill_counts(records, args.locale), total)
+
+    for name in COUNT_FIELDS:
+        assert batched[name].tolist() == per_value[name] == [record[name] for record in filled]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: local-first Command parsing vs always calling the LLM.
+
+Builds a corpus of prompts: the common "<verb> N posts about <topic>"
+shapes plus phrasings the local grammar deliberately leaves to the model
+(vague verbs, extra instructions, people and qualifiers). Each prompt is run
+through PromptInterpreter.parse_prompt twice against the local OpenAI stub
+(openai_stub.py): once with the local parser disabled and once enabled.
+
+Reports the local hit rate, the local parser's cost per prompt, the number
+of LLM requests avoided and the wall-clock time of both runs.
+
+Usage:
+    python -m benchmarks.bench_interpreter_local [--prompts 200] [--latency lognormal:-3,0.4]
+"""
+
+import argparse
+import logging
+import random
+import time
+
+import interpreter as interpreter_module
+from interpreter import PromptInterpreter, parse_command_locally
+from llm_guard import get_circuit_breaker
+from openai_stub import OpenAIStubServer, StubConfig
+from rate_limiter import ModelLimits, RateLimiter
+
+LOCAL_SHAPES = [
+    "Like {n} posts about {topic}",
+    "Could you comment on {n} recent posts about {topic}?",
+    "Fetch {n} posts about {topic}.",
+    "Get me articles on '{topic}'",
+    "Like {n} posts on {topic} and also share them.",
+    "Find {n} articles about {topic}",
+    "Like and comment on {n} posts about {topic}",
+    "Please share {n} latest posts about {topic}",
+]
+LLM_SHAPES = [
+    "Engage with some posts about {topic}",
+    "Show me {n} things about {topic}",
+    "Like {n} posts about {topic} from Satya Nadella",
+    "Find and like {n} posts about {topic}",
+    "Like {n} posts about {topic}, but skip anything promotional",
+]
+TOPICS = ["AI", "fintech", "climate tech", "remote work", "product design", "robotics", "AI in healthcare"]
+
+
+def run(prompts, base_url, use_local_parser):
+    interpreter_module._command_cache.clear()
+    get_circuit_breaker("openai").reset()
+    limiter = RateLimiter(limits={}, default_limits=ModelLimits(rpm=1_000_000, tpm=1_000_000_000))
+    interpreter = PromptInterpreter(
+        "sk-stub", llm_budget=None, rate_limiter=limiter, base_url=base_url, use_local_parser=use_local_parser
+    )
+    start = time.perf_counter()
+    for prompt in prompts:
+        interpreter.parse_prompt(prompt)
+    return time.perf_counter() - start, interpreter.parse_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--local-share", type=float, default=0.75, help="fraction of prompts in the local grammar")
+    parser.add_argument("--latency", default="lognormal:-3,0.4", help="stub latency spec (seconds)")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    rng = random.Random(args.seed)
+    prompts = [
+        rng.choice(LOCAL_SHAPES if rng.random() < args.local_share else LLM_SHAPES)
+        .format(n=rng.randint(2, 9), topic=rng.choice(TOPICS))
+        for _ in range(args.prompts)
+    ]
+
+    start = time.perf_counter()
+    hits = sum(parse_command_locally(prompt) is not None for prompt in prompts)
+    local_cost = (time.perf_counter() - start) / len(prompts)
+    print(f"local hit rate {hits / len(prompts):6.1%}  ({hits}/{len(prompts)})  "
+          f"local parse {local_cost * 1e6:6.1f} µs/prompt")
+
+    with OpenAIStubServer(StubConfig(latency=args.latency, seed=args.seed)) as server:
+        # Repeated prompts are answered by the Command cache in both runs
+        llm_time, llm_stats = run(prompts, server.base_url, use_local_parser=False)
+        local_time, local_stats = run(prompts, server.base_url, use_local_parser=True)
+
+    print(f"LLM only     {llm_time:7.2f} s  {llm_time / len(prompts) * 1e3:7.1f} ms/prompt  {llm_stats}")
+    print(f"local first  {local_time:7.2f} s  {local_time / len(prompts) * 1e3:7.1f} ms/prompt  {local_stats}")
+    print(f"LLM requests avoided {llm_stats['llm'] - local_stats['llm']}  "
+          f"latency saved {(llm_time - local_time) / len(prompts) * 1e3:.1f} ms/prompt on average")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: keyword filtering by text scan vs inverted index.
+
+Builds a synthetic harvest over a vocabulary of a few thousand words and
+answers "posts containing any of K keywords/phrases" for growing K:
+
+- scan:   KeywordMatcher, one pass over the post text per keyword
+- index:  KeywordIndex.query, a union of posting lists (phrases by
+          positional intersection)
+
+Index build time is reported separately; it is paid once per post, as
+posts arrive.
+
+Usage:
+    python -m benchmarks.bench_keyword_index [--posts 50000] [--keywords 3 30 300]
+"""
+
+import argparse
+import random
+import time
+
+from filter_engine import KeywordMatcher
+from keyword_index import KeywordIndex
+from post_batch import PostBatch
+
+
+def measure(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<28} {seconds * 1e3:9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--keywords", type=int, nargs="+", default=[3, 30, 300])
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    # Zipf-like word frequencies, as in real text
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    texts = [" ".join(rng.choices(vocabulary, weights, k=rng.randint(20, 120))) for _ in range(args.posts)]
+    batch = PostBatch.from_records([{"post_id": f"urn:li:activity:{i}", "content_text": text}
+                                    for i, text in enumerate(texts)])
+    print(f"{args.posts} posts, {sum(map(len, texts)) / 1e6:.1f}M characters")
+
+    index = KeywordIndex()
+    measure("build index", lambda: index.add_posts(batch))
+    print(f"index: {index.stats()}")
+
+    column = batch.column("content_text")
+    post_ids = batch.column("post_id").values()
+    for count in args.keywords:
+        keywords = [" ".join(rng.sample(vocabulary[50:1000], 2)) if i % 3 == 0 else rng.choice(vocabulary[50:])
+                    for i in range(count)]
+        matcher = KeywordMatcher(keywords)
+        scanned = measure(f"scan, {count} keywords", lambda: matcher.rows(column))
+        mask = measure(f"index, {count} keywords", lambda: index.mask(post_ids, keywords))
+        assert scanned.tolist() == mask.tolist()
+        print(f"  {int(mask.sum())} matching post(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: prompt enhancement latency against a degraded LLM upstream.
+
+Runs PromptTransformer template enhancement with LLM intent and parameter
+extraction against a simulated OpenAI client whose latency has a heavy
+tail and a configurable error rate, once with an effectively unbounded
+budget (the previous behaviour: wait for the SDK) and once with the default
+LLM latency budget. Reports p50/p95/p99/max enhancement latency; with a
+budget, intent detection and parameter extraction each wait at most one
+budget, so enhancement is bounded by roughly twice the budget.
+
+Usage:
+    python -m benchmarks.bench_llm_guard [--prompts 200] [--scale 0.1]
+"""
+
+import argparse
+import logging
+import random
+import time
+from types import SimpleNamespace
+
+from llm_guard import get_circuit_breaker
+from prompt_template_engine import PromptTemplateEngine
+from prompt_transformer import PromptTransformer
+
+PROMPTS = [
+    "Give kudos to the newest posts about {topic}",
+    "Engage thoughtfully with {n} posts on {topic}",
+    "Surface {n} recent threads about {topic} for me",
+    "Celebrate the latest {topic} announcements",
+]
+TOPICS = ["AI", "fintech", "climate tech", "remote work", "product design", "robotics"]
+
+
+class DegradedCompletions:
+    """Chat completions stub: lognormal latency with occasional multi-second stalls and errors."""
+
+    def __init__(self, scale: float, error_rate: float, stall_rate: float, seed: int = 11):
+        self.scale = scale
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.random = random.Random(seed)
+
+    def create(self, model, messages, **kwargs):
+        roll = self.random.random()
+        if roll < self.stall_rate:
+            time.sleep(20.0 * self.scale)  # upstream stall up to the SDK timeout
+        else:
+            time.sleep(self.random.lognormvariate(-0.7, 0.6) * self.scale)
+        if self.random.random() < self.error_rate:
+            raise RuntimeError("simulated 503 from upstream")
+        content = '{"count": 3}' if "JSON" in messages[0]["content"] else "post_engagement"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(prompts, budget, completions):
+    get_circuit_breaker("openai").reset()
+    latencies = []
+    for prompt in prompts:
+        transformer = PromptTransformer(use_templates=True, use_llm=True)
+        engine = transformer.template_engine
+        engine.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        engine.semantic_cache = None
+        engine.local_classifier = None
+        engine.llm_guard.budget = budget
+        start = time.perf_counter()
+        transformer.enhance_prompt(prompt)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=200, help="prompts per run")
+    parser.add_argument("--scale", type=float, default=0.1, help="multiplier on simulated upstream latency")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    args = parser.parse_args()
+    # Enhancement logs every prompt at INFO and every fallback at WARNING
+    logging.disable(logging.CRITICAL)
+
+    rng = random.Random(3)
+    # Unique prompts so no run is helped by the per-instance or semantic caches
+    prompts = [
+        rng.choice(PROMPTS).format(n=rng.randint(2, 9), topic=rng.choice(TOPICS)) + f" #{i}"
+        for i in range(args.prompts)
+    ]
+    budget = PromptTemplateEngine.LLM_LATENCY_BUDGET * args.scale
+
+    for label, run_budget in (("unbounded", None), (f"budget {budget:.3f}s", budget)):
+        completions = DegradedCompletions(args.scale, args.error_rate, args.stall_rate)
+        latencies = run(prompts, run_budget, completions)
+        print(
+            f"{label:<16} p50 {percentile(latencies, 0.50) * 1e3:8.1f} ms  "
+            f"p95 {percentile(latencies, 0.95) * 1e3:8.1f} ms  "
+            f"p99 {percentile(latencies, 0.99) * 1e3:8.1f} ms  "
+            f"max {max(latencies) * 1e3:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
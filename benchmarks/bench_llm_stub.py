@@ -0,0 +1,125 @@
+"""
+Benchmark: LLM-path throughput and latency against the local OpenAI stub.
+
+Starts openai_stub.OpenAIStubServer on a free port and drives the real
+OpenAI SDK paths through it, no network required:
+
+- engine sync:   PromptTemplateEngine.detect_intent_with_llm, one at a time
+- engine async:  PromptTemplateEngine.detect_intent_with_llm_async, N concurrent
+- interpreter:   PromptInterpreter.parse_prompt_async (structured output), N concurrent
+
+Every prompt is unique so no cache helps. Reports requests/s and
+p50/p95/p99 latency per path, plus the stub's error and token counters.
+Results are reproducible for a given --seed.
+
+Usage:
+    python -m benchmarks.bench_llm_stub [--requests 200] [--concurrency 16]
+        [--latency lognormal:-3.5,0.5] [--error-rate 0.0]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from interpreter import PromptInterpreter
+from llm_guard import get_circuit_breaker
+from openai_stub import OpenAIStubServer, StubConfig
+from prompt_template_engine import PromptTemplateEngine
+from rate_limiter import ModelLimits, RateLimiter
+
+PROMPTS = [
+    "Like {n} posts about {topic}",
+    "Comment on the latest {topic} posts",
+    "Find {n} recent threads about {topic}",
+    "Connect with people working on {topic}",
+]
+TOPICS = ["AI", "fintech", "climate tech", "remote work", "product design", "robotics"]
+
+# Generous limits so the client-side limiter never throttles the measurement
+UNTHROTTLED = ModelLimits(rpm=1_000_000, tpm=1_000_000_000)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(label, latencies, elapsed):
+    print(
+        f"{label:<14} {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50 {percentile(latencies, 0.50) * 1e3:7.1f} ms  "
+        f"p95 {percentile(latencies, 0.95) * 1e3:7.1f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1e3:7.1f} ms"
+    )
+
+
+def run_sync(engine, prompts):
+    latencies = []
+    start = time.perf_counter()
+    for prompt in prompts:
+        began = time.perf_counter()
+        engine.detect_intent_with_llm(prompt)
+        latencies.append(time.perf_counter() - began)
+    return latencies, time.perf_counter() - start
+
+
+async def run_concurrent(call, prompts, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(prompt):
+        async with semaphore:
+            began = time.perf_counter()
+            await call(prompt)
+            latencies.append(time.perf_counter() - began)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(prompt) for prompt in prompts))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per path")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", default="lognormal:-3.5,0.5", help="stub latency spec (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    rng = random.Random(args.seed)
+
+    def prompts(tag):
+        return [
+            rng.choice(PROMPTS).format(n=rng.randint(2, 9), topic=rng.choice(TOPICS)) + f" #{tag}{i}"
+            for i in range(args.requests)
+        ]
+
+    config = StubConfig(latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    with OpenAIStubServer(config) as server:
+        limiter = RateLimiter(limits={}, default_limits=UNTHROTTLED)
+        engine = PromptTemplateEngine(
+            use_llm=True, openai_api_key="sk-stub", base_url=server.base_url, llm_budget=None,
+            use_local_classifier=False, use_semantic_cache=False, rate_limiter=limiter,
+        )
+        interpreter = PromptInterpreter("sk-stub", llm_budget=None, rate_limiter=limiter, base_url=server.base_url)
+        print(f"stub {server.base_url}  latency {args.latency}  error rate {args.error_rate}")
+
+        get_circuit_breaker("openai").reset()
+        report("engine sync", *run_sync(engine, prompts("s")))
+
+        async def run_async_paths():
+            get_circuit_breaker("openai").reset()
+            report("engine async", *await run_concurrent(engine.detect_intent_with_llm_async, prompts("a"), args.concurrency))
+            get_circuit_breaker("openai").reset()
+            report("interpreter", *await run_concurrent(interpreter.parse_prompt_async, prompts("i"), args.concurrency))
+
+        asyncio.run(run_async_paths())
+        print(f"stub counters {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
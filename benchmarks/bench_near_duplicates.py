@@ -0,0 +1,98 @@
+"""
+Benchmark: near-duplicate detection with MinHash/LSH vs exact pairwise Jaccard.
+
+Builds a synthetic harvest where a share of posts are reposts of earlier
+ones with a few words changed or hashtags appended, then compares:
+
+- exact:  pairwise Jaccard over shingle sets, first match wins (quadratic)
+- LSH:    near_duplicates.NearDuplicateIndex.deduplicate on the whole batch
+
+and reports precision/recall of LSH against the exact answer, plus LSH
+throughput on a larger harvest.
+
+Usage:
+    python -m benchmarks.bench_near_duplicates [--posts 2000] [--large 50000] [--duplicates 0.3]
+"""
+
+import argparse
+import random
+import time
+
+from near_duplicates import NearDuplicateIndex
+from text_features import tokenize
+
+WORDS = ("ai fintech climate launch team hiring product data model agents scale growth customers "
+         "excited share proud announce thanks journey lessons leadership remote culture funding").split()
+
+
+def make_texts(count, rng, duplicate_share):
+    texts = []
+    for _ in range(count):
+        if texts and rng.random() < duplicate_share:
+            words = rng.choice(texts).split()
+            for _ in range(rng.randint(0, 2)):
+                words[rng.randrange(len(words))] = rng.choice(WORDS)
+            if rng.random() < 0.5:
+                words.append(f"#{rng.choice(WORDS)}")
+            texts.append(" ".join(words))
+        else:
+            texts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))))
+    return texts
+
+
+def exact_duplicates(texts, threshold, k):
+    shingle_sets = []
+    for text in texts:
+        tokens = tokenize(text)
+        shingle_sets.append({tuple(tokens[i:i + k]) for i in range(max(1, len(tokens) - k + 1))})
+    kept, matches = [], []
+    for index, shingles in enumerate(shingle_sets):
+        match = next((j for j in kept if len(shingles & shingle_sets[j]) / len(shingles | shingle_sets[j]) >= threshold), None)
+        matches.append(match)
+        if match is None:
+            kept.append(index)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--large", type=int, default=50_000)
+    parser.add_argument("--duplicates", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    texts = make_texts(args.posts, rng, args.duplicates)
+    keys = [str(i) for i in range(len(texts))]
+
+    start = time.perf_counter()
+    exact = exact_duplicates(texts, 0.8, 3)
+    exact_seconds = time.perf_counter() - start
+
+    index = NearDuplicateIndex(threshold=0.8)
+    start = time.perf_counter()
+    approximate = index.deduplicate(keys, texts)
+    lsh_seconds = time.perf_counter() - start
+
+    truth = {i for i, match in enumerate(exact) if match is not None}
+    found = {i for i, match in enumerate(approximate) if match is not None}
+    print(f"{args.posts} posts, {len(truth)} exact near-duplicates (Jaccard >= 0.8)")
+    print(f"exact pairwise    {exact_seconds * 1e3:9.1f} ms")
+    print(f"MinHash/LSH       {lsh_seconds * 1e3:9.1f} ms  (bands={index.bands}, rows={index.rows})")
+    print(f"precision {len(truth & found) / max(1, len(found)):.3f}  recall {len(truth & found) / max(1, len(truth)):.3f}\n")
+
+    large = make_texts(args.large, rng, args.duplicates)
+    index = NearDuplicateIndex(threshold=0.8)
+    start = time.perf_counter()
+    signatures = index.signatures(large)
+    signature_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    matches = index.deduplicate([str(i) for i in range(len(large))], large)
+    seconds = time.perf_counter() - start
+    print(f"{args.large} posts: signatures {signature_seconds:.2f} s, deduplicate {seconds:.2f} s "
+          f"({args.large / seconds:,.0f} posts/s), {sum(match is not None for match in matches)} dropped")
+    assert signatures.shape == (args.large, index.num_perm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: regex parameter extraction throughput.
+
+Compares the original per-call pattern lists (up to four count searches,
+three keyword searches and a person search per prompt) with the single-pass
+scanner in parameter_extraction.py over a generated prompt corpus, and
+checks both produce identical results.
+
+Usage:
+    python -m benchmarks.bench_parameter_extraction [--prompts 100000]
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from parameter_extraction import scan_parameters
+
+
+def legacy_extract_keywords(prompt: str) -> List[str]:
+    """Keyword extraction as originally written in PromptTemplateEngine."""
+    patterns = [
+        r'about\s+(.+?)(?:\s+(?:with|by|from|in)|\s*$)',
+        r'on\s+(.+?)(?:\s+(?:with|by|from|in)|\s*$)',
+        r'related to\s+(.+?)(?:\s+(?:with|by|from|in)|\s*$)',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, prompt, re.IGNORECASE)
+        if match:
+            keyword_text = match.group(1).strip()
+            if " and " in keyword_text:
+                return [k.strip() for k in keyword_text.split(" and ")]
+            else:
+                return [keyword_text]
+    return []
+
+
+def legacy_extract_parameters(prompt: str) -> Dict:
+    """Parameter extraction as originally written in PromptTemplateEngine."""
+    params = {}
+    count_patterns = [
+        r'\b(\d+)\s+posts?\b',
+        r'\b(\d+)\s+(?:times?|items?)\b',
+        r'\bfind\s+(\d+)\b',
+        r'\b(\d+)\b'
+    ]
+    for pattern in count_patterns:
+        count_match = re.search(pattern, prompt, re.IGNORECASE)
+        if count_match:
+            params["count"] = int(count_match.group(1))
+            break
+    keywords = legacy_extract_keywords(prompt)
+    if keywords:
+        params["keywords"] = keywords
+    person_match = re.search(r'(?:by|from)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)', prompt)
+    if person_match:
+        params["target_person"] = person_match.group(1)
+    return params
+
+
+def build_corpus(size: int, seed: int = 7) -> List[str]:
+    """Generate realistic LinkedIn automation prompts."""
+    rng = random.Random(seed)
+    verbs = ["Like", "Comment on", "Find", "React to", "Share", "Connect with",
+             "Scroll my feed and collect", "Please find me", "Could you like"]
+    topics = ["AI", "machine learning and startups", "generative AI", "fintech",
+              "systems thinking", "climate tech and energy", "remote work"]
+    people = ["Sundar Pichai", "Satya Nadella", "Reid Hoffman", "Jane Doe"]
+    forms = [
+        "{v} {n}posts about {t}",
+        "{v} {n}posts on {t} by {p}",
+        "{v} {n}recent posts related to {t} from {p} this week",
+        "{v} the latest post by {p}",
+        "{v} {n}people working in {t}",
+        "Tell me about your day",
+    ]
+    corpus = []
+    for _ in range(size):
+        count = rng.choice(["", f"{rng.randint(1, 50)} "])
+        form = rng.choice(forms)
+        corpus.append(form.format(v=rng.choice(verbs), n=count, t=rng.choice(topics), p=rng.choice(people)))
+    return corpus
+
+
+def time_extractor(extractor, corpus: List[str], repeat: int = 3) -> float:
+    """Return the best wall-clock time of several passes over the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for prompt in corpus:
+            extractor(prompt)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=100_000, help="corpus size")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.prompts)
+    mismatches = sum(legacy_extract_parameters(p) != scan_parameters(p) for p in corpus)
+
+    legacy = time_extractor(legacy_extract_parameters, corpus)
+    scanner = time_extractor(scan_parameters, corpus)
+
+    print(f"prompts:          {len(corpus)}")
+    print(f"mismatches:       {mismatches}")
+    print(f"legacy patterns:  {len(corpus) / legacy:,.0f} prompts/s ({legacy * 1e6 / len(corpus):.2f} us/prompt)")
+    print(f"single-pass scan: {len(corpus) / scanner:,.0f} prompts/s ({scanner * 1e6 / len(corpus):.2f} us/prompt)")
+    print(f"speedup:          {legacy / scanner:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: querying an archive of past harvests.
+
+Archives N harvests of synthetic posts, then answers one query ("posts by
+an author with at least 100 likes") three ways:
+
+- JSON reload:   harvests kept as JSON files, re-parsed and filtered in Python
+- arrow scan:    PostArchive.scan over memory-mapped Arrow IPC files
+- parquet scan:  PostArchive.scan over Parquet files (decoded on read)
+
+Usage:
+    python -m benchmarks.bench_post_archive [--harvests 100] [--posts 1000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from models import FetchedPost
+from post_archive import PostArchive
+
+AUTHORS = [f"Author {i}" for i in range(500)]
+
+
+def measure(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<28} {seconds * 1e3:9.2f} ms")
+    return result
+
+
+def harvest(h, size):
+    base = 7_200_000_000_000_000_000 + h * size
+    return [
+        FetchedPost(
+            post_id=f"urn:li:activity:{base + i}",
+            post_url=f"https://www.linkedin.com/feed/update/urn:li:activity:{base + i}/",
+            author_name=AUTHORS[(h * 7 + i) % len(AUTHORS)],
+            author_headline="Engineer at Example",
+            content_text=f"Harvest {h} post {i}: " + "some words about machine learning " * 8,
+            posted_timestamp_str=f"{1 + i % 23}h",
+            likes_count=(i * 37) % 500,
+            comments_count=i % 40,
+        )
+        for i in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--harvests", type=int, default=100)
+    parser.add_argument("--posts", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = 1_748_779_200.0
+    harvests = [harvest(h, args.posts) for h in range(args.harvests)]
+    with tempfile.TemporaryDirectory() as directory:
+        json_dir = os.path.join(directory, "json")
+        os.makedirs(json_dir)
+        archives = {name: PostArchive(os.path.join(directory, name), format=name) for name in ("arrow", "parquet")}
+
+        def write_json():
+            for h, posts in enumerate(harvests):
+                with open(os.path.join(json_dir, f"{h:05d}.json"), "w") as f:
+                    json.dump([post.model_dump(mode="json") for post in posts], f)
+
+        measure(f"write JSON x{args.harvests}", write_json)
+        for name, archive in archives.items():
+            measure(f"append {name} x{args.harvests}",
+                    lambda: [archive.append(posts, harvested_at=start + h * 3600) for h, posts in enumerate(harvests)])
+
+        def json_reload():
+            matches = []
+            for name in sorted(os.listdir(json_dir)):
+                with open(os.path.join(json_dir, name)) as f:
+                    matches.extend(post["post_id"] for post in json.load(f)
+                                   if "author 7" in post["author_name"].lower() and (post["likes_count"] or 0) >= 100)
+            return matches
+
+        by_json = measure("JSON reload", json_reload)
+        for name, archive in archives.items():
+            table = measure(f"{name} scan", lambda: archive.scan(author="author 7", min_likes=100, columns=["post_id"]))
+            assert table["post_id"].to_pylist() == by_json
+        print(f"{len(by_json)} matching post(s) of {args.harvests * args.posts}")
+
+
+if __name__ == "__main__":
+    main()
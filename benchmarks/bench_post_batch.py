@@ -0,0 +1,107 @@
+"""
+Benchmark: list of FetchedPost models vs a columnar PostBatch.
+
+Builds a synthetic harvest with realistic author repetition and compares
+memory held, JSON serialisation (model_dump per post and app.py-style
+clean_post dicts vs PostBatch.to_json), NDJSON emission, and a
+"likes >= 100, newest ids first" filter and sort. Also checks that the
+round trip back to FetchedPost is lossless.
+
+Usage:
+    python -m benchmarks.bench_post_batch [--posts 20000]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from models import FetchedPost
+from post_batch import PostBatch
+
+AUTHORS = [f"Author {i}" for i in range(400)]
+HEADLINES = ["AI Enthusiast | Building the Future", "VP Engineering", "Founder & CEO", None]
+WORDS = "ai fintech climate launch team hiring product data model agents scale growth customers".split()
+
+
+def make_records(count, rng):
+    records = []
+    for i in range(count):
+        activity = 7_200_000_000_000_000_000 + i * 4_194_304
+        author = rng.randrange(len(AUTHORS))
+        records.append({
+            "post_id": f"urn:li:activity:{activity}",
+            "post_url": f"https://www.linkedin.com/feed/update/urn:li:activity:{activity}/",
+            "author_name": AUTHORS[author],
+            "author_url": f"https://www.linkedin.com/in/author-{author}/",
+            "author_headline": HEADLINES[author % len(HEADLINES)],
+            "content_text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+            "posted_timestamp_str": rng.choice(["1h", "2h", "5h", "1d", "2d", "1w"]),
+            "likes_count": rng.randint(0, 2000) if rng.random() > 0.1 else None,
+            "comments_count": rng.randint(0, 200),
+            "reposts_count": rng.randint(0, 50),
+            "views_count": None,
+        })
+    return records
+
+
+def measure(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<42} {best * 1e3:9.2f} ms")
+    return result
+
+
+def allocated(fn):
+    tracemalloc.start()
+    result = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=20_000)
+    args = parser.parse_args()
+
+    records = make_records(args.posts, random.Random(7))
+    posts, posts_bytes = allocated(lambda: [FetchedPost(**record) for record in records])
+    batch, batch_bytes = allocated(lambda: PostBatch.from_posts(posts))
+    print(f"{args.posts} posts  list[FetchedPost] {posts_bytes / 2**20:7.1f} MiB  "
+          f"PostBatch {batch_bytes / 2**20:7.1f} MiB  ({posts_bytes / batch_bytes:.1f}x smaller)")
+
+    measure("PostBatch.from_posts", lambda: PostBatch.from_posts(posts))
+    measure("json.dumps(model_dump per post)", lambda: json.dumps([p.model_dump(mode="json") for p in posts]))
+    measure("json.dumps(app.py clean_post dicts)", lambda: json.dumps([{
+        "post_id": p.post_id, "author_name": p.author_name, "content_text": p.content_text,
+        "likes_count": p.likes_count, "author_url": str(p.author_url), "post_url": str(p.post_url),
+        "posted_timestamp_str": p.posted_timestamp_str,
+    } for p in posts]))
+    measure("PostBatch.to_json", batch.to_json)
+    measure("PostBatch.to_ndjson", batch.to_ndjson)
+
+    def filter_sort_models():
+        kept = [p for p in posts if p.likes_count is not None and p.likes_count >= 100]
+        return sorted(kept, key=lambda p: int(p.post_id.rsplit(":", 1)[1]), reverse=True)
+
+    def filter_sort_batch():
+        kept = batch.filter(batch.column("likes_count") >= 100)
+        return kept.take(np.argsort(-kept.activity_ids(), kind="stable"))
+
+    expected = measure("filter + sort, list[FetchedPost]", filter_sort_models)
+    actual = measure("filter + sort, PostBatch", filter_sort_batch)
+    assert [p.post_id for p in expected] == actual.column("post_id").values()
+
+    restored = measure("PostBatch.to_posts (validated)", batch.to_posts, repeat=1)
+    print(f"lossless round trip: {restored == posts}")
+
+
+if __name__ == "__main__":
+    main()
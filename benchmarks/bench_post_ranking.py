@@ -0,0 +1,80 @@
+"""
+Benchmark: picking the top post_limit posts of a wide harvest.
+
+Scores a synthetic harvest with the settings.yaml ranking weights and
+keeps the best K three ways, reporting time and peak traced memory
+(the generated posts included):
+
+- sort all:  materialise every post, score, sort, slice (O(n log n), O(n))
+- heap:      PostRanker.top_k over a generator (O(n log K), O(K))
+- batch:     PostRanker.top_k_batch on a PostBatch already in memory
+             (vectorised scores, partial sort)
+
+Usage:
+    python -m benchmarks.bench_post_ranking [--posts 200000] [--k 5]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app_config import ConfigStore
+from post_batch import PostBatch
+from post_ranking import PostRanker, RankingConfig
+
+NOW = 1_750_000_000.0
+
+
+def generate(count, seed=5):
+    rng = random.Random(seed)
+    for i in range(count):
+        activity = ((int(NOW) - rng.randint(0, 14 * 86400)) * 1000) << 22
+        yield {
+            "post_id": f"urn:li:activity:{activity + i}",
+            "post_url": f"https://www.linkedin.com/feed/update/urn:li:activity:{activity + i}/",
+            "author_name": f"Author {rng.randrange(3000)}",
+            "content_text": "x" * rng.randint(200, 1200),
+            "posted_timestamp_str": rng.choice([None, "1h", "5h", "1d", "3d", "1w"]),
+            "likes_count": int(rng.paretovariate(1.2)) if rng.random() > 0.1 else None,
+            "comments_count": int(rng.paretovariate(1.5)),
+            "reposts_count": int(rng.paretovariate(2.0)),
+        }
+
+
+def measure(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    # Memory from a second, traced run (tracing slows the run down)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} {seconds * 1e3:9.1f} ms  peak {peak / 1e6:8.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=200_000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    ranker = PostRanker(ConfigStore().config.ranking, now=NOW)
+
+    def sort_all():
+        posts = list(generate(args.posts))
+        scored = sorted(((ranker.score(post), index) for index, post in enumerate(posts)), key=lambda item: (-item[0], item[1]))
+        return [posts[index]["post_id"] for _, index in scored[:args.k]]
+
+    by_sort = measure("sort all", sort_all)
+    by_heap = measure("heap", lambda: [post["post_id"] for _, post in ranker.top_k(generate(args.posts), args.k)])
+    batch = PostBatch.from_records(list(generate(args.posts)))
+    by_batch = measure("batch", lambda: ranker.top_k_batch(batch, args.k).column("post_id").values())
+    assert by_sort == by_heap == by_batch
+    print(f"top {args.k}: {by_heap}")
+
+
+if __name__ == "__main__":
+    main()
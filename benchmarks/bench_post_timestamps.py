@@ -0,0 +1,86 @@
+"""
+Benchmark: normalising posted_timestamp_str and querying by time window.
+
+Builds a synthetic archive with a realistic mix of relative ("2h", "3d",
+"1w • Edited") and absolute ("July 10") timestamps and compares:
+
+- normalisation: parsing every row with the unmemoised parser vs
+  post_timestamps.normalize_timestamps (np.unique + memo table) vs
+  PostBatch.with_posted_at (parses the already interned categories)
+- "posted in the last 24 hours" queries: a full boolean mask over the
+  column vs a range scan over the sorted posted_at index
+
+Usage:
+    python -m benchmarks.bench_post_timestamps [--posts 100000] [--queries 200]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.bench_post_batch import make_records
+from post_batch import PostBatch
+from post_timestamps import DAY, HOUR, normalize_timestamps, parse_token, resolve_token
+
+HARVESTED_AT = 1_750_000_000
+
+
+def timestamp_strings(rng):
+    relative = [f"{n}{unit}" for unit, limit in (("m", 59), ("h", 23), ("d", 6), ("w", 4), ("mo", 11)) for n in range(1, limit + 1)]
+    absolute = [f"{month} {day}" for month in ("Jan", "March", "July", "Sept", "Dec") for day in (1, 10, 20)]
+    choices = relative + [value + " • Edited" for value in relative[:20]] + absolute
+    return lambda: rng.choice(choices)
+
+
+def measure(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1e3:9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    pick = timestamp_strings(rng)
+    records = make_records(args.posts, rng)
+    for record in records:
+        record["posted_timestamp_str"] = pick()
+    values = [record["posted_timestamp_str"] for record in records]
+    batch = PostBatch.from_records(records)
+    print(f"{args.posts} posts, {len(set(values))} distinct timestamp strings\n")
+
+    unmemoised = parse_token.__wrapped__
+    per_row = measure("per row (no memo)",
+                      lambda: np.array([resolve_token(unmemoised(value), HARVESTED_AT) for value in values], dtype=np.int64))
+    vectorised = measure("normalize_timestamps", lambda: normalize_timestamps(values, HARVESTED_AT))
+    dated = measure("PostBatch.with_posted_at", lambda: batch.with_posted_at(HARVESTED_AT))
+    assert (per_row == vectorised).all() and (dated.column("posted_at") == vectorised).all()
+
+    posted_at = dated.column("posted_at")
+    measure("build sorted index", lambda: batch.with_posted_at(HARVESTED_AT).posted_index())
+    dated.posted_index()
+    starts = [HARVESTED_AT - rng.randrange(0, 30 * DAY) for _ in range(args.queries)]
+
+    def mask_queries():
+        return [np.flatnonzero((posted_at >= start) & (posted_at < start + 24 * HOUR)) for start in starts]
+
+    def range_queries():
+        return [dated.rows_posted_between(start, start + 24 * HOUR) for start in starts]
+
+    masked = measure(f"{args.queries} windows, boolean mask", mask_queries)
+    scanned = measure(f"{args.queries} windows, range scan", range_queries)
+    assert all(np.array_equal(np.sort(a), np.sort(b)) for a, b in zip(masked, scanned))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: FetchedPost ingest paths.
+
+Compares building FetchedPost models for a synthetic harvest:
+
+- per item:     FetchedPost(**record) in a loop (the current path)
+- bulk:         models.validate_posts (one cached TypeAdapter call)
+- bulk JSON:    models.validate_posts_json straight from the JSON text
+- trusted:      models.construct_posts (model_construct, no validation)
+
+Usage:
+    python -m benchmarks.bench_post_validation [--posts 10000]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.bench_post_batch import make_records
+from models import FetchedPost, construct_posts, get_posts_adapter, validate_posts, validate_posts_json
+
+
+def measure(label, fn, count, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<14} {best * 1e3:8.2f} ms  {best * 1e6 / count:6.2f} µs/post")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    records = make_records(args.posts, random.Random(7))
+    payload = json.dumps(records)
+    get_posts_adapter()  # built once per process; keep it out of the timings
+
+    per_item = measure("per item", lambda: [FetchedPost(**record) for record in records], args.posts)
+    bulk = measure("bulk", lambda: validate_posts(records), args.posts)
+    bulk_json = measure("bulk JSON", lambda: validate_posts_json(payload), args.posts)
+    trusted = measure("trusted", lambda: construct_posts(records), args.posts)
+
+    assert bulk == per_item and bulk_json == per_item
+    assert [str(post.post_url) for post in trusted] == [str(post.post_url) for post in per_item]
+
+
+if __name__ == "__main__":
+    main()
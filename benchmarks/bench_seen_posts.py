@@ -0,0 +1,59 @@
+"""
+Benchmark: seen-post skip decisions.
+
+Fills a SeenPostIndex with earlier harvests, then times the checks a new
+harvest makes:
+
+- mark_seen:     recording a harvest (one batched upsert transaction)
+- SQL lookup:    one SELECT per post id (what a database-only index costs)
+- set lookup:    SeenPostIndex.seen_mask (in-memory front, no queries)
+
+Usage:
+    python -m benchmarks.bench_seen_posts [--known 200000] [--harvest 5000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from seen_posts import SeenPostIndex, post_key
+
+
+def measure(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<28} {seconds * 1e3:9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--known", type=int, default=200_000)
+    parser.add_argument("--harvest", type=int, default=5000)
+    args = parser.parse_args()
+
+    known = [f"urn:li:activity:{7_200_000_000_000_000_000 + i * 4_194_304}" for i in range(args.known)]
+    # Half of the new harvest was already seen
+    harvest = known[-args.harvest // 2:] + [f"urn:li:activity:{8_000_000_000_000_000_000 + i}" for i in range(args.harvest // 2)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "seen.sqlite3")
+        with SeenPostIndex(path) as index:
+            measure(f"mark_seen {args.known} known", lambda: index.mark_seen(known, seen_at=1.0))
+        index = measure("reopen (load front)", lambda: SeenPostIndex(path))
+
+        def sql_lookup():
+            query = "SELECT 1 FROM seen_posts WHERE post_id = ?"
+            return [index._connection.execute(query, (post_key(post_id),)).fetchone() is not None for post_id in harvest]
+
+        by_sql = measure(f"SQL lookup x{len(harvest)}", sql_lookup)
+        by_set = measure(f"set lookup x{len(harvest)}", lambda: index.seen_mask(harvest))
+        assert by_sql == by_set.tolist() and sum(by_sql) == args.harvest // 2
+        measure(f"mark_seen {len(harvest)} harvest", lambda: index.mark_seen(harvest))
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: template store load and render latency.
+
+Times compiling the bundled config/templates directory and rendering every
+intent's plan through PromptTemplateEngine.render_template, the path
+PromptTransformer takes on each request. Reports per-render latency per
+intent; every render is expected to stay well under a millisecond.
+
+Usage:
+    python -m benchmarks.bench_template_render [--renders 20000]
+"""
+
+import argparse
+import time
+
+from prompt_template_engine import PromptTemplateEngine
+from template_store import TEMPLATE_DIR, TemplateStore
+
+SAMPLE_PARAMETERS = {
+    "post_engagement": {"count": 5, "keywords": ["AI", "startups"], "target_person": "Sundar Pichai"},
+    "comment_post": {"keywords": ["fintech"], "comment_text": "Great insights!"},
+    "connect_follow": {"count": 5, "keywords": ["product managers"], "target_company": "Google"},
+    "message": {"target_person": "John Smith", "message_text": "Thanks for connecting!"},
+    "search_content": {"count": 5, "keywords": ["generative AI"], "timeframe": "this week"},
+    "visit_profile": {"target_person": "Sundar Pichai"},
+    "create_post": {"keywords": ["our product launch"]},
+    "data_extract": {"count": 10, "keywords": ["commenters"]},
+    "feed_collection": {"count": 10},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=20_000, help="renders per intent")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = TemplateStore(TEMPLATE_DIR)
+    load_ms = (time.perf_counter() - start) * 1e3
+    print(f"load + compile {len(store.intents)} templates: {load_ms:.2f} ms")
+
+    engine = PromptTemplateEngine()
+    worst = 0.0
+    for intent, parameters in SAMPLE_PARAMETERS.items():
+        template = f"{intent}_template"
+        engine.render_template(template, parameters)
+        start = time.perf_counter()
+        for _ in range(args.renders):
+            engine.render_template(template, parameters)
+        per_render_us = (time.perf_counter() - start) * 1e6 / args.renders
+        worst = max(worst, per_render_us)
+        print(f"{intent:<16} {per_render_us:6.2f} us/render")
+
+    print(f"slowest intent:  {worst:.2f} us/render ({'under' if worst < 1000 else 'OVER'} 1 ms budget)")
+
+
+if __name__ == "__main__":
+    main()
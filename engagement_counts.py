@@ -0,0 +1,175 @@
+"""
+Parsing of LinkedIn engagement counts.
+
+The feed renders likes, comments, reposts and views as text: "1,204",
+"1.2K", "3M", "12 comments", "Jane Doe and 41 others", or in other UI
+languages "1.204", "1,2 Tsd.", "3 Mio." and "1 204 commentaires".
+FetchedPost expects ints, so scraped values are converted here:
+
+- each locale's number grammar (group and decimal separators, compact
+  suffixes) is compiled into one regex at import time
+- a batch is reduced to its distinct strings, each parsed once through a
+  memo table, and the results are gathered back into an int64 array
+- compact values are truncated, as LinkedIn does when rendering them
+  ("1.2K" means at least 1,200)
+
+Missing or unparseable values become MISSING (-1).
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Pattern, Sequence
+
+import numpy as np
+
+MISSING = -1
+
+COUNT_FIELDS = ("likes_count", "comments_count", "reposts_count", "views_count")
+
+
+@dataclass(frozen=True)
+class CountLocale:
+    """Number grammar of one LinkedIn UI language."""
+    group: str  # characters accepted as thousands separators
+    decimal: str
+    multipliers: Mapping[str, int]  # lower-case compact suffixes
+    others: Optional[str] = None  # "and N others" phrase, with {number} for the count
+    pattern: Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        group, decimal = re.escape(self.group), re.escape(self.decimal)
+        number = (rf"(?P<integer>\d{{1,3}}(?:[{group}]\d{{3}})+|\d+)"
+                  rf"(?:{decimal}(?P<fraction>\d+))?(?![{group}{decimal}]\d)")
+        suffix = "|".join(map(re.escape, sorted(self.multipliers, key=len, reverse=True)))
+        count = rf"(?<!\d)(?<!\d[{group}{decimal}]){number}\s*(?:(?P<suffix>{suffix})(?![^\W\d_]))?"
+        if self.others:
+            count = self.others.format(number=rf"(?P<others>{count})") + "|" + count.replace("?P<", "?P<plain_")
+        object.__setattr__(self, "pattern", re.compile(count))
+
+
+THOUSAND, MILLION, BILLION = 10 ** 3, 10 ** 6, 10 ** 9
+SPACES = " \u00a0\u202f"  # space, no-break space, narrow no-break space
+
+LOCALES: Dict[str, CountLocale] = {
+    "en": CountLocale(",", ".", {"k": THOUSAND, "m": MILLION, "b": BILLION},
+                      r"\band\s+{number}\s+others?\b"),
+    "de": CountLocale("." + SPACES, ",", {"k": THOUSAND, "tsd.": THOUSAND, "tsd": THOUSAND,
+                                          "mio.": MILLION, "mio": MILLION, "mrd.": BILLION, "mrd": BILLION},
+                      r"\bund\s+{number}\s+weitere\b"),
+    "fr": CountLocale(SPACES + ".", ",", {"k": THOUSAND, "m": MILLION, "md": BILLION, "mrd": BILLION},
+                      r"\bet\s+{number}\s+autres?\b"),
+    "es": CountLocale("." + SPACES, ",", {"k": THOUSAND, "mil": THOUSAND, "m": MILLION, "mm": BILLION},
+                      r"\by\s+{number}\s+personas?\s+más\b"),
+    "pt": CountLocale("." + SPACES, ",", {"k": THOUSAND, "mil": THOUSAND, "mi": MILLION, "bi": BILLION},
+                      r"\be\s+(?:mais\s+)?{number}\s+(?:outras?|pessoas)\b"),
+}
+
+DEFAULT_LOCALE = "en"
+
+
+def get_locale(locale: str) -> CountLocale:
+    """
+    Look up a locale by language code ("de", "fr-FR" and "pt_BR" all work).
+
+    Raises:
+        ValueError: If the language is not supported
+    """
+    language = locale.replace("_", "-").split("-")[0].lower()
+    try:
+        return LOCALES[language]
+    except KeyError:
+        raise ValueError(f"Unsupported count locale: {locale!r} (supported: {', '.join(LOCALES)})")
+
+
+@lru_cache(maxsize=8192)
+def parse_count(text: str, locale: str = DEFAULT_LOCALE) -> Optional[int]:
+    """
+    Parse one rendered count ("1,204", "1.2K", "12 comments", "Ann and 41 others").
+
+    The first number in the text is used. Returns None if there is none,
+    or if it has a fractional part without a compact suffix.
+    """
+    grammar = get_locale(locale)
+    match = grammar.pattern.search(text.lower())
+    if not match:
+        return None
+    groups = match.groupdict()
+    prefix = "" if groups.get("others") is not None or grammar.others is None else "plain_"
+    integer = re.sub(r"\D", "", groups[prefix + "integer"])
+    fraction = groups[prefix + "fraction"] or ""
+    suffix = groups[prefix + "suffix"]
+    if fraction and not suffix:
+        return None
+    multiplier = grammar.multipliers[suffix] if suffix else 1
+    value = int(integer + fraction) * multiplier // 10 ** len(fraction)
+    # "Ann and 41 others" counts Ann too
+    return value + 1 if prefix == "" and grammar.others else value
+
+
+def parse_counts(values: Sequence[Any], locale: str = DEFAULT_LOCALE) -> np.ndarray:
+    """
+    Convert a batch of scraped counts into an int64 array.
+
+    Args:
+        values: Rendered count strings; ints pass through, None is missing
+        locale: UI language the counts were rendered in
+
+    Returns:
+        int64 array, MISSING where a value is missing or unparseable
+
+    Raises:
+        ValueError: If the locale is not supported
+    """
+    get_locale(locale)
+    result = np.full(len(values), MISSING, dtype=np.int64)
+    text_rows = []
+    for row, value in enumerate(values):
+        if isinstance(value, str):
+            text_rows.append(row)
+        elif value is not None and not isinstance(value, bool):
+            result[row] = value
+    if text_rows:
+        strings = np.array([values[row] for row in text_rows], dtype=str)
+        distinct, codes = np.unique(strings, return_inverse=True)
+        parsed = [parse_count(text, locale) for text in distinct.tolist()]
+        table = np.array([MISSING if value is None else value for value in parsed], dtype=np.int64)
+        result[text_rows] = table[codes.reshape(-1)]
+    return result
+
+
+def fill_counts(records: Sequence[Mapping[str, Any]], locale: str = DEFAULT_LOCALE,
+                fields: Sequence[str] = COUNT_FIELDS) -> List[Dict[str, Any]]:
+    """
+    Return copies of post dicts with count fields converted to ints (None if unparseable).
+
+    Each field is parsed for the whole batch at once; records without
+    string counts are copied unchanged.
+    """
+    filled = [dict(record) for record in records]
+    for name in fields:
+        values = [record.get(name) for record in records]
+        if not any(isinstance(value, str) for value in values):
+            continue
+        for record, count in zip(filled, parse_counts(values, locale).tolist()):
+            if name in record:
+                record[name] = None if count < 0 else count
+    return filled
+
+
+def format_count(value: int, locale: str = DEFAULT_LOCALE, compact: bool = False) -> str:
+    """
+    Render a count the way LinkedIn does: "1,204", or with compact=True "1.2K".
+
+    Compact values keep one decimal and are truncated, so parse_count()
+    returns a lower bound of the original value.
+    """
+    grammar = get_locale(locale)
+    if compact and value >= THOUSAND:
+        suffix, multiplier = max(((name, size) for name, size in grammar.multipliers.items() if size <= value),
+                                 key=lambda item: (item[1], -len(item[0])))
+        tenths = value * 10 // multiplier
+        whole, fraction = divmod(tenths, 10)
+        number = f"{whole}{grammar.decimal}{fraction}" if fraction else str(whole)
+        return f"{number}{suffix.upper() if len(suffix) == 1 else ' ' + suffix.capitalize()}"
+    return f"{value:,}".replace(",", grammar.group[0])
@@ -16,3 +16,406 @@
 # 3.  It checks every post against these rules.
 # 4.  It creates a new, shorter list containing only the posts that passed the quality check.
 # 5.  It hands this high-quality list back to 'agent.py' for the next step: research.
+"""
+Rule-based post filtering over PostBatch columns.
+
+The rules in config/filters.yaml are compiled once into functions that
+each return a boolean mask over a whole batch:
+
+- min_likes / min_comments: one int64 comparison (unknown counts fail)
+- keywords: whole-word phrase search over the lower-cased content_text
+  buffer (see KeywordMatcher), match positions mapped to rows by binary
+  search; or, given a KeywordIndex, posting-list intersection
+- content_type_whitelist: "article" (LinkedIn Pulse URL), "ad"
+  ("Promoted" instead of a timestamp) or "post"
+- author_class / author_following_only: evaluated once per distinct
+  author headline, URL or name, then gathered through the intern codes
+
+A post survives if every mask is True. The masks run as a short-circuit
+pipeline: each rule sees only the posts that passed the rules before it,
+and rules are ordered by their measured cost per rejected post, so the
+text scans run last, over whatever the count rules left (the text of
+the survivors is compacted before scanning).
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional, Pattern, Sequence, Tuple, Union
+
+import numpy as np
+
+from keyword_index import KeywordIndex
+from models import FetchedPost
+from post_batch import InternedColumn, PostBatch, TextColumn
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = ("post", "article", "ad")
+AUTHOR_CLASSES = {
+    "ceo": ("ceo", "chief executive", "founder", "co-founder"),
+    "developer": ("developer", "engineer", "programmer"),
+    "influencer": ("top voice", "influencer", "creator", "keynote speaker"),
+}
+
+_ARTICLE_URL = re.compile(r"/pulse/")
+_PROMOTED = re.compile(r"^\s*promoted\b", re.IGNORECASE)
+
+Posts = Union[PostBatch, Sequence[FetchedPost], Sequence[Mapping[str, Any]]]
+RuleMask = Callable[[PostBatch], np.ndarray]
+
+# Prior cost estimates (seconds per post) until a rule has been timed
+PRIOR_COSTS = {"count": 1e-8, "interned": 5e-8, "url": 2e-7, "indexed": 5e-7, "text": 2e-6, "external": 1e-2}
+
+
+def phrase_pattern(phrases: Sequence[str]) -> Optional[Pattern]:
+    """
+    One case-insensitive pattern matching any phrase as whole words.
+
+    Whitespace inside a phrase matches any run of whitespace. Returns None
+    if there are no phrases.
+    """
+    alternatives = sorted({r"\s+".join(map(re.escape, phrase.split())) for phrase in phrases if phrase.strip()},
+                          key=len, reverse=True)
+    if not alternatives:
+        return None
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")(?!\w)", re.IGNORECASE)
+
+
+class KeywordMatcher:
+    """
+    Whole-word, case-insensitive phrase search over a TextColumn buffer.
+
+    The buffer is lower-cased once and each phrase is searched as a
+    case-sensitive pattern starting with a literal, which the regex engine
+    scans for far faster than an IGNORECASE alternation with lookarounds.
+    Hits preceded by a word character are dropped, and the rest are mapped
+    to rows in one binary search. Buffers whose length changes when
+    lower-cased fall back to the equivalent single pattern.
+    """
+
+    def __init__(self, phrases: Sequence[str]):
+        self.phrases = tuple(phrase for phrase in phrases if phrase.strip())
+        self.pattern = phrase_pattern(self.phrases)
+        self._lowered = [re.compile(r"\s+".join(map(re.escape, phrase.lower().split())) + r"(?!\w)")
+                         for phrase in self.phrases]
+
+    def rows(self, column: TextColumn) -> np.ndarray:
+        """Boolean mask of rows containing any phrase."""
+        if self.pattern is None:
+            return np.zeros(len(column), dtype=bool)
+        column = column.compacted()
+        text = column.buffer.lower()
+        if len(text) != len(column.buffer):
+            return column.rows_matching(self.pattern)
+        spans = [(match.start(), match.end()) for pattern in self._lowered for match in pattern.finditer(text)
+                 if not match.start() or not _is_word(text[match.start() - 1])]
+        return column.rows_containing(spans)
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _category_mask(column: InternedColumn, predicate: Callable[[str], bool]) -> np.ndarray:
+    """Evaluate ``predicate`` once per distinct value; missing values fail."""
+    flags = np.fromiter(map(predicate, column.categories), dtype=bool, count=len(column.categories))
+    # Code -1 lands on the trailing False
+    return np.append(flags, False)[column.codes]
+
+
+def content_type_masks(batch: PostBatch) -> Dict[str, np.ndarray]:
+    """Boolean mask per content type; every post has exactly one type."""
+    ads = _category_mask(batch.column("posted_timestamp_str"), lambda value: bool(_PROMOTED.match(value)))
+    articles = batch.column("post_url").rows_matching(_ARTICLE_URL) & ~ads
+    return {"post": ~(ads | articles), "article": articles, "ad": ads}
+
+
+@dataclass(frozen=True)
+class FilterRules:
+    """Filtering preferences, as in config/filters.yaml."""
+    keywords: Tuple[str, ...] = ()
+    author_class: Optional[str] = None
+    min_likes: int = 0
+    min_comments: int = 0
+    content_type_whitelist: Tuple[str, ...] = ()
+    author_following_only: bool = False
+
+    @classmethod
+    def from_mapping(cls, document: Mapping[str, Any]) -> "FilterRules":
+        """
+        Build rules from a parsed filters document; missing keys keep their defaults.
+
+        Raises:
+            ValueError: If a rule has the wrong type or a negative threshold
+        """
+        values: Dict[str, Any] = {}
+        for name in ("keywords", "content_type_whitelist"):
+            items = document.get(name) or []
+            if isinstance(items, str) or not isinstance(items, list):
+                raise ValueError(f"Filter rule '{name}' must be a list")
+            values[name] = tuple(str(item) for item in items)
+        for name in ("min_likes", "min_comments"):
+            threshold = document.get(name) or 0
+            if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 0:
+                raise ValueError(f"Filter rule '{name}' must be a non-negative integer")
+            values[name] = threshold
+        author_class = document.get("author_class")
+        values["author_class"] = str(author_class).lower() if author_class else None
+        values["author_following_only"] = bool(document.get("author_following_only", False))
+        unknown = set(document) - set(cls.__dataclass_fields__)
+        if unknown:
+            logger.warning(f"Ignoring unknown filter rules: {sorted(unknown)}")
+        return cls(**values)
+
+
+@dataclass
+class RuleStats:
+    """
+    Running estimates for one rule: cost per post evaluated and pass rate.
+
+    Both start from priors and move towards each observation by ``decay``
+    (an exponentially weighted average), so the pipeline order follows
+    recent batches.
+    """
+    cost: float
+    pass_rate: float = 0.5
+    calls: int = 0
+    evaluated: int = 0
+    rejected: int = 0
+
+    def update(self, evaluated: int, passed: int, seconds: float, decay: float) -> None:
+        self.calls += 1
+        self.evaluated += evaluated
+        self.rejected += evaluated - passed
+        if evaluated:
+            self.cost += decay * (seconds / evaluated - self.cost)
+            self.pass_rate += decay * (passed / evaluated - self.pass_rate)
+
+    @property
+    def rank(self) -> float:
+        """Expected cost per rejected post; the pipeline runs lowest rank first."""
+        return self.cost / max(1.0 - self.pass_rate, 1e-6)
+
+
+@dataclass
+class Predicate:
+    """One compiled rule: a mask function over a batch, with its running statistics."""
+    name: str
+    function: RuleMask
+    stats: RuleStats
+
+
+@dataclass
+class FilterResult:
+    """
+    Posts that passed, the pass mask over the input, and per-rule counts.
+
+    Rules run in ``order`` and each sees only the posts that passed the
+    rules before it: ``evaluated`` is how many posts a rule saw and
+    ``rejected`` how many of those it rejected.
+    """
+    batch: PostBatch
+    mask: np.ndarray
+    rejected: Dict[str, int] = field(default_factory=dict)
+    evaluated: Dict[str, int] = field(default_factory=dict)
+    order: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.mask)
+
+    @property
+    def passed(self) -> int:
+        return len(self.batch)
+
+
+class FilterEngine:
+    """
+    FilterRules compiled into a short-circuiting pipeline of vectorised predicates.
+
+    Each predicate returns a boolean mask over a batch and only sees the
+    posts that survived the predicates before it. Predicates run in order
+    of expected cost per rejected post (cost / (1 - pass rate)), estimated
+    from priors and refined after every batch, so cheap, selective rules
+    run first and expensive text scans, or predicates added with
+    add_predicate (e.g. an LLM relevance check), see as few posts as
+    possible.
+
+    Args:
+        rules: The rules to apply
+        following: Author profile URLs or names the user follows; needed for
+            author_following_only (without it that rule is skipped)
+        decay: Weight of each new observation in the running estimates
+        keyword_index: Answer the keyword rule from this KeywordIndex instead of
+            scanning post text; posts are added to the index as they arrive
+            (posts without a post_id never match)
+    """
+
+    def __init__(self, rules: FilterRules, following: Optional[Collection[str]] = None, decay: float = 0.2,
+                 keyword_index: Optional[KeywordIndex] = None):
+        self.rules = rules
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._predicates: List[Predicate] = [
+            Predicate(name, function, RuleStats(cost))
+            for name, function, cost in self._compile(rules, following, keyword_index)
+        ]
+
+    @property
+    def rule_names(self) -> List[str]:
+        return [predicate.name for predicate in self._predicates]
+
+    @staticmethod
+    def _compile(rules: FilterRules, following: Optional[Collection[str]],
+                 keyword_index: Optional[KeywordIndex]) -> List[Tuple[str, RuleMask, float]]:
+        compiled: List[Tuple[str, RuleMask, float]] = []
+        for name in ("min_likes", "min_comments"):
+            threshold = getattr(rules, name)
+            if threshold > 0:
+                column = name.replace("min_", "") + "_count"
+                compiled.append((name, lambda batch, column=column, threshold=threshold: batch.column(column) >= threshold,
+                                 PRIOR_COSTS["count"]))
+
+        keywords = KeywordMatcher(rules.keywords)
+        if keywords.pattern is not None and keyword_index is not None:
+            def indexed_keywords(batch: PostBatch) -> np.ndarray:
+                keyword_index.add_posts(batch)
+                return keyword_index.mask(batch.column("post_id").values(), keywords.phrases)
+
+            compiled.append(("keywords", indexed_keywords, PRIOR_COSTS["indexed"]))
+        elif keywords.pattern is not None:
+            compiled.append(("keywords", lambda batch: keywords.rows(batch.column("content_text")), PRIOR_COSTS["text"]))
+
+        if rules.content_type_whitelist:
+            allowed = {kind.lower() for kind in rules.content_type_whitelist}
+            unknown = allowed - set(CONTENT_TYPES)
+            if unknown:
+                logger.warning(f"Content types {sorted(unknown)} cannot be detected; no post will match them")
+            allowed &= set(CONTENT_TYPES)
+
+            def content_type(batch: PostBatch) -> np.ndarray:
+                masks = content_type_masks(batch)
+                mask = np.zeros(len(batch), dtype=bool)
+                for kind in allowed:
+                    mask |= masks[kind]
+                return mask
+
+            compiled.append(("content_type_whitelist", content_type, PRIOR_COSTS["url"]))
+
+        if rules.author_class:
+            headline = phrase_pattern(AUTHOR_CLASSES.get(rules.author_class, (rules.author_class,)))
+            compiled.append(("author_class", lambda batch: _category_mask(
+                batch.column("author_headline"), lambda value: bool(headline.search(value))), PRIOR_COSTS["interned"]))
+
+        if rules.author_following_only:
+            if following is None:
+                logger.warning("author_following_only is set but no followed authors were given; rule skipped")
+            else:
+                followed = {value.strip().rstrip("/").lower() for value in following}
+
+                def is_followed(value: str) -> bool:
+                    return value.strip().rstrip("/").lower() in followed
+
+                compiled.append(("author_following_only", lambda batch: (
+                    _category_mask(batch.column("author_url"), is_followed)
+                    | _category_mask(batch.column("author_name"), is_followed)), PRIOR_COSTS["interned"]))
+        return compiled
+
+    def add_predicate(self, name: str, function: RuleMask, cost: float = PRIOR_COSTS["external"],
+                      pass_rate: float = 0.5) -> None:
+        """
+        Add a custom predicate to the pipeline.
+
+        Args:
+            name: Name for rejection counts and statistics (must be unique)
+            function: Returns a boolean mask over the batch it is given
+            cost: Prior estimate of seconds per post
+            pass_rate: Prior estimate of the fraction of posts that pass
+
+        Raises:
+            ValueError: If a predicate with this name already exists
+        """
+        if name in self.rule_names:
+            raise ValueError(f"Filter predicate '{name}' already exists")
+        with self._lock:
+            self._predicates.append(Predicate(name, function, RuleStats(cost, pass_rate)))
+
+    def order(self) -> List[str]:
+        """Current pipeline order."""
+        return [predicate.name for predicate in self._ordered()]
+
+    def _ordered(self) -> List[Predicate]:
+        with self._lock:
+            return sorted(self._predicates, key=lambda predicate: predicate.stats.rank)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Running statistics per predicate, in pipeline order."""
+        with self._lock:
+            return {predicate.name: asdict(predicate.stats) for predicate in
+                    sorted(self._predicates, key=lambda predicate: predicate.stats.rank)}
+
+    def masks(self, batch: PostBatch) -> Dict[str, np.ndarray]:
+        """Pass mask of every rule over the whole of ``batch`` (no short-circuiting)."""
+        return {predicate.name: predicate.function(batch) for predicate in self._predicates}
+
+    def apply(self, posts: Posts) -> FilterResult:
+        """
+        Filter a batch of posts through the pipeline.
+
+        Args:
+            posts: A PostBatch, FetchedPost models or post dicts
+
+        Returns:
+            FilterResult with the surviving rows (in order) and per-rule counts
+        """
+        batch = _as_batch(posts)
+        survivors = np.arange(len(batch))
+        result = FilterResult(batch, np.zeros(len(batch), dtype=bool))
+        for predicate in self._ordered():
+            result.order.append(predicate.name)
+            evaluated = len(survivors)
+            if evaluated:
+                start = time.perf_counter()
+                rows = batch if evaluated == len(batch) else batch.take(survivors)
+                passed = np.asarray(predicate.function(rows), dtype=bool)
+                seconds = time.perf_counter() - start
+                survivors = survivors[passed]
+                with self._lock:
+                    predicate.stats.update(evaluated, len(survivors), seconds, self.decay)
+            result.evaluated[predicate.name] = evaluated
+            result.rejected[predicate.name] = evaluated - len(survivors)
+        result.mask[survivors] = True
+        result.batch = batch.take(survivors)
+        return result
+
+    def filter_posts(self, posts: Sequence[Any]) -> List[Any]:
+        """Keep the posts (FetchedPost models or post dicts) that pass every rule, as given."""
+        if not posts:
+            return []
+        mask = self.apply(posts).mask
+        return [post for post, kept in zip(posts, mask.tolist()) if kept]
+
+
+def _as_batch(posts: Posts) -> PostBatch:
+    if isinstance(posts, PostBatch):
+        return posts
+    # A harvest can mix models and dicts, so each post is converted on its own
+    return PostBatch.from_records([post.__dict__ if isinstance(post, FetchedPost) else post for post in posts])
+
+
+@lru_cache(maxsize=1)
+def _engine_for(rules: FilterRules) -> FilterEngine:
+    return FilterEngine(rules)
+
+
+def get_shared_filter_engine() -> FilterEngine:
+    """
+    Return the process-wide engine for the filter rules of the current
+    configuration (app_config.get_config()), rebuilt when they change.
+    """
+    from app_config import get_config  # app_config imports this module
+    return _engine_for(get_config().filters)
@@ -0,0 +1,200 @@
+"""
+Filter pushdown into the harvest stage.
+
+FilterEngine rules are applied to posts the browser agent has already
+opened and extracted. The rules a harvest can enforce itself are pushed
+down into the agent's task, so rejected posts are never opened or sent
+to the LLM:
+
+- keywords: become a LinkedIn content search (quoted phrases joined by
+  OR, AND-ed with the topic), so the agent only sees matching posts
+- author_following_only: the search's postedBy=["following"] facet
+- content_type_whitelist without "ad": search results carry no promoted
+  posts, and the agent is told to skip cards marked "Promoted"
+- min_likes / min_comments: the agent reads the counts on each post card
+  and skips posts below them without opening them
+- author_class: the agent skips cards whose author headline does not match
+
+The search replaces what the agent browses, so it is only used for feed
+and topic harvests; a task aimed elsewhere (an author's posts, a prompt
+of unknown shape) gets the card-level instructions alone, and its
+keyword rules run after extraction.
+
+Pushdown changes which posts a harvest returns, not just how many the
+agent loads: a search surfaces other posts than the home feed, and a
+misread card can skip a post the filters would have kept. Pushed-down
+rules still run after the harvest, so every post returned passes them.
+PushdownMetrics records agent steps and posts per run with and without
+pushdown, for the steps saved per run.
+"""
+
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from filter_engine import AUTHOR_CLASSES, FilterRules
+
+SEARCH_URL = "https://www.linkedin.com/search/results/content/"
+
+
+def search_query(keywords: Sequence[str], topic: Optional[str] = None) -> str:
+    """LinkedIn boolean search query: the topic AND any of the keywords (phrases quoted)."""
+    terms = []
+    for keyword in keywords:
+        words = " ".join(keyword.replace('"', " ").split())
+        if words:
+            terms.append(f'"{words}"' if " " in words else words)
+    query = " OR ".join(terms)
+    topic = " ".join((topic or "").split())
+    if topic and query:
+        return f"{topic} AND ({query})" if len(terms) > 1 else f"{topic} AND {query}"
+    return topic or query
+
+
+def search_url(query: str, following_only: bool = False, latest_first: bool = True) -> str:
+    """Content search URL for a query, optionally limited to followed authors."""
+    parameters = {"keywords": query, "origin": "FACETED_SEARCH"}
+    if following_only:
+        parameters["postedBy"] = '["following"]'
+    if latest_first:
+        parameters["sortBy"] = '"date_posted"'
+    return f"{SEARCH_URL}?{urlencode(parameters)}"
+
+
+@dataclass(frozen=True)
+class PushdownPlan:
+    """
+    How a harvest enforces filter rules before extraction.
+
+    Attributes:
+        search_url: Content search to harvest instead of the feed or topic (None to keep the task's source)
+        instructions: Card-level skip rules for the agent
+        pushed: Rules enforced (at least in part) during the harvest
+        residual: Rules that can only be checked after extraction
+    """
+    search_url: Optional[str]
+    instructions: Tuple[str, ...]
+    pushed: Tuple[str, ...]
+    residual: Tuple[str, ...]
+
+    def prompt_section(self) -> str:
+        """Agent instructions for the plan ("" if nothing was pushed down)."""
+        if not self.pushed:
+            return ""
+        lines = ["HARVEST FILTERS:"]
+        if self.search_url:
+            lines.append(f"- Collect posts from this search instead of the home feed: {self.search_url}")
+        lines.extend(f"- {instruction}" for instruction in self.instructions)
+        lines.append("- Decide from the post card in the list; never open, expand or extract a post you skip.")
+        return "\n".join(lines)
+
+
+def plan_pushdown(rules: FilterRules, topic: Optional[str] = None, author: Optional[str] = None,
+                  search: bool = True) -> PushdownPlan:
+    """
+    Work out which rules a harvest can enforce, and how.
+
+    Args:
+        rules: The filter rules that will run after the harvest
+        topic: What the user asked to harvest (AND-ed with the keywords in the search)
+        author: The person whose posts the task is about; the search cannot
+            target an author, so keyword rules then run after extraction
+        search: Whether the task is a feed or topic harvest, which a content
+            search may replace; otherwise only card-level instructions are given
+    """
+    pushed: List[str] = []
+    residual: List[str] = []
+    instructions: List[str] = []
+
+    url = None
+    searched = [name for name in ("keywords", "author_following_only") if getattr(rules, name)]
+    if searched and search and not author:
+        url = search_url(search_query(rules.keywords, topic), following_only=rules.author_following_only)
+        pushed.extend(searched)
+    else:
+        residual.extend(searched)
+
+    whitelist = {kind.lower() for kind in rules.content_type_whitelist}
+    if whitelist and "ad" not in whitelist:
+        pushed.append("content_type_whitelist")
+        instructions.append('Skip promoted posts (cards marked "Promoted").')
+        if "article" not in whitelist:
+            instructions.append("Skip shared LinkedIn articles (cards linking to linkedin.com/pulse/).")
+        if whitelist - {"post", "article"}:
+            residual.append("content_type_whitelist")
+    elif whitelist:
+        residual.append("content_type_whitelist")
+
+    thresholds = [f"fewer than {count} {label}" for count, label in
+                  ((rules.min_likes, "reactions"), (rules.min_comments, "comments")) if count > 0]
+    if thresholds:
+        pushed.extend(name for name in ("min_likes", "min_comments") if getattr(rules, name) > 0)
+        instructions.append(f"Skip posts whose card shows {' or '.join(thresholds)} (read the counts under the post).")
+
+    if rules.author_class:
+        pushed.append("author_class")
+        titles = AUTHOR_CLASSES.get(rules.author_class, (rules.author_class,))
+        instructions.append(f"Skip posts whose author headline on the card does not mention: {', '.join(titles)}.")
+
+    return PushdownPlan(url, tuple(instructions), tuple(pushed), tuple(residual))
+
+
+def agent_steps(agent: Any, result: Any) -> Optional[int]:
+    """Steps a browser-use agent took, from its run history or state (None if unknown)."""
+    number_of_steps = getattr(result, "number_of_steps", None)
+    if callable(number_of_steps):
+        return int(number_of_steps())
+    history = getattr(result, "history", None)
+    if isinstance(history, list):
+        return len(history)
+    steps = getattr(getattr(agent, "state", None), "n_steps", None)
+    return int(steps) if isinstance(steps, int) else None
+
+
+class PushdownMetrics:
+    """
+    Per-run harvest statistics, split by whether filters were pushed down.
+
+    ``rejected`` counts posts the post-harvest filter still dropped: work
+    the agent did for nothing, which pushdown should drive towards zero.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[bool, Dict[str, int]] = {
+            pushed: {"runs": 0, "runs_with_steps": 0, "steps": 0, "posts": 0, "rejected": 0} for pushed in (True, False)
+        }
+
+    def record(self, pushed: bool, steps: Optional[int], posts: int, rejected: int) -> None:
+        """Record one run: agent steps (None if unknown), posts extracted, posts the filters rejected."""
+        with self._lock:
+            runs = self._runs[bool(pushed)]
+            runs["runs"] += 1
+            runs["posts"] += posts
+            runs["rejected"] += rejected
+            if steps is not None:
+                runs["runs_with_steps"] += 1
+                runs["steps"] += steps
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals and averages per mode, and the mean steps saved per run once both modes have runs."""
+        with self._lock:
+            summary: Dict[str, Any] = {}
+            for pushed, runs in self._runs.items():
+                summary["pushed" if pushed else "not_pushed"] = {
+                    **runs,
+                    "steps_per_run": runs["steps"] / runs["runs_with_steps"] if runs["runs_with_steps"] else None,
+                    "rejected_rate": runs["rejected"] / runs["posts"] if runs["posts"] else None,
+                }
+        with_pushdown, without = summary["pushed"]["steps_per_run"], summary["not_pushed"]["steps_per_run"]
+        summary["steps_saved_per_run"] = (without - with_pushdown
+                                          if with_pushdown is not None and without is not None else None)
+        return summary
+
+
+@lru_cache(maxsize=1)
+def get_shared_pushdown_metrics() -> PushdownMetrics:
+    """Return the process-wide pushdown metrics."""
+    return PushdownMetrics()
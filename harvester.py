@@ -7,7 +7,16 @@ from pathlib import Path
 from browser_use import Agent, Browser, BrowserConfig
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
+from app_config import get_config
+from filter_engine import FilterEngine
+from filter_pushdown import agent_steps, get_shared_pushdown_metrics, plan_pushdown
+from high_water_marks import get_shared_high_water_marks, incremental_instruction, posts_above
+from interpreter import Command
 from models import FetchedPost
+from near_duplicates import get_shared_duplicate_index
+from post_ranking import get_shared_ranker
+from rate_limiter import LangChainRateLimiter, get_rate_limiter
+from seen_posts import get_shared_seen_index
 from typing import Union, List, Optional, Any
 
 load_dotenv()
@@ -47,18 +56,52 @@ class Harvester:
     Enhanced with Chrome CDP connection for persistent LinkedIn sessions.
     """
     
-    def __init__(self):
-        """Initialize the Harvester with an LLM and CDP configuration."""
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
+    def __init__(self, deduplicate: bool = False, skip_seen: bool = False,
+                 filters: Optional[FilterEngine] = None, push_down: bool = True, rank: bool = False):
+        """
+        Initialize the Harvester with an LLM and CDP configuration.
+
+        Args:
+            deduplicate: Drop posts whose content near-duplicates one already
+                harvested (this run or, with NEAR_DUPLICATE_INDEX_PATH set, earlier runs).
+                Off by default: the index is process-wide, so a repeated harvest
+                would otherwise come back empty
+            skip_seen: Drop posts whose post_id an earlier harvest already returned
+                (tracked in the persistent seen-post index). Meant for scheduled and
+                incremental runs; an interactive harvest returns everything it finds
+            filters: Drop harvested posts that fail these filter rules
+            push_down: Also hand the rules the agent can check on a post card to the
+                agent (see filter_pushdown), so it skips those posts instead of extracting them
+            rank: Return only the best posts of a fetch, best first, by the ranking in
+                config/settings.yaml (as many as the command asked for, else post_limit)
+        """
+        # Agent steps draw from the process-wide OpenAI RPM/TPM budget, reconciled with their reported usage
+        rate_limiter = LangChainRateLimiter(get_rate_limiter(), "gpt-4o")
+        self.llm = ChatOpenAI(
+            model="gpt-4o",
+            temperature=0,
+            base_url=os.getenv("OPENAI_BASE_URL"),
+            rate_limiter=rate_limiter,
+            callbacks=[rate_limiter.usage_callback],
+        )
         
         # Set up browser data directory for future persistence
         self.browser_data_dir = Path.home() / ".linkedin_ai_agent" / "browser_data"
         self.browser_data_dir.mkdir(parents=True, exist_ok=True)
         
-        # CDP connection settings
-        self.cdp_url = "http://localhost:9222"
-        self.connection_timeout = 10  # seconds
-        self.max_retries = 3
+        # CDP connection settings (chrome section of config/settings.yaml, read per Harvester)
+        chrome = get_config().chrome
+        self.debug_port = chrome.debug_port
+        self.cdp_url = chrome.cdp_url
+        self.connection_timeout = chrome.connection_timeout  # seconds
+        self.max_retries = chrome.max_retries
+        
+        # Shared across Harvester instances so repeat harvests skip seen content
+        self.duplicate_index = get_shared_duplicate_index() if deduplicate else None
+        self.seen_index = get_shared_seen_index() if skip_seen else None
+        self.filters = filters
+        self.push_down = push_down
+        self.rank = rank
         
         # Connection state tracking
         self._last_browser_instance = None
@@ -140,7 +183,7 @@ class Harvester:
             # Check if this is likely a Chrome not running scenario
             error_str = str(e).lower()
             if any(indicator in error_str for indicator in ['connection refused', 'not found', 'target closed']):
-                raise ConnectionError(f"Chrome not found on port 9222")  # Use ConnectionError for compatibility
+                raise ConnectionError(f"Chrome not found on port {self.debug_port}")  # Use ConnectionError for compatibility
             else:
                 raise CDPConnectionError(f"Failed to establish CDP connection: {str(e)}")
     
@@ -253,7 +296,8 @@ class Harvester:
             "browser_data_exists": self.is_browser_data_present()
         }
     
-    async def harvest(self, prompt: Optional[str]) -> Union[List[FetchedPost], str, List[Any]]:
+    async def harvest(self, prompt: Optional[str], feed: Optional[str] = None, command: Optional[Command] = None,
+                      author: Optional[str] = None) -> Union[List[FetchedPost], str, List[Any]]:
         """
         Execute a natural language prompt on LinkedIn via browser-use Agent.
         
@@ -261,6 +305,12 @@ class Harvester:
         
         Args:
             prompt: Natural language instruction for LinkedIn automation
+            feed: Harvest incrementally against this feed's high-water mark
+                (see high_water_marks.feed_key): the agent stops scrolling at
+                posts collected by earlier runs, and only newer posts are returned
+            command: The prompt parsed into a Command, if known; posts an engagement
+                command returns are recorded in the seen-post index as acted on
+            author: The person whose posts the prompt is about, if any
             
         Returns:
             Agent execution results - can be string confirmation, 
@@ -291,7 +341,21 @@ class Harvester:
         6. Handle any connection issues gracefully
         
         CONTEXT: Using {'persistent Chrome session' if self._connection_healthy else 'standalone browser'}
+        
+        LIMITS: Scroll the feed at most {get_config().scroll_limit} times
         """
+        # Per-feed newest-post marks, only opened for incremental harvests
+        high_water_marks = get_shared_high_water_marks() if feed else None
+        mark = high_water_marks.get(feed) if feed else None
+        if mark is not None:
+            enhanced_prompt += "\n" + incremental_instruction(mark) + "\n"
+        plan = None
+        if self.filters is not None and self.push_down:
+            # Only a feed or topic harvest may be redirected to a content search
+            plan = plan_pushdown(self.filters.rules, topic=command.topic if command else None, author=author,
+                                 search=feed is not None or command is not None)
+        if plan is not None and plan.pushed:
+            enhanced_prompt += "\n" + plan.prompt_section() + "\n"
         
         try:
             # Get browser with CDP connection and fallback
@@ -309,8 +373,17 @@ class Harvester:
             # Execute the task
             logger.info("🚀 Starting LinkedIn automation task...")
             result = await agent.run()
+            steps = agent_steps(agent, result)
             
             logger.info("✅ LinkedIn automation task completed successfully")
+            self._record_actions(result, command)
+            if feed and self._is_post_list(result):
+                high_water_marks.advance(feed, [self._post_id(item) for item in result])
+                result = posts_above(result, mark)
+            result = self._drop_near_duplicates(self._drop_seen(result))
+            result = self._apply_filters(result, steps, bool(plan and plan.pushed))
+            result = self._rank(result, command)
+            self._mark_seen(result)
             return result
             
         except Exception as e:
@@ -322,6 +395,63 @@ class Harvester:
                 # Only wrap truly unexpected exceptions
                 raise ConnectionError(f"Unexpected error during harvest: {e}")
     
+    @staticmethod
+    def _post_id(post: Any) -> Optional[str]:
+        value = post.get("post_id") if isinstance(post, dict) else post.post_id
+        return str(value) if value else None
+    
+    @staticmethod
+    def _is_post_list(result: Any) -> bool:
+        return isinstance(result, list) and bool(result) and all(isinstance(item, (dict, FetchedPost)) for item in result)
+    
+    def _drop_seen(self, result: Any) -> Any:
+        """Drop posts seen in earlier harvests; other results pass through."""
+        if self.seen_index is None or not self._is_post_list(result):
+            return result
+        new, _ = self.seen_index.filter_unseen(result, mark=False)
+        return new
+    
+    def _mark_seen(self, result: Any) -> None:
+        """Record the posts a harvest returns as seen, once filtering has decided which those are."""
+        if self.seen_index is not None and self._is_post_list(result):
+            self.seen_index.mark_seen([post_id for post_id in map(self._post_id, result) if post_id])
+    
+    def _record_actions(self, result: Any, command: Optional[Command]) -> None:
+        """Record the engagement actions of a command against every post the agent returned."""
+        actions = [action for action in (command.engagement_type if command else []) if action != "fetch_posts"]
+        if not actions or not self._is_post_list(result):
+            return
+        seen_index = self.seen_index or get_shared_seen_index()
+        for post_id in map(self._post_id, result):
+            if post_id:
+                for action in actions:
+                    seen_index.record_action(post_id, action)
+    
+    def _drop_near_duplicates(self, result: Any) -> Any:
+        """Collapse near-duplicate posts when the agent returned a list of posts; other results pass through."""
+        if self.duplicate_index is None or not self._is_post_list(result):
+            return result
+        kept, _ = self.duplicate_index.filter_posts(result)
+        return kept
+    
+    def _apply_filters(self, result: Any, steps: Optional[int], pushed: bool) -> Any:
+        """Drop posts failing the filter rules and record the run in the pushdown metrics."""
+        if self.filters is None:
+            return result
+        if not self._is_post_list(result):
+            get_shared_pushdown_metrics().record(pushed, steps, 0, 0)
+            return result
+        kept = self.filters.filter_posts(result)
+        get_shared_pushdown_metrics().record(pushed, steps, len(result), len(result) - len(kept))
+        return kept
+    
+    def _rank(self, result: Any, command: Optional[Command]) -> Any:
+        """Keep the best posts of a fetch, best first; engagement results (the agent already acted) pass through."""
+        if not self.rank or not self._is_post_list(result) or (command and command.engagement_type != ["fetch_posts"]):
+            return result
+        ranked = get_shared_ranker().top_k(result, command.post_limit if command else None)
+        return [post for _, post in ranked]
+    
     def get_browser_data_path(self) -> str:
         """Get the path to the browser data directory."""
         return str(self.browser_data_dir)
@@ -357,4 +487,4 @@ class Harvester:
         Returns:
             Command string to start Chrome with remote debugging
         """
-        return f"chrome --remote-debugging-port=9222 --user-data-dir={self.browser_data_dir}"
+        return f"chrome --remote-debugging-port={self.debug_port} --user-data-dir={self.browser_data_dir}"
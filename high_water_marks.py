@@ -0,0 +1,208 @@
+"""
+High-water marks for incremental feed and search harvesting.
+
+A scheduled "scroll the feed" run used to scroll from the top up to the
+full scroll limit even when only a handful of posts were new. In
+incremental mode the newest post harvested from each feed or search is
+remembered; the next run is told to stop scrolling once it reaches that
+post or older ones, and anything at or below the mark is dropped, so
+steady-state runs cost time proportional to the new content.
+
+LinkedIn activity ids are time-ordered: the top bits of
+urn:li:activity:N hold the creation time in milliseconds (N >> 22), so
+"newer than the mark" is an integer comparison and every post's creation
+time can be read from its id without parsing the page.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from seen_posts import DEFAULT_DB_PATH, post_key
+from text_features import tokenize
+
+logger = logging.getLogger(__name__)
+
+MISSING = -1
+URN_TIMESTAMP_SHIFT = 22
+HOME_FEED = "feed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS high_water_marks (
+    feed TEXT PRIMARY KEY,
+    post_id TEXT NOT NULL,
+    activity_id INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def activity_id(post_id: Optional[str]) -> Optional[int]:
+    """Numeric id of a post URN (activity, share or ugcPost), or None if the id has none."""
+    if not post_id:
+        return None
+    key = post_key(post_id)
+    return int(key.rsplit(":", 1)[1]) if key.startswith("urn:li:") else None
+
+
+def urn_timestamps(activity_ids: np.ndarray) -> np.ndarray:
+    """Creation times (epoch seconds) encoded in activity ids; MISSING ids stay MISSING."""
+    activity_ids = np.asarray(activity_ids, dtype=np.int64)
+    return np.where(activity_ids >= 0, (activity_ids >> URN_TIMESTAMP_SHIFT) // 1000, MISSING)
+
+
+def urn_timestamp(activity_id: int) -> float:
+    """Creation time (epoch seconds) encoded in one activity id."""
+    return (activity_id >> URN_TIMESTAMP_SHIFT) / 1000.0
+
+
+def feed_key(search: Optional[str] = None) -> str:
+    """Key for a mark: the home feed, or a search normalised to its lower-case words."""
+    words = tokenize(search or "")
+    return f"search:{' '.join(words)}" if words else HOME_FEED
+
+
+@dataclass(frozen=True)
+class HighWaterMark:
+    """The newest post harvested from one feed or search."""
+    feed: str
+    post_id: str
+    activity_id: int
+    updated_at: float
+
+    @property
+    def posted_at(self) -> float:
+        return urn_timestamp(self.activity_id)
+
+    def is_known(self, post_id: Optional[str]) -> bool:
+        """Whether a post is at or below the mark (posts without a URN are never known)."""
+        number = activity_id(post_id)
+        return number is not None and number <= self.activity_id
+
+
+def _post_id(post: Any) -> Optional[str]:
+    value = post.get("post_id") if isinstance(post, dict) else getattr(post, "post_id", None)
+    return str(value) if value else None
+
+
+def posts_above(posts: Sequence[Any], mark: Optional[HighWaterMark]) -> List[Any]:
+    """
+    Keep the posts (FetchedPost models or post dicts) newer than a mark, in order.
+
+    Posts without a URN are kept, since their age is unknown.
+    """
+    if mark is None:
+        return list(posts)
+    ids = np.array([MISSING if number is None else number for number in map(activity_id, map(_post_id, posts))],
+                   dtype=np.int64)
+    keep = (ids < 0) | (ids > mark.activity_id)
+    return [post for post, kept in zip(posts, keep.tolist()) if kept]
+
+
+def incremental_instruction(mark: Optional[HighWaterMark], patience: int = 3) -> str:
+    """
+    Agent instruction that ends scrolling at the mark.
+
+    The home feed is ranked rather than strictly chronological, so the agent
+    stops after ``patience`` consecutive posts at or below the mark rather
+    than at the first one.
+    """
+    if mark is None:
+        return ""
+    posted = datetime.fromtimestamp(mark.posted_at, tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    return (
+        "INCREMENTAL MODE:\n"
+        f"- Posts up to {mark.post_id} (posted {posted}) were collected in an earlier run.\n"
+        f"- A post is already known if its activity id is {mark.activity_id} or lower.\n"
+        f"- Stop scrolling as soon as you see {patience} known posts in a row, and do not extract known posts.\n"
+        "- It is fine to return only a few posts, or none, if little is new."
+    )
+
+
+class HighWaterMarkStore:
+    """
+    Per-feed high-water marks in SQLite, with every mark cached in memory.
+
+    Marks only ever move forward. Use ":memory:" for a throwaway store.
+    """
+
+    def __init__(self, path: str = str(DEFAULT_DB_PATH)):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._marks: Dict[str, HighWaterMark] = {
+            row[0]: HighWaterMark(*row)
+            for row in self._connection.execute("SELECT feed, post_id, activity_id, updated_at FROM high_water_marks")
+        }
+
+    def get(self, feed: str) -> Optional[HighWaterMark]:
+        return self._marks.get(feed)
+
+    def advance(self, feed: str, post_ids: Iterable[Optional[str]],
+                updated_at: Optional[float] = None) -> Optional[HighWaterMark]:
+        """
+        Move a feed's mark to the newest of ``post_ids`` if that is newer than the mark.
+
+        Returns:
+            The mark after the update (None if the feed has none yet)
+        """
+        candidates = [(number, post_key(post_id)) for post_id in post_ids
+                      if (number := activity_id(post_id)) is not None]
+        with self._lock:
+            current = self._marks.get(feed)
+            if not candidates:
+                return current
+            newest, post_id = max(candidates)
+            if current is not None and newest <= current.activity_id:
+                return current
+            mark = HighWaterMark(feed, post_id, newest, time.time() if updated_at is None else updated_at)
+            with self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO high_water_marks (feed, post_id, activity_id, updated_at) VALUES (?, ?, ?, ?)",
+                    (mark.feed, mark.post_id, mark.activity_id, mark.updated_at),
+                )
+            self._marks[feed] = mark
+            logger.info(f"High-water mark for {feed!r} advanced to {post_id}")
+            return mark
+
+    def reset(self, feed: str) -> None:
+        """Forget a feed's mark, so the next run is a full harvest."""
+        with self._lock:
+            with self._connection:
+                self._connection.execute("DELETE FROM high_water_marks WHERE feed = ?", (feed,))
+            self._marks.pop(feed, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "HighWaterMarkStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@lru_cache(maxsize=1)
+def get_shared_high_water_marks() -> HighWaterMarkStore:
+    """
+    Return the process-wide mark store.
+
+    Kept in the seen-post database by default; set HIGH_WATER_MARKS_DB_PATH
+    to use another file (or ":memory:").
+    """
+    return HighWaterMarkStore(os.getenv("HIGH_WATER_MARKS_DB_PATH") or os.getenv("SEEN_POSTS_DB_PATH")
+                              or str(DEFAULT_DB_PATH))
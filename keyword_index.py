@@ -0,0 +1,232 @@
+"""
+Inverted positional index over harvested post text.
+
+Scanning every post for every keyword costs posts x keywords. The index
+tokenises each post once when it is added and keeps, per token, a sorted
+posting list of (document, position) occurrences packed into int64 keys
+(document << POSITION_BITS | position). Queries never touch the text:
+
+- a word is its posting list (documents = keys >> POSITION_BITS)
+- a phrase intersects the posting lists of its words, each shifted back
+  by its offset in the phrase, so only adjacent occurrences survive
+- any-of / all-of queries union or intersect the phrases' document lists
+
+Tokens are lower-cased runs of word characters (\\w+), matching the
+whole-word semantics of the keyword filter. Posts are added in batches:
+tokens are mapped to ids and grouped with one argsort, and each token's
+new postings are appended as one chunk (chunks are merged on first
+query). Documents are numbered in arrival order, so posting lists stay
+sorted without re-sorting, and posts already indexed are skipped.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from post_batch import PostBatch
+
+POSITION_BITS = 20
+MAX_POSITION = (1 << POSITION_BITS) - 1
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+Query = Union[str, Sequence[str]]
+
+
+def index_tokens(text: Optional[str]) -> List[str]:
+    """Lower-cased word tokens of a text, in order."""
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class KeywordIndex:
+    """
+    Incrementally built inverted index from post ids to their word positions.
+
+    Args:
+        path: Optional .npz file to load from (if it exists) and save() to
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def _reset(self) -> None:
+        self._post_ids: List[str] = []
+        self._documents: Dict[str, int] = {}
+        self._vocabulary: Dict[str, int] = {}
+        # Per token id: sorted int64 key chunks, merged into one on first query
+        self._postings: List[List[np.ndarray]] = []
+        self.sources: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._post_ids)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self._documents
+
+    def add(self, post_ids: Sequence[Optional[str]], texts: Sequence[Optional[str]]) -> int:
+        """
+        Index posts not indexed yet; posts without an id are skipped.
+
+        Returns:
+            Number of posts added
+        """
+        with self._lock:
+            token_ids: List[int] = []
+            lengths: List[int] = []
+            vocabulary = self._vocabulary
+            first_document = len(self._post_ids)
+            for post_id, text in zip(post_ids, texts):
+                if not post_id or post_id in self._documents:
+                    continue
+                self._documents[post_id] = len(self._post_ids)
+                self._post_ids.append(post_id)
+                tokens = index_tokens(text)[:MAX_POSITION + 1]
+                token_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+                lengths.append(len(tokens))
+            added = len(self._post_ids) - first_document
+            if not token_ids:
+                return added
+
+            self._postings.extend([] for _ in range(len(vocabulary) - len(self._postings)))
+            lengths_array = np.array(lengths, dtype=np.int64)
+            documents = np.repeat(np.arange(first_document, first_document + added, dtype=np.int64), lengths_array)
+            starts = np.cumsum(lengths_array) - lengths_array
+            positions = np.arange(len(token_ids), dtype=np.int64) - np.repeat(starts, lengths_array)
+            keys = (documents << POSITION_BITS) | positions
+
+            token_array = np.array(token_ids, dtype=np.int64)
+            order = np.argsort(token_array, kind="stable")
+            token_array, keys = token_array[order], keys[order]
+            boundaries = np.flatnonzero(np.diff(token_array)) + 1
+            for token_id, chunk in zip(token_array[np.r_[0, boundaries]].tolist(), np.split(keys, boundaries)):
+                self._postings[token_id].append(chunk)
+            return added
+
+    def add_posts(self, posts: Union[PostBatch, Sequence[Any]]) -> int:
+        """Index a PostBatch, FetchedPost models or post dicts (see add)."""
+        if isinstance(posts, PostBatch):
+            return self.add(posts.column("post_id").values(), posts.column("content_text").values())
+        records = [post if isinstance(post, dict) else post.__dict__ for post in posts]
+        return self.add([None if record.get("post_id") is None else str(record["post_id"]) for record in records],
+                        [record.get("content_text") for record in records])
+
+    def _keys(self, token: str) -> np.ndarray:
+        token_id = self._vocabulary.get(token)
+        if token_id is None:
+            return np.empty(0, dtype=np.int64)
+        chunks = self._postings[token_id]
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0] if chunks else np.empty(0, dtype=np.int64)
+
+    def _shifted(self, token: str, offset: int) -> np.ndarray:
+        """Keys of a token moved back to where a phrase starting ``offset`` words earlier would start."""
+        keys = self._keys(token)
+        if offset:
+            keys = keys[(keys & MAX_POSITION) >= offset] - offset
+        return keys
+
+    def documents(self, phrase: str) -> np.ndarray:
+        """Sorted document numbers containing ``phrase`` as consecutive words (empty for no words)."""
+        tokens = index_tokens(phrase)
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        with self._lock:
+            # Intersect rarest first, so the running candidate set stays small
+            lists = sorted((self._shifted(token, offset) for offset, token in enumerate(tokens)), key=len)
+        candidates = lists[0]
+        for keys in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, keys, assume_unique=True)
+        documents = candidates >> POSITION_BITS
+        # Keys are sorted, so repeated documents are adjacent
+        return documents[np.r_[True, documents[1:] != documents[:-1]]] if len(documents) else documents
+
+    def query(self, phrases: Query, match_all: bool = False) -> np.ndarray:
+        """Sorted document numbers matching any (or, with ``match_all``, every) phrase."""
+        if isinstance(phrases, str):
+            phrases = [phrases]
+        results = [self.documents(phrase) for phrase in phrases if index_tokens(phrase)]
+        if not results:
+            return np.empty(0, dtype=np.int64)
+        if match_all:
+            results.sort(key=len)
+            matched = results[0]
+            for documents in results[1:]:
+                matched = np.intersect1d(matched, documents, assume_unique=True)
+            return matched
+        return np.unique(np.concatenate(results))
+
+    def search(self, phrases: Query, match_all: bool = False) -> List[str]:
+        """Post ids matching any (or every) phrase, in the order they were indexed."""
+        documents = self.query(phrases, match_all)
+        return [self._post_ids[document] for document in documents.tolist()]
+
+    def mask(self, post_ids: Sequence[Optional[str]], phrases: Query, match_all: bool = False) -> np.ndarray:
+        """Boolean mask over ``post_ids`` of posts matching the query; unindexed posts do not match."""
+        matched = self.query(phrases, match_all)
+        documents = np.fromiter((self._documents.get(post_id, -1) if post_id else -1 for post_id in post_ids),
+                                dtype=np.int64, count=len(post_ids))
+        return np.isin(documents, matched)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "posts": len(self._post_ids),
+                "tokens": len(self._vocabulary),
+                "postings": sum(len(chunk) for chunks in self._postings for chunk in chunks),
+            }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Persist the index to a compressed .npz file (written atomically)."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given to save the keyword index to")
+
+        with self._lock:
+            vocabulary = list(self._vocabulary)
+            lists = [self._keys(token) for token in vocabulary]
+            offsets = np.cumsum([0] + [len(keys) for keys in lists])
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    np.savez_compressed(
+                        handle,
+                        keys=np.concatenate(lists) if lists else np.empty(0, dtype=np.int64),
+                        offsets=offsets,
+                        vocabulary=np.array(json.dumps(vocabulary)),
+                        post_ids=np.array(json.dumps(self._post_ids)),
+                        sources=np.array(json.dumps(self.sources)),
+                    )
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def load(self, path: str) -> None:
+        """Replace the index contents with one previously written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            keys, offsets = data["keys"], data["offsets"]
+            vocabulary = json.loads(str(data["vocabulary"]))
+            post_ids = json.loads(str(data["post_ids"]))
+            sources = json.loads(str(data["sources"]))
+        with self._lock:
+            self._reset()
+            self._post_ids = post_ids
+            self._documents = {post_id: document for document, post_id in enumerate(post_ids)}
+            self._vocabulary = {token: token_id for token_id, token in enumerate(vocabulary)}
+            self._postings = [[keys[start:end]] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+            self.sources = sources
@@ -26,17 +26,19 @@ from apscheduler.schedulers.background import BackgroundScheduler
 
 # Import Flask app from our existing application
 from app import app
+from app_config import get_config
 
 
 class Launcher:
     """Main orchestrator for LinkedIn AI Agent ultra-lean architecture"""
     
-    def __init__(self, chrome_debug_port: int = 9222, flask_port: int = 5000, 
-                 flask_host: str = 'localhost', user_data_dir: Optional[str] = None):
-        """Initialize Launcher with configuration parameters"""
-        self.chrome_debug_port = chrome_debug_port
-        self.flask_port = flask_port
-        self.flask_host = flask_host
+    def __init__(self, chrome_debug_port: Optional[int] = None, flask_port: Optional[int] = None,
+                 flask_host: Optional[str] = None, user_data_dir: Optional[str] = None):
+        """Initialize Launcher with configuration parameters (defaults from config/settings.yaml)"""
+        config = get_config()
+        self.chrome_debug_port = chrome_debug_port or config.chrome.debug_port
+        self.flask_port = flask_port or config.web.port
+        self.flask_host = flask_host or config.web.host
         self.user_data_dir = user_data_dir or os.path.expanduser('~/.linkedin_browser')
         
         # Component tracking
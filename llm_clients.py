@@ -0,0 +1,76 @@
+"""
+Shared OpenAI clients for LinkedIn AI Agent LLM calls.
+
+The async helpers hand out one AsyncOpenAI client per (event loop, API key,
+base URL) so every coroutine on a loop reuses the same keep-alive HTTP
+connection pool instead of opening a fresh TCP/TLS session per request.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+try:
+    import httpx
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+# Connection pool sizing for the shared async clients
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE_CONNECTIONS = 50
+KEEPALIVE_EXPIRY = 30.0  # seconds
+
+# httpx connection pools are bound to the loop that opened them, so clients
+# are cached per running loop and dropped together with the loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, Optional[str]], object]]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def get_async_openai_client(api_key: str, base_url: Optional[str] = None) -> "openai.AsyncOpenAI":
+    """
+    Return the shared AsyncOpenAI client for the running event loop.
+
+    Args:
+        api_key: OpenAI API key the client authenticates with
+        base_url: Optional API base URL (e.g. a local OpenAI-compatible server)
+
+    Returns:
+        An AsyncOpenAI client backed by a keep-alive connection pool
+
+    Raises:
+        ImportError: If the openai package is not installed
+        RuntimeError: If called outside a running event loop
+    """
+    if not OPENAI_AVAILABLE:
+        raise ImportError("OpenAI package not available. Install with: pip install openai")
+
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url)
+
+    with _async_clients_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None:
+            http_client = openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                )
+            )
+            client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            loop_clients[key] = client
+        return client
+
+
+async def close_async_openai_clients() -> None:
+    """Close every shared async client that belongs to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        loop_clients = _async_clients.pop(loop, {})
+
+    for client in loop_clients.values():
+        await client.close()
@@ -0,0 +1,445 @@
+"""
+Latency budgets and circuit breaking for LLM calls.
+
+LLMGuard runs an LLM call under a per-call latency budget. If the call has
+not finished within the budget, the caller gets its local fallback
+immediately while the LLM call keeps running in the background, so its
+result still lands in the caller's caches for the next request. A shared
+CircuitBreaker counts failures and budget overruns; once it opens, calls
+go straight to the fallback until a cool-down has passed and a single
+trial call succeeds.
+
+The budget starts when the call starts running, not when it is queued
+for a worker: a call still queued when its budget has passed is dropped
+(PoolSaturated). Waiting for rate-limit capacity (inside local_wait())
+uses the budget like any other time, so an interactive call falls back
+on schedule however busy the limiter is; callers bound the wait itself
+with remaining_budget(). Local overload of either kind, like a
+RateLimitTimeout, is not an upstream failure and does not trip the
+breaker.
+
+Calls without a budget (batches, background work) have nothing to fall
+back from on schedule, so they run on the caller's thread: the shared
+pool of MAX_BACKGROUND_CALLS workers is kept for budgeted calls and a
+large batch cannot queue interactive calls behind it.
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Set, TypeVar
+
+from rate_limiter import RateLimitTimeout
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Fallbacks receive the reason the LLM result was not used
+Fallback = Callable[[BaseException], T]
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised (and passed to fallbacks) when the circuit breaker skips a call."""
+
+
+class LatencyBudgetExceeded(TimeoutError):
+    """Passed to fallbacks when an LLM call overruns its latency budget."""
+
+
+class PoolSaturated(LatencyBudgetExceeded):
+    """Passed to fallbacks when a call waited out its budget queued behind other calls, never running."""
+
+
+class _BudgetClock:
+    """
+    Budget time used by one guarded call since it started running, and
+    whether the call is waiting on a local resource (see local_wait()).
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, budget: Optional[float]):
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._queued_at = time.monotonic()
+        self._started: Optional[float] = None
+        self._local_waits = 0
+
+    def start(self) -> None:
+        """Mark the call as running: budget time counts from here."""
+        with self._lock:
+            self._started = time.monotonic()
+
+    @property
+    def started(self) -> bool:
+        return self._started is not None
+
+    def queued(self) -> float:
+        """Seconds the call waited (or has been waiting) for a worker."""
+        with self._lock:
+            return (self._started if self._started is not None else time.monotonic()) - self._queued_at
+
+    def used(self) -> float:
+        started = self._started
+        return 0.0 if started is None else time.monotonic() - started
+
+    def remaining(self) -> Optional[float]:
+        """Budget left (None without a budget)."""
+        return None if self.budget is None else max(self.budget - self.used(), 0.0)
+
+    def enter_local_wait(self) -> None:
+        with self._lock:
+            self._local_waits += 1
+
+    def exit_local_wait(self) -> None:
+        with self._lock:
+            self._local_waits -= 1
+
+    @property
+    def waiting_locally(self) -> bool:
+        return self._local_waits > 0
+
+    def wait_time(self) -> float:
+        """How long to wait before checking the budget again."""
+        if not self.started:
+            # Queued: check again soon, in case the call starts or its budget passes first
+            remaining = self.budget - self.queued()
+            return min(remaining, self.POLL_INTERVAL) if remaining > 0 else self.POLL_INTERVAL
+        return self.remaining()
+
+
+_budget_clock: contextvars.ContextVar = contextvars.ContextVar("llm_budget_clock", default=None)
+
+
+@contextlib.contextmanager
+def local_wait() -> Iterator[None]:
+    """
+    Mark the enclosed wait (e.g. rate-limit acquisition) as local.
+
+    The wait still uses the latency budget, but a budget that runs out
+    during it is local backpressure, not a slow upstream, so it does not
+    count against the circuit breaker. A no-op outside a guarded call;
+    works around ``await`` as well.
+    """
+    clock = _budget_clock.get()
+    if clock is None:
+        yield
+        return
+    clock.enter_local_wait()
+    try:
+        yield
+    finally:
+        clock.exit_local_wait()
+
+
+def remaining_budget(default: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds left in the current guarded call's latency budget.
+
+    Returns ``default`` outside a guarded call or in one without a budget,
+    so only batch and background work waits that long for a local resource.
+    """
+    clock = _budget_clock.get()
+    remaining = clock.remaining() if clock is not None else None
+    return default if remaining is None else remaining
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed / open / half-open circuit breaker.
+
+    - closed: calls run; ``failure_threshold`` consecutive failures open it
+    - open: calls are skipped until ``reset_timeout`` seconds have passed
+    - half-open: one trial call runs; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed, claiming the half-open trial slot if needed."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"LLM circuit breaker opened after {self._failures} failure(s)")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """End a call that never reached the upstream: counts as neither success nor failure."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self) -> None:
+        """Close the breaker and forget past failures."""
+        self.record_success()
+
+
+@lru_cache(maxsize=None)
+def get_circuit_breaker(name: str = "openai") -> CircuitBreaker:
+    """
+    Return the process-wide circuit breaker for an upstream.
+
+    Engines are created per request, so upstream health has to be tracked
+    outside any single instance.
+    """
+    return CircuitBreaker()
+
+
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Upper bound on LLM calls running in the background at once
+MAX_BACKGROUND_CALLS = 16
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_BACKGROUND_CALLS, thread_name_prefix="llm-guard"
+            )
+        return _executor
+
+
+def _started(clock: _BudgetClock, fn: Callable[..., T], *args, **kwargs) -> T:
+    clock.start()
+    return fn(*args, **kwargs)
+
+
+async def _started_async(clock: _BudgetClock, coroutine_fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+    clock.start()
+    return await coroutine_fn(*args, **kwargs)
+
+
+class LLMGuard:
+    """
+    Run LLM calls under a latency budget with a circuit breaker.
+
+    Args:
+        budget: Seconds to wait for the LLM before using the fallback (None waits indefinitely)
+        breaker: Circuit breaker shared by calls to the same upstream
+        name: Label used in log messages
+    """
+
+    def __init__(self, budget: Optional[float] = 2.0, breaker: Optional[CircuitBreaker] = None,
+                 name: str = "LLM"):
+        self.budget = budget
+        self.breaker = breaker or get_circuit_breaker()
+        self.name = name
+        self.stats: Dict[str, int] = {"calls": 0, "timeouts": 0, "errors": 0, "short_circuits": 0, "overloads": 0}
+        self._background: Set[asyncio.Task] = set()
+
+    def _skip(self, fallback: Fallback) -> Any:
+        self.stats["short_circuits"] += 1
+        logger.debug(f"{self.name} circuit open; using local fallback")
+        return fallback(CircuitOpenError(f"{self.name} circuit breaker is open"))
+
+    def _timed_out(self, fallback: Fallback) -> Any:
+        self.stats["timeouts"] += 1
+        self.breaker.record_failure()
+        logger.warning(f"{self.name} call exceeded its {self.budget}s budget; using local fallback")
+        return fallback(LatencyBudgetExceeded(f"{self.name} call exceeded {self.budget}s"))
+
+    def _overloaded(self, error: BaseException, fallback: Fallback) -> Any:
+        self.stats["overloads"] += 1
+        # The upstream was never called, so its health is unknown
+        self.breaker.release()
+        logger.warning(f"{self.name} call used up its {self.budget}s budget waiting locally ({error}); "
+                       f"using local fallback")
+        return fallback(error)
+
+    def _failed(self, error: BaseException, fallback: Fallback) -> Any:
+        self.stats["errors"] += 1
+        if isinstance(error, RateLimitTimeout):
+            # Our own limiter gave up before the upstream was called
+            self.breaker.release()
+        else:
+            self.breaker.record_failure()
+        logger.warning(f"{self.name} call failed: {error}. Using local fallback.")
+        return fallback(error)
+
+    def call(self, fn: Callable[..., T], *args, fallback: Fallback, **kwargs) -> T:
+        """
+        Call ``fn(*args, **kwargs)``, falling back if it is slow, failing or circuit-broken.
+
+        Args:
+            fn: Blocking LLM call
+            fallback: Called with the reason when the LLM result is not used
+
+        Returns:
+            The LLM result, or the fallback's result
+        """
+        if not self.breaker.allow():
+            return self._skip(fallback)
+
+        self.stats["calls"] += 1
+        if self.budget is None:
+            return self._call_unbudgeted(fn, *args, fallback=fallback, **kwargs)
+        # Run in a copy of the caller's context so context variables (e.g. the
+        # rate limiter's request priority) follow the call onto the pool
+        context = contextvars.copy_context()
+        clock = _BudgetClock(self.budget)
+        context.run(_budget_clock.set, clock)
+        future = _get_executor().submit(context.run, _started, clock, fn, *args, **kwargs)
+        try:
+            result = self._wait(future, clock)
+        except PoolSaturated as e:
+            return self._overloaded(e, fallback)
+        except concurrent.futures.TimeoutError as e:
+            if future.done():
+                return self._failed(e, fallback)
+            # The call keeps running on the pool and fills the caches when it returns
+            future.add_done_callback(self._log_background_result)
+            if clock.waiting_locally:
+                return self._overloaded(RateLimitTimeout(f"{self.name} call was still waiting for capacity"), fallback)
+            return self._timed_out(fallback)
+        except Exception as e:
+            return self._failed(e, fallback)
+
+        self.breaker.record_success()
+        return result
+
+    def _call_unbudgeted(self, fn: Callable[..., T], *args, fallback: Fallback, **kwargs) -> T:
+        """Run a call with no budget on the caller's thread, leaving the shared pool to budgeted calls."""
+        clock = _BudgetClock(None)
+        token = _budget_clock.set(clock)
+        try:
+            result = _started(clock, fn, *args, **kwargs)
+        except Exception as e:
+            return self._failed(e, fallback)
+        finally:
+            _budget_clock.reset(token)
+        self.breaker.record_success()
+        return result
+
+    async def call_async(self, coroutine_fn: Callable[..., Awaitable[T]], *args, fallback: Fallback, **kwargs) -> T:
+        """
+        Await ``coroutine_fn(*args, **kwargs)`` under the latency budget.
+
+        On timeout the coroutine is left running as a background task
+        instead of being cancelled, so its result still warms the caches.
+        """
+        if not self.breaker.allow():
+            return self._skip(fallback)
+
+        self.stats["calls"] += 1
+        clock = _BudgetClock(self.budget)
+        # The task copies the current context, clock included
+        token = _budget_clock.set(clock)
+        try:
+            task = asyncio.ensure_future(_started_async(clock, coroutine_fn, *args, **kwargs))
+        finally:
+            _budget_clock.reset(token)
+        try:
+            while True:
+                timeout = None if self.budget is None else clock.wait_time()
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+                    break
+                except asyncio.TimeoutError:
+                    if task.done():
+                        result = task.result()
+                        break
+                    if not clock.started:
+                        if clock.queued() >= self.budget:
+                            # Never scheduled: a busy event loop, not a slow upstream
+                            task.cancel()
+                            raise PoolSaturated(f"{self.name} call was not started within {self.budget}s")
+                        continue
+                    if clock.used() >= self.budget:
+                        raise
+        except PoolSaturated as e:
+            return self._overloaded(e, fallback)
+        except asyncio.TimeoutError as e:
+            if task.done():
+                return self._failed(e, fallback)
+            self._background.add(task)
+            task.add_done_callback(self._background_task_done)
+            if clock.waiting_locally:
+                return self._overloaded(RateLimitTimeout(f"{self.name} call was still waiting for capacity"), fallback)
+            return self._timed_out(fallback)
+        except Exception as e:
+            return self._failed(e, fallback)
+
+        self.breaker.record_success()
+        return result
+
+    def _wait(self, future: concurrent.futures.Future, clock: _BudgetClock) -> Any:
+        """The call's result, raising TimeoutError once it has used up its budget unfinished."""
+        while True:
+            try:
+                return future.result(timeout=clock.wait_time())
+            except concurrent.futures.TimeoutError:
+                if future.done():
+                    # Finished as the wait timed out, or raised a TimeoutError itself (e.g. RateLimitTimeout)
+                    return future.result()
+                if not clock.started:
+                    # cancel() fails once a worker has picked the call up; its budget then applies
+                    if clock.queued() >= self.budget and future.cancel():
+                        raise PoolSaturated(f"{self.name} call was not started within {self.budget}s")
+                    continue
+                if clock.used() >= self.budget:
+                    raise
+
+    def _log_background_result(self, future) -> None:
+        error = future.exception()
+        if error:
+            logger.debug(f"Background {self.name} call failed: {error}")
+        else:
+            logger.debug(f"Background {self.name} call completed after the budget")
+
+    def _background_task_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            self._log_background_result(task)
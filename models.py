@@ -1,5 +1,10 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional
+import logging
+from functools import lru_cache
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Union
+
+from pydantic import BaseModel, HttpUrl, Field, TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
 
 class FetchedPost(BaseModel):
     post_id: str = Field(..., description="Unique identifier for the post, if available (e.g., from its URL or a data attribute).")
@@ -35,3 +40,58 @@ class FetchedPost(BaseModel):
         #     }
         # }
         pass
+
+
+@lru_cache(maxsize=1)
+def get_posts_adapter() -> TypeAdapter:
+    """Return the shared TypeAdapter for List[FetchedPost]; building one compiles a validator."""
+    return TypeAdapter(List[FetchedPost])
+
+
+def validate_posts(items: Sequence[Mapping[str, Any]], skip_invalid: bool = False) -> List[FetchedPost]:
+    """
+    Validate a batch of extracted post dicts in one call.
+
+    Args:
+        items: Raw post dicts (e.g. parsed from the agent's structured output)
+        skip_invalid: Drop items that fail validation instead of raising
+
+    Returns:
+        Validated FetchedPost models, in input order
+
+    Raises:
+        ValidationError: If an item is invalid and skip_invalid is False
+    """
+    adapter = get_posts_adapter()
+    try:
+        return adapter.validate_python(items)
+    except ValidationError as e:
+        if not skip_invalid:
+            raise
+        invalid = {error["loc"][0] for error in e.errors() if error["loc"] and isinstance(error["loc"][0], int)}
+        logger.warning(f"Dropping {len(invalid)} invalid post(s) of {len(items)}")
+        return adapter.validate_python([item for index, item in enumerate(items) if index not in invalid])
+
+
+def validate_posts_json(data: Union[str, bytes]) -> List[FetchedPost]:
+    """
+    Validate a JSON array of posts straight from text, without building intermediate dicts.
+
+    Raises:
+        ValidationError: If the JSON is malformed or an item is invalid
+    """
+    return get_posts_adapter().validate_json(data)
+
+
+def construct_posts(records: Iterable[Mapping[str, Any]]) -> List[FetchedPost]:
+    """
+    Build FetchedPost models without validation (FetchedPost.model_construct per record).
+
+    Only for records that were validated earlier, e.g. read back from the
+    post archive. As with model_construct, unknown keys are ignored and URL
+    fields keep the strings they were given; serialise such posts from
+    their records (e.g. PostBatch.to_json) rather than with model_dump(), which
+    warns about the string URLs.
+    """
+    construct = FetchedPost.model_construct
+    return [construct(**record) for record in records]
@@ -0,0 +1,325 @@
+"""
+Near-duplicate detection for harvested post text.
+
+Reposts, cross-posts and templated engagement bait produce many posts whose
+content_text is almost identical. This module collapses them before any
+filtering, research or commenting is paid for:
+
+- each text is reduced to hashed word shingles (token hashes are computed
+  once per distinct token and combined into shingles with array maths)
+- MinHash signatures are computed for whole batches in NumPy: one
+  (shingles x permutations) matrix of multiply-add-shift hashes per chunk,
+  reduced per document with np.minimum.reduceat
+- signatures are split into LSH bands; a document is only compared with
+  documents sharing at least one band bucket, so lookups are sub-linear
+- candidates are confirmed by the estimated Jaccard similarity
+
+The index can be persisted to a compressed .npz file, so repeat harvests
+skip content seen in earlier runs.
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from text_features import tokenize
+
+logger = logging.getLogger(__name__)
+
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SHIFT = np.uint64(32)
+_EMPTY = np.uint32(0xFFFFFFFF)
+# Rows of the (shingles x permutations) hash matrix computed at once
+_CHUNK_SHINGLES = 32768
+
+
+@lru_cache(maxsize=None)
+def lsh_parameters(threshold: float, num_perm: int, false_negative_weight: float = 0.9) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) for a Jaccard threshold.
+
+    Minimises the weighted false-positive area below the threshold plus the
+    false-negative area above it of the LSH candidate curve 1 - (1 - s^r)^b.
+    Every candidate is verified against its signature, so a false positive
+    only costs one comparison while a false negative is a missed duplicate;
+    the default weighting favours recall.
+    """
+    similarity = np.linspace(0.0, 1.0, 201)
+    below, above = similarity <= threshold, similarity >= threshold
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            candidate = 1.0 - (1.0 - similarity ** rows) ** bands
+            # Riemann sums over the uniform grid
+            error = ((1.0 - false_negative_weight) * candidate[below].sum()
+                     + false_negative_weight * (1.0 - candidate[above]).sum())
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of text signatures, keyed by caller-supplied ids (post ids).
+
+    deduplicate() checks a batch against the index and against earlier
+    texts in the same batch, and adds the new ones, so the first post seen
+    becomes the canonical one.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3,
+                 seed: int = 1, path: Optional[str] = None, autosave_every: int = 1024):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm <= 0 or shingle_size <= 0:
+            raise ValueError("num_perm and shingle_size must be positive")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.path = path
+        self.autosave_every = autosave_every
+        self.bands, self.rows = lsh_parameters(threshold, num_perm)
+
+        # h(x) = (a * x + b) mod 2^64 >> 32 over 32-bit shingle hashes: a
+        # 2-universal family (multiply-add-shift) that needs no modulo
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) << np.uint64(1) | np.uint64(1)
+        self._b = generator.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._band_weights = generator.randint(1, (1 << 63) - 1, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self._shingle_weights = generator.randint(1, (1 << 63) - 1, size=shingle_size, dtype=np.uint64) | np.uint64(1)
+        self._token_hashes: Dict[str, int] = {"": 0}
+
+        self._lock = threading.RLock()
+        self._added_since_save = 0
+        self.duplicates_found = 0
+        self._reset()
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def _reset(self) -> None:
+        self._signatures = np.empty((64, self.num_perm), dtype=np.uint32)
+        self._keys: List[str] = []
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        """Forget every indexed text."""
+        with self._lock:
+            self._reset()
+            self.duplicates_found = 0
+
+    def _shingles(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return all shingle hashes (32-bit values in uint64) and each text's shingle count."""
+        k = self.shingle_size
+        token_lists = [tokenize(text or "") for text in texts]
+        # Texts shorter than one shingle are padded, so the whole text is its only shingle
+        token_lists = [tokens + [""] * (k - len(tokens)) if 0 < len(tokens) < k else tokens for tokens in token_lists]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        counts = np.maximum(lengths - k + 1, 0)
+        if not counts.any():
+            return np.empty(0, dtype=np.uint64), counts
+
+        lookup = self._token_hashes
+        tokens = np.fromiter(
+            (lookup[token] if token in lookup else lookup.setdefault(token, zlib.crc32(token.encode()))
+             for token in chain.from_iterable(token_lists)),
+            dtype=np.uint64, count=int(lengths.sum()))
+        combined = np.zeros(len(tokens) - k + 1, dtype=np.uint64)
+        for offset, weight in enumerate(self._shingle_weights):
+            combined += tokens[offset:len(tokens) - k + 1 + offset] * weight
+        # Drop shingles that straddle two texts
+        text_ends = np.repeat(np.cumsum(lengths), lengths)[:len(combined)]
+        combined = combined[np.arange(len(combined)) + k <= text_ends]
+        return (combined >> _SHIFT) ^ (combined & _MAX_HASH), counts
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Compute MinHash signatures for a batch of texts.
+
+        Returns:
+            (len(texts), num_perm) uint32 array; texts without words get an
+            all-0xFFFFFFFF signature and never match anything
+        """
+        shingles, counts = self._shingles(texts)
+        signatures = np.full((len(texts), self.num_perm), _EMPTY, dtype=np.uint32)
+        rows = np.flatnonzero(counts)
+        if not len(rows):
+            return signatures
+
+        ends = np.cumsum(counts[rows])
+        starts = ends - counts[rows]
+        # Permutations x shingles, so each per-document minimum reduces a contiguous run
+        buffer = np.empty((self.num_perm, max(_CHUNK_SHINGLES, int(counts.max()))), dtype=np.uint64)
+        a, b = self._a[:, None], self._b[:, None]
+        chunk_start = 0
+        while chunk_start < len(rows):
+            # Whole documents per chunk, bounded by the hash matrix size
+            chunk_end = max(chunk_start + 1, int(np.searchsorted(ends, starts[chunk_start] + _CHUNK_SHINGLES, side="right")))
+            low, high = starts[chunk_start], ends[chunk_end - 1]
+            hashed = buffer[:, :high - low]
+            np.multiply(a, shingles[None, low:high], out=hashed)
+            hashed += b
+            hashed >>= _SHIFT
+            signatures[rows[chunk_start:chunk_end]] = np.minimum.reduceat(hashed, starts[chunk_start:chunk_end] - low, axis=1).T
+            chunk_start = chunk_end
+        return signatures
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Hash each band of each signature to one uint64 bucket key; shape (n, bands)."""
+        banded = signatures[:, :self.bands * self.rows].astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        return (banded * self._band_weights).sum(axis=2)
+
+    def _insert(self, key: str, signature: np.ndarray, band_keys: List[int]) -> None:
+        slot = len(self._keys)
+        if slot == len(self._signatures):
+            grown = np.empty((2 * slot, self.num_perm), dtype=np.uint32)
+            grown[:slot] = self._signatures
+            self._signatures = grown
+        self._signatures[slot] = signature
+        self._keys.append(key)
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets.setdefault(band_key, []).append(slot)
+
+    def _match(self, signature: np.ndarray, band_keys: List[int]) -> Optional[int]:
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, band_keys):
+            candidates.update(buckets.get(band_key, ()))
+        if not candidates:
+            return None
+        slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[slots] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        return int(slots[best]) if similarity[best] >= self.threshold else None
+
+    def deduplicate(self, keys: Sequence[str], texts: Sequence[str], add: bool = True) -> List[Optional[str]]:
+        """
+        Find near-duplicates for a batch of texts.
+
+        Args:
+            keys: Id of each text (e.g. post_id), reported for later duplicates
+            texts: The texts to check
+            add: Index the texts that are not duplicates
+
+        Returns:
+            For each text, the key of the earlier near-duplicate (already
+            indexed, or earlier in this batch), or None if the text is new
+        """
+        if len(keys) != len(texts):
+            raise ValueError("keys and texts must have the same length")
+        signatures = self.signatures(texts)
+        band_keys = self._band_keys(signatures).tolist()
+        empty = (signatures == _EMPTY).all(axis=1)
+        results: List[Optional[str]] = []
+        with self._lock:
+            for index, key in enumerate(keys):
+                if empty[index]:
+                    results.append(None)
+                    continue
+                match = self._match(signatures[index], band_keys[index])
+                if match is not None:
+                    results.append(self._keys[match])
+                    self.duplicates_found += 1
+                    continue
+                results.append(None)
+                if add:
+                    self._insert(key, signatures[index], band_keys[index])
+                    self._added_since_save += 1
+            if add and self.path and self._added_since_save >= self.autosave_every:
+                self.save()
+        return results
+
+    def query(self, text: str) -> Optional[str]:
+        """Return the key of an indexed near-duplicate of ``text``, without adding it."""
+        return self.deduplicate(["<query>"], [text], add=False)[0]
+
+    def filter_posts(self, posts: Sequence[Any]) -> Tuple[List[Any], Dict[str, str]]:
+        """
+        Drop near-duplicate posts (FetchedPost models or post dicts) and index the rest.
+
+        Returns:
+            (posts to keep, {dropped post_id: post_id of the post it duplicates})
+        """
+        def field(post, name):
+            return post.get(name) if isinstance(post, dict) else getattr(post, name, None)
+
+        keys = [str(field(post, "post_id") or index) for index, post in enumerate(posts)]
+        matches = self.deduplicate(keys, [field(post, "content_text") or "" for post in posts])
+        kept = [post for post, match in zip(posts, matches) if match is None]
+        dropped = {key: match for key, match in zip(keys, matches) if match is not None}
+        if dropped:
+            logger.info(f"Dropped {len(dropped)} near-duplicate post(s) of {len(posts)}")
+        return kept, dropped
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Persist the index to a compressed .npz file (written atomically)."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given to save the near-duplicate index to")
+
+        with self._lock:
+            parameters = {"num_perm": self.num_perm, "shingle_size": self.shingle_size, "seed": self.seed}
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    np.savez_compressed(
+                        handle,
+                        signatures=self._signatures[:len(self._keys)],
+                        keys=np.array(json.dumps(self._keys)),
+                        parameters=np.array(json.dumps(parameters)),
+                    )
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._added_since_save = 0
+
+    def load(self, path: str) -> None:
+        """Replace the index contents with one previously written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            parameters = json.loads(str(data["parameters"]))
+            signatures = data["signatures"]
+            keys = json.loads(str(data["keys"]))
+        expected = {"num_perm": self.num_perm, "shingle_size": self.shingle_size, "seed": self.seed}
+        if parameters != expected:
+            raise ValueError(f"Near-duplicate index file was built with {parameters}, expected {expected}")
+
+        with self._lock:
+            self._reset()
+            for key, signature, band_keys in zip(keys, signatures, self._band_keys(signatures).tolist()):
+                self._insert(key, signature, band_keys)
+
+    def stats(self) -> dict:
+        """Return index size, LSH layout and the number of duplicates found."""
+        return {"entries": len(self), "bands": self.bands, "rows": self.rows,
+                "duplicates_found": self.duplicates_found}
+
+
+@lru_cache(maxsize=1)
+def get_shared_duplicate_index() -> NearDuplicateIndex:
+    """
+    Return the process-wide near-duplicate index.
+
+    Set NEAR_DUPLICATE_INDEX_PATH to persist it between runs, so repeat
+    harvests skip content already seen.
+    """
+    index = NearDuplicateIndex(path=os.getenv("NEAR_DUPLICATE_INDEX_PATH"))
+    if index.path:
+        atexit.register(index.save)
+    return index
@@ -0,0 +1,436 @@
+"""
+Local OpenAI-compatible stub server for offline tests and benchmarks.
+
+Serves POST /v1/chat/completions (plain, streaming and structured-output
+requests) and GET /v1/models from a threaded HTTP server with keep-alive,
+so the real OpenAI SDK, AsyncOpenAI and LangChain's ChatOpenAI can all talk
+to it. Point clients at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+(or the base_url argument of PromptTemplateEngine / PromptInterpreter).
+
+Behaviour is configurable and seeded for reproducible runs:
+
+- latency: a distribution spec such as "0.2", "uniform:0.1,0.4",
+  "normal:0.3,0.05", "lognormal:-1.2,0.5" or "exponential:0.25" (seconds),
+  plus an optional per-completion-token generation rate
+- error_rate / error_status: fraction of requests answered with an
+  OpenAI-style error (429 by default)
+- scripted responses: ordered rules matched by regex against the request's
+  messages, each with its own content, latency, status or token counts
+- default responses: intent names and JSON parameters for the template
+  engine's prompts, and schema-shaped JSON for structured outputs
+
+Usage:
+    python -m openai_stub --port 8765 --latency lognormal:-1.2,0.5 --error-rate 0.02
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import yaml
+
+from intent_registry import build_default_registry
+from parameter_extraction import scan_parameters
+
+logger = logging.getLogger(__name__)
+
+LatencySampler = Callable[[random.Random], float]
+
+
+def parse_latency(spec: Any) -> LatencySampler:
+    """
+    Build a latency sampler from a distribution spec.
+
+    Args:
+        spec: Seconds as a number, or "fixed:s", "uniform:low,high",
+            "normal:mean,std", "lognormal:mu,sigma" or "exponential:mean"
+
+    Returns:
+        A function drawing a non-negative latency from a random.Random
+
+    Raises:
+        ValueError: If the spec is not recognised
+    """
+    if isinstance(spec, (int, float)):
+        value = float(spec)
+        return lambda rng: value
+
+    kind, _, raw_args = str(spec).partition(":")
+    if not raw_args:
+        kind, raw_args = "fixed", kind
+    try:
+        args = [float(arg) for arg in raw_args.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+
+    if kind == "fixed" and len(args) == 1:
+        return lambda rng: args[0]
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == "normal" and len(args) == 2:
+        return lambda rng: max(0.0, rng.gauss(args[0], args[1]))
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: rng.lognormvariate(args[0], args[1])
+    if kind == "exponential" and len(args) == 1:
+        return lambda rng: rng.expovariate(1.0 / args[0]) if args[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate OpenAI token count (~4 characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+@dataclass
+class ScriptedResponse:
+    """A response rule: requests whose messages match ``pattern`` get this reply."""
+    pattern: str
+    content: Any = None
+    status: int = 200
+    latency: Any = None
+    completion_tokens: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+
+    def __post_init__(self):
+        self._regex = re.compile(self.pattern, re.IGNORECASE | re.DOTALL)
+        self._latency = parse_latency(self.latency) if self.latency is not None else None
+
+    def matches(self, text: str) -> bool:
+        return bool(self._regex.search(text))
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of an OpenAIStubServer."""
+    latency: Any = 0.0
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    error_status: int = 429
+    seed: Optional[int] = 0
+    responses: List[ScriptedResponse] = field(default_factory=list)
+
+    @classmethod
+    def from_file(cls, path: str, **overrides) -> "StubConfig":
+        """Load a config (including a "responses" rule list) from a YAML or JSON file."""
+        with open(path, "r", encoding="utf-8") as handle:
+            document = yaml.safe_load(handle) or {}
+        responses = [ScriptedResponse(**rule) for rule in document.pop("responses", [])]
+        document.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(responses=responses, **document)
+
+
+_INTENT_TABLE = build_default_registry().keyword_table
+
+
+def _default_intent(text: str) -> str:
+    text = text.lower()
+    scores = {intent: sum(keyword in text for keyword in keywords) for intent, keywords in _INTENT_TABLE}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else "unknown"
+
+
+def _instance_from_schema(schema: Mapping, root: Optional[Mapping] = None) -> Any:
+    """Build a minimal value satisfying a JSON schema (as sent for structured outputs)."""
+    root = root or schema
+    if "$ref" in schema:
+        target = root
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            target = target[part]
+        return _instance_from_schema(target, root)
+    if "anyOf" in schema:
+        return _instance_from_schema(schema["anyOf"][0], root)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {name: _instance_from_schema(prop, root) for name, prop in schema.get("properties", {}).items()}
+    return {"array": [], "string": "", "integer": 0, "number": 0.0, "boolean": False, "null": None}.get(kind)
+
+
+def default_response(body: Mapping) -> str:
+    """Answer a chat request the way the repo's prompts expect, without a model."""
+    messages = body.get("messages", [])
+    system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    user = str(messages[-1].get("content", "")) if messages else ""
+    request_text = re.search(r'User request: "(.*)"', user, re.DOTALL)
+    prompt = request_text.group(1) if request_text else user
+
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        instance = _instance_from_schema(schema)
+        if isinstance(instance, dict):
+            # Fill the interpreter's Command fields from the prompt where they exist
+            parameters = scan_parameters(prompt)
+            if "topic" in instance and parameters.get("keywords"):
+                instance["topic"] = " and ".join(parameters["keywords"])
+            if "post_limit" in instance and parameters.get("count"):
+                instance["post_limit"] = parameters["count"]
+            if "is_valid" in instance:
+                instance["is_valid"] = bool(instance.get("topic"))
+        return json.dumps(instance)
+    if "intent classifier" in system:
+        return _default_intent(prompt)
+    if "valid JSON" in system or response_format.get("type") == "json_object":
+        return json.dumps(scan_parameters(prompt))
+    return "OK"
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under concurrent clients, adding 1s retransmit stalls
+    request_queue_size = 256
+
+
+class OpenAIStubServer:
+    """
+    Threaded OpenAI-compatible HTTP server.
+
+    Use as a context manager (or call start()/stop()); ``base_url`` is the
+    value to pass as an OpenAI client's base_url.
+    """
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self._latency = parse_latency(self.config.latency)
+        self._random = random.Random(self.config.seed)
+        self._random_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "errors": 0, "scripted": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._server = _StubHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "OpenAIStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="openai-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "OpenAIStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _count(self, **increments) -> None:
+        with self._counter_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _draw(self, sampler: LatencySampler) -> float:
+        with self._random_lock:
+            return sampler(self._random)
+
+    def _should_fail(self) -> bool:
+        if self.config.error_rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.config.error_rate
+
+    def plan(self, body: Mapping) -> Dict[str, Any]:
+        """
+        Decide the reply to a chat request: status, content, token counts and delay.
+
+        Exposed separately from the HTTP handler so the decision logic can be
+        tested without sockets.
+        """
+        request_text = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        rule = next((rule for rule in self.config.responses if rule.matches(request_text)), None)
+
+        status = 200
+        if rule and rule.status != 200:
+            status = rule.status
+        elif self._should_fail():
+            status = self.config.error_status
+
+        if rule and rule.content is not None:
+            content = rule.content if isinstance(rule.content, str) else json.dumps(rule.content)
+        else:
+            content = default_response(body)
+
+        prompt_tokens = rule.prompt_tokens if rule and rule.prompt_tokens is not None else count_tokens(request_text)
+        completion_tokens = (rule.completion_tokens if rule and rule.completion_tokens is not None
+                             else count_tokens(content))
+
+        delay = self._draw(rule._latency if rule and rule._latency else self._latency)
+        if self.config.tokens_per_second and status == 200:
+            delay += completion_tokens / self.config.tokens_per_second
+
+        return {
+            "status": status,
+            "content": content,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "delay": delay,
+            "scripted": rule is not None,
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so client connection pools are exercised
+            # Headers and body are written separately; without this Nagle adds ~40ms per reply
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                logger.debug("openai-stub: " + format % args)
+
+            def _send_json(self, status: int, payload: Mapping, headers: Optional[Mapping] = None) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/") in ("/v1/models", "/models"):
+                    self._send_json(200, {"object": "list", "data": [
+                        {"id": model, "object": "model", "created": 0, "owned_by": "openai-stub"}
+                        for model in ("gpt-4o", "gpt-4o-mini", "gpt-4o-2024-08-06")
+                    ]})
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+                    return
+
+                if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+
+                plan = server.plan(body)
+                server._count(requests=1, scripted=int(plan["scripted"]))
+                time.sleep(plan["delay"])
+
+                if plan["status"] != 200:
+                    server._count(errors=1)
+                    error_type = "rate_limit_error" if plan["status"] == 429 else "server_error"
+                    self._send_json(plan["status"], {"error": {
+                        "message": f"Injected {plan['status']} from openai-stub",
+                        "type": error_type,
+                        "code": "rate_limit_exceeded" if plan["status"] == 429 else None,
+                    }}, headers={"Retry-After": "0"} if plan["status"] == 429 else None)
+                    return
+
+                server._count(prompt_tokens=plan["prompt_tokens"], completion_tokens=plan["completion_tokens"])
+                usage = {
+                    "prompt_tokens": plan["prompt_tokens"],
+                    "completion_tokens": plan["completion_tokens"],
+                    "total_tokens": plan["prompt_tokens"] + plan["completion_tokens"],
+                }
+                completion_id = f"chatcmpl-stub-{server.stats['requests']}"
+                model = body.get("model", "gpt-4o-mini")
+
+                if body.get("stream"):
+                    self._send_stream(completion_id, model, plan["content"], usage,
+                                      include_usage=bool((body.get("stream_options") or {}).get("include_usage")))
+                    return
+
+                self._send_json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": plan["content"], "refusal": None},
+                        "finish_reason": "stop",
+                        "logprobs": None,
+                    }],
+                    "usage": usage,
+                })
+
+            def _send_stream(self, completion_id: str, model: str, content: str, usage: Mapping, include_usage: bool) -> None:
+                def chunk(delta, finish_reason=None, chunk_usage=None):
+                    payload = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model, "choices": [] if delta is None else [
+                            {"index": 0, "delta": delta, "finish_reason": finish_reason, "logprobs": None}
+                        ],
+                    }
+                    if chunk_usage is not None:
+                        payload["usage"] = chunk_usage
+                    return f"data: {json.dumps(payload)}\n\n".encode()
+
+                parts = [chunk({"role": "assistant", "content": ""})]
+                parts += [chunk({"content": piece}) for piece in re.findall(r"\S+\s*|\s+", content)]
+                parts.append(chunk({}, finish_reason="stop"))
+                if include_usage:
+                    parts.append(chunk(None, chunk_usage=dict(usage)))
+                parts.append(b"data: [DONE]\n\n")
+                data = b"".join(parts)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", help="YAML/JSON file with settings and scripted 'responses'")
+    parser.add_argument("--latency", help="latency spec, e.g. 'lognormal:-1.2,0.5'")
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--error-status", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    overrides = {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+        "seed": args.seed,
+    }
+    if args.config:
+        config = StubConfig.from_file(args.config, **overrides)
+    else:
+        config = StubConfig(**{key: value for key, value in overrides.items() if value is not None})
+
+    logging.basicConfig(level=logging.INFO)
+    server = OpenAIStubServer(config, host=args.host, port=args.port)
+    print(f"OpenAI stub listening on {server.base_url} (export OPENAI_BASE_URL={server.base_url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
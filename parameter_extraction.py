@@ -0,0 +1,142 @@
+"""
+Regex-based parameter extraction for LinkedIn automation prompts.
+
+All patterns are compiled once at import. scan_parameters() makes a single
+pass over the prompt with one combined scanner that records every count,
+target-person and keyword-trigger candidate, then resolves them with the
+same precedence the original per-pattern searches used:
+
+- count: "N posts" > "N times/items" > "find N" > any number
+- keywords: "about X" > "on X" > "related to X"
+- target_person: "by/from First Last"
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Keyword phrases end at a connecting word or at the end of the prompt
+_KEYWORD_TAIL = r'\s+(.+?)(?:\s+(?:with|by|from|in)|\s*$)'
+
+# Full keyword patterns, anchored at trigger positions found by the scanner
+KEYWORD_PATTERNS = (
+    ("about", re.compile(r'about' + _KEYWORD_TAIL, re.IGNORECASE)),            # "about AI"
+    ("on", re.compile(r'on' + _KEYWORD_TAIL, re.IGNORECASE)),                  # "on machine learning"
+    ("related", re.compile(r'related to' + _KEYWORD_TAIL, re.IGNORECASE)),     # "related to startups"
+)
+
+# One scanner finds every trigger token; none of the triggers can overlap,
+# so a single left-to-right pass reports all of them. The leading character
+# class lets the regex engine skip positions that cannot start a trigger.
+SCANNER = re.compile(
+    r'(?=[\daAbfFoOrR])(?:'
+    r'(?P<number>\d+)'
+    r'|(?i:(?P<find>\bfind)|(?P<about>about)|(?P<on>on)|(?P<related>related to))'
+    r'|(?P<person>by|from)'
+    r')'
+)
+
+# Anchored follow-up patterns applied at trigger positions
+_POSTS_AFTER = re.compile(r'\s+posts?\b', re.IGNORECASE)              # "3 posts"
+_TIMES_AFTER = re.compile(r'\s+(?:times?|items?)\b', re.IGNORECASE)    # "5 times"
+_FIND_AFTER = re.compile(r'\s+(\d+)\b')                               # "find 10"
+PERSON_PATTERN = re.compile(r'(?:by|from)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)')
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def split_keywords(keyword_text: str) -> List[str]:
+    """Split a keyword phrase on ' and ' into separate keywords."""
+    # Handle multiple keywords separated by "and"
+    if " and " in keyword_text:
+        return [k.strip() for k in keyword_text.split(" and ")]
+    else:
+        return [keyword_text]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _resolve_keywords(prompt: str, triggers: Dict[str, List[int]]) -> List[str]:
+    for kind, pattern in KEYWORD_PATTERNS:
+        for position in triggers[kind]:
+            match = pattern.match(prompt, position)
+            if match:
+                return split_keywords(match.group(1).strip())
+    return []
+
+
+def scan_parameters(prompt: str) -> Dict:
+    """
+    Extract count, keywords and target person from a prompt in one scan.
+
+    Args:
+        prompt: User prompt
+
+    Returns:
+        Dict with any of "count", "keywords" and "target_person"
+    """
+    # Candidate counts in precedence order: "N posts", "N times", "find N", any number
+    count_posts = count_times = count_find = count_any = None
+    person = None
+    triggers: Dict[str, List[int]] = {"about": [], "on": [], "related": []}
+    length = len(prompt)
+
+    for match in SCANNER.finditer(prompt):
+        kind = match.lastgroup
+        start, end = match.span()
+
+        if kind == "number":
+            # Mirror \b(\d+)\b: the digit run must be a whole word
+            if (start and _is_word_char(prompt[start - 1])) or (end < length and _is_word_char(prompt[end])):
+                continue
+            value = match.group()
+            if count_any is None:
+                count_any = value
+            if count_posts is None and _POSTS_AFTER.match(prompt, end):
+                count_posts = value
+            elif count_times is None and _TIMES_AFTER.match(prompt, end):
+                count_times = value
+        elif kind == "find":
+            if count_find is None:
+                found = _FIND_AFTER.match(prompt, end)
+                if found:
+                    count_find = found.group(1)
+        elif kind == "person":
+            if person is None:
+                found = PERSON_PATTERN.match(prompt, start)
+                if found:
+                    person = found.group(1)
+        else:
+            triggers[kind].append(start)
+
+    params = {}
+
+    for value in (count_posts, count_times, count_find, count_any):
+        if value is not None:
+            params["count"] = int(value)
+            break
+
+    keywords = _resolve_keywords(prompt, triggers)
+    if keywords:
+        params["keywords"] = keywords
+
+    if person:
+        params["target_person"] = person
+
+    return params
+
+
+def extract_keywords(prompt: str) -> List[str]:
+    """Extract topic keywords ("about X", "on X", "related to X") from a prompt."""
+    triggers: Dict[str, List[int]] = {"about": [], "on": [], "related": []}
+    for match in SCANNER.finditer(prompt):
+        kind = match.lastgroup
+        if kind in triggers:
+            triggers[kind].append(match.start())
+    return _resolve_keywords(prompt, triggers)
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse every whitespace run into a single space."""
+    return WHITESPACE.sub(' ', text)
@@ -0,0 +1,384 @@
+"""
+Archive of harvested posts in Arrow IPC (or Parquet) files.
+
+Harvest results otherwise only exist in the /api/execute JSON response.
+PostArchive appends each harvest as one file under a partition per
+harvest date:
+
+    <root>/harvest_date=2025-06-01/posts-1748779200000-3f2a9c1e.arrow
+
+- files are written from PostBatch columns: interned author/headline/
+  timestamp columns become Arrow dictionary columns, counts become
+  nullable int64; posted_at (normalised timestamp, falling back to the
+  time encoded in the activity URN), activity_id, harvested_at and the
+  harvest's feed are added
+- Arrow IPC files are uncompressed and memory-mapped when read, so scans
+  are zero-copy: only the pages a query touches are read from disk
+- date-range queries skip partitions harvested before the range starts
+  (a post cannot be posted after it was harvested)
+- keyword and phrase queries are answered from an inverted index
+  (<root>/keyword_index.npz) that is brought up to date with the files
+  appended since it was last used
+
+Query from the command line:
+
+    python -m post_archive query --root archive --author "jane" --since 2025-05-01 --min-likes 100
+    python -m post_archive query --root archive --keyword "systems thinking" --keyword strategy
+    python -m post_archive stats --root archive
+    python -m post_archive export --root archive --out posts.parquet --since 2025-05-01
+
+pyarrow is optional; without it get_shared_archive() returns None and
+PostArchive raises ImportError.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from high_water_marks import urn_timestamps
+from keyword_index import KeywordIndex
+from models import FetchedPost, validate_posts
+from post_batch import COUNT_FIELDS, FIELDS, MISSING, InternedColumn, PostBatch, TextColumn
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "harvest_date="
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+KEYWORD_INDEX_FILE = "keyword_index.npz"
+DERIVED_FIELDS = ("activity_id", "posted_at", "harvested_at", "feed")
+
+Posts = Union[PostBatch, Sequence[FetchedPost]]
+
+
+def _to_timestamp(value: Union[None, float, str, date, datetime]) -> Optional[float]:
+    """Epoch seconds from a number, an ISO date/datetime string, or a date/datetime (naive = UTC)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _string_mask(column: "pa.ChunkedArray", predicate: Callable[["pa.Array"], "pa.Array"]) -> "pa.ChunkedArray":
+    """Apply a string predicate; for dictionary columns it runs once per distinct value."""
+    chunks = []
+    for chunk in column.chunks:
+        if pa.types.is_dictionary(chunk.type):
+            chunk = pc.take(predicate(chunk.dictionary), chunk.indices)
+        else:
+            chunk = predicate(chunk)
+        chunks.append(pc.fill_null(chunk, False))
+    return pa.chunked_array(chunks, type=pa.bool_())
+
+
+class PostArchive:
+    """Append-only, date-partitioned archive of harvested posts."""
+
+    def __init__(self, root: str, format: str = "arrow"):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the post archive (pip install pyarrow)")
+        if format not in FORMATS:
+            raise ValueError(f"Unknown archive format: {format} (expected one of {sorted(FORMATS)})")
+        self.root = root
+        self.format = format
+        self._keyword_index: Optional[KeywordIndex] = None
+
+    @staticmethod
+    def _table(batch: PostBatch, harvested_at: float, feed: Optional[str]) -> "pa.Table":
+        """Convert a PostBatch to an Arrow table, keeping interned columns dictionary-encoded."""
+        arrays: Dict[str, pa.Array] = {}
+        for name in FIELDS:
+            column = batch.column(name)
+            if isinstance(column, InternedColumn):
+                indices = pa.array(column.codes, mask=column.codes < 0, type=pa.int32())
+                arrays[name] = pa.DictionaryArray.from_arrays(indices, pa.array(column.categories, type=pa.string()))
+            elif isinstance(column, TextColumn):
+                arrays[name] = pa.array(column.values(), type=pa.string())
+            else:
+                arrays[name] = pa.array(column, mask=column < 0, type=pa.int64())
+
+        activity_ids = batch.activity_ids()
+        posted_at = batch.with_posted_at(harvested_at).column("posted_at")
+        posted_at = np.where(posted_at >= 0, posted_at, urn_timestamps(activity_ids))
+        arrays["activity_id"] = pa.array(activity_ids, mask=activity_ids < 0, type=pa.int64())
+        arrays["posted_at"] = pa.array(posted_at, mask=posted_at < 0, type=pa.int64()).cast(pa.timestamp("s", tz="UTC"))
+        arrays["harvested_at"] = pa.array(np.full(len(batch), int(harvested_at)), type=pa.int64()).cast(pa.timestamp("s", tz="UTC"))
+        arrays["feed"] = pa.array([feed] * len(batch), type=pa.string()).dictionary_encode()
+        return pa.table(arrays)
+
+    def append(self, posts: Posts, harvested_at: Optional[float] = None, feed: Optional[str] = None) -> Optional[str]:
+        """
+        Write one harvest to a new file in its date partition.
+
+        Args:
+            posts: A PostBatch or FetchedPost models
+            harvested_at: Harvest time (epoch seconds); defaults to now
+            feed: Feed or search the posts came from (see high_water_marks.feed_key)
+
+        Returns:
+            Path of the written file, or None if there were no posts
+        """
+        batch = posts if isinstance(posts, PostBatch) else PostBatch.from_posts(posts)
+        if not len(batch):
+            return None
+        harvested_at = time.time() if harvested_at is None else harvested_at
+        table = self._table(batch, harvested_at, feed)
+
+        day = datetime.fromtimestamp(harvested_at, tz=timezone.utc).date().isoformat()
+        directory = os.path.join(self.root, PARTITION_PREFIX + day)
+        os.makedirs(directory, exist_ok=True)
+        name = f"posts-{int(harvested_at * 1000)}-{uuid.uuid4().hex[:8]}{FORMATS[self.format]}"
+        path = os.path.join(directory, name)
+        # Written under a temporary name and renamed, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            if self.format == "arrow":
+                with pa.OSFile(tmp_path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            else:
+                pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Archived {len(batch)} post(s) to {path}")
+        return path
+
+    def files(self, since: Optional[float] = None) -> List[str]:
+        """Archive files in harvest order, skipping partitions harvested before ``since``."""
+        if not os.path.isdir(self.root):
+            return []
+        first_day = None if since is None else datetime.fromtimestamp(since, tz=timezone.utc).date().isoformat()
+        paths = []
+        for partition in sorted(os.listdir(self.root)):
+            if not partition.startswith(PARTITION_PREFIX):
+                continue
+            if first_day is not None and partition[len(PARTITION_PREFIX):] < first_day:
+                continue
+            directory = os.path.join(self.root, partition)
+            paths.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                         if name.endswith(tuple(FORMATS.values())))
+        return paths
+
+    @staticmethod
+    def read_file(path: str) -> "pa.Table":
+        """Read one archive file; Arrow IPC files are memory-mapped (zero-copy)."""
+        if path.endswith(FORMATS["arrow"]):
+            return ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return pq.read_table(path, memory_map=True)
+
+    def keyword_index(self) -> KeywordIndex:
+        """
+        The archive's keyword index, updated with any files not indexed yet.
+
+        Only the post_id and content_text columns of new files are read; the
+        index is saved to <root>/keyword_index.npz when it changes.
+        """
+        if self._keyword_index is None:
+            self._keyword_index = KeywordIndex(os.path.join(self.root, KEYWORD_INDEX_FILE))
+        index = self._keyword_index
+        indexed = set(index.sources)
+        added = False
+        for path in self.files():
+            source = os.path.relpath(path, self.root)
+            if source in indexed:
+                continue
+            table = self.read_file(path)
+            index.add(table["post_id"].to_pylist(), table["content_text"].to_pylist())
+            index.sources.append(source)
+            added = True
+        if added:
+            index.save()
+        return index
+
+    def scan(self, since: Union[None, float, str, date, datetime] = None,
+             until: Union[None, float, str, date, datetime] = None,
+             author: Optional[str] = None, contains: Optional[str] = None, feed: Optional[str] = None,
+             min_likes: Optional[int] = None, min_comments: Optional[int] = None,
+             min_reposts: Optional[int] = None, min_views: Optional[int] = None,
+             keywords: Optional[Sequence[str]] = None, match_all: bool = False,
+             columns: Optional[Sequence[str]] = None) -> "pa.Table":
+        """
+        Query the archive.
+
+        Args:
+            since, until: posted_at range [since, until); epoch seconds, ISO strings or dates (UTC)
+            author: Case-insensitive substring of the author name
+            contains: Case-insensitive substring of the post text
+            feed: Exact feed key the posts were harvested from
+            min_likes, min_comments, min_reposts, min_views: Engagement thresholds
+                (posts with an unknown count do not pass)
+            keywords: Words or phrases (whole words, case-insensitive) looked up
+                in the keyword index; posts must contain any of them, or all
+                of them with ``match_all``
+            columns: Columns to return (default: all)
+
+        Returns:
+            Matching rows as an Arrow table, in harvest order
+        """
+        since, until = _to_timestamp(since), _to_timestamp(until)
+        tables = [self.read_file(path) for path in self.files(since)]
+        table = (pa.concat_tables(tables, promote_options="default") if tables
+                 else self._table(PostBatch.from_records([]), 0, None))
+
+        masks = []
+        if since is not None:
+            masks.append(pc.greater_equal(table["posted_at"], pa.scalar(int(since), pa.timestamp("s", tz="UTC"))))
+        if until is not None:
+            masks.append(pc.less(table["posted_at"], pa.scalar(int(until), pa.timestamp("s", tz="UTC"))))
+        if author:
+            masks.append(_string_mask(table["author_name"], lambda values: pc.match_substring(values, author, ignore_case=True)))
+        if contains:
+            masks.append(_string_mask(table["content_text"], lambda values: pc.match_substring(values, contains, ignore_case=True)))
+        if feed is not None:
+            masks.append(_string_mask(table["feed"], lambda values: pc.equal(values, feed)))
+        if keywords:
+            post_ids = self.keyword_index().search(keywords, match_all)
+            masks.append(pc.is_in(table["post_id"], value_set=pa.array(post_ids, type=pa.string())))
+        for name, threshold in zip(COUNT_FIELDS, (min_likes, min_comments, min_reposts, min_views)):
+            if threshold is not None:
+                masks.append(pc.greater_equal(table[name], threshold))
+        if masks:
+            mask = masks[0]
+            for other in masks[1:]:
+                mask = pc.and_kleene(mask, other)
+            table = table.filter(pc.fill_null(mask, False))
+        return table.select(list(columns)) if columns else table
+
+    def read_posts(self, **filters: Any) -> List[FetchedPost]:
+        """Query the archive (see scan) and return FetchedPost models; rows that do not validate are skipped."""
+        table = self.scan(**filters, columns=FIELDS)
+        # Agent dicts are archived as returned, so validate on the way out
+        # (bulk validation costs about as much as model_construct)
+        return validate_posts(table.to_pylist(), skip_invalid=True)
+
+    def export_parquet(self, path: str, **filters: Any) -> int:
+        """Write the posts matching ``filters`` (see scan) to one Parquet file; returns the row count."""
+        table = self.scan(**filters)
+        pq.write_table(table, path)
+        return table.num_rows
+
+    def stats(self) -> Dict[str, Any]:
+        """Archive size: files, posts, distinct authors, harvest and posted date ranges."""
+        table = self.scan(columns=["author_name", "posted_at", "harvested_at"])
+        if not table.num_rows:
+            return {"files": 0, "posts": 0}
+        authors = pc.count_distinct(table["author_name"].cast(pa.string())).as_py()
+
+        def iso(value):
+            return value.isoformat() if value is not None else None
+
+        return {
+            "files": len(self.files()),
+            "posts": table.num_rows,
+            "authors": authors,
+            "first_harvest": iso(pc.min(table["harvested_at"]).as_py()),
+            "last_harvest": iso(pc.max(table["harvested_at"]).as_py()),
+            "oldest_post": iso(pc.min(table["posted_at"]).as_py()),
+            "newest_post": iso(pc.max(table["posted_at"]).as_py()),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_shared_archive() -> Optional[PostArchive]:
+    """
+    Return the process-wide archive, or None if archiving is off.
+
+    Set POST_ARCHIVE_DIR to enable it (and POST_ARCHIVE_FORMAT=parquet for
+    Parquet instead of Arrow IPC files). Requires pyarrow.
+    """
+    root = os.getenv("POST_ARCHIVE_DIR")
+    if not root:
+        return None
+    if not PYARROW_AVAILABLE:
+        logger.warning("POST_ARCHIVE_DIR is set but pyarrow is not installed; harvests will not be archived")
+        return None
+    return PostArchive(root, os.getenv("POST_ARCHIVE_FORMAT", "arrow"))
+
+
+def _print_table(table: "pa.Table", output: str, limit: Optional[int]) -> None:
+    if limit is not None:
+        table = table.slice(0, limit)
+    rows = table.to_pylist()
+    if output == "ndjson":
+        for row in rows:
+            sys.stdout.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+        return
+    for row in rows:
+        posted = row["posted_at"].strftime("%Y-%m-%d %H:%M") if row["posted_at"] else "?"
+        likes = "-" if row["likes_count"] is None else row["likes_count"]
+        comments = "-" if row["comments_count"] is None else row["comments_count"]
+        text = " ".join((row["content_text"] or "").split())
+        author = (row["author_name"] or "?")[:24]
+        print(f"{posted}  {author:<24} {likes:>7} likes {comments:>5} comments  {text[:70]}")
+    print(f"({len(rows)} post(s))")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query the archive of harvested LinkedIn posts.")
+    parser.add_argument("--root", default=os.getenv("POST_ARCHIVE_DIR", "post_archive"), help="Archive directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(command):
+        command.add_argument("--since", help="Posted on or after (ISO date or datetime, UTC)")
+        command.add_argument("--until", help="Posted before (ISO date or datetime, UTC)")
+        command.add_argument("--author", help="Author name contains (case-insensitive)")
+        command.add_argument("--contains", help="Post text contains (case-insensitive)")
+        command.add_argument("--feed", help="Feed key the posts were harvested from")
+        for name in ("likes", "comments", "reposts", "views"):
+            command.add_argument(f"--min-{name}", type=int)
+        command.add_argument("--keyword", dest="keywords", action="append",
+                             help="Word or phrase to look up in the keyword index (repeatable)")
+        command.add_argument("--all-keywords", dest="match_all", action="store_true",
+                             help="Require every --keyword instead of any")
+
+    query = commands.add_parser("query", help="Print matching posts")
+    add_filters(query)
+    query.add_argument("--output", choices=("table", "ndjson"), default="table")
+    query.add_argument("--limit", type=int)
+    export = commands.add_parser("export", help="Write matching posts to a Parquet file")
+    add_filters(export)
+    export.add_argument("--out", required=True)
+    commands.add_parser("stats", help="Summarise the archive")
+    args = parser.parse_args(argv)
+
+    archive = PostArchive(args.root)
+    if args.command == "stats":
+        print(json.dumps(archive.stats(), indent=2))
+        return
+    filters = {name: getattr(args, name) for name in ("since", "until", "author", "contains", "feed",
+                                                       "min_likes", "min_comments", "min_reposts", "min_views",
+                                                       "keywords", "match_all")}
+    if args.command == "export":
+        print(f"Exported {archive.export_parquet(args.out, **filters)} post(s) to {args.out}")
+    else:
+        _print_table(archive.scan(**filters), args.output, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,516 @@
+"""
+Columnar container for harvested LinkedIn posts.
+
+A PostBatch stores a harvest column by column instead of one pydantic
+object per post:
+
+- counts (likes, comments, reposts, views) are int64 NumPy arrays with
+  MISSING (-1) standing in for None
+- author names, author URLs, headlines and timestamp strings are interned:
+  an int32 code array into a list of distinct values (-1 for None)
+- post ids, post URLs and post text live in one contiguous string buffer
+  per column, addressed by start/end offset arrays
+
+Filtering, taking and sorting only gather the small per-row arrays; the
+string buffers are shared, never copied. JSON and NDJSON are emitted
+column-wise (ASCII-escaped, like json.dumps defaults), escaping each
+distinct interned value once, without building a dict per post. Conversion to and from FetchedPost is lossless.
+
+Given the harvest time, posted_timestamp_str ("2h", "3d", "July 10") is
+normalised into a posted_at column of epoch seconds, parsed once per
+distinct string. A sorted index over it is built on first use, so
+time-window queries are a binary search plus a range slice.
+"""
+
+import re
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Pattern, Sequence, TextIO, Tuple, Union
+
+import numpy as np
+
+from engagement_counts import DEFAULT_LOCALE, parse_counts
+from high_water_marks import activity_id
+from models import FetchedPost, construct_posts, validate_posts
+from post_timestamps import normalize_categories
+
+MISSING = -1
+
+FIELDS = tuple(FetchedPost.model_fields)
+COUNT_FIELDS = ("likes_count", "comments_count", "reposts_count", "views_count")
+INTERNED_FIELDS = ("author_name", "author_url", "author_headline", "posted_timestamp_str")
+TEXT_FIELDS = ("post_id", "post_url", "content_text")
+POSTED_AT = "posted_at"
+
+_SEPARATOR = "\x00"
+
+
+class TextColumn:
+    """
+    Strings stored as [start, end) spans of one shared buffer; start == -1 means None.
+
+    Values are separated by a NUL character, so patterns run over the whole
+    buffer (word boundaries, lookarounds) never see a neighbouring row.
+    """
+
+    __slots__ = ("buffer", "starts", "ends")
+
+    def __init__(self, buffer: str, starts: np.ndarray, ends: np.ndarray):
+        self.buffer = buffer
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def from_values(cls, values: Sequence[Optional[str]]) -> "TextColumn":
+        parts = ["" if value is None else value for value in values]
+        lengths = np.fromiter(map(len, parts), dtype=np.int64, count=len(parts))
+        ends = np.cumsum(lengths + 1) - 1
+        starts = ends - lengths
+        missing = np.fromiter((value is None for value in values), dtype=bool, count=len(parts))
+        starts[missing] = MISSING
+        ends[missing] = MISSING
+        return cls(_SEPARATOR.join(parts), starts, ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        start = self.starts[index]
+        return None if start < 0 else self.buffer[start:self.ends[index]]
+
+    def values(self) -> List[Optional[str]]:
+        buffer = self.buffer
+        return [None if start < 0 else buffer[start:end] for start, end in zip(self.starts.tolist(), self.ends.tolist())]
+
+    def take(self, indices: np.ndarray) -> "TextColumn":
+        return TextColumn(self.buffer, self.starts[indices], self.ends[indices])
+
+    def contains(self, needle: str, case_sensitive: bool = False) -> np.ndarray:
+        """Boolean mask of rows whose text contains ``needle``, from one scan of the buffer."""
+        if not needle:
+            return self.starts >= 0
+        return self.rows_matching(re.compile(re.escape(needle), 0 if case_sensitive else re.IGNORECASE))
+
+    def rows_matching(self, pattern: Pattern) -> np.ndarray:
+        """
+        Boolean mask of rows containing a match of ``pattern``.
+
+        The buffer (compacted first if mostly unused) is scanned once and
+        match positions are mapped to rows with a binary search over the
+        span starts. Matches of an empty
+        pattern, or matches spanning two rows, do not count.
+        """
+        column = self.compacted()
+        matches = [(m.start(), m.end()) for m in pattern.finditer(column.buffer) if m.end() > m.start()]
+        return column.rows_containing(matches)
+
+    def compacted(self) -> "TextColumn":
+        """
+        This column, or a copy holding only its own values when most of the
+        shared buffer belongs to other rows (e.g. after a selective take), so
+        whole-buffer scans read only this column's text.
+        """
+        present = self.starts >= 0
+        used = int((self.ends[present] - self.starts[present]).sum()) + len(self)
+        return self if 2 * used >= len(self.buffer) else TextColumn.from_values(self.values())
+
+    def rows_containing(self, spans: Sequence[Tuple[int, int]]) -> np.ndarray:
+        """Boolean mask of rows containing any of the [start, end) buffer spans; spans across rows do not count."""
+        mask = np.zeros(len(self), dtype=bool)
+        if not len(spans):
+            return mask
+        positions, match_ends = np.asarray(spans, dtype=np.int64).reshape(-1, 2).T
+
+        # Rows may share a span after take(); resolve each distinct span once
+        present = self.starts >= 0
+        span_starts, inverse = np.unique(self.starts[present], return_inverse=True)
+        span_ends = np.zeros_like(span_starts)
+        span_ends[inverse] = self.ends[present]
+        owner = np.searchsorted(span_starts, positions, side="right") - 1
+        valid = owner >= 0
+        owner, match_ends = owner[valid], match_ends[valid]
+        inside = match_ends <= span_ends[owner]
+        hit = np.zeros(len(span_starts), dtype=bool)
+        hit[owner[inside]] = True
+        mask[present] = hit[inverse]
+        return mask
+
+    def json_values(self) -> List[str]:
+        """JSON-encode every value (None as null)."""
+        return ["null" if value is None else encode_basestring_ascii(value) for value in self.values()]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.starts.nbytes + self.ends.nbytes
+
+
+class InternedColumn:
+    """Repeated strings stored as int32 codes into a list of distinct values; -1 means None."""
+
+    __slots__ = ("codes", "categories", "_lookup")
+
+    def __init__(self, codes: np.ndarray, categories: List[str], lookup: Optional[Dict[str, int]] = None):
+        self.codes = codes
+        self.categories = categories
+        # value -> code (built on first use when not given); shared with columns taken from this one
+        self._lookup = lookup
+
+    @classmethod
+    def from_values(cls, values: Iterable[Optional[str]]) -> "InternedColumn":
+        lookup: Dict[str, int] = {}
+        codes = [MISSING if value is None else lookup.setdefault(value, len(lookup)) for value in values]
+        return cls(np.array(codes, dtype=np.int32), list(lookup), lookup)
+
+    def code(self, value: str) -> int:
+        """Code of ``value``, or MISSING if no row has it."""
+        if self._lookup is None:
+            self._lookup = {category: code for code, category in enumerate(self.categories)}
+        return self._lookup.get(value, MISSING)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return None if code < 0 else self.categories[code]
+
+    def values(self) -> List[Optional[str]]:
+        # Index -1 lands on the trailing None
+        table = self.categories + [None]
+        return [table[code] for code in self.codes.tolist()]
+
+    def take(self, indices: np.ndarray) -> "InternedColumn":
+        return InternedColumn(self.codes[indices], self.categories, self._lookup)
+
+    def equals(self, value: Optional[str]) -> np.ndarray:
+        """Boolean mask of rows equal to ``value``; one dictionary lookup, one array comparison."""
+        if value is None:
+            return self.codes < 0
+        code = self.code(value)
+        if code == MISSING:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+
+    def sort_keys(self) -> np.ndarray:
+        """Per-row rank of the value in sorted order, for argsort."""
+        order = sorted(range(len(self.categories)), key=self.categories.__getitem__)
+        rank = np.empty(len(self.categories) + 1, dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        rank[-1] = MISSING
+        return rank[self.codes]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + sum(len(value) for value in self.categories)
+
+
+Column = Union[np.ndarray, TextColumn, InternedColumn]
+
+
+class PostBatch:
+    """
+    A harvest of posts stored column-wise.
+
+    Build one with from_posts() or from_records(); get posts back with
+    to_posts(), indexing or iteration. Vectorised operations (filter, take,
+    sort_by) return new batches that share the string buffers.
+
+    The derived posted_at column (epoch seconds, MISSING when unknown) is
+    available through column("posted_at") like a count column, but is not
+    part of the FetchedPost records or the JSON output.
+    """
+
+    def __init__(self, columns: Mapping[str, Column], activity_ids: Optional[np.ndarray] = None,
+                 posted_at: Optional[np.ndarray] = None):
+        missing = set(FIELDS) - set(columns)
+        if missing:
+            raise ValueError(f"PostBatch is missing columns: {sorted(missing)}")
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("PostBatch columns must all have the same length")
+        self._columns: Dict[str, Column] = {name: columns[name] for name in FIELDS}
+        self._length = lengths.pop() if lengths else 0
+        if activity_ids is None:
+            activity_ids = np.fromiter(map(_activity_id, self._columns["post_id"].values()),
+                                       dtype=np.int64, count=self._length)
+        self._activity_ids = activity_ids
+        if posted_at is None:
+            posted_at = np.full(self._length, MISSING, dtype=np.int64)
+        self._posted_at = posted_at
+        self._posted_index: Optional[tuple] = None
+
+    @classmethod
+    def from_records(cls, records: Sequence[Mapping[str, Any]], harvested_at: Optional[float] = None,
+                     count_locale: str = DEFAULT_LOCALE) -> "PostBatch":
+        """
+        Build a batch from post dicts (e.g. FetchedPost.model_dump() output) without validation.
+
+        Missing keys become None. URLs are stored as given. Counts scraped as
+        text ("1.2K", "12 comments") are parsed per column in ``count_locale``;
+        unparseable ones become None. If ``harvested_at`` (epoch seconds) is
+        given, posted_at is normalised from the timestamp strings.
+
+        Raises:
+            ValueError: If a count is negative
+        """
+        columns: Dict[str, Column] = {}
+        for name in TEXT_FIELDS:
+            columns[name] = TextColumn.from_values([_as_str(record.get(name)) for record in records])
+        for name in INTERNED_FIELDS:
+            columns[name] = InternedColumn.from_values(_as_str(record.get(name)) for record in records)
+        for name in COUNT_FIELDS:
+            values = [record.get(name) for record in records]
+            if any(isinstance(value, str) for value in values):
+                parsed = parse_counts(values, count_locale).tolist()
+                values = [(None if count < 0 else count) if isinstance(value, str) else value
+                          for value, count in zip(values, parsed)]
+            counts = np.array([MISSING if value is None else value for value in values], dtype=np.int64)
+            if (counts[np.fromiter((value is not None for value in values), dtype=bool, count=len(values))] < 0).any():
+                raise ValueError(f"{name} must not be negative")
+            columns[name] = counts
+        batch = cls(columns)
+        return batch if harvested_at is None else batch.with_posted_at(harvested_at)
+
+    @classmethod
+    def from_posts(cls, posts: Sequence[FetchedPost], harvested_at: Optional[float] = None) -> "PostBatch":
+        """Build a batch from FetchedPost models (see from_records for ``harvested_at``)."""
+        return cls.from_records([post.__dict__ for post in posts], harvested_at)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, name: str) -> Column:
+        """Return a column: an int64 array for counts and posted_at, otherwise a TextColumn or InternedColumn."""
+        if name == POSTED_AT:
+            return self._posted_at
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"Unknown PostBatch column: {name}")
+
+    def value(self, name: str, index: int) -> Any:
+        column = self.column(name)
+        if isinstance(column, np.ndarray):
+            count = int(column[index])
+            return None if count < 0 else count
+        return column[index]
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Return one post as a plain dict (FetchedPost field order, None for missing)."""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PostBatch index out of range")
+        return {name: self.value(name, index) for name in FIELDS}
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[FetchedPost, "PostBatch"]:
+        if isinstance(index, slice):
+            return self.take(np.arange(self._length)[index])
+        return FetchedPost(**self.record(index))
+
+    def __iter__(self) -> Iterator[FetchedPost]:
+        return iter(self.to_posts())
+
+    def columns_as_lists(self) -> Dict[str, List[Any]]:
+        """Return every column as a Python list (None for missing values)."""
+        lists = {}
+        for name, column in self._columns.items():
+            if isinstance(column, np.ndarray):
+                lists[name] = [None if count < 0 else count for count in column.tolist()]
+            else:
+                lists[name] = column.values()
+        return lists
+
+    def to_posts(self, validate: bool = True) -> List[FetchedPost]:
+        """
+        Materialise FetchedPost models.
+
+        Args:
+            validate: Validate in bulk like freshly harvested posts. Pass False
+                for batches built from already-validated posts to use the
+                trusted construct_posts path (URL fields stay strings).
+        """
+        lists = self.columns_as_lists()
+        records = [dict(zip(FIELDS, row)) for row in zip(*(lists[name] for name in FIELDS))]
+        return validate_posts(records) if validate else construct_posts(records)
+
+    def take(self, indices: Union[Sequence[int], np.ndarray]) -> "PostBatch":
+        """Return a batch with the given rows, in the given order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        return PostBatch({
+            name: column[indices] if isinstance(column, np.ndarray) else column.take(indices)
+            for name, column in self._columns.items()
+        }, self._activity_ids[indices], self._posted_at[indices])
+
+    def filter(self, mask: Union[Sequence[bool], np.ndarray]) -> "PostBatch":
+        """Return the rows where ``mask`` is True."""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self._length,):
+            raise ValueError(f"Filter mask must have shape ({self._length},)")
+        return self.take(np.flatnonzero(mask))
+
+    def argsort(self, name: str, descending: bool = False) -> np.ndarray:
+        """
+        Return the row order sorting by a column; missing values always sort last.
+
+        The sort is stable, so ties keep their harvest order.
+        """
+        column = self.column(name)
+        if isinstance(column, np.ndarray):
+            keys = column
+        elif isinstance(column, InternedColumn):
+            keys = column.sort_keys()
+        else:
+            values = column.values()
+            ranked = sorted(range(len(values)), key=lambda i: (values[i] is None, values[i] or ""))
+            keys = np.empty(len(values), dtype=np.int64)
+            keys[ranked] = np.arange(len(values))
+            keys[[value is None for value in values]] = MISSING
+        missing = keys < 0
+        keys = -keys if descending else keys.copy()
+        order = np.lexsort((keys, missing))
+        return order
+
+    def sort_by(self, name: str, descending: bool = False) -> "PostBatch":
+        """Return the batch sorted by a column (see argsort)."""
+        return self.take(self.argsort(name, descending))
+
+    def contains(self, needle: str, name: str = "content_text", case_sensitive: bool = False) -> np.ndarray:
+        """Boolean mask of rows whose text column contains ``needle``."""
+        column = self.column(name)
+        if isinstance(column, TextColumn):
+            return column.contains(needle, case_sensitive)
+        if isinstance(column, InternedColumn):
+            flags = [needle in value if case_sensitive else needle.lower() in value.lower() for value in column.categories]
+            return np.append(np.array(flags, dtype=bool), False)[column.codes]
+        raise TypeError(f"Column {name} is not a text column")
+
+    def activity_ids(self) -> np.ndarray:
+        """
+        Numeric ids of the posts' LinkedIn URNs (see high_water_marks.activity_id), MISSING where a post id has none.
+
+        Parsed once when the batch is built and carried through take/filter/sort.
+        """
+        return self._activity_ids
+
+    def with_posted_at(self, harvested_at: float) -> "PostBatch":
+        """
+        Return the batch with posted_at normalised from posted_timestamp_str.
+
+        Each distinct timestamp string is parsed once (the column is already
+        interned); rows are filled with one gather. Columns are shared.
+
+        Args:
+            harvested_at: Epoch seconds when these posts were harvested
+        """
+        timestamps = self._columns["posted_timestamp_str"]
+        posted_at = normalize_categories(timestamps.categories, timestamps.codes, harvested_at)
+        return PostBatch(self._columns, self._activity_ids, posted_at)
+
+    def posted_index(self) -> tuple:
+        """
+        Return the sorted posted_at index as (sorted timestamps, row order).
+
+        Rows with an unknown posted_at are left out. Built on first use and
+        kept for the life of the batch (batches are immutable).
+        """
+        if self._posted_index is None:
+            rows = np.flatnonzero(self._posted_at >= 0)
+            order = rows[np.argsort(self._posted_at[rows], kind="stable")]
+            self._posted_index = (self._posted_at[order], order)
+        return self._posted_index
+
+    def rows_posted_between(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """
+        Row indices with start <= posted_at < end, oldest first.
+
+        A range scan over the sorted index: two binary searches and a slice.
+        Either bound may be None for an open-ended window.
+        """
+        timestamps, order = self.posted_index()
+        low = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+        high = len(timestamps) if end is None else np.searchsorted(timestamps, end, side="left")
+        return order[low:high]
+
+    def posted_between(self, start: Optional[float] = None, end: Optional[float] = None) -> "PostBatch":
+        """Return the posts with start <= posted_at < end, oldest first."""
+        return self.take(self.rows_posted_between(start, end))
+
+    @classmethod
+    def concat(cls, batches: Sequence["PostBatch"]) -> "PostBatch":
+        """Concatenate batches into one, rebasing buffers and merging interned values."""
+        if not batches:
+            return cls.from_records([])
+        columns: Dict[str, Column] = {}
+        for name in FIELDS:
+            parts = [batch._columns[name] for batch in batches]
+            if isinstance(parts[0], np.ndarray):
+                columns[name] = np.concatenate(parts)
+            elif isinstance(parts[0], TextColumn):
+                buffers, starts, ends, offset = [], [], [], 0
+                for part in parts:
+                    shift = np.where(part.starts >= 0, offset, 0)
+                    starts.append(part.starts + shift)
+                    ends.append(part.ends + shift)
+                    buffers.append(part.buffer)
+                    offset += len(part.buffer) + len(_SEPARATOR)
+                columns[name] = TextColumn(_SEPARATOR.join(buffers), np.concatenate(starts), np.concatenate(ends))
+            else:
+                lookup: Dict[str, int] = {}
+                codes = []
+                for part in parts:
+                    remap = np.array([lookup.setdefault(value, len(lookup)) for value in part.categories] + [MISSING],
+                                     dtype=np.int32)
+                    codes.append(remap[part.codes])
+                columns[name] = InternedColumn(np.concatenate(codes), list(lookup), lookup)
+        return cls(columns, np.concatenate([batch._activity_ids for batch in batches]),
+                   np.concatenate([batch._posted_at for batch in batches]))
+
+    def _encoded_columns(self) -> List[List[str]]:
+        """JSON-encode each column; interned values are escaped once per distinct value."""
+        encoded = []
+        for name in FIELDS:
+            column = self._columns[name]
+            if isinstance(column, np.ndarray):
+                encoded.append(["null" if count < 0 else str(count) for count in column.tolist()])
+            elif isinstance(column, InternedColumn):
+                table = [encode_basestring_ascii(value) for value in column.categories] + ["null"]
+                encoded.append([table[code] for code in column.codes.tolist()])
+            else:
+                encoded.append(column.json_values())
+        return encoded
+
+    def iter_ndjson(self) -> Iterator[str]:
+        """Yield one JSON object per post, matching FetchedPost.model_dump(mode="json")."""
+        template = "{{" + ",".join(f'"{name}":{{}}' for name in FIELDS) + "}}"
+        return map(template.format, *self._encoded_columns())
+
+    def to_ndjson(self) -> str:
+        """Return the batch as newline-delimited JSON."""
+        return "".join(line + "\n" for line in self.iter_ndjson())
+
+    def write_ndjson(self, stream: TextIO) -> int:
+        """Write the batch as NDJSON to a text stream; returns the number of posts written."""
+        count = 0
+        for line in self.iter_ndjson():
+            stream.write(line)
+            stream.write("\n")
+            count += 1
+        return count
+
+    def to_json(self) -> str:
+        """Return the batch as a JSON array of post objects."""
+        return "[" + ",".join(self.iter_ndjson()) + "]"
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns (string buffers counted as one byte per character)."""
+        return sum(column.nbytes for column in self._columns.values())
+
+
+def _as_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _activity_id(post_id: Optional[str]) -> int:
+    number = activity_id(post_id)
+    return MISSING if number is None else number
@@ -0,0 +1,250 @@
+"""
+Engagement ranking: pick the best posts of a harvest to engage with.
+
+settings.yaml caps engagement at ``post_limit`` posts; the ``ranking``
+section says which ones. Each post gets a weighted score, with the
+w_* weights taken from ranking.weights:
+
+    w_likes    * log1p(likes)
+  + w_comments * log1p(comments)
+  + w_reposts  * log1p(reposts)
+  + w_recency  * 0.5 ** (age_hours / recency_half_life_hours)
+  + w_author   * (1 if the author is one of preferred_authors else 0)
+
+Counts are log-scaled so one viral post does not drown every other
+signal; unknown counts score 0. Rendered counts ("1.2K", "3 comments")
+are parsed as PostBatch parses them, so score() and scores() agree. The age comes from posted_timestamp_str
+("2h", "3d") or, failing that, the creation time encoded in the activity
+id; posts of unknown age get no recency score.
+
+top_k() keeps the K best posts of any iterable (e.g. a generator over a
+wide harvest) in a bounded min-heap: O(n log K) time and O(K) memory.
+top_k_batch() ranks a PostBatch already in memory with vectorised scores
+and a partial sort. Harvester(rank=True) ranks fetched posts with the
+shared ranker.
+"""
+
+import heapq
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Generic, Iterable, List, Mapping, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from engagement_counts import parse_count
+from high_water_marks import activity_id, urn_timestamp, urn_timestamps
+from post_batch import COUNT_FIELDS, MISSING, PostBatch
+from post_timestamps import parse_timestamp
+
+WEIGHTS = ("likes", "comments", "reposts", "recency", "author")
+
+T = TypeVar("T")
+
+
+def _author_key(value: Optional[str]) -> str:
+    return (value or "").strip().rstrip("/").lower()
+
+
+def _count(value: Any) -> int:
+    """One engagement count as PostBatch reads it: numbers pass through, text is parsed, None is MISSING."""
+    if isinstance(value, str):
+        value = parse_count(value)
+    return MISSING if value is None else int(value)
+
+
+@dataclass(frozen=True)
+class RankingConfig:
+    """Score weights and the number of posts to keep, as in config/settings.yaml."""
+    likes: float = 1.0
+    comments: float = 2.0
+    reposts: float = 1.5
+    recency: float = 2.0
+    author: float = 2.0
+    recency_half_life_hours: float = 24.0
+    preferred_authors: Tuple[str, ...] = ()
+    post_limit: int = 5
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> "RankingConfig":
+        """
+        Build the config from a parsed settings document (top-level post_limit plus a ranking section).
+
+        Raises:
+            ValueError: If a weight is not a number, or the half-life or post_limit is not positive
+        """
+        ranking = settings.get("ranking") or {}
+        if not isinstance(ranking, Mapping):
+            raise ValueError("Setting 'ranking' must be a mapping")
+        weights = ranking.get("weights") or {}
+        unknown = set(weights) - set(WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown ranking weights: {sorted(unknown)} (expected {list(WEIGHTS)})")
+        values: dict = {}
+        for name, weight in weights.items():
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                raise ValueError(f"Ranking weight '{name}' must be a number")
+            values[name] = float(weight)
+        half_life = ranking.get("recency_half_life_hours", cls.recency_half_life_hours)
+        post_limit = settings.get("post_limit", cls.post_limit)
+        if not isinstance(half_life, (int, float)) or half_life <= 0:
+            raise ValueError("Setting 'recency_half_life_hours' must be a positive number")
+        if isinstance(post_limit, bool) or not isinstance(post_limit, int) or post_limit <= 0:
+            raise ValueError("Setting 'post_limit' must be a positive integer")
+        authors = ranking.get("preferred_authors") or []
+        return cls(**values, recency_half_life_hours=float(half_life), post_limit=post_limit,
+                   preferred_authors=tuple(str(author) for author in authors))
+
+
+class TopK(Generic[T]):
+    """
+    The ``k`` highest-scoring items pushed so far, kept in a bounded min-heap.
+
+    The heap root is the weakest kept item, so each push is one comparison
+    and, when the item makes the cut, one O(log k) replacement. Ties keep
+    the item pushed first.
+    """
+
+    def __init__(self, k: int):
+        if k < 0:
+            raise ValueError("k must not be negative")
+        self.k = k
+        self._heap: List[Tuple[float, int, T]] = []
+        self._pushed = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, score: float, item: T) -> bool:
+        """Offer an item; returns whether it is (for now) among the top k."""
+        # Negated arrival order: on equal scores the later item is the smaller entry, so it goes first
+        entry = (score, -self._pushed, item)
+        self._pushed += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if self.k and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    @property
+    def threshold(self) -> Optional[float]:
+        """Score an item must beat to get in once the heap is full (None until then)."""
+        return self._heap[0][0] if self.k and len(self._heap) == self.k else None
+
+    def items(self) -> List[Tuple[float, T]]:
+        """Kept (score, item) pairs, best first."""
+        return [(score, item) for score, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+class PostRanker:
+    """
+    Scores posts with a RankingConfig.
+
+    Args:
+        config: Weights and limits
+        now: Reference time for ages and relative timestamps (epoch seconds);
+            defaults to the time of each call
+    """
+
+    def __init__(self, config: Optional[RankingConfig] = None, now: Optional[float] = None):
+        self.config = config or RankingConfig()
+        self.now = now
+        self._preferred = frozenset(map(_author_key, self.config.preferred_authors))
+        self._decay = math.log(2) / (self.config.recency_half_life_hours * 3600)
+
+    def _now(self) -> float:
+        return time.time() if self.now is None else self.now
+
+    def score(self, post: Any, now: Optional[float] = None) -> float:
+        """Score one post (FetchedPost model or post dict)."""
+        record = post if isinstance(post, dict) else post.__dict__
+        config = self.config
+        now = self._now() if now is None else now
+        score = 0.0
+        for weight, name in zip((config.likes, config.comments, config.reposts), COUNT_FIELDS):
+            if weight:
+                count = _count(record.get(name))
+                if count > 0:
+                    score += weight * math.log1p(count)
+        if config.recency:
+            posted_at = parse_timestamp(record.get("posted_timestamp_str"), now)
+            if posted_at == MISSING:
+                number = activity_id(record.get("post_id"))
+                posted_at = MISSING if number is None else int(urn_timestamp(number))
+            if posted_at != MISSING:
+                score += config.recency * math.exp(-self._decay * max(now - posted_at, 0.0))
+        if config.author and self._preferred and (
+                _author_key(record.get("author_name")) in self._preferred
+                or _author_key(str(record.get("author_url") or "")) in self._preferred):
+            score += config.author
+        return score
+
+    def scores(self, batch: PostBatch, now: Optional[float] = None) -> np.ndarray:
+        """Score every post of a batch at once (same formula as score())."""
+        config = self.config
+        now = self._now() if now is None else now
+        scores = np.zeros(len(batch), dtype=np.float64)
+        for weight, name in zip((config.likes, config.comments, config.reposts), COUNT_FIELDS):
+            if weight:
+                scores += weight * np.log1p(np.maximum(batch.column(name), 0))
+        if config.recency:
+            posted_at = batch.with_posted_at(now).column("posted_at")
+            posted_at = np.where(posted_at >= 0, posted_at, urn_timestamps(batch.activity_ids()))
+            known = posted_at >= 0
+            ages = np.maximum(now - posted_at[known], 0.0)
+            scores[known] += config.recency * np.exp(-self._decay * ages)
+        if config.author and self._preferred:
+            scores += config.author * (self._preferred_mask(batch, "author_name")
+                                       | self._preferred_mask(batch, "author_url"))
+        return scores
+
+    def _preferred_mask(self, batch: PostBatch, name: str) -> np.ndarray:
+        """Rows of an interned author column naming a preferred author; one lookup per distinct value."""
+        column = batch.column(name)
+        flags = np.fromiter((_author_key(value) in self._preferred for value in column.categories),
+                            dtype=bool, count=len(column.categories))
+        # Code -1 (missing) lands on the trailing False
+        return np.append(flags, False)[column.codes]
+
+    def top_k(self, posts: Iterable[T], k: Optional[int] = None) -> List[Tuple[float, T]]:
+        """
+        Best ``k`` posts (default: post_limit) of any iterable, as (score, post), best first.
+
+        Holds at most k posts at a time, so ``posts`` can be a generator over
+        a harvest too large to keep in memory.
+        """
+        now = self._now()
+        best: TopK[T] = TopK(self.config.post_limit if k is None else k)
+        for post in posts:
+            best.push(self.score(post, now), post)
+        return best.items()
+
+    def top_k_batch(self, batch: PostBatch, k: Optional[int] = None) -> PostBatch:
+        """Best ``k`` posts (default: post_limit) of a batch, best first; ties keep harvest order."""
+        k = min(self.config.post_limit if k is None else k, len(batch))
+        if k <= 0:
+            return batch.take(np.empty(0, dtype=np.int64))
+        scores = self.scores(batch)
+        # Partial sort to the k best, then order just those (stable: earlier rows win ties)
+        candidates = np.argpartition(-scores, k - 1)[:k] if k < len(batch) else np.arange(len(batch))
+        cutoff = scores[candidates].min()
+        candidates = np.flatnonzero(scores >= cutoff)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+        return batch.take(order)
+
+
+@lru_cache(maxsize=1)
+def _ranker_for(config: RankingConfig) -> PostRanker:
+    return PostRanker(config)
+
+
+def get_shared_ranker() -> PostRanker:
+    """
+    Return the process-wide ranker for the ranking settings of the current
+    configuration (app_config.get_config()), rebuilt when they change.
+    """
+    from app_config import get_config  # app_config imports this module
+    return _ranker_for(get_config().ranking)
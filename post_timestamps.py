@@ -0,0 +1,139 @@
+"""
+Normalisation of LinkedIn's relative post timestamps.
+
+FetchedPost.posted_timestamp_str holds what the feed shows: "2h", "3d",
+"1w", "2mo", "1yr", "5 hours ago", "Just now", "July 10" or "Jul 10, 2023",
+often with a trailing "• Edited". normalize_timestamps() converts a whole
+batch into epoch seconds relative to the harvest time:
+
+- the batch is reduced to its distinct strings with np.unique (a harvest
+  of thousands of posts typically has a few dozen distinct values)
+- each distinct string is parsed once through a memoised token table that
+  is independent of the harvest time
+- the parsed offsets are broadcast back to every row in one array step
+
+Relative tokens resolve to ``harvested_at - offset``; absolute dates
+resolve to midnight UTC, with a missing year taken as the most recent
+occurrence not after the harvest. Unparseable or missing values become
+MISSING (-1).
+"""
+
+import calendar
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+MISSING = -1
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+UNIT_SECONDS = {
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "m": MINUTE, "min": MINUTE, "mins": MINUTE, "minute": MINUTE, "minutes": MINUTE,
+    "h": HOUR, "hr": HOUR, "hrs": HOUR, "hour": HOUR, "hours": HOUR,
+    "d": DAY, "day": DAY, "days": DAY,
+    "w": 7 * DAY, "wk": 7 * DAY, "wks": 7 * DAY, "week": 7 * DAY, "weeks": 7 * DAY,
+    "mo": 30 * DAY, "mos": 30 * DAY, "month": 30 * DAY, "months": 30 * DAY,
+    "y": 365 * DAY, "yr": 365 * DAY, "yrs": 365 * DAY, "year": 365 * DAY, "years": 365 * DAY,
+}
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+
+_DECORATION = re.compile(r"\s*(?:[•·|]\s*)?(?:edited)?\s*[•·]?\s*$|^\s*(?:posted\s+)?", re.IGNORECASE)
+_RELATIVE = re.compile(r"^(\d+)\s*([a-z]+)(?:\s+ago)?$")
+_ABSOLUTE = re.compile(r"^([a-z]+)\.?\s+(\d{1,2})(?:,?\s+(\d{4}))?$")
+_NOW = frozenset({"now", "just now", "moments ago", "a moment ago"})
+
+# Parsed token: ("relative", seconds) or ("absolute", month, day, year or None)
+Token = Tuple
+
+
+@lru_cache(maxsize=4096)
+def parse_token(text: str) -> Optional[Token]:
+    """
+    Parse one timestamp string into a harvest-independent token.
+
+    Returns:
+        ("relative", seconds_ago), ("absolute", month, day, year_or_None),
+        or None if the string is not a recognised timestamp
+    """
+    text = _DECORATION.sub("", text.strip().lower()).strip()
+    if not text:
+        return None
+    if text in _NOW:
+        return ("relative", 0)
+
+    relative = _RELATIVE.match(text)
+    if relative:
+        unit = UNIT_SECONDS.get(relative.group(2))
+        return ("relative", int(relative.group(1)) * unit) if unit else None
+
+    absolute = _ABSOLUTE.match(text)
+    if absolute:
+        month = MONTHS.get(absolute.group(1))
+        day = int(absolute.group(2))
+        year = int(absolute.group(3)) if absolute.group(3) else None
+        if month and 1 <= day <= calendar.monthrange(year or 2000, month)[1]:
+            return ("absolute", month, day, year)
+    return None
+
+
+def resolve_token(token: Optional[Token], harvested_at: float) -> int:
+    """Turn a parsed token into epoch seconds for a harvest at ``harvested_at``."""
+    if token is None:
+        return MISSING
+    if token[0] == "relative":
+        return int(harvested_at) - token[1]
+
+    _, month, day, year = token
+    harvest = datetime.fromtimestamp(harvested_at, tz=timezone.utc)
+    if year is None:
+        year = harvest.year
+        if (month, day) > (harvest.month, harvest.day):
+            year -= 1
+        if month == 2 and day == 29 and not calendar.isleap(year):
+            # Feb 29 without a year: the most recent leap year not after the harvest
+            while not calendar.isleap(year):
+                year -= 1
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp())
+
+
+def parse_timestamp(text: Optional[str], harvested_at: float) -> int:
+    """Convert one timestamp string to epoch seconds, or MISSING."""
+    return MISSING if text is None else resolve_token(parse_token(text), harvested_at)
+
+
+def normalize_categories(categories: Sequence[str], codes: np.ndarray, harvested_at: float) -> np.ndarray:
+    """
+    Normalise an interned string column (distinct values plus int codes, -1 for None).
+
+    Each distinct value is parsed once; rows are filled with one gather.
+    """
+    table = np.fromiter((parse_timestamp(value, harvested_at) for value in categories),
+                        dtype=np.int64, count=len(categories))
+    return np.append(table, MISSING)[codes]
+
+
+def normalize_timestamps(values: Sequence[Optional[str]], harvested_at: float) -> np.ndarray:
+    """
+    Convert a batch of timestamp strings into epoch seconds.
+
+    Args:
+        values: posted_timestamp_str values (None allowed)
+        harvested_at: Epoch seconds when the posts were harvested
+
+    Returns:
+        int64 array of epoch seconds, MISSING where a value is missing or unparseable
+    """
+    if not len(values):
+        return np.empty(0, dtype=np.int64)
+    strings = np.array(["" if value is None else value for value in values], dtype=str)
+    distinct, codes = np.unique(strings, return_inverse=True)
+    return normalize_categories(distinct.tolist(), codes.reshape(-1), harvested_at)
@@ -1,7 +1,8 @@
-import re
 import json
+import logging
 import os
-from typing import Dict, List, Optional
+import asyncio
+from typing import Dict, List, Optional, Tuple
 from functools import lru_cache
 
 try:
@@ -10,6 +11,26 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+try:
+    from intent_classifier import get_default_classifier
+    LOCAL_CLASSIFIER_AVAILABLE = True
+except ImportError:
+    LOCAL_CLASSIFIER_AVAILABLE = False
+
+try:
+    from semantic_cache import get_shared_semantic_cache
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+from intent_registry import IntentRegistry, IntentSpec, build_default_registry
+from llm_clients import get_async_openai_client
+from llm_guard import LLMGuard, get_circuit_breaker, local_wait, remaining_budget
+from parameter_extraction import extract_keywords, scan_parameters
+from rate_limiter import estimate_tokens, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
 class PromptTemplateEngine:
     """
     A class to manage and render prompt templates for LinkedIn actions.
@@ -28,33 +49,31 @@ class PromptTemplateEngine:
     INTENT_FEED_COLLECTION = "feed_collection"
     INTENT_UNKNOWN = "unknown"
     
-    # Intent keywords mapping
-    INTENT_KEYWORDS = {
-        INTENT_POST_ENGAGEMENT: ['like', 'react', 'appreciate', 'love', 'thumbs up', 'approval'],
-        INTENT_COMMENT_POST: ['comment', 'reply', 'respond', 'add thoughts'],
-        INTENT_CONNECT_FOLLOW: ['connect', 'follow', 'add'],
-        INTENT_MESSAGE: ['message', 'send', 'dm', 'inmail'],
-        INTENT_SEARCH_CONTENT: ['search', 'find', 'discover', 'look for'],
-        INTENT_VISIT_PROFILE: ['profile', 'visit', 'open', 'view'],
-        INTENT_CREATE_POST: ['post', 'create', 'publish', 'share', 'write'],
-        INTENT_DATA_EXTRACT: ['extract', 'export', 'data', 'gather', 'collect data'],
-        INTENT_FEED_COLLECTION: ['scroll', 'feed', 'collect posts', 'browse']
-    }
+    # Intent names, keywords, renderers and parameter schemas; subclasses get
+    # their own copy so register_intent() never leaks into the parent class
+    INTENT_REGISTRY: IntentRegistry = build_default_registry()
+    
+    # Read-only intent -> keywords view, kept for existing callers
+    INTENT_KEYWORDS = INTENT_REGISTRY.keywords
     
     # LLM Configuration
     DEFAULT_MODEL = "gpt-4o-mini"
+    
+    # Local classifier predictions at or above this probability (and agreeing
+    # with keyword matching) are answered without an LLM round trip
+    LOCAL_CLASSIFIER_THRESHOLD = 0.8
+    
+    # Seconds to wait for an LLM answer before using the keyword/regex result;
+    # the LLM call still completes in the background and warms the caches
+    LLM_LATENCY_BUDGET = 1.5
+    
+    # Longest an unbudgeted LLM call waits for shared rate limit capacity before failing
+    # over; calls under the latency budget wait at most what is left of it
+    RATE_LIMIT_TIMEOUT = 60.0
     INTENT_CLASSIFICATION_PROMPT = """
 Classify this LinkedIn automation request into one of these intents:
 
-- post_engagement: liking, reacting to posts, showing appreciation
-- comment_post: commenting, replying to posts, adding thoughts
-- create_post: writing, publishing, sharing new content
-- search_content: finding, discovering posts/profiles/content
-- connect_follow: connecting with people, following users
-- message: sending DMs, InMail, private messages
-- visit_profile: viewing, opening someone's profile
-- data_extract: exporting, collecting, gathering data
-- feed_collection: scrolling, browsing feed, collecting posts
+{intents}
 
 User request: "{prompt}"
 
@@ -78,13 +97,57 @@ User request: "{prompt}"
 Respond with valid JSON only.
 """
     
-    def __init__(self, use_llm: bool = False, openai_api_key: Optional[str] = None, model: str = None):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.INTENT_REGISTRY = cls.INTENT_REGISTRY.copy()
+        cls.INTENT_KEYWORDS = cls.INTENT_REGISTRY.keywords
+    
+    @classmethod
+    def register_intent(cls, spec: IntentSpec, replace: bool = False) -> IntentSpec:
+        """
+        Register an additional intent for this engine class.
+        
+        Lookup tables are rebuilt once here, so detection and rendering cost
+        does not grow with per-call reflection.
+        
+        Args:
+            spec: Intent name, keywords, description, renderer and schema
+            replace: Allow overriding an existing intent of the same name
+            
+        Returns:
+            The registered spec
+        """
+        registered = cls.INTENT_REGISTRY.register(spec, replace=replace)
+        cls.INTENT_KEYWORDS = cls.INTENT_REGISTRY.keywords
+        return registered
+    
+    def __init__(self, use_llm: bool = False, openai_api_key: Optional[str] = None, model: str = None,
+                 use_local_classifier: bool = True, semantic_cache=None, use_semantic_cache: bool = True,
+                 llm_budget: Optional[float] = None, rate_limiter=None, base_url: Optional[str] = None):
         self.use_llm = use_llm
         self.model = model or self.DEFAULT_MODEL
         self.openai_client = None
+        self._openai_api_key = None
+        # OpenAI-compatible endpoint, e.g. the local stub in openai_stub.py
+        self.base_url = base_url or os.getenv('OPENAI_BASE_URL')
+        self.local_classifier = None
+        self.semantic_cache = None
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.llm_guard = LLMGuard(
+            budget=self.LLM_LATENCY_BUDGET if llm_budget is None else llm_budget,
+            breaker=get_circuit_breaker("openai"),
+            name="OpenAI",
+        )
         
         if self.use_llm:
             self._initialize_openai_client(openai_api_key)
+            if use_local_classifier and LOCAL_CLASSIFIER_AVAILABLE:
+                self.local_classifier = get_default_classifier()
+            if use_semantic_cache:
+                if semantic_cache is not None:
+                    self.semantic_cache = semantic_cache
+                elif SEMANTIC_CACHE_AVAILABLE:
+                    self.semantic_cache = get_shared_semantic_cache()
     
     def _initialize_openai_client(self, api_key: Optional[str] = None) -> None:
         """Initialize OpenAI client with proper error handling."""
@@ -95,26 +158,115 @@ Respond with valid JSON only.
         if not resolved_api_key:
             raise ValueError("OpenAI API key required when use_llm=True. Set OPENAI_API_KEY environment variable.")
         
-        self.openai_client = openai.OpenAI(api_key=resolved_api_key)
+        self._openai_api_key = resolved_api_key
+        self.openai_client = openai.OpenAI(api_key=resolved_api_key, base_url=self.base_url)
+    
+    def _get_async_client(self):
+        """Return the shared keep-alive AsyncOpenAI client for the running event loop."""
+        if not self.openai_client:
+            raise ValueError("OpenAI client not initialized. Set use_llm=True in constructor.")
+        return get_async_openai_client(self._openai_api_key, self.base_url)
+    
+    def _intent_messages(self, prompt: str) -> List[Dict]:
+        """Build the chat messages for LLM intent classification."""
+        return [
+            {"role": "system", "content": "You are a LinkedIn automation intent classifier. Respond only with the intent name."},
+            {"role": "user", "content": self.INTENT_CLASSIFICATION_PROMPT.format(intents=self.INTENT_REGISTRY.menu, prompt=prompt)}
+        ]
+    
+    def _parameter_messages(self, prompt: str) -> List[Dict]:
+        """Build the chat messages for LLM parameter extraction."""
+        return [
+            {"role": "system", "content": "You are a parameter extraction assistant. Respond only with valid JSON."},
+            {"role": "user", "content": self.PARAMETER_EXTRACTION_PROMPT.format(prompt=prompt)}
+        ]
+    
+    def _acquire_rate_limit(self, messages: List[Dict], max_tokens: int) -> int:
+        """Reserve shared rate limit capacity for a chat request (within the latency budget); return the token estimate."""
+        tokens = estimate_tokens(messages, max_tokens)
+        with local_wait():
+            self.rate_limiter.acquire(self.model, tokens, timeout=remaining_budget(self.RATE_LIMIT_TIMEOUT))
+        return tokens
+    
+    async def _aacquire_rate_limit(self, messages: List[Dict], max_tokens: int) -> int:
+        """Async variant of _acquire_rate_limit."""
+        tokens = estimate_tokens(messages, max_tokens)
+        with local_wait():
+            await self.rate_limiter.aacquire(self.model, tokens, timeout=remaining_budget(self.RATE_LIMIT_TIMEOUT))
+        return tokens
+    
+    def _record_usage(self, estimated_tokens: int, response) -> None:
+        """Report the tokens a response actually used back to the rate limiter."""
+        usage = getattr(response, "usage", None)
+        self.rate_limiter.record_usage(self.model, estimated_tokens, getattr(usage, "total_tokens", None))
+    
+    def _semantic_cache_get(self, namespace: str, prompt: str):
+        """Look up a paraphrase-tolerant cached LLM result, or None."""
+        if self.semantic_cache is None:
+            return None
+        return self.semantic_cache.get(namespace, prompt)
+    
+    def _semantic_cache_put(self, namespace: str, prompt: str, value) -> None:
+        """Remember an LLM result for this prompt and its near-duplicates."""
+        if self.semantic_cache is not None:
+            self.semantic_cache.put(namespace, prompt, value)
+    
+    def _resolve_llm_intent(self, intent: str, prompt: str) -> str:
+        """Validate an LLM-returned intent, falling back to keyword matching for unknown names."""
+        # Validate that returned intent is one of our known intents
+        if intent in self.INTENT_REGISTRY.names or intent == self.INTENT_UNKNOWN:
+            self._semantic_cache_put("intent", prompt, intent)
+            return intent
+        else:
+            # Fallback if LLM returns unknown intent
+            return self._detect_intent_keywords(prompt)
     
     def detect_intent(self, prompt: str) -> str:
-        """Detect intent using LLM if enabled, otherwise fall back to keyword matching."""
+        """
+        Detect intent using LLM if enabled, otherwise fall back to keyword matching.
+        
+        The LLM call runs under LLM_LATENCY_BUDGET and the shared OpenAI circuit
+        breaker; a slow, failing or circuit-broken call returns the keyword result.
+        """
         if self.use_llm and self.openai_client:
-            try:
-                return self.detect_intent_with_llm(prompt)
-            except Exception as e:
-                print(f"LLM intent detection failed: {e}. Falling back to keyword matching.")
-                return self._detect_intent_keywords(prompt)
+            local_intent = self._classify_locally(prompt)
+            if local_intent:
+                return local_intent
+            return self.llm_guard.call(
+                self.detect_intent_with_llm, prompt,
+                fallback=lambda error: self._detect_intent_keywords(prompt)
+            )
         else:
             return self._detect_intent_keywords(prompt)
     
+    def _classify_locally(self, prompt: str) -> Optional[str]:
+        """
+        Classify intent with the local naive Bayes model.
+        
+        Returns:
+            The intent when the prediction is confident and corroborated by
+            keyword matching, None when the prompt should escalate to the LLM
+        """
+        if not self.local_classifier:
+            return None
+        
+        prediction = self.local_classifier.predict(prompt)
+        if prediction.confidence < self.LOCAL_CLASSIFIER_THRESHOLD:
+            return None
+        
+        # Disagreement with the keyword scorer marks the prompt as ambiguous
+        if prediction.intent != self._detect_intent_keywords(prompt):
+            return None
+        
+        return prediction.intent
+    
     def _detect_intent_keywords(self, prompt: str) -> str:
         """Original keyword-based intent detection with enhanced keyword matching."""
         prompt_lower = prompt.lower()
         
         # Score-based matching for better accuracy
         intent_scores = {}
-        for intent, keywords in self.INTENT_KEYWORDS.items():
+        for intent, keywords in self.INTENT_REGISTRY.keyword_table:
             score = sum(1 for keyword in keywords if keyword in prompt_lower)
             if score > 0:
                 intent_scores[intent] = score
@@ -131,71 +283,80 @@ Respond with valid JSON only.
         if not self.openai_client:
             raise ValueError("OpenAI client not initialized. Set use_llm=True in constructor.")
         
+        cached_intent = self._semantic_cache_get("intent", prompt)
+        if cached_intent is not None:
+            return cached_intent
+        
         try:
+            messages = self._intent_messages(prompt)
+            estimated_tokens = self._acquire_rate_limit(messages, 20)
             response = self.openai_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a LinkedIn automation intent classifier. Respond only with the intent name."},
-                    {"role": "user", "content": self.INTENT_CLASSIFICATION_PROMPT.format(prompt=prompt)}
-                ],
+                messages=messages,
                 max_tokens=20,
                 temperature=0.1
             )
+            self._record_usage(estimated_tokens, response)
             
             intent = response.choices[0].message.content.strip()
+            return self._resolve_llm_intent(intent, prompt)
+                
+        except Exception as e:
+            logger.debug(f"OpenAI API error: {e}")
+            raise
+    
+    async def detect_intent_async(self, prompt: str) -> str:
+        """Non-blocking variant of detect_intent built on the shared AsyncOpenAI client."""
+        if self.use_llm and self.openai_client:
+            local_intent = self._classify_locally(prompt)
+            if local_intent:
+                return local_intent
+            return await self.llm_guard.call_async(
+                self.detect_intent_with_llm_async, prompt,
+                fallback=lambda error: self._detect_intent_keywords(prompt)
+            )
+        else:
+            return self._detect_intent_keywords(prompt)
+    
+    async def detect_intent_with_llm_async(self, prompt: str) -> str:
+        """Use GPT-4o Mini to detect intent without blocking the event loop."""
+        client = self._get_async_client()
+        
+        cached_intent = self._semantic_cache_get("intent", prompt)
+        if cached_intent is not None:
+            return cached_intent
+        
+        try:
+            messages = self._intent_messages(prompt)
+            estimated_tokens = await self._aacquire_rate_limit(messages, 20)
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=20,
+                temperature=0.1
+            )
+            self._record_usage(estimated_tokens, response)
             
-            # Validate that returned intent is one of our known intents
-            all_intents = [getattr(self, attr) for attr in dir(self) if attr.startswith('INTENT_') and not attr.endswith('_KEYWORDS')]
-            if intent in all_intents:
-                return intent
-            else:
-                # Fallback if LLM returns unknown intent
-                return self._detect_intent_keywords(prompt)
+            intent = response.choices[0].message.content.strip()
+            return self._resolve_llm_intent(intent, prompt)
                 
         except Exception as e:
-            print(f"OpenAI API error: {e}")
+            logger.debug(f"OpenAI API error: {e}")
             raise
     
     def extract_parameters(self, prompt: str) -> Dict:
         """Extract parameters using LLM if enabled, otherwise use regex."""
         if self.use_llm and self.openai_client:
-            try:
-                return self.extract_parameters_with_llm(prompt)
-            except Exception as e:
-                print(f"LLM parameter extraction failed: {e}. Falling back to regex.")
-                return self._extract_parameters_regex(prompt)
+            return self.llm_guard.call(
+                self.extract_parameters_with_llm, prompt,
+                fallback=lambda error: self._extract_parameters_regex(prompt)
+            )
         else:
             return self._extract_parameters_regex(prompt)
     
     def _extract_parameters_regex(self, prompt: str) -> Dict:
-        """Enhanced regex-based parameter extraction."""
-        params = {}
-        
-        # Extract numeric count with better patterns
-        count_patterns = [
-            r'\b(\d+)\s+posts?\b',  # "3 posts"
-            r'\b(\d+)\s+(?:times?|items?)\b',  # "5 times"
-            r'\bfind\s+(\d+)\b',  # "find 10"
-            r'\b(\d+)\b'  # any number (fallback)
-        ]
-        
-        for pattern in count_patterns:
-            count_match = re.search(pattern, prompt, re.IGNORECASE)
-            if count_match:
-                params["count"] = int(count_match.group(1))
-                break
-        
-        # Extract keywords with improved patterns
-        keywords = self._extract_keywords(prompt)
-        if keywords:
-            params["keywords"] = keywords
-        
-        # Extract person names (basic pattern)
-        person_match = re.search(r'(?:by|from)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)', prompt)
-        if person_match:
-            params["target_person"] = person_match.group(1)
-        
-        return params
+        """Enhanced regex-based parameter extraction (single pass, precompiled patterns)."""
+        return scan_parameters(prompt)
     
     @lru_cache(maxsize=64)
     def extract_parameters_with_llm(self, prompt: str) -> Dict:
@@ -203,45 +364,90 @@ Respond with valid JSON only.
         if not self.openai_client:
             raise ValueError("OpenAI client not initialized. Set use_llm=True in constructor.")
         
+        cached_parameters = self._semantic_cache_get("parameters", prompt)
+        if cached_parameters is not None:
+            return cached_parameters
+        
         try:
+            messages = self._parameter_messages(prompt)
+            estimated_tokens = self._acquire_rate_limit(messages, 200)
             response = self.openai_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a parameter extraction assistant. Respond only with valid JSON."},
-                    {"role": "user", "content": self.PARAMETER_EXTRACTION_PROMPT.format(prompt=prompt)}
-                ],
+                messages=messages,
                 max_tokens=200,
                 temperature=0.1
             )
+            self._record_usage(estimated_tokens, response)
             
             response_content = response.choices[0].message.content.strip()
-            return json.loads(response_content)
+            parameters = json.loads(response_content)
+            self._semantic_cache_put("parameters", prompt, parameters)
+            return parameters
             
         except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}. Content: {response_content}")
+            logger.warning(f"JSON parsing error: {e}. Content: {response_content}")
             return self._extract_parameters_regex(prompt)
         except Exception as e:
-            print(f"OpenAI API error: {e}")
+            logger.debug(f"OpenAI API error: {e}")
             raise
     
+    async def extract_parameters_async(self, prompt: str) -> Dict:
+        """Non-blocking variant of extract_parameters built on the shared AsyncOpenAI client."""
+        if self.use_llm and self.openai_client:
+            return await self.llm_guard.call_async(
+                self.extract_parameters_with_llm_async, prompt,
+                fallback=lambda error: self._extract_parameters_regex(prompt)
+            )
+        else:
+            return self._extract_parameters_regex(prompt)
+    
+    async def extract_parameters_with_llm_async(self, prompt: str) -> Dict:
+        """Use GPT-4o Mini to extract parameters without blocking the event loop."""
+        client = self._get_async_client()
+        
+        cached_parameters = self._semantic_cache_get("parameters", prompt)
+        if cached_parameters is not None:
+            return cached_parameters
+        
+        try:
+            messages = self._parameter_messages(prompt)
+            estimated_tokens = await self._aacquire_rate_limit(messages, 200)
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=200,
+                temperature=0.1
+            )
+            self._record_usage(estimated_tokens, response)
+            
+            response_content = response.choices[0].message.content.strip()
+            parameters = json.loads(response_content)
+            self._semantic_cache_put("parameters", prompt, parameters)
+            return parameters
+            
+        except json.JSONDecodeError as e:
+            logger.warning(f"JSON parsing error: {e}. Content: {response_content}")
+            return self._extract_parameters_regex(prompt)
+        except Exception as e:
+            logger.debug(f"OpenAI API error: {e}")
+            raise
+    
+    async def analyze_prompt_async(self, prompt: str) -> Tuple[str, Dict]:
+        """
+        Detect intent and extract parameters concurrently.
+        
+        Returns:
+            Tuple of (intent, parameters)
+        """
+        intent, parameters = await asyncio.gather(
+            self.detect_intent_async(prompt),
+            self.extract_parameters_async(prompt)
+        )
+        return intent, parameters
+    
     def _extract_keywords(self, prompt: str) -> List[str]:
         """Enhanced keyword extraction with multiple patterns."""
-        patterns = [
-            r'about\s+(.+?)(?:\s+(?:with|by|from|in)|\s*$)',  # "about AI"
-            r'on\s+(.+?)(?:\s+(?:with|by|from|in)|\s*$)',     # "on machine learning"
-            r'related to\s+(.+?)(?:\s+(?:with|by|from|in)|\s*$)',  # "related to startups"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, prompt, re.IGNORECASE)
-            if match:
-                keyword_text = match.group(1).strip()
-                # Handle multiple keywords separated by "and"
-                if " and " in keyword_text:
-                    return [k.strip() for k in keyword_text.split(" and ")]
-                else:
-                    return [keyword_text]
-        return []
+        return extract_keywords(prompt)
     
     def select_template(self, prompt: str) -> str:
         """Select appropriate template based on prompt intent."""
@@ -249,51 +455,18 @@ Respond with valid JSON only.
         return f"{intent}_template"
     
     def render_template(self, template: str, parameters: Dict) -> str:
-        """Render template with given parameters."""
-        template_renderers = {
-            f"{self.INTENT_POST_ENGAGEMENT}_template": self._render_post_engagement_template,
-            f"{self.INTENT_COMMENT_POST}_template": self._render_comment_post_template,
-        }
+        """
+        Render template with given parameters.
         
-        renderer = template_renderers.get(template)
-        if renderer:
-            return renderer(parameters)
+        Args:
+            template: Template name ("<intent>_template") or bare intent name
+            parameters: Extracted parameters; validated against the intent schema
+            
+        Returns:
+            Numbered execution steps, or generic steps for unregistered intents
+        """
+        spec = self.INTENT_REGISTRY.get(template)
+        if spec:
+            return spec.render(parameters)
         else:
             return "1. Navigate to LinkedIn\n2. Perform the requested action"
-    
-    def _render_post_engagement_template(self, parameters: Dict) -> str:
-        """Render enhanced post engagement template."""
-        count = parameters.get("count", 1)
-        keywords = parameters.get("keywords", ["content"])
-        target_person = parameters.get("target_person")
-        
-        keyword_text = " and ".join(keywords)
-        steps = [
-            "1. Navigate to LinkedIn feed",
-            f"2. Search for {count} posts about {keyword_text}"
-        ]
-        
-        if target_person:
-            steps[1] += f" from {target_person}"
-        
-        steps.extend([
-            "3. Click the like button on each relevant post",
-            "4. Verify the like was successful",
-            "5. Wait briefly between actions to avoid rate limiting"
-        ])
-        
-        return "\n".join(steps)
-    
-    def _render_comment_post_template(self, parameters: Dict) -> str:
-        """Render enhanced comment post template."""
-        keywords = parameters.get("keywords", ["content"])
-        comment_text = parameters.get("comment_text", "Great insights!")
-        
-        keyword_text = " and ".join(keywords)
-        return f"""1. Navigate to LinkedIn feed
-2. Find posts about {keyword_text}
-3. Click the comment button on the target post
-4. Type comment: "{comment_text}"
-5. Review comment for appropriateness
-6. Submit the comment
-7. Verify comment was posted successfully"""
@@ -6,9 +6,10 @@ that prepares natural language prompts for direct use with browser-use Agent.
 """
 
 from typing import Optional
-import re
 import logging
 
+from parameter_extraction import normalize_whitespace
+
 # Try to import PromptTemplateEngine for advanced template-based enhancement
 try:
     from prompt_template_engine import PromptTemplateEngine
@@ -122,6 +123,42 @@ class PromptTransformer:
         
         return enhanced_prompt
     
+    async def enhance_prompt_async(self, user_prompt: Optional[str]) -> str:
+        """
+        Async variant of enhance_prompt for use inside an event loop.
+        
+        Uses the template engine's AsyncOpenAI path so LLM-backed enhancement
+        does not block a thread on network I/O; many enhancements can share a
+        single event loop and connection pool.
+        
+        Args:
+            user_prompt: Raw user input prompt
+            
+        Returns:
+            Enhanced prompt optimized for browser-use Agent execution
+            
+        Raises:
+            ValueError: If prompt is empty or None
+        """
+        logger = logging.getLogger(__name__)
+        
+        # Validate input
+        if not user_prompt or not user_prompt.strip():
+            raise ValueError("Empty prompt not allowed")
+        
+        clean_prompt = self._clean_prompt(user_prompt.strip())
+        
+        if self.use_templates and self.template_engine:
+            try:
+                template_enhanced = await self._try_template_enhancement_async(clean_prompt)
+                if template_enhanced:
+                    return template_enhanced
+            except Exception as e:
+                logger.info(f"Template enhancement failed: {e}")
+                logger.info("Falling back to generic enhancement.")
+        
+        return self._build_enhanced_prompt(clean_prompt)
+    
     def _try_template_enhancement(self, clean_prompt: str) -> Optional[str]:
         """
         Attempt template-based enhancement using PromptTemplateEngine.
@@ -146,40 +183,73 @@ class PromptTransformer:
             # Extract parameters for the detected intent
             parameters = self.template_engine.extract_parameters(clean_prompt)
             
-            # Render template with extracted parameters
-            template_content = self.template_engine.render_template(intent, parameters)
+            return self._build_template_prompt(clean_prompt, intent, parameters)
             
-            # Build enhanced prompt with template content and safety guidelines
-            enhanced_sections = [
-                self._linkedin_context,
-                "",
-                f"Task: {clean_prompt}",
-                "",
-                "Detailed execution plan:",
-                template_content,
-                "",
-                "Important guidelines:",
-            ]
+        except Exception as e:
+            print(f"Template enhancement error: {e}")
+            return None
+    
+    async def _try_template_enhancement_async(self, clean_prompt: str) -> Optional[str]:
+        """
+        Async variant of _try_template_enhancement.
+        
+        Intent detection and parameter extraction run concurrently on the
+        shared AsyncOpenAI client instead of as two sequential round trips.
+        
+        Args:
+            clean_prompt: Cleaned user prompt
             
-            # Add safety guidelines
-            for guideline in self._safety_guidelines:
-                enhanced_sections.append(f"- {guideline}")
+        Returns:
+            Template-enhanced prompt if successful, None if no template matches
+        """
+        if not self.template_engine:
+            return None
+        
+        try:
+            intent, parameters = await self.template_engine.analyze_prompt_async(clean_prompt)
             
-            enhanced_sections.extend([
-                "",
-                "Please execute this LinkedIn automation task while adhering to these professional standards."
-            ])
+            if intent == "unknown":
+                # No template matches, use generic enhancement
+                return None
             
-            return "\n".join(enhanced_sections)
+            return self._build_template_prompt(clean_prompt, intent, parameters)
             
         except Exception as e:
             print(f"Template enhancement error: {e}")
             return None
     
+    def _build_template_prompt(self, clean_prompt: str, intent: str, parameters: dict) -> str:
+        """Render the intent template and wrap it with LinkedIn context and safety guidelines."""
+        # Render template with extracted parameters
+        template_content = self.template_engine.render_template(intent, parameters)
+        
+        # Build enhanced prompt with template content and safety guidelines
+        enhanced_sections = [
+            self._linkedin_context,
+            "",
+            f"Task: {clean_prompt}",
+            "",
+            "Detailed execution plan:",
+            template_content,
+            "",
+            "Important guidelines:",
+        ]
+        
+        # Add safety guidelines
+        for guideline in self._safety_guidelines:
+            enhanced_sections.append(f"- {guideline}")
+        
+        enhanced_sections.extend([
+            "",
+            "Please execute this LinkedIn automation task while adhering to these professional standards."
+        ])
+        
+        return "\n".join(enhanced_sections)
+    
     def _clean_prompt(self, prompt: str) -> str:
         """Clean and normalize the input prompt."""
         # Remove excessive whitespace
-        cleaned = re.sub(r'\s+', ' ', prompt)
+        cleaned = normalize_whitespace(prompt)
         # Ensure proper capitalization for first word
         if cleaned and not cleaned[0].isupper():
             cleaned = cleaned[0].upper() + cleaned[1:]
@@ -0,0 +1,438 @@
+"""
+Process-wide OpenAI rate limiting.
+
+Every OpenAI call in the process (the browser-use agent's ChatOpenAI, the
+prompt template engine and the prompt interpreter) draws from one
+RateLimiter. Each model has two token buckets, one for requests per minute
+and one for tokens per minute. Waiting callers queue fairly: the highest
+priority class goes first (interactive requests from the UI before
+scheduled automations) and requests within a class are served in arrival
+order, so a large request is never starved by a stream of small ones.
+
+Callers mark scheduled work with the request_priority() context manager;
+the priority follows the call into threads started through LLMGuard and
+into asyncio tasks.
+
+Limits come from the rate_limits section of config/settings.yaml (whose
+values can be taken from the environment) when the shared limiter is
+created. Dated snapshots such as gpt-4o-2024-08-06 count against their
+base model's limits and buckets.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import re
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.outputs import LLMResult
+    from langchain_core.rate_limiters import BaseRateLimiter
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+
+class Priority(IntEnum):
+    """Queueing class of an LLM request; lower values are served first."""
+    INTERACTIVE = 0
+    SCHEDULED = 1
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a request could not be admitted within its timeout."""
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Requests-per-minute and tokens-per-minute allowance for one model."""
+    rpm: int
+    tpm: int
+
+
+    @classmethod
+    def from_settings(cls, name: str, section: Any) -> "ModelLimits":
+        """
+        Build limits from a ``{rpm: ..., tpm: ...}`` mapping.
+
+        Raises:
+            ValueError: If the section is not a mapping or a limit is not a positive integer
+        """
+        if not isinstance(section, Mapping) or set(section) != {"rpm", "tpm"}:
+            raise ValueError(f"Rate limits for '{name}' must be a mapping with rpm and tpm")
+        for key, value in section.items():
+            if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+                raise ValueError(f"Rate limit '{name}.{key}' must be a positive integer")
+        return cls(rpm=section["rpm"], tpm=section["tpm"])
+
+
+# OpenAI usage tier 1 limits; raise them in config/settings.yaml to match the account's tier
+DEFAULT_MODEL_LIMITS: Mapping[str, ModelLimits] = {
+    "gpt-4o": ModelLimits(rpm=500, tpm=30_000),
+    "gpt-4o-mini": ModelLimits(rpm=500, tpm=200_000),
+}
+FALLBACK_LIMITS = ModelLimits(rpm=500, tpm=30_000)
+
+# Date suffix of a model snapshot: gpt-4o-2024-08-06, gpt-4-0613
+_SNAPSHOT_SUFFIX = re.compile(r"-(?:\d{4}-\d{2}-\d{2}|\d{4})$")
+
+
+def base_model(model: str) -> str:
+    """The model a snapshot name belongs to (gpt-4o for gpt-4o-2024-08-06); other names are unchanged."""
+    return _SNAPSHOT_SUFFIX.sub("", model)
+
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    """The rate_limits section of config/settings.yaml."""
+    models: Tuple[Tuple[str, ModelLimits], ...] = tuple(DEFAULT_MODEL_LIMITS.items())
+    default: ModelLimits = FALLBACK_LIMITS
+
+    @classmethod
+    def from_settings(cls, section: Mapping[str, Any]) -> "RateLimitSettings":
+        """
+        Build the settings from a ``{default: {rpm, tpm}, models: {name: {rpm, tpm}}}`` section.
+
+        Models not listed keep DEFAULT_MODEL_LIMITS; snapshot names are folded into their base model.
+
+        Raises:
+            ValueError: If the section has unknown keys or a limit is invalid
+        """
+        unknown = set(section) - {"default", "models"}
+        if unknown:
+            raise ValueError(f"Unknown rate_limits settings: {sorted(unknown)}")
+        models = section.get("models") or {}
+        if not isinstance(models, Mapping):
+            raise ValueError("Setting 'rate_limits.models' must be a mapping")
+        limits = dict(DEFAULT_MODEL_LIMITS)
+        for name, value in models.items():
+            limits[base_model(str(name))] = ModelLimits.from_settings(str(name), value)
+        default = section.get("default")
+        return cls(models=tuple(limits.items()),
+                   default=cls.default if default is None else ModelLimits.from_settings("default", default))
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar("llm_request_priority", default=Priority.INTERACTIVE)
+
+
+@contextlib.contextmanager
+def request_priority(priority: Priority):
+    """Run the enclosed LLM calls with the given queueing priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+def estimate_tokens(messages: Iterable[Mapping], max_tokens: int = 0) -> int:
+    """
+    Estimate the tokens a chat request will consume.
+
+    Uses the ~4 characters per token rule of thumb for the prompt plus the
+    completion allowance; actual usage is reconciled afterwards with
+    RateLimiter.record_usage().
+    """
+    messages = list(messages)
+    characters = sum(len(str(message.get("content", ""))) for message in messages)
+    return characters // 4 + 4 * len(messages) + max_tokens
+
+
+class _Bucket:
+    """Continuously refilling token bucket. Not thread-safe; guarded by the model lock."""
+
+    def __init__(self, per_minute: int, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (the bucket must be refilled first)."""
+        # A request larger than the whole bucket is admitted once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class _ModelState:
+    def __init__(self, limits: ModelLimits, now: float):
+        self.limits = limits
+        self.requests = _Bucket(limits.rpm, now)
+        self.tokens = _Bucket(limits.tpm, now)
+        self.queue: List[tuple] = []  # heap of (priority, sequence)
+        self.granted = {priority: 0 for priority in Priority}
+        self.timeouts = {priority: 0 for priority in Priority}
+        self.wait_seconds = {priority: 0.0 for priority in Priority}
+        self.max_wait_seconds = {priority: 0.0 for priority in Priority}
+        self.tokens_reserved = 0
+        self.tokens_used = 0
+
+
+class RateLimiter:
+    """
+    Per-model RPM/TPM limiter with priority-fair queueing.
+
+    Args:
+        limits: Model name -> ModelLimits; unknown models use ``default_limits``.
+            Snapshots share the limits and buckets of their base model (see base_model())
+        default_limits: Limits for models not listed in ``limits``
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    # Longest a waiter sleeps before re-checking, so async waiters notice refills and cancellations
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, limits: Optional[Mapping[str, ModelLimits]] = None,
+                 default_limits: ModelLimits = FALLBACK_LIMITS, clock=time.monotonic):
+        self.limits = {base_model(model): model_limits
+                       for model, model_limits in (DEFAULT_MODEL_LIMITS if limits is None else limits).items()}
+        self.default_limits = default_limits
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._models: Dict[str, _ModelState] = {}
+        self._sequence = itertools.count()
+
+    def _state(self, model: str) -> _ModelState:
+        model = base_model(model)
+        state = self._models.get(model)
+        if state is None:
+            state = _ModelState(self.limits.get(model, self.default_limits), self._clock())
+            self._models[model] = state
+        return state
+
+    def _try_admit(self, state: _ModelState, ticket: tuple, tokens: int) -> float:
+        """Admit ``ticket`` if it heads the queue and both buckets allow it; return 0 or the wait."""
+        now = self._clock()
+        state.requests.refill(now)
+        state.tokens.refill(now)
+        if state.queue[0] != ticket:
+            return self.POLL_INTERVAL
+        wait = max(state.requests.wait_time(1), state.tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+        state.requests.level -= 1
+        # Oversized requests leave the bucket in debt rather than blocking forever
+        state.tokens.level -= tokens
+        heapq.heappop(state.queue)
+        return 0.0
+
+    def _enqueue(self, model: str, priority: Priority):
+        state = self._state(model)
+        ticket = (int(priority), next(self._sequence))
+        heapq.heappush(state.queue, ticket)
+        return state, ticket
+
+    def _dequeue(self, state: _ModelState, ticket: tuple) -> None:
+        state.queue.remove(ticket)
+        heapq.heapify(state.queue)
+
+    def _granted(self, state: _ModelState, priority: Priority, tokens: int, waited: float) -> None:
+        state.granted[priority] += 1
+        state.wait_seconds[priority] += waited
+        state.max_wait_seconds[priority] = max(state.max_wait_seconds[priority], waited)
+        state.tokens_reserved += tokens
+
+    def acquire(self, model: str, tokens: int = 1, priority: Optional[Priority] = None,
+                blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Reserve one request and ``tokens`` tokens for ``model``.
+
+        Args:
+            model: Model the request is sent to
+            tokens: Estimated tokens (prompt + completion) of the request
+            priority: Queueing class; defaults to the current request_priority()
+            blocking: Wait for capacity instead of returning False immediately
+            timeout: Maximum seconds to wait when blocking (None waits indefinitely)
+
+        Returns:
+            True once admitted; False if not blocking and no capacity was available
+
+        Raises:
+            RateLimitTimeout: If blocking and the timeout expired first
+        """
+        priority = current_priority() if priority is None else Priority(priority)
+        start = self._clock()
+        deadline = None if timeout is None else start + timeout
+
+        with self._condition:
+            state, ticket = self._enqueue(model, priority)
+            try:
+                while True:
+                    wait = self._try_admit(state, ticket, tokens)
+                    if wait == 0.0:
+                        self._granted(state, priority, tokens, self._clock() - start)
+                        self._condition.notify_all()
+                        return True
+                    if not blocking:
+                        self._dequeue(state, ticket)
+                        self._condition.notify_all()
+                        return False
+                    if deadline is not None:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            state.timeouts[priority] += 1
+                            self._dequeue(state, ticket)
+                            self._condition.notify_all()
+                            raise RateLimitTimeout(f"Timed out waiting for {model} rate limit capacity")
+                        wait = min(wait, remaining)
+                    self._condition.wait(min(wait, self.POLL_INTERVAL))
+            except BaseException:
+                if ticket in state.queue:
+                    self._dequeue(state, ticket)
+                    self._condition.notify_all()
+                raise
+
+    async def aacquire(self, model: str, tokens: int = 1, priority: Optional[Priority] = None,
+                       blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """Async variant of acquire() that waits with asyncio.sleep instead of blocking the loop."""
+        priority = current_priority() if priority is None else Priority(priority)
+        start = self._clock()
+        deadline = None if timeout is None else start + timeout
+
+        with self._lock:
+            state, ticket = self._enqueue(model, priority)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_admit(state, ticket, tokens)
+                    if wait == 0.0:
+                        self._granted(state, priority, tokens, self._clock() - start)
+                        self._condition.notify_all()
+                        return True
+                    if not blocking:
+                        self._dequeue(state, ticket)
+                        self._condition.notify_all()
+                        return False
+                    if deadline is not None:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            state.timeouts[priority] += 1
+                            self._dequeue(state, ticket)
+                            self._condition.notify_all()
+                            raise RateLimitTimeout(f"Timed out waiting for {model} rate limit capacity")
+                        wait = min(wait, remaining)
+                await asyncio.sleep(min(wait, self.POLL_INTERVAL))
+        except BaseException:
+            with self._lock:
+                if ticket in state.queue:
+                    self._dequeue(state, ticket)
+                    self._condition.notify_all()
+            raise
+
+    def record_usage(self, model: str, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Reconcile a request's estimated tokens with the usage OpenAI reported.
+
+        Over-estimates are returned to the bucket and under-estimates are
+        charged, so the TPM bucket tracks real consumption.
+        """
+        if not isinstance(actual_tokens, int) or isinstance(actual_tokens, bool):
+            return
+        with self._condition:
+            state = self._state(model)
+            state.tokens.refill(self._clock())
+            state.tokens.level = min(state.tokens.capacity, state.tokens.level + estimated_tokens - actual_tokens)
+            state.tokens_used += actual_tokens
+            self._condition.notify_all()
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Return per-model (base model) limits, queue depth, grants, timeouts and waits by priority."""
+        with self._lock:
+            now = self._clock()
+            snapshot = {}
+            for model, state in self._models.items():
+                state.requests.refill(now)
+                state.tokens.refill(now)
+                snapshot[model] = {
+                    "rpm_limit": state.limits.rpm,
+                    "tpm_limit": state.limits.tpm,
+                    "requests_available": round(state.requests.level, 2),
+                    "tokens_available": round(state.tokens.level, 2),
+                    "tokens_reserved": state.tokens_reserved,
+                    "tokens_used": state.tokens_used,
+                    "priorities": {
+                        priority.name.lower(): {
+                            "queued": sum(1 for ticket in state.queue if ticket[0] == priority),
+                            "granted": state.granted[priority],
+                            "timeouts": state.timeouts[priority],
+                            "avg_wait_seconds": round(state.wait_seconds[priority] / state.granted[priority], 4)
+                            if state.granted[priority] else 0.0,
+                            "max_wait_seconds": round(state.max_wait_seconds[priority], 4),
+                        }
+                        for priority in Priority
+                    },
+                }
+            return snapshot
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the limiter shared by every OpenAI caller in the process, with
+    the rate_limits of the configuration at the time it is first requested.
+    """
+    from app_config import get_config  # app_config imports this module
+    settings = get_config().rate_limits
+    return RateLimiter(dict(settings.models), settings.default)
+
+
+if LANGCHAIN_AVAILABLE:
+    def _total_tokens(response: LLMResult) -> Optional[int]:
+        """Total tokens OpenAI reported for a LangChain call, or None if the response has no usage."""
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("total_tokens") is not None:
+            return usage["total_tokens"]
+        # Streaming and newer responses carry usage on each message instead
+        totals = [(getattr(getattr(generation, "message", None), "usage_metadata", None) or {}).get("total_tokens")
+                  for generations in response.generations for generation in generations]
+        return sum(totals) if totals and None not in totals else None
+
+    class LangChainRateLimiter(BaseRateLimiter):
+        """
+        Adapter that lets LangChain chat models (e.g. the harvester's ChatOpenAI) draw from a RateLimiter.
+
+        LangChain does not tell the limiter how large a request is, so each
+        call reserves a fixed ``tokens_per_request`` estimate. Register
+        ``usage_callback`` as one of the model's callbacks to reconcile that
+        estimate with the usage in each response.
+        """
+
+        def __init__(self, limiter: RateLimiter, model: str, tokens_per_request: int = 4000):
+            self.limiter = limiter
+            self.model = model
+            self.tokens_per_request = tokens_per_request
+            self.usage_callback = LangChainUsageCallback(self)
+
+        def acquire(self, *, blocking: bool = True) -> bool:
+            return self.limiter.acquire(self.model, self.tokens_per_request, blocking=blocking)
+
+        async def aacquire(self, *, blocking: bool = True) -> bool:
+            return await self.limiter.aacquire(self.model, self.tokens_per_request, blocking=blocking)
+
+    class LangChainUsageCallback(BaseCallbackHandler):
+        """Returns the unused part of a LangChainRateLimiter reservation (or charges the excess) once a call ends."""
+
+        def __init__(self, adapter: LangChainRateLimiter):
+            self.adapter = adapter
+
+        def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+            self.adapter.limiter.record_usage(self.adapter.model, self.adapter.tokens_per_request,
+                                              _total_tokens(response))
@@ -0,0 +1,209 @@
+"""
+Persistent index of posts the agent has already seen and acted on.
+
+Scheduled "scroll the feed" jobs otherwise re-extract, and could re-engage
+with, the same posts run after run. SeenPostIndex records, per post id:
+
+- when the post was first and last seen, and how many harvests saw it
+- which actions (like, comment, share, ...) were taken, and when
+
+SQLite is the durable store; every known post id and every (post, action)
+pair is also held in memory, so "seen before?" and "already commented?"
+are O(1) set lookups with no query. Writes are batched into one
+transaction per harvest.
+
+Post ids are canonicalised, so "urn:li:activity:123" and the feed URL
+".../feed/update/urn:li:activity:123/" are the same post.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".linkedin_ai_agent" / "seen_posts.sqlite3"
+
+_URN = re.compile(r"urn:li:(activity|share|ugcPost):(\d+)", re.IGNORECASE)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_posts (
+    post_id TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS post_actions (
+    post_id TEXT NOT NULL,
+    action TEXT NOT NULL,
+    acted_at REAL NOT NULL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS post_actions_post_id ON post_actions (post_id);
+"""
+
+
+def post_key(post_id: str) -> str:
+    """Canonical key for a post id: its LinkedIn URN if one is embedded, else the stripped id."""
+    match = _URN.search(post_id)
+    if match:
+        kind = match.group(1)
+        return f"urn:li:{'ugcPost' if kind.lower() == 'ugcpost' else kind.lower()}:{match.group(2)}"
+    return post_id.strip()
+
+
+@dataclass
+class SeenPost:
+    """Everything the index knows about one post."""
+    post_id: str
+    first_seen: float
+    last_seen: float
+    seen_count: int
+    actions: List[Tuple[str, float]] = field(default_factory=list)
+
+
+class SeenPostIndex:
+    """
+    SQLite-backed seen-post index with an in-memory membership front.
+
+    Use ":memory:" as the path for a throwaway index (tests, dry runs).
+    """
+
+    def __init__(self, path: str = str(DEFAULT_DB_PATH)):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        # Flask serves requests from several threads; the lock serialises use of the connection
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+        self._seen: Set[str] = {row[0] for row in self._connection.execute("SELECT post_id FROM seen_posts")}
+        self._acted: Dict[str, Set[str]] = {}
+        for post_id, action in self._connection.execute("SELECT DISTINCT post_id, action FROM post_actions"):
+            self._acted.setdefault(post_id, set()).add(action)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_key(post_id) in self._seen
+
+    def has_acted(self, post_id: str, action: Optional[str] = None) -> bool:
+        """Whether any action (or the given one) was taken on a post; no database access."""
+        actions = self._acted.get(post_key(post_id))
+        return bool(actions) if action is None else bool(actions and action in actions)
+
+    def seen_mask(self, post_ids: Iterable[Optional[str]]) -> np.ndarray:
+        """Boolean mask of post ids seen before, e.g. for PostBatch.filter(~mask)."""
+        seen = self._seen
+        return np.array([post_id is not None and post_key(post_id) in seen for post_id in post_ids], dtype=bool)
+
+    def mark_seen(self, post_ids: Iterable[str], seen_at: Optional[float] = None) -> int:
+        """
+        Record that posts were seen (now, or at ``seen_at``) in one transaction.
+
+        Returns:
+            How many of the posts had not been seen before
+        """
+        seen_at = time.time() if seen_at is None else seen_at
+        keys = list(dict.fromkeys(post_key(post_id) for post_id in post_ids if post_id))
+        with self._lock:
+            new = sum(key not in self._seen for key in keys)
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT INTO seen_posts (post_id, first_seen, last_seen) VALUES (?, ?, ?) "
+                    "ON CONFLICT (post_id) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen), "
+                    "seen_count = seen_count + 1",
+                    [(key, seen_at, seen_at) for key in keys],
+                )
+            self._seen.update(keys)
+        return new
+
+    def record_action(self, post_id: str, action: str, detail: Optional[str] = None,
+                      acted_at: Optional[float] = None) -> None:
+        """Record an action taken on a post (the post is marked seen too)."""
+        acted_at = time.time() if acted_at is None else acted_at
+        key = post_key(post_id)
+        with self._lock:
+            if key not in self._seen:
+                self.mark_seen([key], acted_at)
+            with self._connection:
+                self._connection.execute(
+                    "INSERT INTO post_actions (post_id, action, acted_at, detail) VALUES (?, ?, ?, ?)",
+                    (key, action, acted_at, detail),
+                )
+            self._acted.setdefault(key, set()).add(action)
+
+    def get(self, post_id: str) -> Optional[SeenPost]:
+        """Return the stored history of a post, or None if it was never seen."""
+        key = post_key(post_id)
+        if key not in self._seen:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT first_seen, last_seen, seen_count FROM seen_posts WHERE post_id = ?", (key,)
+            ).fetchone()
+            actions = self._connection.execute(
+                "SELECT action, acted_at FROM post_actions WHERE post_id = ? ORDER BY acted_at", (key,)
+            ).fetchall()
+        return SeenPost(key, row[0], row[1], row[2], [tuple(action) for action in actions])
+
+    def filter_unseen(self, posts: Sequence[Any], mark: bool = True,
+                      seen_at: Optional[float] = None) -> Tuple[List[Any], List[Any]]:
+        """
+        Split posts (FetchedPost models or post dicts) into new and previously seen.
+
+        Args:
+            posts: Harvested posts
+            mark: Record every post as seen (new ones get first_seen, old ones last_seen)
+            seen_at: Timestamp to record instead of now
+
+        Returns:
+            (new posts, posts seen in an earlier harvest)
+        """
+        def post_id(post):
+            value = post.get("post_id") if isinstance(post, dict) else getattr(post, "post_id", None)
+            return str(value) if value else None
+
+        ids = [post_id(post) for post in posts]
+        seen = self.seen_mask(ids)
+        new = [post for post, was_seen in zip(posts, seen) if not was_seen]
+        old = [post for post, was_seen in zip(posts, seen) if was_seen]
+        if mark:
+            self.mark_seen([post for post in ids if post], seen_at)
+        if old:
+            logger.info(f"Skipping {len(old)} already seen post(s) of {len(posts)}")
+        return new, old
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "SeenPostIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@lru_cache(maxsize=1)
+def get_shared_seen_index() -> SeenPostIndex:
+    """
+    Return the process-wide seen-post index.
+
+    Stored under ~/.linkedin_ai_agent next to the browser profile; set
+    SEEN_POSTS_DB_PATH to use another file (or ":memory:").
+    """
+    return SeenPostIndex(os.getenv("SEEN_POSTS_DB_PATH") or str(DEFAULT_DB_PATH))
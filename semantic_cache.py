@@ -0,0 +1,319 @@
+"""
+Semantic near-duplicate cache for LLM prompt analysis results.
+
+Prompts are embedded locally as hashed TF-IDF vectors (see text_features.py)
+and kept in an in-memory matrix. A lookup returns the stored result of the
+most similar earlier prompt when its cosine similarity clears a threshold,
+so paraphrases such as "like 5 posts about AI" and "Like 5 AI posts" share
+one LLM answer. Entries are evicted least-recently-used and the index can be
+persisted to a compressed .npz file between runs.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from text_features import HashingVectorizer, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Numbers and quoted text change what an LLM extracts ("like 5 posts" vs
+# "like 50 posts"), so they must match exactly for a cache hit.
+_SIGNATURE_PATTERN = re.compile(r"\d+|'[^']*'|\"[^\"]*\"")
+
+
+# Function words carry no meaning for prompt analysis; dropping them lets
+# "posts about AI" and "AI posts" embed identically
+STOP_WORDS = frozenset({
+    "a", "about", "an", "and", "any", "at", "by", "can", "could", "for", "from",
+    "i", "in", "into", "me", "my", "of", "on", "please", "related", "some", "that",
+    "the", "their", "them", "these", "this", "those", "to", "up", "with", "you", "your",
+})
+
+
+def content_terms(text: str) -> str:
+    """Reduce a prompt to its lightly stemmed content words."""
+    terms = []
+    for token in tokenize(text):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return " ".join(terms)
+
+
+def prompt_signature(text: str) -> str:
+    """Return the exact-match part of a prompt: its numbers and quoted phrases."""
+    return "\x1f".join(match.lower() for match in _SIGNATURE_PATTERN.findall(text))
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache keyed by prompt similarity.
+
+    Each entry stores the hashed content-word counts of a prompt, its namespace
+    (e.g. "intent" or "parameters"), its exact-match signature and a
+    JSON-serialisable value. Lookups weight terms by inverse document
+    frequency over the cached prompts, so words every prompt shares
+    ("posts", "like") count for less than topic words.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 512,
+                 path: Optional[str] = None, autosave_every: int = 16,
+                 vectorizer: Optional[HashingVectorizer] = None):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self.autosave_every = autosave_every
+        # Word unigrams only: word order rarely changes the request, while
+        # character n-grams would make different topics ("AI" vs "API") look alike
+        self.vectorizer = vectorizer or HashingVectorizer(n_features=2 ** 12, word_ngrams=(1, 1), char_ngrams=None)
+
+        self._lock = threading.RLock()
+        self._puts_since_save = 0
+        self.hits = 0
+        self.misses = 0
+        self._reset()
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def _reset(self) -> None:
+        n_features = self.vectorizer.n_features
+        self._tf = np.zeros((self.max_entries, n_features), dtype=np.float32)
+        self._df = np.zeros(n_features, dtype=np.float32)
+        self._row_norms = np.zeros(self.max_entries, dtype=np.float32)
+        self._norms_dirty = False
+        self._occupied = np.zeros(self.max_entries, dtype=bool)
+        self._last_used = np.zeros(self.max_entries, dtype=np.int64)
+        # (namespace, signature) pairs are interned to ints so eligibility is one vector compare
+        self._key_ids = np.full(self.max_entries, -1, dtype=np.int64)
+        self._key_table = {}
+        self._keys = [None] * self.max_entries
+        self._slot_by_prompt = {}
+        self._prompts = [None] * self.max_entries
+        self._values = [None] * self.max_entries
+        self._clock = 0
+
+    def __len__(self) -> int:
+        return int(self._occupied.sum())
+
+    def clear(self) -> None:
+        """Drop every cached entry and reset hit statistics."""
+        with self._lock:
+            self._reset()
+            self.hits = 0
+            self.misses = 0
+
+    def _idf(self) -> np.ndarray:
+        n_docs = max(len(self), 1)
+        return np.log((1.0 + n_docs) / (1.0 + self._df)) + 1.0
+
+    def _term_counts(self, text: str) -> np.ndarray:
+        return self.vectorizer.transform_one(content_terms(text))
+
+    def _best_match(self, namespace: str, text: str) -> Tuple[Optional[int], float]:
+        """Return the slot and similarity of the closest eligible cached prompt."""
+        if not self._occupied.any():
+            return None, 0.0
+
+        buckets, weights = self.vectorizer.sparse(content_terms(text))
+        if buckets.size == 0:
+            return None, 0.0
+
+        # Collapse repeated buckets so the query vector matches transform_one()
+        buckets, inverse = np.unique(buckets, return_inverse=True)
+        query = np.bincount(inverse, weights=weights).astype(np.float32)
+
+        idf = self._idf()
+        if self._norms_dirty:
+            self._row_norms = np.sqrt((self._tf ** 2) @ (idf ** 2)).astype(np.float32)
+            self._norms_dirty = False
+
+        query_weights = query * idf[buckets] ** 2
+        query_norm = float(np.sqrt(np.sum((query * idf[buckets]) ** 2)))
+        if query_norm == 0.0:
+            return None, 0.0
+
+        # Only the query's columns contribute to the dot products
+        dots = self._tf[:, buckets] @ query_weights
+        denominators = self._row_norms * query_norm
+        similarities = np.divide(dots, denominators, out=np.zeros_like(dots), where=denominators > 0)
+
+        key_id = self._key_table.get((namespace, prompt_signature(text)))
+        if key_id is None:
+            return None, 0.0
+        eligible = self._occupied & (self._key_ids == key_id)
+        if not eligible.any():
+            return None, 0.0
+
+        similarities[~eligible] = -1.0
+        best = int(np.argmax(similarities))
+        return best, float(similarities[best])
+
+    def get(self, namespace: str, text: str) -> Optional[Any]:
+        """
+        Return the cached value of the most similar prompt, if similar enough.
+
+        Args:
+            namespace: Kind of result being looked up (e.g. "intent")
+            text: Prompt to look up
+
+        Returns:
+            A copy of the cached value, or None on a miss
+        """
+        with self._lock:
+            slot, similarity = self._best_match(namespace, text)
+            if slot is None or similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._clock += 1
+            self._last_used[slot] = self._clock
+            logger.debug(f"Semantic cache hit ({similarity:.2f}): '{text}' ~ '{self._prompts[slot]}'")
+            return copy.deepcopy(self._values[slot])
+
+    def put(self, namespace: str, text: str, value: Any) -> None:
+        """
+        Store a result for a prompt, evicting the least recently used entry if full.
+
+        Args:
+            namespace: Kind of result being stored (e.g. "parameters")
+            text: Prompt the result was computed for
+            value: JSON-serialisable result
+        """
+        term_counts = self._term_counts(text)
+        if not term_counts.any():
+            return
+
+        with self._lock:
+            signature = prompt_signature(text)
+            slot = self._slot_by_prompt.get((namespace, text))
+            if slot is None:
+                free = np.flatnonzero(~self._occupied)
+                slot = int(free[0]) if free.size else int(np.argmin(self._last_used))
+            if self._occupied[slot]:
+                self._df -= (self._tf[slot] > 0)
+                self._slot_by_prompt.pop((self._keys[slot][0], self._prompts[slot]), None)
+
+            self._tf[slot] = term_counts
+            self._df += (term_counts > 0)
+            self._occupied[slot] = True
+            self._norms_dirty = True
+            self._clock += 1
+            self._last_used[slot] = self._clock
+            self._set_key(slot, namespace, signature)
+            self._prompts[slot] = text
+            self._slot_by_prompt[(namespace, text)] = slot
+            self._values[slot] = copy.deepcopy(value)
+
+            self._puts_since_save += 1
+            if self.path and self._puts_since_save >= self.autosave_every:
+                self.save()
+
+    def _set_key(self, slot: int, namespace: str, signature: str) -> None:
+        key = (namespace, signature)
+        self._key_ids[slot] = self._key_table.setdefault(key, len(self._key_table))
+        self._keys[slot] = key
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Persist the index to a compressed .npz file.
+
+        The file is written to a temporary name and atomically renamed, so a
+        crash mid-write never leaves a truncated index behind.
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given to save the semantic cache to")
+
+        with self._lock:
+            slots = np.flatnonzero(self._occupied)
+            metadata = [
+                {
+                    "namespace": self._keys[slot][0],
+                    "signature": self._keys[slot][1],
+                    "prompt": self._prompts[slot],
+                    "value": self._values[slot],
+                }
+                for slot in slots
+            ]
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    np.savez_compressed(
+                        handle,
+                        tf=self._tf[slots],
+                        last_used=self._last_used[slots],
+                        n_features=np.array(self.vectorizer.n_features),
+                        metadata=np.array(json.dumps(metadata)),
+                    )
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._puts_since_save = 0
+
+    def load(self, path: str) -> None:
+        """Replace the cache contents with an index previously written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["n_features"]) != self.vectorizer.n_features:
+                raise ValueError("Semantic cache file was built with a different feature size")
+            tf = data["tf"]
+            last_used = data["last_used"]
+            metadata = json.loads(str(data["metadata"]))
+
+        with self._lock:
+            self._reset()
+            # Keep the most recently used entries if the file holds more than fit
+            order = np.argsort(last_used)[::-1][:self.max_entries]
+            for slot, index in enumerate(sorted(order, key=lambda i: last_used[i])):
+                entry = metadata[index]
+                self._tf[slot] = tf[index]
+                self._df += (tf[index] > 0)
+                self._occupied[slot] = True
+                self._last_used[slot] = slot + 1
+                self._set_key(slot, entry["namespace"], entry["signature"])
+                self._prompts[slot] = entry["prompt"]
+                self._slot_by_prompt[(entry["namespace"], entry["prompt"])] = slot
+                self._values[slot] = entry["value"]
+            self._clock = len(order)
+            self._norms_dirty = True
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=1)
+def get_shared_semantic_cache() -> SemanticCache:
+    """
+    Return the process-wide semantic cache.
+
+    Flask handlers build a new PromptTemplateEngine per request, so results
+    are shared through this cache rather than per-instance state. Set
+    SEMANTIC_CACHE_PATH to persist the index between runs.
+    """
+    cache = SemanticCache(path=os.getenv("SEMANTIC_CACHE_PATH"))
+    if cache.path:
+        atexit.register(cache.save)
+    return cache
@@ -0,0 +1,276 @@
+"""
+YAML template database for LinkedIn action execution plans.
+
+Each intent's plan lives in its own file under config/templates/ (e.g.
+config/templates/post_engagement.yaml):
+
+    intent: post_engagement
+    defaults:
+      count: 1
+      keywords: [content]
+    steps:
+      - Navigate to LinkedIn feed
+      - text: Search for {count} posts about {keywords} from {target_person}
+        when: target_person
+      - text: Search for {count} posts about {keywords}
+        unless: target_person
+
+Steps are str.format templates over the extracted parameters; list values
+are joined with " and ". A step with ``when``/``unless`` is kept only if
+the named parameter is set/unset, and steps are numbered after filtering.
+
+Files are parsed and compiled into render callables once. The store
+re-checks file modification times at most every ``check_interval``
+seconds and recompiles only the files that changed.
+"""
+
+import glob
+import logging
+import os
+import string
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "templates")
+
+GENERIC_PLAN = "1. Navigate to LinkedIn\n2. Perform the requested action"
+
+Renderer = Callable[[Mapping], str]
+Step = Union[str, Mapping]
+
+_formatter = string.Formatter()
+
+
+def _field_names(text: str) -> Tuple[str, ...]:
+    """Return the root parameter names referenced by a format string."""
+    names = []
+    for _, field_name, _, _ in _formatter.parse(text):
+        if field_name is None:
+            continue
+        if not field_name:
+            raise ValueError(f"Positional placeholder '{{}}' is not allowed in template step: {text!r}")
+        names.append(field_name.split(".", 1)[0].split("[", 1)[0])
+    return tuple(names)
+
+
+def _render_value(value):
+    if isinstance(value, (list, tuple)):
+        return " and ".join(str(item) for item in value)
+    return value
+
+
+def compile_template(steps: Iterable[Step], defaults: Optional[Mapping] = None, name: str = "<inline>") -> Renderer:
+    """
+    Compile template steps into a render callable.
+
+    Placeholders are checked here rather than at render time: every
+    parameter a step references must have a default or be guarded by the
+    step's own ``when`` condition, so rendering can never raise KeyError.
+
+    Args:
+        steps: Step strings or mappings with "text" and optional "when"/"unless"
+        defaults: Values used for parameters missing from a render call
+        name: Template name used in error messages
+
+    Returns:
+        A function rendering a parameter mapping into numbered steps
+
+    Raises:
+        ValueError: If a step is malformed or references an undefined parameter
+    """
+    base = {key: _render_value(value) for key, value in (defaults or {}).items()}
+    compiled = []
+    for index, step in enumerate(steps, start=1):
+        if isinstance(step, str):
+            text, when, unless = step, None, None
+        elif isinstance(step, Mapping) and isinstance(step.get("text"), str):
+            text, when, unless = step["text"], step.get("when"), step.get("unless")
+        else:
+            raise ValueError(f"Template '{name}' step {index} must be a string or a mapping with 'text'")
+
+        for field_name in _field_names(text):
+            if field_name not in base and field_name != when:
+                raise ValueError(
+                    f"Template '{name}' step {index} uses {{{field_name}}} without a default or 'when: {field_name}'"
+                )
+        compiled.append((text, when, unless))
+
+    if not compiled:
+        raise ValueError(f"Template '{name}' has no steps")
+
+    if not any(when or unless for _, when, unless in compiled):
+        # Unconditional plans are numbered once and rendered with a single format call
+        plan = "\n".join(f"{number}. {text}" for number, (text, _, _) in enumerate(compiled, start=1))
+
+        def render(parameters: Mapping) -> str:
+            context = dict(base)
+            for key, value in parameters.items():
+                if value is not None:
+                    context[key] = _render_value(value)
+            return plan.format_map(context)
+
+        return render
+
+    steps_table = tuple(compiled)
+
+    def render_conditional(parameters: Mapping) -> str:
+        context = dict(base)
+        for key, value in parameters.items():
+            if value is not None:
+                context[key] = _render_value(value)
+        lines = []
+        for text, when, unless in steps_table:
+            if when and not context.get(when):
+                continue
+            if unless and context.get(unless):
+                continue
+            lines.append(f"{len(lines) + 1}. {text.format_map(context)}")
+        return "\n".join(lines)
+
+    return render_conditional
+
+
+def load_template_file(path: str) -> Tuple[str, Renderer]:
+    """
+    Parse and compile one template file.
+
+    Returns:
+        Tuple of (intent name, render callable)
+
+    Raises:
+        ValueError: If the file is not a valid template definition
+    """
+    with open(path, "r", encoding="utf-8") as handle:
+        document = yaml.safe_load(handle)
+
+    if not isinstance(document, Mapping):
+        raise ValueError(f"Template file {path} must contain a mapping")
+
+    intent = document.get("intent") or os.path.splitext(os.path.basename(path))[0]
+    defaults = document.get("defaults") or {}
+    if not isinstance(defaults, Mapping):
+        raise ValueError(f"Template file {path}: 'defaults' must be a mapping")
+    steps = document.get("steps")
+    if not isinstance(steps, list):
+        raise ValueError(f"Template file {path}: 'steps' must be a list")
+
+    return intent, compile_template(steps, defaults, name=intent)
+
+
+class TemplateStore:
+    """
+    Compiled templates loaded from a directory of YAML files.
+
+    Lookups are plain dict reads. Every ``check_interval`` seconds the next
+    lookup stats the directory and recompiles changed files; a file that
+    fails to compile is logged and its previous version keeps serving.
+    """
+
+    def __init__(self, directory: str = TEMPLATE_DIR, check_interval: float = 1.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._templates: Dict[str, Renderer] = {}
+        # path -> (mtime_ns, size, intent)
+        self._files: Dict[str, Tuple[int, int, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self.reload()
+
+    def _template_paths(self):
+        patterns = (os.path.join(self.directory, "*.yaml"), os.path.join(self.directory, "*.yml"))
+        return sorted(path for pattern in patterns for path in glob.glob(pattern))
+
+    def reload(self) -> bool:
+        """
+        Recompile template files added or changed since the last check.
+
+        Returns:
+            True if any template was added, changed or removed
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            templates = dict(self._templates)
+            files = {}
+            changed = False
+
+            for path in self._template_paths():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                previous = self._files.get(path)
+                if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                    files[path] = previous
+                    continue
+
+                try:
+                    intent, renderer = load_template_file(path)
+                except (OSError, ValueError, yaml.YAMLError) as e:
+                    logger.error(f"Failed to load template {path}: {e}")
+                    # Keep serving the last good version; retry once the file changes again
+                    files[path] = (stat.st_mtime_ns, stat.st_size, previous[2] if previous else None)
+                    continue
+
+                if previous and previous[2] and previous[2] != intent:
+                    templates.pop(previous[2], None)
+                templates[intent] = renderer
+                files[path] = (stat.st_mtime_ns, stat.st_size, intent)
+                changed = True
+                logger.debug(f"Compiled template '{intent}' from {path}")
+
+            for path, (_, _, intent) in self._files.items():
+                if path not in files and intent:
+                    templates.pop(intent, None)
+                    changed = True
+
+            # Swap in the new tables in one assignment so readers never see a partial update
+            self._templates = templates
+            self._files = files
+            return changed
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() >= self._next_check:
+            self.reload()
+
+    def get(self, intent: str) -> Optional[Renderer]:
+        """Return the compiled renderer for an intent, or None if none is defined."""
+        self._maybe_reload()
+        return self._templates.get(intent)
+
+    def render(self, intent: str, parameters: Mapping) -> Optional[str]:
+        """Render an intent's plan, or return None if the intent has no template."""
+        renderer = self.get(intent)
+        return renderer(parameters) if renderer else None
+
+    @property
+    def intents(self) -> frozenset:
+        return frozenset(self._templates)
+
+    def __contains__(self, intent: str) -> bool:
+        return intent in self._templates
+
+
+@lru_cache(maxsize=1)
+def get_shared_template_store() -> TemplateStore:
+    """Return the process-wide store for the bundled config/templates directory."""
+    return TemplateStore()
+
+
+def template_renderer(intent: str) -> Renderer:
+    """
+    Return a renderer that always uses the current shared template for an intent.
+
+    The lookup happens per call, so edits to the YAML file are picked up
+    without re-registering the intent.
+    """
+    def render(parameters: Mapping) -> str:
+        rendered = get_shared_template_store().render(intent, parameters)
+        return GENERIC_PLAN if rendered is None else rendered
+
+    return render
@@ -0,0 +1,12 @@
+"""
+Shared test configuration.
+
+Process-wide stores default to files under ~/.linkedin_ai_agent; tests
+keep them in memory so a test run never touches the user's data.
+"""
+
+import os
+
+os.environ["SEEN_POSTS_DB_PATH"] = ":memory:"
+os.environ["HIGH_WATER_MARKS_DB_PATH"] = ":memory:"
+os.environ.pop("NEAR_DUPLICATE_INDEX_PATH", None)
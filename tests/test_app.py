@@ -242,3 +242,25 @@ def test_old_endpoints_removed(client):
     # Assert
     assert parse_response.status_code == 404
     assert process_response.status_code == 404
+
+
+@patch('app.Harvester')
+@patch('app.PromptTransformer')
+def test_incremental_request_harvests_against_topic_feed(mock_transformer_class, mock_harvester_class, client):
+    """
+    An 'incremental' request harvests against the high-water mark of its topic's search.
+    """
+    mock_transformer_class.return_value.enhance_prompt.return_value = "Enhanced: Fetch posts about AI"
+    mock_harvester = MagicMock()
+    mock_harvester.harvest = AsyncMock(return_value="Done")
+    mock_harvester_class.return_value = mock_harvester
+
+    client.post('/api/process', json={'prompt': 'Fetch 5 posts about AI Agents', 'execute_immediately': True,
+                                      'incremental': True})
+    client.post('/api/process', json={'prompt': 'Fetch 5 posts about AI Agents', 'execute_immediately': True})
+
+    incremental, interactive = mock_harvester.harvest.await_args_list
+    assert incremental.kwargs['feed'] == 'search:ai agents' and incremental.kwargs['command'].topic == 'AI Agents'
+    assert interactive.kwargs['feed'] is None
+    assert mock_harvester_class.call_args_list[0].kwargs['skip_seen'] is True
+    assert mock_harvester_class.call_args_list[1].kwargs['skip_seen'] is False
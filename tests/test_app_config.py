@@ -0,0 +1,185 @@
+"""
+Tests for the typed, hot-reloadable configuration.
+"""
+
+import os
+import time
+
+import pytest
+
+import app_config
+from app_config import AppConfig, ConfigStore, interpolate
+
+SETTINGS = """
+openai_api_key: ${TEST_API_KEY}
+mode_default: supervised
+scroll_limit: 10
+post_limit: 3
+chrome:
+  debug_port: ${TEST_CDP_PORT:-9333}
+  connection_timeout: 2.5
+web:
+  port: 8080
+"""
+
+
+def _write(path, text):
+    """Write a file and move its mtime forward, so back-to-back edits are seen as changes."""
+    path.write_text(text)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setenv("TEST_API_KEY", "sk-secret")
+    monkeypatch.delenv("TEST_CDP_PORT", raising=False)
+    settings, filters, persona = tmp_path / "settings.yaml", tmp_path / "filters.yaml", tmp_path / "persona.md"
+    _write(settings, SETTINGS)
+    _write(filters, "keywords: [AI]\nmin_likes: 5\n")
+    _write(persona, "Analytical")
+    return settings, filters, persona
+
+
+class TestInterpolate:
+    """Test cases for environment variable references."""
+
+    def test_references(self):
+        environ = {"KEY": "sk-1", "PORT": "8000", "FLAG": "true", "EMPTY": ""}
+        document = {"key": "${KEY}", "url": "http://host:${PORT}/x", "port": "${PORT}", "flag": "${FLAG}",
+                    "default": "${MISSING:-7}", "missing": "${MISSING}", "empty": "${EMPTY:-fallback}",
+                    "list": ["${KEY}", 3], "plain": "no refs"}
+        assert interpolate(document, environ) == {
+            "key": "sk-1", "url": "http://host:8000/x", "port": 8000, "flag": True, "default": 7,
+            "missing": None, "empty": "fallback", "list": ["sk-1", 3], "plain": "no refs"}
+
+    def test_whole_reference_stays_scalar(self):
+        assert interpolate("${VALUE}", {"VALUE": "a: b"}) == "a: b"
+        assert interpolate("${VALUE}", {"VALUE": "[1, 2"}) == "[1, 2"
+
+
+class TestAppConfig:
+    """Test cases for validating config documents."""
+
+    def test_loads_repo_config(self):
+        config = ConfigStore().config
+        assert config.chrome.cdp_url == "http://localhost:9222"
+        assert (config.web.port, config.scroll_limit, config.post_limit) == (5000, 30, 5)
+        assert config.filters.min_likes == 20 and config.ranking.post_limit == 5
+        assert "Persona" in config.persona
+
+    def test_defaults(self):
+        assert AppConfig.from_documents({}) == AppConfig()
+
+    def test_rate_limits_from_the_environment(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_RPM", "5000")
+        monkeypatch.setenv("OPENAI_TPM", "800000")
+        limits = ConfigStore().config.rate_limits
+        assert dict(limits.models)["gpt-4o"].tpm == 800_000
+        assert limits.default.rpm == 5000
+
+    @pytest.mark.parametrize("settings", [
+        {"mode_default": "reckless"},
+        {"scroll_limit": 0},
+        {"scroll_limit": "30"},
+        {"engagement_types": "like"},
+        {"chrome": {"debug_port": 70000}},
+        {"chrome": {"connection_timeout": 0}},
+        {"chrome": {"max_retries": 0}},
+        {"web": ["port"]},
+        {"post_limit": -1},
+        {"rate_limits": {"default": {"rpm": -1, "tpm": 1}}},
+    ])
+    def test_invalid_settings(self, settings):
+        with pytest.raises(ValueError):
+            AppConfig.from_documents(settings)
+
+    def test_invalid_filters(self):
+        with pytest.raises(ValueError):
+            AppConfig.from_documents({}, {"min_likes": -1})
+
+
+class TestConfigStore:
+    """Test cases for loading and hot reloading."""
+
+    def test_loads_and_interpolates(self, files):
+        config = ConfigStore(*map(str, files)).config
+        assert config.openai_api_key == "sk-secret"
+        assert config.chrome.debug_port == 9333 and config.chrome.connection_timeout == 2.5
+        assert config.web.port == 8080 and config.post_limit == 3
+        assert config.filters.keywords == ("AI",) and config.persona == "Analytical"
+
+    def test_reload_swaps_on_change_only(self, files):
+        settings, filters, _ = files
+        store = ConfigStore(*map(str, files))
+        before = store.config
+        assert not store.reload() and store.config is before
+        _write(filters, "min_likes: 50\n")
+        assert store.reload()
+        assert store.config.filters.min_likes == 50 and store.config.filters.keywords == ()
+        assert store.config.scroll_limit == before.scroll_limit and store.reloads == 1
+
+    def test_parses_unchanged_files_once(self, files, monkeypatch):
+        settings, filters, _ = files
+        store = ConfigStore(*map(str, files))
+        loads = []
+        original = app_config.yaml.safe_load
+        monkeypatch.setattr(app_config.yaml, "safe_load", lambda text: loads.append(text) or original(text))
+        _write(filters, "min_likes: 1\n")
+        assert store.reload()
+        # Only the edited file is parsed again (scalars from interpolation aside)
+        assert "min_likes: 1\n" in loads and SETTINGS not in loads
+
+    def test_invalid_edit_keeps_last_good_config(self, files):
+        settings, _, _ = files
+        store = ConfigStore(*map(str, files))
+        before = store.config
+        _write(settings, "scroll_limit: -5\n")
+        assert not store.reload() and store.config is before
+        _write(settings, "scroll_limit: [\n")
+        assert not store.reload() and store.config is before
+        _write(settings, "scroll_limit: 12\n")
+        assert store.reload() and store.config.scroll_limit == 12
+
+    def test_missing_optional_files(self, files, tmp_path):
+        settings, _, _ = files
+        store = ConfigStore(str(settings), str(tmp_path / "none.yaml"), str(tmp_path / "none.md"))
+        assert store.config.filters == AppConfig().filters and store.config.persona == ""
+        with pytest.raises(FileNotFoundError):
+            ConfigStore(str(tmp_path / "none.yaml"))
+
+    def test_listeners(self, files):
+        settings, _, _ = files
+        store = ConfigStore(*map(str, files))
+        seen = []
+        store.subscribe(lambda config: seen.append(config.scroll_limit))
+        store.subscribe(lambda config: 1 / 0)
+        _write(settings, "scroll_limit: 7\n")
+        assert store.reload()
+        assert seen == [7]
+
+    def test_watch_reloads(self, files):
+        settings, _, _ = files
+        store = ConfigStore(*map(str, files))
+        store.watch(interval=0.01)
+        try:
+            _write(settings, "scroll_limit: 99\n")
+            deadline = time.monotonic() + 5
+            while store.config.scroll_limit != 99 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert store.config.scroll_limit == 99
+        finally:
+            store.stop()
+
+    def test_shared_store_reads_env_paths(self, files, monkeypatch):
+        settings, filters, persona = files
+        monkeypatch.setenv("SETTINGS_PATH", str(settings))
+        monkeypatch.setenv("FILTERS_PATH", str(filters))
+        monkeypatch.setenv("PERSONA_PATH", str(persona))
+        monkeypatch.setenv("CONFIG_RELOAD_INTERVAL", "0")
+        app_config.get_shared_config_store.cache_clear()
+        try:
+            assert app_config.get_config().web.port == 8080
+            assert app_config.get_shared_config_store()._watcher is None
+        finally:
+            app_config.get_shared_config_store.cache_clear()
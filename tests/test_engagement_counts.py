@@ -0,0 +1,90 @@
+"""
+Tests for engagement count parsing.
+"""
+
+import numpy as np
+import pytest
+
+from engagement_counts import MISSING, LOCALES, fill_counts, format_count, get_locale, parse_count, parse_counts
+
+# (rendered text, locale, expected count) as scraped from the feed in each UI language
+CORPUS = [
+    ("0", "en", 0),
+    ("1,204", "en", 1204),
+    ("1.2K", "en", 1200),
+    ("2.5k reactions", "en", 2500),
+    ("3M", "en", 3_000_000),
+    ("1,234,567 views", "en", 1_234_567),
+    ("12 comments", "en", 12),
+    ("1 repost", "en", 1),
+    ("Jane Doe and 41 others", "en", 42),
+    ("1.204", "de", 1204),
+    ("1,2 Tsd.", "de", 1200),
+    ("3 Mio.", "de", 3_000_000),
+    ("Anna und 3 weitere", "de", 4),
+    ("1 204 commentaires", "fr", 1204),
+    ("1 204", "fr", 1204),
+    ("1,5 k", "fr", 1500),
+    ("Anne et 1 204 autres", "fr", 1205),
+    ("12 mil", "es", 12_000),
+    ("Ana y 5 personas más", "es", 6),
+    ("1,5 mi", "pt", 1_500_000),
+    ("2.431 comentários", "pt", 2431),
+]
+
+
+class TestParseCount:
+    """Test cases for single rendered counts."""
+
+    @pytest.mark.parametrize("text, locale, expected", CORPUS)
+    def test_corpus(self, text, locale, expected):
+        assert parse_count(text, locale) == expected
+
+    @pytest.mark.parametrize("text, locale", [
+        ("", "en"), ("Like", "en"), ("1.204", "en"), ("1,2", "en"), ("1,2", "de-DE"),
+    ])
+    def test_unparseable(self, text, locale):
+        assert parse_count(text, locale) is None
+
+    def test_locale_variants(self):
+        assert get_locale("pt_BR") is LOCALES["pt"]
+        assert parse_count("1.204", "de-AT") == 1204
+        with pytest.raises(ValueError):
+            get_locale("xx")
+
+
+class TestRoundTrip:
+    """Test cases for format_count -> parse_count."""
+
+    @pytest.mark.parametrize("locale", sorted(LOCALES))
+    @pytest.mark.parametrize("value", [0, 7, 999, 1000, 1204, 99_999, 1_250_000, 3_000_000_000])
+    def test_exact_round_trip(self, locale, value):
+        assert parse_count(format_count(value, locale), locale) == value
+
+    @pytest.mark.parametrize("locale", sorted(LOCALES))
+    @pytest.mark.parametrize("value, lower_bound", [(999, 999), (1204, 1200), (1_250_000, 1_200_000), (3_000_000_000, 3_000_000_000)])
+    def test_compact_round_trip_truncates(self, locale, value, lower_bound):
+        assert parse_count(format_count(value, locale, compact=True), locale) == lower_bound
+
+
+class TestBatch:
+    """Test cases for batch parsing and record filling."""
+
+    def test_parse_counts(self):
+        values = ["1.2K", None, 5, "1.2K", "junk", "12 comments"]
+        result = parse_counts(values)
+        assert result.dtype == np.int64
+        assert result.tolist() == [1200, MISSING, 5, 1200, MISSING, 12]
+
+    def test_parse_counts_matches_corpus(self):
+        for locale in LOCALES:
+            rows = [(text, expected) for text, row_locale, expected in CORPUS if row_locale == locale]
+            assert parse_counts([text for text, _ in rows], locale).tolist() == [expected for _, expected in rows]
+
+    def test_fill_counts(self):
+        records = [{"likes_count": "1,204", "comments_count": "3 comments", "views_count": None},
+                   {"likes_count": 7, "comments_count": "n/a"}]
+        filled = fill_counts(records)
+        assert filled == [{"likes_count": 1204, "comments_count": 3, "views_count": None},
+                          {"likes_count": 7, "comments_count": None}]
+        assert records[0]["likes_count"] == "1,204"
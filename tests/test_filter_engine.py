@@ -0,0 +1,195 @@
+"""
+Tests for the rule-based filter engine.
+"""
+
+import numpy as np
+import pytest
+
+import app_config
+import filter_engine
+from app_config import AppConfig, ConfigStore
+from filter_engine import FilterEngine, FilterRules, KeywordMatcher, content_type_masks, phrase_pattern
+from keyword_index import KeywordIndex
+from models import FetchedPost
+from post_batch import PostBatch
+
+
+def _post(i, text, likes=50, comments=10, headline=None, url=None, timestamp="2h", author="Jane Doe"):
+    return FetchedPost(
+        post_id=f"urn:li:activity:{7200000000000000000 + i}",
+        post_url=url or f"https://www.linkedin.com/feed/update/urn:li:activity:{7200000000000000000 + i}/",
+        author_name=author,
+        author_url=f"https://www.linkedin.com/in/{author.split()[0].lower()}/",
+        author_headline=headline,
+        content_text=text,
+        posted_timestamp_str=timestamp,
+        likes_count=likes,
+        comments_count=comments,
+    )
+
+
+@pytest.fixture
+def posts():
+    return [
+        _post(0, "Our AI strategy for 2025"),
+        _post(1, "Notes on systems\nthinking", likes=5),
+        _post(2, "Said nothing relevant", comments=None),
+        _post(3, "FAIR play: the air is clean"),
+        _post(4, "Long read on AI", url="https://www.linkedin.com/pulse/long-read-jane-doe/"),
+        _post(5, "Buy our AI tool", timestamp="Promoted"),
+    ]
+
+
+@pytest.fixture
+def rules():
+    return FilterRules.from_mapping({
+        "keywords": ["AI", "strategy", "systems thinking"],
+        "min_likes": 20,
+        "min_comments": 5,
+        "content_type_whitelist": ["article", "post"],
+    })
+
+
+class TestFilterRules:
+    """Test cases for loading rules."""
+
+    def test_loads_repo_config(self):
+        rules = ConfigStore().config.filters
+        assert rules.keywords == ("AI", "strategy", "systems thinking")
+        assert (rules.min_likes, rules.min_comments) == (20, 5)
+        assert rules.content_type_whitelist == ("article", "post")
+        assert rules.author_class is None and not rules.author_following_only
+
+    def test_defaults_for_missing_keys(self):
+        assert FilterRules.from_mapping({}) == FilterRules()
+
+    @pytest.mark.parametrize("document", [{"keywords": "AI"}, {"min_likes": -1}, {"min_comments": "5"}])
+    def test_invalid_rules(self, document):
+        with pytest.raises(ValueError):
+            FilterRules.from_mapping(document)
+
+
+class TestMatching:
+    """Test cases for the vectorised rule masks."""
+
+    def test_phrase_pattern(self):
+        pattern = phrase_pattern(["AI", "systems thinking", " "])
+        assert pattern.search("systems   thinking")
+        assert pattern.search("ai-first")
+        assert not pattern.search("FAIR air")
+        assert phrase_pattern([]) is None
+
+    @pytest.mark.parametrize("prefix", ["", "İstanbul: "])
+    def test_keyword_matcher(self, prefix):
+        # "İ" lower-cases to two characters, which forces the single-pattern path
+        texts = [prefix + "about AI", "SAID again", "Systems\tThinking_x", "systems  THINKING.", "strategy"]
+        batch = PostBatch.from_records([{"post_id": str(i), "content_text": text} for i, text in enumerate(texts)])
+        matcher = KeywordMatcher(["AI", "systems thinking"])
+        assert matcher.rows(batch.column("content_text")).tolist() == [True, False, False, True, False]
+        assert not KeywordMatcher([]).rows(batch.column("content_text")).any()
+
+    def test_content_types(self, posts):
+        masks = content_type_masks(PostBatch.from_posts(posts))
+        assert np.flatnonzero(masks["article"]).tolist() == [4]
+        assert np.flatnonzero(masks["ad"]).tolist() == [5]
+        assert np.flatnonzero(masks["post"]).tolist() == [0, 1, 2, 3]
+
+
+class TestFilterEngine:
+    """Test cases for applying compiled rules."""
+
+    def test_survivors_and_rejections(self, posts, rules):
+        result = FilterEngine(rules).apply(posts)
+        assert [post.post_id for post in result.batch] == [posts[0].post_id, posts[4].post_id]
+        assert result.mask.tolist() == [True, False, False, False, True, False]
+        # Each rule counts only the posts it saw: the ad never reaches the keyword scan
+        assert result.order == ["min_likes", "min_comments", "content_type_whitelist", "keywords"]
+        assert result.rejected == {"min_likes": 1, "min_comments": 1, "content_type_whitelist": 1, "keywords": 1}
+        assert result.evaluated == {"min_likes": 6, "min_comments": 5, "content_type_whitelist": 4, "keywords": 3}
+        assert (result.total, result.passed) == (6, 2)
+
+    def test_accepts_batches_and_dicts(self, posts, rules):
+        engine = FilterEngine(rules)
+        from_batch = engine.apply(PostBatch.from_posts(posts)).mask
+        dicts = [post.model_dump(mode="json") for post in posts]
+        assert engine.filter_posts(dicts) == [dicts[0], dicts[4]]
+        assert from_batch.tolist() == engine.apply(dicts).mask.tolist()
+        assert engine.filter_posts([]) == []
+
+    def test_accepts_mixed_models_and_dicts(self, posts, rules):
+        engine = FilterEngine(rules)
+        mixed = [post.model_dump(mode="json") if i % 2 else post for i, post in enumerate(posts)]
+        assert engine.apply(mixed).mask.tolist() == engine.apply(posts).mask.tolist()
+        assert engine.filter_posts(mixed) == [mixed[0], mixed[4]]
+        assert engine.filter_posts(list(reversed(mixed))) == [mixed[4], mixed[0]]
+
+    def test_no_rules_keeps_everything(self, posts):
+        result = FilterEngine(FilterRules()).apply(posts)
+        assert result.passed == len(posts) and result.rejected == {}
+
+    def test_author_class(self, posts):
+        posts[0] = _post(0, "x", headline="Founder & CEO at Acme")
+        posts[1] = _post(1, "y", headline="Software Engineer")
+        engine = FilterEngine(FilterRules(author_class="ceo"))
+        assert engine.apply(posts).mask.tolist() == [True] + [False] * 5
+
+    def test_author_following_only(self, posts):
+        posts[2] = _post(2, "z", author="Ada Lovelace")
+        rules = FilterRules(author_following_only=True)
+        assert "author_following_only" not in FilterEngine(rules).rule_names
+        engine = FilterEngine(rules, following=["https://www.linkedin.com/in/ada"])
+        assert engine.apply(posts).mask.tolist() == [False, False, True, False, False, False]
+
+    def test_keyword_index(self, posts, rules):
+        index = KeywordIndex()
+        engine = FilterEngine(rules, keyword_index=index)
+        assert engine.apply(posts).mask.tolist() == FilterEngine(rules).apply(posts).mask.tolist()
+        # Only posts that reached the keyword rule were indexed
+        assert len(index) == 3
+
+    def test_shared_engine_follows_config(self, monkeypatch):
+        config = AppConfig(filters=FilterRules(keywords=("climate",), min_likes=1))
+        monkeypatch.setattr(app_config, "get_config", lambda: config)
+        engine = filter_engine.get_shared_filter_engine()
+        assert engine.rule_names == ["min_likes", "keywords"]
+        assert filter_engine.get_shared_filter_engine() is engine
+        config = AppConfig(filters=FilterRules(min_likes=1))
+        assert filter_engine.get_shared_filter_engine().rule_names == ["min_likes"]
+
+
+class TestPipeline:
+    """Test cases for short-circuiting and adaptive ordering."""
+
+    def test_expensive_predicates_see_only_survivors(self, posts, rules):
+        engine = FilterEngine(rules)
+        seen = []
+
+        def relevance(batch):
+            seen.extend(batch.column("post_id").values())
+            return np.ones(len(batch), dtype=bool)
+
+        engine.add_predicate("relevance", relevance)
+        result = engine.apply(posts)
+        assert result.order[-1] == "relevance"
+        assert seen == [posts[0].post_id, posts[4].post_id]
+        with pytest.raises(ValueError):
+            engine.add_predicate("relevance", relevance)
+
+    def test_order_adapts_to_measured_selectivity(self, posts):
+        engine = FilterEngine(FilterRules())
+        engine.add_predicate("keeps_all", lambda batch: np.ones(len(batch), dtype=bool), cost=1e-6, pass_rate=0.1)
+        engine.add_predicate("rejects_most", lambda batch: batch.activity_ids() % 3 == 0, cost=1e-6, pass_rate=0.9)
+        assert engine.order() == ["keeps_all", "rejects_most"]
+        for _ in range(20):
+            engine.apply(posts)
+        assert engine.order() == ["rejects_most", "keeps_all"]
+        stats = engine.stats()
+        assert list(stats) == ["rejects_most", "keeps_all"]
+        assert stats["keeps_all"]["pass_rate"] == pytest.approx(1.0, abs=0.05)
+        assert stats["rejects_most"]["rejected"] == 20 * 4
+
+    def test_matches_full_evaluation(self, posts, rules):
+        engine = FilterEngine(rules)
+        full = np.logical_and.reduce(list(engine.masks(PostBatch.from_posts(posts)).values()))
+        assert engine.apply(posts).mask.tolist() == full.tolist()
+        assert FilterEngine(rules).apply([]).passed == 0
@@ -0,0 +1,113 @@
+"""
+Tests for pushing filter rules down into the harvest.
+"""
+
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import filter_pushdown
+from app_config import ConfigStore
+from filter_engine import FilterRules
+from filter_pushdown import PushdownMetrics, agent_steps, plan_pushdown, search_query, search_url
+
+
+class TestSearch:
+    """Test cases for building the content search."""
+
+    def test_query_quotes_phrases(self):
+        assert search_query(["AI", "systems thinking"]) == 'AI OR "systems thinking"'
+        assert search_query(['"quoted"  words', " "]) == '"quoted words"'
+
+    def test_query_with_topic(self):
+        assert search_query(["AI", "strategy"], topic="product  management") == "product management AND (AI OR strategy)"
+        assert search_query(["AI"], topic="leadership") == "leadership AND AI"
+        assert search_query([], topic="leadership") == "leadership"
+
+    def test_url_parameters(self):
+        url = search_url('AI OR "systems thinking"', following_only=True)
+        assert url.startswith(filter_pushdown.SEARCH_URL)
+        parameters = parse_qs(urlparse(url).query)
+        assert parameters["keywords"] == ['AI OR "systems thinking"']
+        assert parameters["postedBy"] == ['["following"]']
+        assert parameters["sortBy"] == ['"date_posted"']
+        assert "postedBy" not in parse_qs(urlparse(search_url("AI")).query)
+
+
+class TestPlanPushdown:
+    """Test cases for deciding which rules the harvest enforces."""
+
+    def test_repo_rules(self):
+        plan = plan_pushdown(ConfigStore().config.filters)
+        assert set(plan.pushed) == {"keywords", "content_type_whitelist", "min_likes", "min_comments"}
+        assert plan.residual == ()
+        assert "systems+thinking" in plan.search_url
+        section = plan.prompt_section()
+        assert section.startswith("HARVEST FILTERS:")
+        assert plan.search_url in section
+        assert "fewer than 20 reactions or fewer than 5 comments" in section
+        assert "Promoted" in section and "pulse" not in section
+
+    def test_topic_joins_the_search(self):
+        plan = plan_pushdown(FilterRules(keywords=("AI",), min_likes=3), topic="leadership")
+        assert parse_qs(urlparse(plan.search_url).query)["keywords"] == ["leadership AND AI"]
+
+    @pytest.mark.parametrize("scope", [{"author": "Jane Doe"}, {"search": False}])
+    def test_search_only_for_feed_or_topic_harvests(self, scope):
+        plan = plan_pushdown(FilterRules(keywords=("AI",), author_following_only=True, min_likes=3), topic="AI", **scope)
+        assert plan.search_url is None
+        assert plan.pushed == ("min_likes",) and plan.residual == ("keywords", "author_following_only")
+        section = plan.prompt_section()
+        assert "search" not in section and "fewer than 3 reactions" in section
+
+    def test_nothing_to_push(self):
+        plan = plan_pushdown(FilterRules())
+        assert plan.search_url is None and plan.pushed == () and plan.prompt_section() == ""
+
+    def test_following_only_searches_without_keywords(self):
+        plan = plan_pushdown(FilterRules(author_following_only=True))
+        assert plan.pushed == ("author_following_only",)
+        assert parse_qs(urlparse(plan.search_url).query)["postedBy"] == ['["following"]']
+
+    def test_content_types(self):
+        posts_only = plan_pushdown(FilterRules(content_type_whitelist=("post",)))
+        assert "pulse" in posts_only.prompt_section()
+        with_ads = plan_pushdown(FilterRules(content_type_whitelist=("post", "ad")))
+        assert with_ads.pushed == () and with_ads.residual == ("content_type_whitelist",)
+
+    def test_author_class(self):
+        plan = plan_pushdown(FilterRules(author_class="ceo", min_likes=3))
+        assert plan.pushed == ("min_likes", "author_class")
+        assert "fewer than 3 reactions" in plan.prompt_section()
+        assert "chief executive" in plan.prompt_section()
+
+
+class TestPushdownMetrics:
+    """Test cases for per-run step accounting."""
+
+    def test_steps_saved_per_run(self):
+        metrics = PushdownMetrics()
+        assert metrics.summary()["steps_saved_per_run"] is None
+        metrics.record(False, 30, posts=20, rejected=15)
+        metrics.record(False, 40, posts=20, rejected=12)
+        metrics.record(True, 12, posts=6, rejected=1)
+        metrics.record(True, None, posts=4, rejected=0)
+        summary = metrics.summary()
+        assert summary["not_pushed"]["steps_per_run"] == 35
+        assert summary["not_pushed"]["rejected_rate"] == pytest.approx(27 / 40)
+        assert summary["pushed"]["runs"] == 2 and summary["pushed"]["steps_per_run"] == 12
+        assert summary["steps_saved_per_run"] == 23
+
+    def test_agent_steps(self):
+        assert agent_steps(None, SimpleNamespace(number_of_steps=lambda: 7)) == 7
+        assert agent_steps(None, SimpleNamespace(history=[1, 2, 3])) == 3
+        assert agent_steps(SimpleNamespace(state=SimpleNamespace(n_steps=4)), ["post"]) == 4
+        assert agent_steps(None, "done") is None
+
+    def test_shared_metrics(self):
+        filter_pushdown.get_shared_pushdown_metrics.cache_clear()
+        try:
+            assert filter_pushdown.get_shared_pushdown_metrics() is filter_pushdown.get_shared_pushdown_metrics()
+        finally:
+            filter_pushdown.get_shared_pushdown_metrics.cache_clear()
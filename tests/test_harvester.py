@@ -152,3 +152,77 @@ async def test_harvester_returns_string_or_list(mock_agent_class):
     result2 = await harvester.harvest("Fetch posts about machine learning")
     assert isinstance(result2, list)
     assert len(result2) == 1
+
+
+@pytest.mark.asyncio
+@patch('harvester.Agent')
+async def test_harvester_marks_seen_after_filtering_and_records_actions(mock_agent_class):
+    """
+    Posts the filters reject are not marked seen, and an engagement command
+    records its actions against the posts the agent returned.
+    """
+    from filter_engine import FilterEngine, FilterRules
+    from interpreter import Command
+    from seen_posts import SeenPostIndex
+
+    posts = [{"post_id": f"urn:li:activity:{7200000000000000000 + i}", "author_name": "Jane Doe",
+              "content_text": f"Post {i}", "likes_count": likes} for i, likes in enumerate([50, 2])]
+    mock_agent_instance = MagicMock()
+    mock_agent_instance.run = AsyncMock(return_value=posts)
+    mock_agent_class.return_value = mock_agent_instance
+    seen = SeenPostIndex(":memory:")
+    command = Command(topic="AI", post_limit=2, engagement_type=["like"], is_valid=True, feedback="")
+
+    with patch('harvester.get_shared_seen_index', return_value=seen), \
+            patch.object(Harvester, '_get_browser_with_fallback', AsyncMock()):
+        harvester = Harvester(skip_seen=True, filters=FilterEngine(FilterRules(min_likes=10)))
+        assert await harvester.harvest("Fetch 2 posts about AI") == posts[:1]
+        assert posts[0]["post_id"] in seen and posts[1]["post_id"] not in seen
+
+        await harvester.harvest("Like 2 posts about AI", command=command)
+        assert all(seen.has_acted(post["post_id"], "like") for post in posts)
+
+
+@pytest.mark.asyncio
+@patch('harvester.Agent')
+async def test_harvester_ranks_fetched_posts(mock_agent_class):
+    """
+    With rank=True a fetch returns the best posts the command asked for, best first.
+    """
+    from interpreter import Command
+
+    posts = [{"post_id": f"urn:li:activity:{i}", "author_name": "Jane Doe", "content_text": f"Post {i}",
+              "likes_count": likes} for i, likes in enumerate([3, "1.2K", 40])]
+    mock_agent_instance = MagicMock()
+    mock_agent_instance.run = AsyncMock(return_value=posts)
+    mock_agent_class.return_value = mock_agent_instance
+    command = Command(topic="AI", post_limit=2, engagement_type=["fetch_posts"], is_valid=True, feedback="")
+
+    with patch.object(Harvester, '_get_browser_with_fallback', AsyncMock()):
+        result = await Harvester(rank=True).harvest("Fetch 2 posts about AI", command=command)
+
+    assert result == [posts[1], posts[2]]
+
+
+@pytest.mark.asyncio
+@patch('harvester.Agent')
+async def test_harvester_searches_only_for_topic_harvests(mock_agent_class):
+    """
+    Keyword rules redirect a topic harvest to a content search, but never a task of unknown shape.
+    """
+    from filter_engine import FilterEngine, FilterRules
+    from interpreter import Command
+
+    mock_agent_instance = MagicMock()
+    mock_agent_instance.run = AsyncMock(return_value="Done")
+    mock_agent_class.return_value = mock_agent_instance
+    command = Command(topic="leadership", post_limit=3, engagement_type=["fetch_posts"], is_valid=True, feedback="")
+
+    with patch.object(Harvester, '_get_browser_with_fallback', AsyncMock()):
+        harvester = Harvester(filters=FilterEngine(FilterRules(keywords=("AI",), min_likes=3)))
+        await harvester.harvest("Fetch 3 posts about leadership", command=command)
+        await harvester.harvest("Find AI researchers at YC companies and engage with their posts")
+
+    topic_task, other_task = (call.kwargs['task'] for call in mock_agent_class.call_args_list)
+    assert "search/results/content" in topic_task and "leadership+AND+AI" in topic_task
+    assert "search/results/content" not in other_task and "fewer than 3 reactions" in other_task
@@ -0,0 +1,107 @@
+"""
+Tests for incremental harvesting high-water marks.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from high_water_marks import (
+    HOME_FEED, MISSING, HighWaterMarkStore, activity_id, feed_key, incremental_instruction, posts_above,
+    urn_timestamp, urn_timestamps,
+)
+from models import FetchedPost
+from post_batch import PostBatch
+
+# Activity id created at 2024-06-01 12:00:00 UTC
+CREATED = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+BASE_ID = int(CREATED * 1000) << 22
+
+
+def _urn(offset_ms):
+    return f"urn:li:activity:{BASE_ID + (offset_ms << 22)}"
+
+
+def _post(offset_ms):
+    return FetchedPost(post_id=_urn(offset_ms), post_url=f"https://www.linkedin.com/feed/update/{_urn(offset_ms)}/",
+                       author_name="Jane Doe", content_text=f"Post at +{offset_ms} ms")
+
+
+@pytest.fixture
+def store():
+    with HighWaterMarkStore(":memory:") as store:
+        yield store
+
+
+class TestUrnTimestamps:
+    """Test cases for reading creation times from activity ids."""
+
+    def test_activity_id(self):
+        assert activity_id(f"https://www.linkedin.com/feed/update/{_urn(0)}/") == BASE_ID
+        assert activity_id("urn:li:ugcPost:42") == 42
+        assert activity_id("not-a-urn") is None
+        assert activity_id(None) is None
+
+    def test_timestamps(self):
+        assert urn_timestamp(BASE_ID) == CREATED
+        ids = np.array([BASE_ID, BASE_ID + (60_000 << 22), MISSING])
+        assert urn_timestamps(ids).tolist() == [CREATED, CREATED + 60, MISSING]
+
+    def test_matches_post_batch_ids(self):
+        batch = PostBatch.from_posts([_post(0), _post(5000)])
+        assert urn_timestamps(batch.activity_ids()).tolist() == [CREATED, CREATED + 5]
+
+    def test_feed_key(self):
+        assert feed_key() == feed_key("  ") == HOME_FEED
+        assert feed_key("Generative AI!") == feed_key("generative   ai") == "search:generative ai"
+
+
+class TestHighWaterMarkStore:
+    """Test cases for storing and advancing marks."""
+
+    def test_advance_only_moves_forward(self, store):
+        assert store.get(HOME_FEED) is None
+        mark = store.advance(HOME_FEED, [_urn(10), _urn(30), "no-urn", None, _urn(20)], updated_at=1.0)
+        assert (mark.post_id, mark.activity_id, mark.updated_at) == (_urn(30), BASE_ID + (30 << 22), 1.0)
+        assert store.advance(HOME_FEED, [_urn(25)]) is mark
+        assert store.advance(HOME_FEED, []) is mark
+        assert store.advance(HOME_FEED, [_urn(40)]).post_id == _urn(40)
+        assert store.get("search:ai") is None
+
+    def test_is_known(self, store):
+        mark = store.advance(HOME_FEED, [_urn(30)])
+        assert mark.is_known(_urn(30)) and mark.is_known(_urn(10))
+        assert not mark.is_known(_urn(31)) and not mark.is_known("no-urn")
+        assert mark.posted_at == pytest.approx(CREATED + 0.03)
+
+    def test_reset(self, store):
+        store.advance(HOME_FEED, [_urn(30)])
+        store.reset(HOME_FEED)
+        assert store.get(HOME_FEED) is None
+
+    def test_persists(self, tmp_path):
+        path = str(tmp_path / "agent.sqlite3")
+        with HighWaterMarkStore(path) as store:
+            store.advance("search:ai", [_urn(5)])
+        with HighWaterMarkStore(path) as reopened:
+            assert reopened.get("search:ai").post_id == _urn(5)
+
+
+class TestIncremental:
+    """Test cases for truncating harvests at the mark."""
+
+    def test_posts_above(self, store):
+        mark = store.advance(HOME_FEED, [_urn(20)])
+        posts = [_post(50), _post(20), _post(30), _post(10)]
+        undated = {"post_id": "no-urn", "content_text": "?"}
+        assert posts_above(posts + [undated], mark) == [posts[0], posts[2], undated]
+        assert posts_above(posts, None) == posts
+
+    def test_instruction(self, store):
+        assert incremental_instruction(None) == ""
+        mark = store.advance(HOME_FEED, [_urn(0)])
+        instruction = incremental_instruction(mark, patience=2)
+        assert str(BASE_ID) in instruction
+        assert "2024-06-01 12:00 UTC" in instruction
+        assert "2 known posts in a row" in instruction
@@ -116,7 +116,7 @@ class TestImmediateUIResponse:
         # Mock harvester with simple return value
         mock_harvester = MagicMock()
         
-        async def mock_harvest(prompt):
+        async def mock_harvest(prompt, **options):
             return [
                 {
                     'post_id': 'test123',
@@ -155,7 +155,7 @@ class TestImmediateUIResponse:
         # Mock harvester with simple return value
         mock_harvester = MagicMock()
         
-        async def mock_harvest(prompt):
+        async def mock_harvest(prompt, **options):
             return ["Execution completed successfully"]
         
         mock_harvester.harvest = mock_harvest
@@ -246,7 +246,7 @@ Important guidelines:
         # Step 2: Execute enhanced prompt
         mock_harvester = MagicMock()
         
-        async def mock_harvest(prompt):
+        async def mock_harvest(prompt, **options):
             return ["Connected successfully"]
         
         mock_harvester.harvest = mock_harvest
@@ -0,0 +1,86 @@
+"""
+Tests for the local naive Bayes intent classifier.
+"""
+
+import pytest
+
+from intent_classifier import (
+    NaiveBayesIntentClassifier,
+    TRAINING_EXAMPLES,
+    get_default_classifier,
+)
+from text_features import HashingVectorizer
+
+
+class TestNaiveBayesIntentClassifier:
+    """Test cases for NaiveBayesIntentClassifier."""
+
+    def test_default_classifier_covers_all_intents(self):
+        """The bundled corpus trains every template intent plus 'unknown'."""
+        classifier = get_default_classifier()
+        assert set(classifier.classes_) == {
+            "post_engagement", "comment_post", "connect_follow", "message",
+            "search_content", "visit_profile", "create_post", "data_extract",
+            "feed_collection", "unknown",
+        }
+
+    def test_default_classifier_fits_training_corpus(self):
+        """The trained model reproduces its own labels."""
+        classifier = get_default_classifier()
+        predictions = classifier.predict_many([prompt for prompt, _ in TRAINING_EXAMPLES])
+        correct = sum(p.intent == label for p, (_, label) in zip(predictions, TRAINING_EXAMPLES))
+        assert correct / len(TRAINING_EXAMPLES) > 0.95
+
+    @pytest.mark.parametrize("prompt,expected", [
+        ("Like 10 posts about fintech", "post_engagement"),
+        ("Comment on 3 posts about leadership", "comment_post"),
+        ("Connect with 4 engineers at Apple", "connect_follow"),
+        ("Scroll my feed for 5 minutes", "feed_collection"),
+        ("Export the list of my followers", "data_extract"),
+    ])
+    def test_predicts_unseen_prompts(self, prompt, expected):
+        """Paraphrases outside the corpus are classified with high confidence."""
+        prediction = get_default_classifier().predict(prompt)
+        assert prediction.intent == expected
+        assert prediction.confidence > 0.8
+
+    def test_predict_matches_batch_prediction(self):
+        """Sparse single-prompt scoring agrees with dense batch scoring."""
+        classifier = get_default_classifier()
+        prompts = ["Like 5 AI posts", "Tell me a joke"]
+        batch = classifier.predict_many(prompts)
+        for prompt, expected in zip(prompts, batch):
+            single = classifier.predict(prompt)
+            assert single.intent == expected.intent
+            assert single.confidence == pytest.approx(expected.confidence)
+
+    def test_probabilities_sum_to_one(self):
+        """predict_proba returns a normalized distribution per prompt."""
+        probabilities = get_default_classifier().predict_proba(["Like 3 posts about AI", ""])
+        assert probabilities.shape[0] == 2
+        assert probabilities.sum(axis=1) == pytest.approx([1.0, 1.0])
+
+    def test_untrained_classifier_raises(self):
+        """Predicting before fit() is an error."""
+        with pytest.raises(ValueError, match="not been trained"):
+            NaiveBayesIntentClassifier().predict("Like 3 posts about AI")
+
+    def test_fit_requires_examples(self):
+        """Training on an empty corpus is rejected."""
+        with pytest.raises(ValueError):
+            NaiveBayesIntentClassifier().fit([])
+
+
+class TestHashingVectorizer:
+    """Test cases for the hashed n-gram features."""
+
+    def test_vectors_are_stable_and_case_insensitive(self):
+        vectorizer = HashingVectorizer(n_features=1024)
+        first = vectorizer.transform_one("Like 5 posts about AI")
+        second = vectorizer.transform_one("like 5 POSTS about ai")
+        assert (first == second).all()
+        assert first.sum() > 0
+
+    def test_n_features_must_be_power_of_two(self):
+        with pytest.raises(ValueError):
+            HashingVectorizer(n_features=1000)
@@ -0,0 +1,104 @@
+"""
+Tests for the intent registry and its compiled renderers.
+"""
+
+import pytest
+
+from intent_registry import (
+    DEFAULT_INTENTS,
+    IntentRegistry,
+    IntentSpec,
+    build_default_registry,
+)
+from template_store import compile_template
+
+
+def _spec(name="follow_up", renderer=None, **kwargs):
+    return IntentSpec(
+        name=name,
+        keywords=kwargs.pop("keywords", ["follow up"]),
+        description="following up on earlier conversations",
+        renderer=renderer or compile_template(("Navigate to LinkedIn messaging", "Follow up with {target_person}"),
+                                              defaults={"target_person": "recent contacts"}),
+        **kwargs,
+    )
+
+
+class TestIntentRegistry:
+    """Test cases for IntentRegistry lookups."""
+
+    def test_default_registry_covers_all_intents(self):
+        registry = build_default_registry()
+        assert registry.names == {
+            "post_engagement", "comment_post", "connect_follow", "message",
+            "search_content", "visit_profile", "create_post", "data_extract",
+            "feed_collection",
+        }
+
+    def test_lookup_accepts_intent_and_template_names(self):
+        registry = build_default_registry()
+        assert registry.get("message") is registry.get("message_template")
+        assert registry.get("unknown") is None
+        assert registry.get("unknown_template") is None
+
+    def test_every_default_intent_renders_numbered_steps(self):
+        for spec in DEFAULT_INTENTS:
+            rendered = spec.render({})
+            assert rendered.startswith("1. Navigate to LinkedIn"), spec.name
+            assert "{" not in rendered, spec.name
+
+    def test_register_rebuilds_lookup_tables(self):
+        registry = build_default_registry()
+        registry.register(_spec())
+
+        assert "follow_up" in registry.names
+        assert registry.keywords["follow_up"] == ["follow up"]
+        assert "- follow_up: following up on earlier conversations" in registry.menu
+        assert registry.keyword_table[-1] == ("follow_up", ("follow up",))
+
+    def test_duplicate_registration_requires_replace(self):
+        registry = IntentRegistry([_spec()])
+        with pytest.raises(ValueError):
+            registry.register(_spec())
+        replacement = _spec(keywords=["chase up"])
+        registry.register(replacement, replace=True)
+        assert registry.get("follow_up") is replacement
+
+    def test_copy_is_independent(self):
+        registry = build_default_registry()
+        copied = registry.copy()
+        copied.register(_spec())
+        assert "follow_up" not in registry
+
+
+class TestIntentSpec:
+    """Test cases for IntentSpec validation and rendering."""
+
+    def test_spec_is_frozen(self):
+        spec = _spec()
+        with pytest.raises(AttributeError):
+            spec.name = "other"
+        with pytest.raises(TypeError):
+            spec.schema["count"] = str
+
+    def test_validate_coerces_llm_output(self):
+        spec = _spec()
+        params = spec.validate({"count": "3", "keywords": "AI", "target_person": None, "extra": 1})
+        assert params == {"count": 3, "keywords": ["AI"], "extra": 1}
+
+    def test_validate_drops_wrong_types(self):
+        spec = _spec()
+        assert spec.validate({"count": "three", "keywords": 5, "target_person": ["x"]}) == {}
+
+    def test_custom_schema_fields_are_validated(self):
+        spec = _spec(schema={"note": str})
+        assert spec.validate({"note": 42}) == {"note": "42"}
+
+    def test_post_engagement_keyword_string_is_not_split_into_letters(self):
+        rendered = build_default_registry().get("post_engagement").render({"count": 3, "keywords": "AI"})
+        assert "Search for 3 posts about AI" in rendered
+
+    def test_custom_renderer_uses_defaults_and_parameters(self):
+        spec = _spec()
+        assert spec.render({}) == "1. Navigate to LinkedIn messaging\n2. Follow up with recent contacts"
+        assert spec.render({"target_person": "Jane Doe"}).endswith("Follow up with Jane Doe")
@@ -3,6 +3,7 @@
 # This file contains the unit tests for the Prompt Interpreter.
 
 import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
 from interpreter import PromptInterpreter, Command
 
 # This test is designed to fail because we have not yet created the
@@ -89,3 +90,289 @@ def test_parse_fetch_posts_prompt():
     actual_command_implicit = interpreter.parse_prompt(prompt_implicit)
     assert actual_command_implicit == expected_command_implicit
 
+
+@pytest.mark.asyncio
+@patch('openai.AsyncOpenAI')
+async def test_parse_prompt_async_returns_parsed_command(mock_async_openai):
+    """The async path awaits the structured-output call and returns its Command."""
+    expected_command = Command(
+        topic="python programming",
+        post_limit=3,
+        engagement_type=["like", "share"],
+        is_valid=True,
+        feedback=""
+    )
+    completion = MagicMock()
+    completion.choices[0].message.parsed = expected_command
+    mock_client = MagicMock()
+    mock_client.beta.chat.completions.parse = AsyncMock(return_value=completion)
+    mock_async_openai.return_value = mock_client
+
+    interpreter = PromptInterpreter(api_key="sk-test", use_local_parser=False)
+    actual_command = await interpreter.parse_prompt_async("Like 3 posts on python programming and also share them.")
+
+    assert actual_command == expected_command
+    mock_client.beta.chat.completions.parse.assert_awaited_once()
+
+
+def test_parse_prompt_returns_within_latency_budget():
+    """A slow structured parse yields an invalid Command now and a cached Command later."""
+    import threading
+    import time
+    import interpreter as interpreter_module
+    from llm_guard import get_circuit_breaker
+
+    get_circuit_breaker("openai").reset()
+    expected_command = Command(
+        topic="remote work",
+        post_limit=4,
+        engagement_type=["like"],
+        is_valid=True,
+        feedback=""
+    )
+    completion = MagicMock()
+    completion.choices[0].message.parsed = expected_command
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow_parse(**kwargs):
+        release.wait(5)
+        finished.set()
+        return completion
+
+    with patch('interpreter.OpenAI') as mock_openai:
+        mock_openai.return_value.beta.chat.completions.parse.side_effect = slow_parse
+        interpreter = PromptInterpreter(api_key="sk-test", llm_budget=0.05)
+        prompt = "Like 4 posts about remote work, slowly"
+
+        start = time.perf_counter()
+        first = interpreter.parse_prompt(prompt)
+        assert time.perf_counter() - start < 1.0
+        assert first.is_valid is False
+        assert "not responding" in first.feedback
+
+        release.set()
+        assert finished.wait(5)
+        deadline = time.monotonic() + 5
+        while interpreter_module._get_cached_command((interpreter.MODEL, prompt)) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert interpreter.parse_prompt(prompt) == expected_command
+        mock_openai.return_value.beta.chat.completions.parse.assert_called_once()
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("Could you comment on 5 recent posts about systems thinking?",
+     Command(topic="systems thinking", post_limit=5, engagement_type=["comment"], is_valid=True, feedback="")),
+    ("Like 3 posts on python programming and also share them.",
+     Command(topic="python programming", post_limit=3, engagement_type=["like", "share"], is_valid=True, feedback="")),
+    ("Fetch 3 posts about 'generative AI'",
+     Command(topic="generative AI", post_limit=3, engagement_type=["fetch_posts"], is_valid=True, feedback="")),
+    ("Get me articles on 'quantum computing'",
+     Command(topic="quantum computing", post_limit=5, engagement_type=["fetch_posts"], is_valid=True, feedback="")),
+    ("Like and comment on three posts about climate tech",
+     Command(topic="climate tech", post_limit=3, engagement_type=["like", "comment"], is_valid=True, feedback="")),
+])
+def test_parse_command_locally_matches_system_prompt_examples(prompt, expected):
+    """Prompts in the common grammar parse to the Commands the system prompt's examples give."""
+    from interpreter import parse_command_locally
+
+    assert parse_command_locally(prompt) == expected
+
+
+def test_parse_command_locally_requires_count_for_engagement():
+    from interpreter import parse_command_locally
+
+    command = parse_command_locally("Comment on posts about fintech.")
+    assert command.is_valid is False
+    assert command.post_limit == 0
+    assert command.engagement_type == ["comment"]
+    assert command.feedback == "Please specify how many posts to comment on."
+    assert parse_command_locally("Like posts about AI").feedback == "Please specify how many posts to like."
+
+
+@pytest.mark.parametrize("prompt", [
+    "Like 5 posts.",
+    "Show me 2 things about marketing.",
+    "Engage with some posts about AI.",
+    "Like 4 posts about remote work, slowly",
+    "Find and like 3 posts about AI",
+    "Like 5 posts about AI from Sundar Pichai",
+    "Like 5 posts about AI and then message the authors",
+    "Like 500 posts about AI",
+    "Like 3 posts about AI with more than 100 likes",
+    "Comment on 2 posts about hiring where the author is a CEO",
+    "Share 2 posts about Python 3",
+    "Fetch 5 posts about AI from the last week",
+    "Like 3 posts about startups since yesterday",
+])
+def test_parse_command_locally_defers_ambiguous_prompts(prompt):
+    from interpreter import parse_command_locally
+
+    assert parse_command_locally(prompt) is None
+
+
+def test_parse_prompt_skips_llm_for_local_grammar():
+    """Simple prompts never reach the API; ambiguous ones still do."""
+    with patch('interpreter.OpenAI') as mock_openai:
+        parse = mock_openai.return_value.beta.chat.completions.parse
+        interpreter = PromptInterpreter(api_key="sk-test")
+
+        command = interpreter.parse_prompt("Fetch 10 posts about AI in healthcare.")
+        assert command.topic == "AI in healthcare"
+        assert command.post_limit == 10
+        parse.assert_not_called()
+
+        parse.return_value.choices[0].message.parsed = Command(
+            topic="AI", post_limit=0, engagement_type=[], is_valid=False, feedback="Be specific."
+        )
+        interpreter.parse_prompt("Engage with some posts about AI, local test")
+        parse.assert_called_once()
+        assert interpreter.parse_stats == {"local": 1, "cached": 0, "llm": 1}
+
+
+@pytest.fixture
+def stub_server():
+    from llm_guard import get_circuit_breaker
+    from openai_stub import OpenAIStubServer, ScriptedResponse, StubConfig
+
+    for name in ("openai", "openai-batch"):
+        get_circuit_breaker(name).reset()
+    config = StubConfig(latency=0.05, responses=[ScriptedResponse(pattern="explode", status=400)])
+    with OpenAIStubServer(config) as server:
+        yield server
+    for name in ("openai", "openai-batch"):
+        get_circuit_breaker(name).reset()
+
+
+def _batch_interpreter(server):
+    from rate_limiter import ModelLimits, RateLimiter
+
+    limiter = RateLimiter(limits={}, default_limits=ModelLimits(rpm=100_000, tpm=100_000_000))
+    return PromptInterpreter(api_key="sk-test", rate_limiter=limiter, base_url=server.base_url)
+
+
+BATCH = [
+    "Engage with some posts about batch robotics",
+    "Like 3 posts about climate tech",
+    "Engage with some posts about batch robotics",
+    "Engage with posts about explode",
+    "Engage with some posts about batch fintech",
+]
+
+
+def test_parse_prompts_dedupes_and_isolates_errors(stub_server):
+    interpreter = _batch_interpreter(stub_server)
+    commands = interpreter.parse_prompts(BATCH)
+
+    assert len(commands) == len(BATCH)
+    assert commands[0] == commands[2]
+    assert commands[0] is not commands[2]
+    assert commands[1].engagement_type == ["like"] and commands[1].post_limit == 3
+    assert commands[3].is_valid is False
+    assert "unexpected error" in commands[3].feedback
+    assert commands[4].topic == "batch fintech"
+    # Duplicates and the local-grammar prompt never reach the server
+    assert stub_server.stats["requests"] == 3
+    assert interpreter.parse_stats == {"local": 1, "cached": 0, "llm": 3}
+
+    # A second run is served from the Command cache except for the failed prompt
+    interpreter.parse_prompts(BATCH)
+    assert stub_server.stats["requests"] == 4
+
+
+@pytest.mark.asyncio
+async def test_parse_prompts_async_matches_sync(stub_server):
+    interpreter = _batch_interpreter(stub_server)
+    commands = await interpreter.parse_prompts_async([p.replace("batch", "async") for p in BATCH])
+
+    assert commands[0].topic == "async robotics"
+    assert commands[0] == commands[2]
+    assert commands[3].is_valid is False
+    assert stub_server.stats["requests"] == 3
+
+
+def test_parse_prompts_bounds_concurrency(stub_server):
+    import time
+
+    stub_server.config.responses.clear()
+    interpreter = _batch_interpreter(stub_server)
+    prompts = [f"Engage with some posts about bounded topic {i}" for i in range(8)]
+
+    start = time.perf_counter()
+    commands = interpreter.parse_prompts(prompts, max_concurrency=4)
+    elapsed = time.perf_counter() - start
+
+    assert [c.topic for c in commands] == [f"bounded topic {i}" for i in range(8)]
+    # Two waves of four 50ms calls: faster than sequential, slower than unbounded
+    assert 0.1 <= elapsed < 0.4
+
+
+def test_parse_prompts_ignores_interactive_budget_and_breaker(stub_server):
+    """A batch waits out slow calls and an open interactive breaker instead of returning fallbacks."""
+    from llm_guard import get_circuit_breaker
+
+    stub_server.config.responses.clear()
+    interpreter = _batch_interpreter(stub_server)
+    interpreter.llm_guard.budget = 0.01
+    interactive = get_circuit_breaker("openai")
+    for _ in range(interactive.failure_threshold):
+        interactive.record_failure()
+
+    prompts = [f"Engage with some posts about patient topic {i}" for i in range(6)]
+    commands = interpreter.parse_prompts(prompts)
+
+    assert [c.topic for c in commands] == [f"patient topic {i}" for i in range(6)]
+    assert interpreter.llm_guard.stats["calls"] == 0
+    assert interpreter.batch_guard.stats["calls"] == 6
+    assert get_circuit_breaker("openai-batch").state == "closed"
+
+
+def test_saturating_batches_leave_the_guard_pool_to_interactive_parses(stub_server, monkeypatch):
+    """Slow batches run on their own threads, so an interactive parse still meets its budget."""
+    import concurrent.futures
+    import time
+    import llm_guard
+    from llm_guard import get_circuit_breaker
+    from openai_stub import ScriptedResponse
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(llm_guard, "_executor", pool)
+    stub_server.config.responses[:] = [ScriptedResponse(pattern="slow batch", latency=1.5)]
+    interpreter = _batch_interpreter(stub_server)
+    interpreter.llm_guard.budget = 1.0
+    batches = [[f"Engage with some posts about slow batch {batch}-{i}" for i in range(8)] for batch in range(2)]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as runner:
+        running = [runner.submit(interpreter.parse_prompts, prompts) for prompts in batches]
+        time.sleep(0.2)
+        start = time.perf_counter()
+        command = interpreter.parse_prompt("Engage with some posts about interactive topic")
+        elapsed = time.perf_counter() - start
+        results = [future.result() for future in running]
+
+    assert command.is_valid and command.topic == "interactive topic"
+    assert elapsed < 1.0
+    assert all(c.is_valid for commands in results for c in commands)
+    assert interpreter.llm_guard.stats["timeouts"] == interpreter.llm_guard.stats["overloads"] == 0
+    assert get_circuit_breaker("openai").state == "closed"
+    pool.shutdown(wait=True)
+
+
+def test_parse_prompt_does_not_wait_out_the_rate_limiter(stub_server):
+    """Without rate limit capacity an interactive parse falls back within its budget, breaker untouched."""
+    import time
+    from llm_guard import get_circuit_breaker
+    from rate_limiter import ModelLimits, RateLimiter
+
+    limiter = RateLimiter(limits={}, default_limits=ModelLimits(rpm=1, tpm=100_000))
+    interpreter = PromptInterpreter(api_key="sk-test", llm_budget=0.2, rate_limiter=limiter,
+                                    base_url=stub_server.base_url)
+    limiter.acquire(interpreter.MODEL)
+
+    start = time.perf_counter()
+    command = interpreter.parse_prompt("Engage with some posts about throttled topic")
+
+    assert command.is_valid is False
+    assert time.perf_counter() - start < 1.0
+    assert stub_server.stats["requests"] == 0
+    assert get_circuit_breaker("openai").state == "closed"
@@ -0,0 +1,91 @@
+"""
+Tests for the inverted keyword index.
+"""
+
+import numpy as np
+import pytest
+
+from keyword_index import KeywordIndex, index_tokens
+from models import FetchedPost
+from post_batch import PostBatch
+
+TEXTS = {
+    "a": "Systems thinking beats AI hype. Strategy first.",
+    "b": "thinking about systems",
+    "c": "Our systems  THINKING, ai-first",
+    "d": "Nothing to see; fair air",
+    "e": "Émile on systems thinking and strategy",
+}
+
+
+@pytest.fixture
+def index():
+    index = KeywordIndex()
+    index.add(list(TEXTS), list(TEXTS.values()))
+    return index
+
+
+class TestIndexing:
+    """Test cases for building the index."""
+
+    def test_tokens(self):
+        assert index_tokens("Émile's AI-first, systems_thinking!") == ["émile", "s", "ai", "first", "systems_thinking"]
+        assert index_tokens(None) == []
+
+    def test_skips_known_and_missing_ids(self, index):
+        assert index.add(["a", None, "f"], ["changed", "no id", "new post"]) == 1
+        assert len(index) == 6 and "f" in index and None not in index
+        assert index.search("changed") == []
+
+    def test_incremental_batches_match_one_batch(self, index):
+        incremental = KeywordIndex()
+        for post_id, text in TEXTS.items():
+            incremental.add([post_id], [text])
+        for query in ("systems thinking", "ai", "strategy", "thinking systems"):
+            assert incremental.search(query) == index.search(query)
+
+    def test_add_posts(self):
+        posts = [FetchedPost(post_id=post_id, post_url=f"https://x.com/{post_id}", author_name="A", content_text=text)
+                 for post_id, text in TEXTS.items()]
+        from_models, from_batch = KeywordIndex(), KeywordIndex()
+        assert from_models.add_posts(posts) == from_batch.add_posts(PostBatch.from_posts(posts)) == 5
+        assert from_models.search("strategy") == from_batch.search("strategy") == ["a", "e"]
+
+
+class TestQueries:
+    """Test cases for posting-list queries."""
+
+    def test_words(self, index):
+        assert index.search("AI") == ["a", "c"]
+        assert index.search("air") == ["d"]
+        assert index.search("missing") == []
+
+    def test_phrases_need_adjacent_words_in_order(self, index):
+        assert index.search("systems thinking") == ["a", "c", "e"]
+        assert index.search("thinking about systems") == ["b"]
+        assert index.search("systems about") == []
+
+    def test_any_and_all(self, index):
+        assert index.search(["strategy", "ai"]) == ["a", "c", "e"]
+        assert index.search(["strategy", "systems thinking"], match_all=True) == ["a", "e"]
+        assert index.search(["", "  "]) == []
+
+    def test_mask(self, index):
+        mask = index.mask(["e", "unknown", None, "a"], ["strategy"])
+        assert mask.tolist() == [True, False, False, True]
+        assert mask.dtype == np.bool_
+
+    def test_save_and_load(self, index, tmp_path):
+        path = str(tmp_path / "index" / "keywords.npz")
+        index.sources.append("harvest_date=2025-06-01/posts.arrow")
+        index.save(path)
+        loaded = KeywordIndex(path)
+        assert loaded.stats() == index.stats()
+        assert loaded.sources == index.sources
+        assert loaded.search("systems thinking") == ["a", "c", "e"]
+        loaded.add(["g"], ["more systems thinking"])
+        assert loaded.search("systems thinking") == ["a", "c", "e", "g"]
+
+    def test_save_needs_path(self, index):
+        with pytest.raises(ValueError):
+            index.save()
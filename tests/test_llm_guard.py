@@ -0,0 +1,281 @@
+"""
+Tests for latency-budgeted LLM calls and the circuit breaker.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import llm_guard
+from llm_guard import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyBudgetExceeded,
+    LLMGuard,
+    PoolSaturated,
+    local_wait,
+    remaining_budget,
+)
+from rate_limiter import ModelLimits, RateLimiter, RateLimitTimeout
+
+
+def _drained_limiter():
+    """A limiter whose next request has to wait a minute."""
+    limiter = RateLimiter({"model": ModelLimits(rpm=1, tpm=1000)})
+    limiter.acquire("model")
+    return limiter
+
+
+@pytest.fixture
+def single_worker(monkeypatch):
+    """A one-worker guard pool, so a test can keep it busy."""
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(llm_guard, "_executor", executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_a_single_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now = 15
+        assert not breaker.allow()
+
+
+class TestLLMGuard:
+    """Test cases for LLMGuard.call and LLMGuard.call_async."""
+
+    def test_fast_call_returns_llm_result(self):
+        guard = LLMGuard(budget=1.0, breaker=CircuitBreaker())
+        assert guard.call(lambda x: x * 2, 21, fallback=lambda error: -1) == 42
+        assert guard.stats["calls"] == 1
+
+    def test_slow_call_returns_fallback_and_finishes_in_background(self):
+        release = threading.Event()
+        finished = threading.Event()
+
+        def slow():
+            release.wait(5)
+            finished.set()
+            return "llm"
+
+        guard = LLMGuard(budget=0.05, breaker=CircuitBreaker())
+        reasons = []
+        start = time.perf_counter()
+        result = guard.call(slow, fallback=lambda error: reasons.append(error) or "local")
+
+        assert result == "local"
+        assert time.perf_counter() - start < 1.0
+        assert isinstance(reasons[0], LatencyBudgetExceeded)
+        assert guard.stats["timeouts"] == 1
+
+        release.set()
+        assert finished.wait(5)
+
+    def test_errors_use_fallback_with_the_exception(self):
+        def failing():
+            raise ValueError("boom")
+
+        guard = LLMGuard(budget=1.0, breaker=CircuitBreaker())
+        result = guard.call(failing, fallback=lambda error: f"local ({error})")
+        assert result == "local (boom)"
+        assert guard.stats["errors"] == 1
+
+    def test_open_circuit_skips_the_call(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        guard = LLMGuard(budget=1.0, breaker=breaker)
+        calls = []
+
+        result = guard.call(lambda: calls.append(1), fallback=lambda error: type(error))
+        assert result is CircuitOpenError
+        assert calls == []
+        assert guard.stats["short_circuits"] == 1
+
+    def test_timeouts_count_towards_opening_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        guard = LLMGuard(budget=0.01, breaker=breaker)
+        for _ in range(2):
+            guard.call(time.sleep, 0.2, fallback=lambda error: None)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    @pytest.mark.asyncio
+    async def test_async_slow_call_keeps_running_after_fallback(self):
+        done = asyncio.Event()
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            done.set()
+            return "llm"
+
+        guard = LLMGuard(budget=0.01, breaker=CircuitBreaker())
+        assert await guard.call_async(slow, fallback=lambda error: "local") == "local"
+        await asyncio.wait_for(done.wait(), timeout=5)
+
+    @pytest.mark.asyncio
+    async def test_async_fast_call_and_error(self):
+        async def double(x):
+            return x * 2
+
+        async def failing():
+            raise RuntimeError("down")
+
+        guard = LLMGuard(budget=1.0, breaker=CircuitBreaker())
+        assert await guard.call_async(double, 4, fallback=lambda error: 0) == 8
+        assert await guard.call_async(failing, fallback=lambda error: str(error)) == "down"
+
+    def test_rate_limit_waits_are_bounded_by_the_budget(self):
+        limiter = _drained_limiter()
+
+        def throttled():
+            with local_wait():
+                limiter.acquire("model", timeout=remaining_budget(60.0))
+            return "llm"
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        guard = LLMGuard(budget=0.2, breaker=breaker)
+        started = time.monotonic()
+        assert isinstance(guard.call(throttled, fallback=lambda error: error), RateLimitTimeout)
+        assert time.monotonic() - started < 0.5
+        assert guard.stats["timeouts"] == 0 and breaker.state == CircuitBreaker.CLOSED
+
+    def test_remaining_budget_outside_a_guarded_call(self):
+        assert remaining_budget(60.0) == 60.0
+        assert LLMGuard(budget=None, breaker=CircuitBreaker()).call(
+            lambda: remaining_budget(60.0), fallback=lambda error: None) == 60.0
+        assert LLMGuard(budget=5.0, breaker=CircuitBreaker()).call(
+            lambda: remaining_budget(60.0), fallback=lambda error: None) <= 5.0
+
+    def test_upstream_time_still_counts_after_queueing(self):
+        def queued_then_slow():
+            with local_wait():
+                time.sleep(0.05)
+            time.sleep(0.5)
+
+        guard = LLMGuard(budget=0.1, breaker=CircuitBreaker())
+        assert guard.call(queued_then_slow, fallback=lambda error: "local") == "local"
+        assert guard.stats["timeouts"] == 1
+
+    def test_unbudgeted_calls_stay_off_the_pool(self, single_worker):
+        single_worker.submit(time.sleep, 0.3)
+        breaker = CircuitBreaker(failure_threshold=1)
+        guard = LLMGuard(budget=None, breaker=breaker)
+        assert guard.call(threading.current_thread, fallback=lambda error: None) is threading.current_thread()
+
+        def failing():
+            raise RuntimeError("boom")
+
+        assert isinstance(guard.call(failing, fallback=lambda error: error), RuntimeError)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_budget_starts_when_the_call_runs(self, single_worker):
+        single_worker.submit(time.sleep, 0.15)
+        guard = LLMGuard(budget=0.2, breaker=CircuitBreaker())
+
+        def slowish():
+            time.sleep(0.15)
+            return "llm"
+
+        assert guard.call(slowish, fallback=lambda error: "local") == "llm"
+        assert guard.stats["timeouts"] == 0
+
+    def test_saturated_pool_is_local_overload(self, single_worker):
+        single_worker.submit(time.sleep, 0.5)
+        breaker = CircuitBreaker(failure_threshold=1)
+        guard = LLMGuard(budget=0.1, breaker=breaker)
+        calls = []
+        started = time.monotonic()
+        reason = guard.call(lambda: calls.append(1), fallback=lambda error: error)
+        assert isinstance(reason, PoolSaturated) and time.monotonic() - started < 0.4
+        assert guard.stats["overloads"] == 1 and guard.stats["timeouts"] == 0
+        assert breaker.state == CircuitBreaker.CLOSED
+        single_worker.shutdown(wait=True)
+        # The queued call was dropped, not run late
+        assert calls == []
+
+    def test_rate_limit_timeout_does_not_trip_the_breaker(self):
+        def throttled():
+            raise RateLimitTimeout("no capacity")
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        guard = LLMGuard(budget=1.0, breaker=breaker)
+        assert isinstance(guard.call(throttled, fallback=lambda error: error), RateLimitTimeout)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_rate_limit_timeout_frees_the_half_open_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+        breaker.record_failure()
+        clock.now = 1
+        guard = LLMGuard(budget=1.0, breaker=breaker)
+
+        def throttled():
+            raise RateLimitTimeout("no capacity")
+
+        guard.call(throttled, fallback=lambda error: None)
+        assert guard.call(lambda: "llm", fallback=lambda error: "local") == "llm"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_async_rate_limit_waits_are_bounded_by_the_budget(self):
+        limiter = _drained_limiter()
+
+        async def throttled():
+            with local_wait():
+                await limiter.aacquire("model", timeout=remaining_budget(60.0))
+            return "llm"
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        guard = LLMGuard(budget=0.2, breaker=breaker)
+        started = time.monotonic()
+        assert isinstance(await guard.call_async(throttled, fallback=lambda error: error), RateLimitTimeout)
+        assert time.monotonic() - started < 0.5
+        assert guard.stats["timeouts"] == 0 and breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,80 @@
+"""
+Tests for FetchedPost bulk validation and trusted construction.
+"""
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from models import FetchedPost, construct_posts, get_posts_adapter, validate_posts, validate_posts_json
+
+
+def _record(i, **overrides):
+    record = {
+        "post_id": f"urn:li:activity:{7200000000000000000 + i}",
+        "post_url": f"https://www.linkedin.com/feed/update/urn:li:activity:{7200000000000000000 + i}/",
+        "author_name": "Jane Doe",
+        "author_url": "https://www.linkedin.com/in/janedoe/",
+        "content_text": f"Post {i} about AI",
+        "likes_count": i,
+    }
+    record.update(overrides)
+    return record
+
+
+class TestValidatePosts:
+    """Test cases for bulk validation through the cached TypeAdapter."""
+
+    def test_matches_per_item_validation(self):
+        records = [_record(i) for i in range(5)]
+        assert validate_posts(records) == [FetchedPost(**record) for record in records]
+
+    def test_adapter_is_cached(self):
+        assert get_posts_adapter() is get_posts_adapter()
+
+    def test_invalid_item_raises_by_default(self):
+        with pytest.raises(ValidationError):
+            validate_posts([_record(0), _record(1, post_url="not a url")])
+
+    def test_skip_invalid_drops_only_bad_items(self):
+        records = [_record(0), _record(1, post_url="not a url"), _record(2), _record(3, likes_count="many")]
+        posts = validate_posts(records, skip_invalid=True)
+        assert [post.post_id for post in posts] == [records[0]["post_id"], records[2]["post_id"]]
+
+    def test_validate_json(self):
+        records = [_record(i) for i in range(3)]
+        assert validate_posts_json(json.dumps(records)) == validate_posts(records)
+
+
+class TestConstructPosts:
+    """Test cases for the trusted construction path."""
+
+    def test_matches_validated_posts(self):
+        records = [_record(i) for i in range(3)] + [_record(3, author_url=None)]
+        trusted = construct_posts(records)
+        validated = validate_posts(records)
+        for post, expected in zip(trusted, validated):
+            for name in FetchedPost.model_fields:
+                value, expected_value = getattr(post, name), getattr(expected, name)
+                assert (str(value) if name.endswith("_url") and value is not None else value) == \
+                    (str(expected_value) if name.endswith("_url") and expected_value is not None else expected_value)
+
+    def test_defaults_and_fields_set(self):
+        post = construct_posts([{"post_id": "1", "post_url": "https://x.com/1", "author_name": "A", "content_text": "t"}])[0]
+        assert post.views_count is None
+        assert post.author_headline is None
+        assert post.model_fields_set == {"post_id", "post_url", "author_name", "content_text"}
+
+    def test_unknown_keys_are_ignored(self):
+        post = construct_posts([_record(0, source="agent")])[0]
+        assert "source" not in post.__dict__
+
+    def test_skips_validation(self):
+        post = construct_posts([_record(0, post_url="not a url")])[0]
+        assert post.post_url == "not a url"
+
+    def test_validated_dumps_keep_url_objects(self):
+        dumped = validate_posts([_record(0)])[0].model_dump()
+        assert not isinstance(dumped["post_url"], str)
+        assert isinstance(validate_posts([_record(0)])[0].model_dump(mode="json")["post_url"], str)
@@ -0,0 +1,120 @@
+"""
+Tests for MinHash/LSH near-duplicate detection.
+"""
+
+import numpy as np
+import pytest
+
+from models import FetchedPost
+from near_duplicates import NearDuplicateIndex, lsh_parameters
+
+BASE = ("Excited to share that our team just launched a new AI product for fintech customers. "
+        "Huge thanks to everyone who made this possible, and to our early design partners!")
+OTHER = "Completely different post about climate policy and carbon markets in Europe this year."
+
+
+def _jaccard(index, a, b):
+    first, second = index.signatures([a, b])
+    return (first == second).mean()
+
+
+@pytest.fixture
+def index():
+    return NearDuplicateIndex()
+
+
+class TestSignatures:
+    """Test cases for MinHash signatures and LSH parameters."""
+
+    def test_batch_matches_single(self, index):
+        texts = [BASE, OTHER, "", "short", BASE + " #AI"]
+        batch = index.signatures(texts)
+        assert batch.shape == (5, 128) and batch.dtype == np.uint32
+        for row, text in enumerate(texts):
+            assert (index.signatures([text])[0] == batch[row]).all()
+
+    def test_estimates_similarity(self, index):
+        assert _jaccard(index, BASE, BASE) == 1.0
+        assert _jaccard(index, BASE, BASE + " #AI #fintech") > 0.8
+        assert _jaccard(index, BASE, OTHER) < 0.1
+
+    def test_case_and_punctuation_insensitive(self, index):
+        assert _jaccard(index, BASE, BASE.upper().replace(",", "")) == 1.0
+
+    def test_signatures_are_stable_across_instances(self, index):
+        assert (index.signatures([BASE]) == NearDuplicateIndex().signatures([BASE])).all()
+
+    def test_lsh_parameters_fit_num_perm(self):
+        bands, rows = lsh_parameters(0.8, 128)
+        assert bands * rows <= 128
+        # Texts at the threshold are very likely to become candidates
+        assert 1 - (1 - 0.8 ** rows) ** bands > 0.8
+        assert 1 - (1 - 0.5 ** rows) ** bands < 0.05
+
+
+class TestDeduplicate:
+    """Test cases for collapsing near-duplicates."""
+
+    def test_within_batch_first_wins(self, index):
+        texts = [BASE, BASE + " #AI #fintech", OTHER, BASE]
+        assert index.deduplicate(["a", "b", "c", "d"], texts) == [None, "a", None, "a"]
+        assert len(index) == 2
+        assert index.stats()["duplicates_found"] == 2
+
+    def test_across_batches(self, index):
+        index.deduplicate(["a"], [BASE])
+        assert index.deduplicate(["b", "c"], [OTHER, "Repost: " + BASE]) == [None, "a"]
+        assert index.query(OTHER + "!") == "b"
+        assert index.query("Something else entirely about hiring engineers") is None
+
+    def test_empty_text_never_matches(self, index):
+        assert index.deduplicate(["a", "b"], ["", "  "]) == [None, None]
+        assert len(index) == 0
+
+    def test_query_does_not_add(self, index):
+        assert index.query(BASE) is None
+        assert len(index) == 0
+
+    def test_length_mismatch(self, index):
+        with pytest.raises(ValueError):
+            index.deduplicate(["a"], [])
+
+    def test_filter_posts(self, index):
+        posts = [
+            FetchedPost(post_id=f"urn:li:activity:{i}", post_url=f"https://www.linkedin.com/feed/update/{i}/",
+                        author_name="Jane Doe", content_text=text)
+            for i, text in enumerate([BASE, OTHER, BASE + " 🚀"])
+        ]
+        kept, dropped = index.filter_posts(posts)
+        assert kept == posts[:2]
+        assert dropped == {"urn:li:activity:2": "urn:li:activity:0"}
+        kept, _ = index.filter_posts([{"post_id": "x", "content_text": OTHER}])
+        assert kept == []
+
+
+class TestPersistence:
+    """Test cases for saving and loading the index."""
+
+    def test_round_trip(self, tmp_path, index):
+        path = str(tmp_path / "dedupe.npz")
+        index.deduplicate(["a", "b"], [BASE, OTHER])
+        index.save(path)
+
+        reloaded = NearDuplicateIndex(path=path)
+        assert len(reloaded) == 2
+        assert reloaded.deduplicate(["c", "d"], [BASE + " #AI", "A brand new post about robotics"]) == ["a", None]
+
+    def test_autosave(self, tmp_path):
+        path = tmp_path / "dedupe.npz"
+        index = NearDuplicateIndex(path=str(path), autosave_every=2)
+        index.deduplicate(["a"], [BASE])
+        assert not path.exists()
+        index.deduplicate(["b"], [OTHER])
+        assert path.exists()
+
+    def test_parameter_mismatch(self, tmp_path, index):
+        path = str(tmp_path / "dedupe.npz")
+        index.deduplicate(["a"], [BASE])
+        index.save(path)
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(num_perm=64, path=path)
@@ -0,0 +1,156 @@
+"""
+Tests for the local OpenAI-compatible stub server.
+"""
+
+import json
+import random
+
+import openai
+import pytest
+
+from interpreter import PromptInterpreter
+from llm_guard import get_circuit_breaker
+from openai_stub import OpenAIStubServer, ScriptedResponse, StubConfig, parse_latency
+from prompt_template_engine import PromptTemplateEngine
+from rate_limiter import ModelLimits, RateLimiter
+
+
+def _body(*contents, **extra):
+    return {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": c} for c in contents], **extra}
+
+
+class TestParseLatency:
+    """Test cases for latency distribution specs."""
+
+    def test_fixed_values(self):
+        rng = random.Random(0)
+        assert parse_latency(0.25)(rng) == 0.25
+        assert parse_latency("0.5")(rng) == 0.5
+        assert parse_latency("fixed:0.1")(rng) == 0.1
+
+    def test_distributions_stay_in_range(self):
+        rng = random.Random(0)
+        assert all(0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2 for _ in range(100))
+        assert all(parse_latency("normal:0.0,1.0")(rng) >= 0 for _ in range(100))
+        assert all(parse_latency("lognormal:-2,0.5")(rng) > 0 for _ in range(100))
+        assert all(parse_latency("exponential:0.1")(rng) >= 0 for _ in range(100))
+
+    def test_invalid_spec(self):
+        with pytest.raises(ValueError):
+            parse_latency("gamma:1,2")
+        with pytest.raises(ValueError):
+            parse_latency("uniform:0.1")
+
+
+class TestPlan:
+    """Test cases for response decisions, without sockets."""
+
+    def test_scripted_rule_wins_in_order(self):
+        server = OpenAIStubServer(StubConfig(responses=[
+            ScriptedResponse(pattern="robotics", content={"count": 7}, completion_tokens=42),
+            ScriptedResponse(pattern=".*", content="fallthrough"),
+        ]))
+        try:
+            plan = server.plan(_body("Find posts about Robotics"))
+            assert json.loads(plan["content"]) == {"count": 7}
+            assert plan["completion_tokens"] == 42
+            assert plan["scripted"]
+            assert server.plan(_body("anything else"))["content"] == "fallthrough"
+        finally:
+            server._server.server_close()
+
+    def test_error_rate_is_seeded(self):
+        def statuses():
+            server = OpenAIStubServer(StubConfig(error_rate=0.5, error_status=500, seed=7))
+            try:
+                return [server.plan(_body("hi"))["status"] for _ in range(50)]
+            finally:
+                server._server.server_close()
+
+        first = statuses()
+        assert set(first) == {200, 500}
+        assert first == statuses()
+
+    def test_tokens_per_second_adds_generation_time(self):
+        server = OpenAIStubServer(StubConfig(latency=0.1, tokens_per_second=10, responses=[
+            ScriptedResponse(pattern="x", content="ok", completion_tokens=5),
+        ]))
+        try:
+            assert server.plan(_body("x"))["delay"] == pytest.approx(0.6)
+        finally:
+            server._server.server_close()
+
+    def test_config_from_file(self, tmp_path):
+        path = tmp_path / "stub.yaml"
+        path.write_text(
+            "latency: uniform:0.0,0.01\n"
+            "error_rate: 0.1\n"
+            "responses:\n"
+            "  - pattern: hello\n"
+            "    content: hi\n",
+            encoding="utf-8",
+        )
+        config = StubConfig.from_file(str(path), error_rate=0.0)
+        assert config.error_rate == 0.0
+        assert config.latency == "uniform:0.0,0.01"
+        assert config.responses[0].matches("say HELLO")
+
+
+class TestStubServer:
+    """End-to-end tests through the real OpenAI SDK clients."""
+
+    @pytest.fixture
+    def server(self):
+        get_circuit_breaker("openai").reset()
+        with OpenAIStubServer(StubConfig(responses=[
+            ScriptedResponse(pattern="ping", content="pong", prompt_tokens=3, completion_tokens=1),
+        ])) as server:
+            yield server
+        get_circuit_breaker("openai").reset()
+
+    @pytest.fixture
+    def limiter(self):
+        return RateLimiter(limits={}, default_limits=ModelLimits(rpm=100_000, tpm=100_000_000))
+
+    def test_chat_completion_reports_usage(self, server):
+        client = openai.OpenAI(api_key="sk-test", base_url=server.base_url)
+        response = client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "ping"}])
+        assert response.choices[0].message.content == "pong"
+        assert response.usage.total_tokens == 4
+        assert server.stats["requests"] == 1
+        assert server.stats["scripted"] == 1
+
+    def test_streaming(self, server):
+        client = openai.OpenAI(api_key="sk-test", base_url=server.base_url)
+        stream = client.chat.completions.create(
+            model="gpt-4o", messages=[{"role": "user", "content": "ping"}],
+            stream=True, stream_options={"include_usage": True},
+        )
+        chunks = list(stream)
+        assert "".join(c.choices[0].delta.content or "" for c in chunks if c.choices) == "pong"
+        assert chunks[-1].usage.total_tokens == 4
+
+    def test_injected_errors_surface_as_sdk_errors(self, server):
+        server.config.error_rate = 1.0
+        client = openai.OpenAI(api_key="sk-test", base_url=server.base_url, max_retries=0)
+        with pytest.raises(openai.RateLimitError):
+            client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hello"}])
+        assert server.stats["errors"] == 1
+
+    def test_template_engine_uses_base_url(self, server, limiter):
+        engine = PromptTemplateEngine(
+            use_llm=True, openai_api_key="sk-test", base_url=server.base_url, rate_limiter=limiter,
+            use_local_classifier=False, use_semantic_cache=False,
+        )
+        assert engine.detect_intent_with_llm("Comment on posts about AI") == "comment_post"
+        assert engine.extract_parameters_with_llm("Like 5 posts about AI") == {"count": 5, "keywords": ["AI"]}
+        assert server.stats["requests"] == 2
+
+    def test_interpreter_structured_output(self, server, limiter, monkeypatch):
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        interpreter = PromptInterpreter("sk-test", rate_limiter=limiter, use_local_parser=False)
+        command = interpreter.parse_prompt("Like 4 posts about quantum computing")
+        assert command.topic == "quantum computing"
+        assert command.post_limit == 4
+        assert command.is_valid
+        assert server.stats["requests"] == 1
@@ -0,0 +1,53 @@
+"""
+Tests for the single-pass parameter extraction scanner.
+"""
+
+import random
+
+import pytest
+
+from benchmarks.bench_parameter_extraction import build_corpus, legacy_extract_parameters
+from parameter_extraction import extract_keywords, normalize_whitespace, scan_parameters
+
+
+@pytest.mark.parametrize("prompt,expected", [
+    ("Like 3 posts about AI", {"count": 3, "keywords": ["AI"]}),
+    ("Find 10 posts about startups", {"count": 10, "keywords": ["startups"]}),
+    ("Connect with 5 Google employees", {"count": 5}),
+    ("find 7 and then like 2 posts", {"count": 2}),
+    ("Like it 4 times, visit 9 profiles", {"count": 4}),
+    ("Find posts about machine learning and startups", {"keywords": ["machine learning", "startups"]}),
+    ("Like 5 posts about generative AI from Sundar Pichai",
+     {"count": 5, "keywords": ["generative AI"], "target_person": "Sundar Pichai"}),
+    # The original patterns end a phrase at any word starting with "in"; that is preserved
+    ("Like posts about artificial intelligence", {"keywords": ["artificial"]}),
+    ("Comment on posts related to fintech", {"keywords": ["posts related to fintech"]}),
+    ("Look for posts related to venture capital", {"keywords": ["venture capital"]}),
+    ("Tell me a joke", {}),
+])
+def test_scan_parameters(prompt, expected):
+    assert scan_parameters(prompt) == expected
+
+
+def test_scanner_matches_original_patterns_on_generated_corpus():
+    """The combined scanner keeps the precedence of the original per-pattern searches."""
+    for prompt in build_corpus(2000):
+        assert scan_parameters(prompt) == legacy_extract_parameters(prompt), prompt
+
+
+def test_scanner_matches_original_patterns_on_adversarial_corpus():
+    """Odd casing, embedded triggers and trailing whitespace resolve identically."""
+    rng = random.Random(1)
+    words = ("like comment find FIND posts post about ABOUT on On related to Related To with by from in "
+             "AI startups Sundar Pichai Simon Cook 3 10 times items mention roundabout bytes instance a1 2b").split(" ")
+    for _ in range(5000):
+        prompt = " ".join(rng.choice(words) for _ in range(rng.randint(0, 12))) + rng.choice(["", " ", "  ", "\n"])
+        assert scan_parameters(prompt) == legacy_extract_parameters(prompt), repr(prompt)
+
+
+def test_extract_keywords_priority():
+    assert extract_keywords("Comment on posts about generative AI") == ["generative AI"]
+
+
+def test_normalize_whitespace():
+    assert normalize_whitespace("multiple\n\nlines\tand  spaces") == "multiple lines and spaces"
@@ -0,0 +1,173 @@
+"""
+Tests for the Arrow/Parquet post archive.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import post_archive
+from models import FetchedPost
+from post_archive import PostArchive
+from post_batch import PostBatch
+
+HARVESTED_AT = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+def _timestamp(day):
+    return datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _posts():
+    authors = ["Jane Doe", "Émile Zola", "Ada Lovelace"]
+    return [
+        FetchedPost(
+            post_id=f"urn:li:activity:{7200000000000000000 + i}",
+            post_url=f"https://www.linkedin.com/feed/update/urn:li:activity:{7200000000000000000 + i}/",
+            author_name=authors[i % 3],
+            author_url=None if i % 2 else "https://www.linkedin.com/in/janedoe/",
+            content_text=f"Post {i} about {'AI' if i % 2 else 'climate'}",
+            posted_timestamp_str=["2h", "3d", None][i % 3],
+            likes_count=None if i == 4 else i * 10,
+            comments_count=i,
+        )
+        for i in range(6)
+    ]
+
+
+@pytest.fixture
+def posts():
+    return _posts()
+
+
+@pytest.fixture(params=["arrow", "parquet"])
+def archive(request, tmp_path, posts):
+    archive = PostArchive(str(tmp_path / "archive"), format=request.param)
+    archive.append(posts, harvested_at=HARVESTED_AT, feed="feed")
+    return archive
+
+
+class TestAppend:
+    """Test cases for writing harvests."""
+
+    def test_partitioned_by_harvest_date(self, archive):
+        path = archive.append(_posts()[:1], harvested_at=HARVESTED_AT + 86400)
+        assert os.path.basename(os.path.dirname(path)) == "harvest_date=2025-06-16"
+        assert len(archive.files()) == 2
+        assert len(archive.files(since=HARVESTED_AT + 86400)) == 1
+
+    def test_empty_harvest_writes_nothing(self, tmp_path):
+        archive = PostArchive(str(tmp_path))
+        assert archive.append([], harvested_at=HARVESTED_AT) is None
+        assert archive.files() == []
+        assert archive.scan().num_rows == 0
+
+    def test_interned_columns_stay_dictionary_encoded(self, archive):
+        assert pa.types.is_dictionary(archive.scan().schema.field("author_name").type)
+
+    def test_round_trip(self, archive, posts):
+        assert [post.model_dump(mode="json") for post in archive.read_posts()] == [post.model_dump(mode="json") for post in posts]
+
+    def test_accepts_post_batch(self, tmp_path, posts):
+        archive = PostArchive(str(tmp_path))
+        archive.append(PostBatch.from_posts(posts), harvested_at=HARVESTED_AT)
+        assert [post.post_id for post in archive.read_posts()] == [post.post_id for post in posts]
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            PostArchive(str(tmp_path), format="csv")
+
+
+class TestScan:
+    """Test cases for queries."""
+
+    def test_posted_at_from_timestamp_string_or_urn(self, archive):
+        posted = archive.scan()["posted_at"].to_pylist()
+        assert posted[0].timestamp() == HARVESTED_AT - 7200
+        assert posted[1].timestamp() == HARVESTED_AT - 3 * 86400
+        # No timestamp string: creation time encoded in the activity id
+        assert posted[2].timestamp() == (7200000000000000002 >> 22) // 1000
+
+    def test_ids_without_urn_have_no_posted_at(self, tmp_path):
+        archive = PostArchive(str(tmp_path))
+        archive.append(PostBatch.from_records([{"post_id": "p2", "author_name": "Jane Doe"}]), harvested_at=HARVESTED_AT)
+        assert archive.scan()["posted_at"].to_pylist() == [None]
+        assert archive.scan(since="1970-01-02").num_rows == 0
+
+    def test_filters(self, archive, posts):
+        def ids(**filters):
+            return [post.post_id for post in archive.read_posts(**filters)]
+
+        assert ids(author="jane") == [posts[0].post_id, posts[3].post_id]
+        assert ids(contains="ai", min_comments=2) == [posts[3].post_id, posts[5].post_id]
+        assert ids(min_likes=30) == [posts[3].post_id, posts[5].post_id]
+        assert ids(since=datetime.fromtimestamp(HARVESTED_AT - 86400, tz=timezone.utc)) == [posts[0].post_id, posts[3].post_id]
+        assert ids(until=HARVESTED_AT - 86400) == [posts[1].post_id, posts[2].post_id, posts[4].post_id, posts[5].post_id]
+        assert ids(feed="feed") == [post.post_id for post in posts]
+        assert ids(feed="search:ai", author="jane") == []
+
+    def test_keywords_use_the_index(self, archive, posts):
+        def ids(**filters):
+            return [post.post_id for post in archive.read_posts(**filters)]
+
+        assert ids(keywords=["ai"]) == [posts[1].post_id, posts[3].post_id, posts[5].post_id]
+        assert ids(keywords=["about climate", "post 1"]) == [posts[0].post_id, posts[1].post_id, posts[2].post_id,
+                                                               posts[4].post_id]
+        assert ids(keywords=["post 3", "ai"], match_all=True) == [posts[3].post_id]
+        assert archive.keyword_index().sources == [os.path.relpath(path, archive.root) for path in archive.files()]
+
+        # Files appended later are indexed on the next query, and the index persists
+        archive.append([_posts()[0].model_copy(update={"post_id": "urn:li:activity:1", "content_text": "AI news"})],
+                       harvested_at=HARVESTED_AT + 60)
+        assert ids(keywords=["news"]) == ["urn:li:activity:1"]
+        reopened = PostArchive(archive.root, format=archive.format)
+        assert len(reopened.keyword_index()) == 7
+
+    def test_since_prunes_older_partitions(self, archive):
+        archive.append(_posts()[:1], harvested_at=HARVESTED_AT - 30 * 86400)
+        assert archive.scan().num_rows == 7
+        assert len(archive.files(since=_timestamp("2025-06-01"))) == 1
+        # Posts 2 and 5 have no timestamp string; their activity ids date from 2024
+        assert archive.scan(since="2025-06-01").num_rows == 4
+
+    def test_export_parquet(self, archive, tmp_path):
+        import pyarrow.parquet as pq
+        out = str(tmp_path / "export.parquet")
+        assert archive.export_parquet(out, author="zola") == 2
+        assert pq.read_table(out)["author_name"].to_pylist() == ["Émile Zola"] * 2
+
+    def test_stats(self, archive):
+        stats = archive.stats()
+        assert (stats["files"], stats["posts"], stats["authors"]) == (1, 6, 3)
+        assert stats["first_harvest"] == "2025-06-15T12:00:00+00:00"
+
+
+class TestCli:
+    """Test cases for the query CLI."""
+
+    def test_query_ndjson(self, archive, capsys):
+        post_archive.main(["--root", archive.root, "query", "--author", "ada", "--output", "ndjson"])
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [row["author_name"] for row in rows] == ["Ada Lovelace", "Ada Lovelace"]
+        post_archive.main(["--root", archive.root, "query", "--keyword", "climate", "--keyword", "post 2",
+                           "--all-keywords", "--output", "ndjson"])
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [row["content_text"] for row in rows] == ["Post 2 about climate"]
+
+    def test_query_table_and_stats(self, archive, capsys):
+        post_archive.main(["--root", archive.root, "query", "--min-likes", "50", "--limit", "5"])
+        out = capsys.readouterr().out
+        assert "Post 5 about AI" in out and "(1 post(s))" in out
+        post_archive.main(["--root", archive.root, "stats"])
+        assert json.loads(capsys.readouterr().out)["posts"] == 6
+
+    def test_query_table_without_author(self, tmp_path, capsys):
+        archive = PostArchive(str(tmp_path))
+        archive.append(PostBatch.from_records([{"post_id": "urn:li:activity:1", "content_text": "Anonymous post"}]),
+                       harvested_at=HARVESTED_AT)
+        post_archive.main(["--root", archive.root, "query"])
+        assert "Anonymous post" in capsys.readouterr().out
@@ -0,0 +1,218 @@
+"""
+Tests for the columnar PostBatch container.
+"""
+
+import io
+import json
+import re
+
+import numpy as np
+import pytest
+
+from models import FetchedPost
+from post_batch import MISSING, PostBatch
+
+
+def _posts():
+    authors = ["Jane Doe", "Émile Zola", "Jane Doe"]
+    return [
+        FetchedPost(
+            post_id=f"urn:li:activity:{7200000000000000000 + i}",
+            post_url=f"https://www.linkedin.com/feed/update/urn:li:activity:{7200000000000000000 + i}/",
+            author_name=authors[i % 3],
+            author_url=None if i % 2 else "https://www.linkedin.com/in/janedoe/",
+            author_headline="AI Enthusiast | Building the Future" if i % 3 == 0 else None,
+            content_text=f'Post {i} about "AI" in fintech\nsecond line ✓',
+            posted_timestamp_str=["2h", "1d", None][i % 3],
+            likes_count=None if i == 4 else i * 10,
+            comments_count=i,
+            reposts_count=0,
+            views_count=None,
+        )
+        for i in range(6)
+    ]
+
+
+@pytest.fixture
+def posts():
+    return _posts()
+
+
+@pytest.fixture
+def batch(posts):
+    return PostBatch.from_posts(posts)
+
+
+class TestRoundTrip:
+    """Test cases for lossless conversion."""
+
+    def test_to_posts_is_lossless(self, posts, batch):
+        assert len(batch) == len(posts)
+        assert batch.to_posts() == posts
+        assert batch[1] == posts[1]
+        assert list(batch) == posts
+
+    def test_from_records_matches_from_posts(self, posts, batch):
+        records = PostBatch.from_records([post.model_dump(mode="json") for post in posts])
+        assert records.to_posts() == posts
+        assert records.to_json() == batch.to_json()
+
+    def test_missing_values_use_sentinel(self, batch):
+        assert batch.column("likes_count")[4] == MISSING
+        assert batch.value("likes_count", 4) is None
+        assert batch.value("author_url", 1) is None
+        assert batch.record(-1)["views_count"] is None
+
+    def test_authors_are_interned(self, batch):
+        assert batch.column("author_name").categories == ["Jane Doe", "Émile Zola"]
+        assert batch.column("author_name").codes.tolist() == [0, 1, 0, 0, 1, 0]
+
+    def test_negative_counts_rejected(self, posts):
+        record = posts[0].model_dump(mode="json")
+        record["likes_count"] = -3
+        with pytest.raises(ValueError):
+            PostBatch.from_records([record])
+
+    def test_scraped_counts_are_parsed(self, posts):
+        records = [post.model_dump(mode="json") for post in posts[:2]]
+        records[0].update(likes_count="1,2 Tsd.", comments_count="12 Kommentare")
+        records[1].update(likes_count="keine")
+        batch = PostBatch.from_records(records, count_locale="de")
+        assert batch.column("likes_count").tolist() == [1200, MISSING]
+        assert batch.column("comments_count").tolist() == [12, 1]
+
+    def test_empty_batch(self):
+        empty = PostBatch.from_records([])
+        assert len(empty) == 0
+        assert empty.to_json() == "[]"
+        assert empty.to_posts() == []
+
+
+class TestSerialisation:
+    """Test cases for JSON and NDJSON emission."""
+
+    def test_ndjson_matches_model_dump(self, posts, batch):
+        lines = batch.to_ndjson().splitlines()
+        assert [json.loads(line) for line in lines] == [post.model_dump(mode="json") for post in posts]
+
+    def test_json_array(self, posts, batch):
+        assert json.loads(batch.to_json()) == [post.model_dump(mode="json") for post in posts]
+
+    def test_write_ndjson(self, batch):
+        stream = io.StringIO()
+        assert batch.write_ndjson(stream) == len(batch)
+        assert stream.getvalue() == batch.to_ndjson()
+
+
+class TestVectorisedOperations:
+    """Test cases for filter, take, sort and search."""
+
+    def test_filter_by_count(self, posts, batch):
+        popular = batch.filter(batch.column("likes_count") >= 30)
+        assert popular.to_posts() == [posts[3], posts[5]]
+
+    def test_filter_rejects_wrong_shape(self, batch):
+        with pytest.raises(ValueError):
+            batch.filter([True])
+
+    def test_take_shares_buffers(self, posts, batch):
+        picked = batch.take([5, 0, 5])
+        assert picked.column("content_text").buffer is batch.column("content_text").buffer
+        assert picked.to_posts() == [posts[5], posts[0], posts[5]]
+        assert batch[1:3].to_posts() == posts[1:3]
+
+    def test_sort_puts_missing_last(self, batch):
+        ascending = batch.sort_by("likes_count").column("likes_count").tolist()
+        descending = batch.sort_by("likes_count", descending=True).column("likes_count").tolist()
+        assert ascending == [0, 10, 20, 30, 50, MISSING]
+        assert descending == [50, 30, 20, 10, 0, MISSING]
+
+    def test_sort_by_interned_and_text_columns_is_stable(self, batch):
+        by_author = batch.sort_by("author_name")
+        assert by_author.column("author_name").values() == ["Jane Doe"] * 4 + ["Émile Zola"] * 2
+        assert by_author.column("comments_count").tolist() == [0, 2, 3, 5, 1, 4]
+        by_id = batch.sort_by("post_id", descending=True)
+        assert by_id.column("comments_count").tolist() == [5, 4, 3, 2, 1, 0]
+
+    def test_contains(self, batch):
+        assert batch.contains("post 3").tolist() == [False, False, False, True, False, False]
+        assert batch.contains("POST 3", case_sensitive=True).sum() == 0
+        assert batch.contains("ai enthusiast", name="author_headline").tolist() == [
+            True, False, False, True, False, False
+        ]
+        # Duplicated rows after take() resolve to the same span
+        assert batch.take([3, 3, 0]).contains("post 3").tolist() == [True, True, False]
+
+    def test_matches_do_not_span_rows(self):
+        batch = PostBatch.from_records([
+            {"post_id": "a", "post_url": "u", "author_name": "x", "content_text": "ends with ab"},
+            {"post_id": "b", "post_url": "u", "author_name": "x", "content_text": "cd starts"},
+        ])
+        assert batch.contains("abcd").tolist() == [False, False]
+        # Word boundaries see the end of the row, not the next row's text
+        assert batch.column("content_text").rows_matching(re.compile(r"\bab\b")).tolist() == [True, False]
+        combined = PostBatch.concat([batch, batch])
+        assert combined.column("content_text").rows_matching(re.compile(r"starts\b")).tolist() == [False, True] * 2
+
+    def test_interned_equals(self, batch):
+        authors = batch.column("author_name")
+        assert authors.equals("Émile Zola").tolist() == [False, True, False, False, True, False]
+        assert not authors.equals("Nobody").any()
+        assert batch.column("author_url").equals(None).tolist() == [False, True] * 3
+        picked = batch.take([4, 0]).column("author_name")
+        assert picked.equals("Émile Zola").tolist() == [True, False]
+        assert picked.code("Jane Doe") == 0 and picked.code("Nobody") == MISSING
+
+    def test_activity_ids(self, batch):
+        ids = batch.sort_by("likes_count", descending=True).activity_ids()
+        assert ids[0] == 7200000000000000005
+        assert ids.dtype == np.int64
+
+    def test_activity_ids_need_a_urn(self):
+        batch = PostBatch.from_records([{"post_id": "p2"}, {"post_id": "12345"},
+                                        {"post_id": "https://www.linkedin.com/feed/update/urn:li:share:7200000000000000001/"}])
+        assert batch.activity_ids().tolist() == [MISSING, MISSING, 7200000000000000001]
+
+    def test_concat(self, posts, batch):
+        other = PostBatch.from_posts(list(reversed(posts)))
+        combined = PostBatch.concat([batch.take([0, 1]), other.filter(other.column("comments_count") > 3)])
+        assert combined.to_posts() == [posts[0], posts[1], posts[5], posts[4]]
+        assert combined.column("author_name").categories == ["Jane Doe", "Émile Zola"]
+
+
+HARVESTED_AT = 1_750_000_000
+
+
+class TestPostedAt:
+    """Test cases for the normalised posted_at column and its time index."""
+
+    @pytest.fixture
+    def dated(self, posts):
+        return PostBatch.from_posts(posts, harvested_at=HARVESTED_AT)
+
+    def test_posted_at_is_normalised(self, batch, dated):
+        assert (batch.column("posted_at") == MISSING).all()
+        two_hours, one_day = HARVESTED_AT - 7200, HARVESTED_AT - 86400
+        assert dated.column("posted_at").tolist() == [two_hours, one_day, MISSING] * 2
+        assert dated.to_json() == batch.to_json()
+
+    def test_carried_through_take_and_concat(self, dated):
+        assert dated.take([1, 0]).column("posted_at").tolist() == [HARVESTED_AT - 86400, HARVESTED_AT - 7200]
+        later = PostBatch.from_posts(dated.to_posts()[:1], harvested_at=HARVESTED_AT + 3600)
+        combined = PostBatch.concat([dated, later])
+        assert combined.column("posted_at")[-1] == HARVESTED_AT - 3600
+
+    def test_range_scan(self, dated):
+        window = dated.rows_posted_between(HARVESTED_AT - 3 * 3600, HARVESTED_AT)
+        assert window.tolist() == [0, 3]
+        assert dated.rows_posted_between().tolist() == [1, 4, 0, 3]
+        assert dated.rows_posted_between(end=HARVESTED_AT - 7200).tolist() == [1, 4]
+        recent = dated.posted_between(start=HARVESTED_AT - 7200)
+        assert [post.comments_count for post in recent] == [0, 3]
+
+    def test_index_is_cached(self, dated):
+        assert dated.posted_index() is dated.posted_index()
+
+    def test_sort_by_posted_at(self, dated):
+        newest_first = dated.sort_by("posted_at", descending=True)
+        assert newest_first.column("comments_count").tolist() == [0, 3, 1, 4, 2, 5]
@@ -0,0 +1,141 @@
+"""
+Tests for engagement scoring and top-K selection.
+"""
+
+import math
+import random
+
+import pytest
+
+import app_config
+import post_ranking
+from app_config import AppConfig, ConfigStore
+from models import FetchedPost
+from post_batch import PostBatch
+from post_ranking import PostRanker, RankingConfig, TopK
+
+NOW = 1_750_000_000.0
+
+
+def _post(i, likes=None, comments=None, reposts=None, timestamp=None, author="Jane Doe", post_id=None):
+    post_id = post_id or f"urn:li:activity:{7200000000000000000 + i}"
+    return FetchedPost(post_id=post_id, post_url=f"https://www.linkedin.com/feed/update/{post_id}/",
+                       author_name=author, author_url=f"https://www.linkedin.com/in/{author.split()[0].lower()}/",
+                       content_text=f"Post {i}", posted_timestamp_str=timestamp,
+                       likes_count=likes, comments_count=comments, reposts_count=reposts)
+
+
+class TestRankingConfig:
+    """Test cases for reading ranking settings."""
+
+    def test_loads_repo_settings(self):
+        config = ConfigStore().config.ranking
+        assert config.post_limit == 5
+        assert (config.likes, config.comments, config.recency) == (1.0, 2.0, 2.0)
+        assert config.preferred_authors == ()
+
+    def test_defaults_without_ranking_section(self):
+        assert RankingConfig.from_settings({}) == RankingConfig()
+
+    @pytest.mark.parametrize("settings", [
+        {"ranking": {"weights": {"shares": 1}}},
+        {"ranking": {"weights": {"likes": "high"}}},
+        {"ranking": {"recency_half_life_hours": 0}},
+        {"post_limit": 0},
+        {"ranking": ["likes"]},
+    ])
+    def test_invalid_settings(self, settings):
+        with pytest.raises(ValueError):
+            RankingConfig.from_settings(settings)
+
+
+class TestTopK:
+    """Test cases for the bounded heap."""
+
+    def test_keeps_best_k_in_order(self):
+        best = TopK(3)
+        for score, item in [(1, "a"), (5, "b"), (3, "c"), (4, "d"), (2, "e")]:
+            best.push(score, item)
+        assert best.items() == [(5, "b"), (4, "d"), (3, "c")]
+        assert len(best) == 3 and best.threshold == 3
+
+    def test_ties_keep_first_pushed(self):
+        best = TopK(2)
+        for item in "abcd":
+            best.push(1.0, item)
+        assert [item for _, item in best.items()] == ["a", "b"]
+
+    def test_matches_full_sort(self):
+        rng = random.Random(3)
+        scores = [rng.randint(0, 50) for _ in range(1000)]
+        best = TopK(10)
+        for index, score in enumerate(scores):
+            best.push(score, index)
+        expected = sorted(range(len(scores)), key=lambda index: (-scores[index], index))[:10]
+        assert [index for _, index in best.items()] == expected
+
+    def test_zero_k(self):
+        best = TopK(0)
+        assert not best.push(1.0, "a") and best.items() == [] and best.threshold is None
+        with pytest.raises(ValueError):
+            TopK(-1)
+
+
+class TestPostRanker:
+    """Test cases for scoring and ranking posts."""
+
+    def test_score_formula(self):
+        ranker = PostRanker(RankingConfig(recency_half_life_hours=2), now=NOW)
+        post = _post(0, likes=99, comments=9, reposts=None, timestamp="2h")
+        expected = math.log1p(99) + 2 * math.log1p(9) + 2.0 * 0.5
+        assert ranker.score(post) == pytest.approx(expected)
+        assert ranker.score(post.model_dump(mode="json")) == pytest.approx(expected)
+
+    def test_recency_falls_back_to_activity_id(self):
+        created = 1_749_000_000
+        post = _post(0, post_id=f"urn:li:activity:{(created * 1000) << 22}")
+        ranker = PostRanker(RankingConfig(recency_half_life_hours=1), now=created + 3600)
+        assert ranker.score(post) == pytest.approx(2.0 * 0.5)
+        assert PostRanker(now=NOW).score(_post(0, post_id="no-urn")) == 0.0
+
+    def test_preferred_authors(self):
+        ranker = PostRanker(RankingConfig(recency=0, preferred_authors=("https://www.linkedin.com/in/ada",)), now=NOW)
+        assert ranker.score(_post(0, author="Ada Lovelace")) == 2.0
+        assert ranker.score(_post(0)) == 0.0
+
+    def test_batch_scores_match_per_post(self):
+        posts = [_post(i, likes=i * 7 or None, comments=i % 4, reposts=i % 3, timestamp=[None, "3h", "2d"][i % 3],
+                       author=["Jane Doe", "Ada Lovelace"][i % 2]) for i in range(12)]
+        ranker = PostRanker(RankingConfig(preferred_authors=("Ada Lovelace",)), now=NOW)
+        assert ranker.scores(PostBatch.from_posts(posts)).tolist() == pytest.approx([ranker.score(p) for p in posts])
+
+    def test_rendered_counts_rank_like_batch(self):
+        records = [{"post_id": f"urn:li:activity:{i}", "author_name": "Jane Doe", "likes_count": likes,
+                    "comments_count": comments}
+                   for i, (likes, comments) in enumerate([("1.2K", "3 comments"), (900, 40), ("12", None), (None, "1,204")])]
+        ranker = PostRanker(RankingConfig(recency=0), now=NOW)
+        batch = PostBatch.from_records(records)
+        assert [ranker.score(record) for record in records] == pytest.approx(ranker.scores(batch).tolist())
+        assert [record["post_id"] for _, record in ranker.top_k(records, 3)] == \
+            ranker.top_k_batch(batch, 3).column("post_id").values()
+
+    def test_top_k_streams(self):
+        posts = (_post(i, likes=(i * 37) % 101) for i in range(101))
+        ranker = PostRanker(RankingConfig(recency=0, post_limit=3), now=NOW)
+        assert [post.likes_count for _, post in ranker.top_k(posts)] == [100, 99, 98]
+
+    def test_top_k_batch_matches_heap(self):
+        posts = [_post(i, likes=(i * 37) % 11, comments=i % 2) for i in range(200)]
+        ranker = PostRanker(RankingConfig(recency=0), now=NOW)
+        for k in (0, 1, 5, 200, 500):
+            from_heap = [post.post_id for _, post in ranker.top_k(posts, k)]
+            assert ranker.top_k_batch(PostBatch.from_posts(posts), k).column("post_id").values() == from_heap
+
+    def test_shared_ranker_follows_config(self, monkeypatch):
+        config = AppConfig(ranking=RankingConfig.from_settings({"post_limit": 2, "ranking": {"weights": {"likes": 3}}}))
+        monkeypatch.setattr(app_config, "get_config", lambda: config)
+        ranker = post_ranking.get_shared_ranker()
+        assert (ranker.config.post_limit, ranker.config.likes, ranker.config.comments) == (2, 3.0, 2.0)
+        assert post_ranking.get_shared_ranker() is ranker
+        config = AppConfig()
+        assert post_ranking.get_shared_ranker().config == RankingConfig()
@@ -0,0 +1,70 @@
+"""
+Tests for posted_timestamp_str normalisation.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from post_timestamps import DAY, HOUR, MISSING, normalize_timestamps, parse_timestamp, parse_token
+
+HARVESTED_AT = datetime(2025, 3, 15, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+def _utc(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+class TestParseTimestamp:
+    """Test cases for single timestamp strings."""
+
+    @pytest.mark.parametrize("text, seconds_ago", [
+        ("2h", 2 * HOUR),
+        ("3d", 3 * DAY),
+        ("1w", 7 * DAY),
+        ("2mo", 60 * DAY),
+        ("1yr", 365 * DAY),
+        ("12m", 12 * 60),
+        ("45s", 45),
+        ("5 hours ago", 5 * HOUR),
+        ("4 min ago", 4 * 60),
+        ("Just now", 0),
+        ("3d • Edited", 3 * DAY),
+        ("1w •", 7 * DAY),
+        (" 2H ", 2 * HOUR),
+    ])
+    def test_relative(self, text, seconds_ago):
+        assert parse_timestamp(text, HARVESTED_AT) == int(HARVESTED_AT) - seconds_ago
+
+    @pytest.mark.parametrize("text, expected", [
+        ("July 10", _utc(2024, 7, 10)),
+        ("Mar 15", _utc(2025, 3, 15)),
+        ("Mar 16", _utc(2024, 3, 16)),
+        ("Jul 10, 2023", _utc(2023, 7, 10)),
+        ("Sept 3", _utc(2024, 9, 3)),
+        ("Feb 29", _utc(2024, 2, 29)),
+    ])
+    def test_absolute_dates_infer_most_recent_year(self, text, expected):
+        assert parse_timestamp(text, HARVESTED_AT) == expected
+
+    @pytest.mark.parametrize("text", [None, "", "yesterday-ish", "3 fortnights", "Feb 30", "Smarch 3"])
+    def test_unparseable_is_missing(self, text):
+        assert parse_timestamp(text, HARVESTED_AT) == MISSING
+
+    def test_tokens_are_memoised_independently_of_harvest_time(self):
+        assert parse_token("2h") is parse_token("2h")
+        assert parse_timestamp("2h", HARVESTED_AT + 60) == parse_timestamp("2h", HARVESTED_AT) + 60
+
+
+class TestNormalizeTimestamps:
+    """Test cases for batch normalisation."""
+
+    def test_matches_scalar_parsing(self):
+        values = ["2h", None, "July 10", "2h", "junk", "1d", "1d"]
+        result = normalize_timestamps(values, HARVESTED_AT)
+        assert result.dtype == np.int64
+        assert result.tolist() == [parse_timestamp(value, HARVESTED_AT) for value in values]
+
+    def test_empty(self):
+        assert normalize_timestamps([], HARVESTED_AT).shape == (0,)
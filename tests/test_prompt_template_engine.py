@@ -1,8 +1,14 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 class TestPromptTemplateEngine(unittest.TestCase):
 
+    def setUp(self):
+        from llm_guard import get_circuit_breaker
+        from semantic_cache import get_shared_semantic_cache
+        get_shared_semantic_cache().clear()
+        get_circuit_breaker("openai").reset()
+
     def test_engine_initialization(self):
         """RED: Test that the PromptTemplateEngine can be initialized."""
         try:
@@ -160,6 +166,182 @@ class TestPromptTemplateEngine(unittest.TestCase):
         intent = engine.detect_intent(prompt)  # This should use fallback
         self.assertEqual(intent, "post_engagement", "Fallback to keyword matching failed")
 
+    @patch('openai.OpenAI')
+    def test_local_classifier_skips_llm_for_confident_prompts(self, mock_openai):
+        """Clear prompts are classified locally without an LLM round trip."""
+        from prompt_template_engine import PromptTemplateEngine
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        engine = PromptTemplateEngine(use_llm=True)
+        
+        self.assertEqual(engine.detect_intent("Like 3 posts about AI"), "post_engagement")
+        self.assertEqual(engine.detect_intent("Connect with 5 Google employees"), "connect_follow")
+        mock_client.chat.completions.create.assert_not_called()
+
+    @patch('openai.OpenAI')
+    def test_local_classifier_escalates_ambiguous_prompts(self, mock_openai):
+        """Prompts the local model cannot corroborate are sent to the LLM."""
+        from prompt_template_engine import PromptTemplateEngine
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "post_engagement"
+        mock_client.chat.completions.create.return_value = mock_response
+        
+        engine = PromptTemplateEngine(use_llm=True)
+        
+        # No intent keyword appears here, so keyword matching cannot corroborate the model
+        intent = engine.detect_intent("Give kudos to the newest posts about design")
+        self.assertEqual(intent, "post_engagement")
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch('openai.OpenAI')
+    def test_semantic_cache_reuses_results_for_paraphrases(self, mock_openai):
+        """Paraphrased prompts reuse an earlier LLM parameter extraction."""
+        from prompt_template_engine import PromptTemplateEngine
+        from semantic_cache import SemanticCache
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"count": 5, "keywords": ["AI"]}'
+        mock_client.chat.completions.create.return_value = mock_response
+        
+        engine = PromptTemplateEngine(use_llm=True, semantic_cache=SemanticCache())
+        
+        first = engine.extract_parameters_with_llm("like 5 posts about AI")
+        second = engine.extract_parameters_with_llm("Like 5 AI posts")
+        
+        self.assertEqual(first, second)
+        mock_client.chat.completions.create.assert_called_once()
+        
+        # A different count is never served from the cache
+        engine.extract_parameters_with_llm("Like 50 AI posts")
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+    def test_render_template_accepts_intent_names(self):
+        """Both "<intent>" and "<intent>_template" select the compiled renderer."""
+        from prompt_template_engine import PromptTemplateEngine
+        engine = PromptTemplateEngine()
+        
+        for intent in engine.INTENT_REGISTRY.names:
+            self.assertEqual(engine.render_template(intent, {}), engine.render_template(f"{intent}_template", {}))
+            self.assertNotIn("Perform the requested action", engine.render_template(intent, {}))
+        self.assertIn("Perform the requested action", engine.render_template("unknown_template", {}))
+
+    def test_register_intent_is_scoped_to_subclass(self):
+        """Registering an intent on a subclass enables it there without touching the base engine."""
+        from prompt_template_engine import PromptTemplateEngine
+        from intent_registry import IntentSpec
+        from template_store import compile_template
+        
+        class EventEngine(PromptTemplateEngine):
+            pass
+        
+        EventEngine.register_intent(IntentSpec(
+            name="event_rsvp",
+            keywords=("rsvp", "attend"),
+            description="responding to LinkedIn events",
+            renderer=compile_template(("Navigate to LinkedIn events", "RSVP to {keywords}"), defaults={"keywords": ["the event"]}),
+        ))
+        
+        engine = EventEngine()
+        self.assertEqual(engine.detect_intent("RSVP to the AI meetup"), "event_rsvp")
+        self.assertEqual(engine.render_template("event_rsvp", {"keywords": ["the AI meetup"]}),
+                         "1. Navigate to LinkedIn events\n2. RSVP to the AI meetup")
+        self.assertIn("event_rsvp", EventEngine.INTENT_KEYWORDS)
+        self.assertNotIn("event_rsvp", PromptTemplateEngine.INTENT_REGISTRY)
+        self.assertNotIn("event_rsvp", PromptTemplateEngine.INTENT_KEYWORDS)
+
+    @patch('openai.OpenAI')
+    def test_llm_intent_outside_registry_falls_back_to_keywords(self, mock_openai):
+        """Unregistered intent names from the LLM are replaced by keyword matching."""
+        from prompt_template_engine import PromptTemplateEngine
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "teleport"
+        mock_client.chat.completions.create.return_value = mock_response
+        
+        engine = PromptTemplateEngine(use_llm=True, use_local_classifier=False, use_semantic_cache=False)
+        self.assertEqual(engine.detect_intent_with_llm("Follow 10 AI researchers"), "connect_follow")
+        
+        # The registered intents are listed in the classification prompt
+        sent_prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("- feed_collection: scrolling, browsing feed, collecting posts", sent_prompt)
+
+    @patch('openai.OpenAI')
+    def test_slow_llm_returns_keyword_intent_within_budget(self, mock_openai):
+        """A slow LLM answer is replaced by keyword matching and cached for the next call."""
+        import threading
+        import time
+        from prompt_template_engine import PromptTemplateEngine
+        release = threading.Event()
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "search_content"
+        
+        def slow_create(**kwargs):
+            release.wait(5)
+            return mock_response
+        mock_client.chat.completions.create.side_effect = slow_create
+        
+        engine = PromptTemplateEngine(use_llm=True, use_local_classifier=False, llm_budget=0.05)
+        prompt = "Discover and open posts on climate tech"
+        
+        start = time.perf_counter()
+        self.assertEqual(engine.detect_intent(prompt), engine._detect_intent_keywords(prompt))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        
+        # The background call finishes and its answer serves the next request
+        release.set()
+        deadline = time.monotonic() + 5
+        while engine.semantic_cache.get("intent", prompt) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(engine.detect_intent(prompt), "search_content")
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch('openai.OpenAI')
+    def test_circuit_breaker_skips_llm_after_repeated_failures(self, mock_openai):
+        """Once the shared breaker opens, prompts are answered locally without calling the API."""
+        from prompt_template_engine import PromptTemplateEngine
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = Exception("API Error")
+        
+        engine = PromptTemplateEngine(use_llm=True, use_local_classifier=False)
+        threshold = engine.llm_guard.breaker.failure_threshold
+        for i in range(threshold):
+            self.assertEqual(engine.extract_parameters(f"Like {i + 1} posts about AI"), {"count": i + 1, "keywords": ["AI"]})
+        self.assertEqual(mock_client.chat.completions.create.call_count, threshold)
+        
+        # A new engine shares the breaker, so it does not call the API either
+        other = PromptTemplateEngine(use_llm=True, use_local_classifier=False)
+        self.assertEqual(other.detect_intent("Follow 10 AI researchers"), "connect_follow")
+        self.assertEqual(mock_client.chat.completions.create.call_count, threshold)
+        self.assertEqual(other.llm_guard.stats["short_circuits"], 1)
+
+    @patch('openai.OpenAI')
+    def test_llm_calls_draw_from_the_rate_limiter(self, mock_openai):
+        """Each LLM request reserves capacity and reports its actual token usage."""
+        from prompt_template_engine import PromptTemplateEngine
+        from rate_limiter import RateLimiter
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"count": 2}'
+        mock_response.usage.total_tokens = 57
+        mock_client.chat.completions.create.return_value = mock_response
+        
+        limiter = RateLimiter()
+        engine = PromptTemplateEngine(use_llm=True, use_semantic_cache=False, rate_limiter=limiter)
+        engine.extract_parameters_with_llm("Like 2 posts")
+        
+        metrics = limiter.metrics()[engine.model]
+        self.assertEqual(metrics["priorities"]["interactive"]["granted"], 1)
+        self.assertEqual(metrics["tokens_used"], 57)
+
     def test_openai_client_initialization(self):
         """RED: Test OpenAI client is properly initialized when use_llm=True."""
         from prompt_template_engine import PromptTemplateEngine
@@ -168,5 +350,80 @@ class TestPromptTemplateEngine(unittest.TestCase):
         self.assertTrue(hasattr(engine, 'openai_client'), "OpenAI client not initialized")
         self.assertIsNotNone(engine.openai_client, "OpenAI client is None")
 
+
+class TestPromptTemplateEngineAsync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        from llm_guard import get_circuit_breaker
+        from semantic_cache import get_shared_semantic_cache
+        get_shared_semantic_cache().clear()
+        get_circuit_breaker("openai").reset()
+
+    def _mock_async_client(self, mock_async_openai, *contents):
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        responses = []
+        for content in contents:
+            response = MagicMock()
+            response.choices[0].message.content = content
+            responses.append(response)
+        mock_client.chat.completions.create = AsyncMock(side_effect=responses)
+        return mock_client
+
+    @patch('openai.AsyncOpenAI')
+    @patch('openai.OpenAI')
+    async def test_detect_intent_async_uses_async_client(self, mock_openai, mock_async_openai):
+        """Async intent detection awaits the AsyncOpenAI client instead of the blocking one."""
+        from prompt_template_engine import PromptTemplateEngine
+        mock_async_client = self._mock_async_client(mock_async_openai, "comment_post")
+
+        engine = PromptTemplateEngine(use_llm=True, use_local_classifier=False)
+        intent = await engine.detect_intent_async("Share your thoughts under the latest AI post")
+
+        self.assertEqual(intent, "comment_post")
+        mock_async_client.chat.completions.create.assert_awaited_once()
+        mock_openai.return_value.chat.completions.create.assert_not_called()
+
+    @patch('openai.AsyncOpenAI')
+    @patch('openai.OpenAI')
+    async def test_extract_parameters_async_parses_json(self, mock_openai, mock_async_openai):
+        """Async parameter extraction returns the parsed JSON payload."""
+        from prompt_template_engine import PromptTemplateEngine
+        self._mock_async_client(mock_async_openai, '{"count": 4, "keywords": ["fintech"]}')
+
+        engine = PromptTemplateEngine(use_llm=True)
+        params = await engine.extract_parameters_async("Like four fintech posts")
+
+        self.assertEqual(params, {"count": 4, "keywords": ["fintech"]})
+
+    @patch('openai.AsyncOpenAI')
+    @patch('openai.OpenAI')
+    async def test_async_fallback_on_llm_failure(self, mock_openai, mock_async_openai):
+        """Async paths fall back to keyword and regex extraction when the LLM fails."""
+        from prompt_template_engine import PromptTemplateEngine
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+
+        engine = PromptTemplateEngine(use_llm=True, use_local_classifier=False)
+        intent, params = await engine.analyze_prompt_async("Like 3 posts about AI")
+
+        self.assertEqual(intent, "post_engagement")
+        self.assertEqual(params["count"], 3)
+        self.assertEqual(mock_client.chat.completions.create.await_count, 2)
+
+    @patch('openai.AsyncOpenAI')
+    @patch('openai.OpenAI')
+    async def test_async_client_is_shared_per_event_loop(self, mock_openai, mock_async_openai):
+        """Engines on the same loop reuse one pooled AsyncOpenAI client."""
+        from prompt_template_engine import PromptTemplateEngine
+        mock_async_openai.return_value = MagicMock()
+
+        first = PromptTemplateEngine(use_llm=True)._get_async_client()
+        second = PromptTemplateEngine(use_llm=True)._get_async_client()
+
+        self.assertIs(first, second)
+        mock_async_openai.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
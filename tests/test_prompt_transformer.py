@@ -91,6 +91,15 @@ class TestPromptTransformer:
             assert any(char.isdigit() and ". " in enhanced for char in enhanced), f"No numbered steps found in template for: {prompt}"
             assert "Navigate to LinkedIn" in enhanced, f"Template steps missing for: {prompt}"
     
+    def test_template_rendering_uses_intent_specific_steps(self):
+        """Detected intents render their own execution plan, not the generic two-step plan."""
+        transformer = PromptTransformer(use_templates=True)
+        
+        enhanced = transformer.enhance_prompt("Like 3 posts about AI")
+        assert "2. Search for 3 posts about AI" in enhanced
+        assert "Click the like button" in enhanced
+        assert "Perform the requested action" not in enhanced
+    
     def test_fallback_to_generic_enhancement(self):
         """RED: Test fallback to generic enhancement when no template matches."""
         transformer = PromptTransformer(use_templates=True)
@@ -183,3 +192,19 @@ class TestPromptTransformer:
         assert "5" in enhanced, "Count parameter not incorporated"
         assert "artificial intelligence" in enhanced.lower(), "Keywords not incorporated" 
         assert "Sundar Pichai" in enhanced, "Target person not incorporated"
+    
+    @pytest.mark.asyncio
+    async def test_enhance_prompt_async_matches_sync_result(self):
+        """Async enhancement produces the same prompt as the synchronous path."""
+        transformer = PromptTransformer(use_templates=True)
+        
+        prompt = "Like 3 posts about AI"
+        enhanced_async = await transformer.enhance_prompt_async(prompt)
+        
+        assert enhanced_async == transformer.enhance_prompt(prompt)
+    
+    @pytest.mark.asyncio
+    async def test_enhance_prompt_async_empty_input_validation(self):
+        """Async enhancement rejects empty prompts like the sync path."""
+        with pytest.raises(ValueError, match="Empty prompt not allowed"):
+            await self.transformer.enhance_prompt_async("   ")
@@ -0,0 +1,238 @@
+"""
+Tests for the process-wide OpenAI rate limiter.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm_guard import CircuitBreaker, LLMGuard
+from rate_limiter import (
+    LangChainRateLimiter,
+    ModelLimits,
+    Priority,
+    RateLimiter,
+    RateLimitSettings,
+    RateLimitTimeout,
+    base_model,
+    current_priority,
+    estimate_tokens,
+    request_priority,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _drain(limiter, model):
+    while limiter.acquire(model, blocking=False):
+        pass
+
+
+class TestBuckets:
+    """RPM and TPM accounting with an injected clock."""
+
+    def test_requests_per_minute(self):
+        clock = FakeClock()
+        limiter = RateLimiter({"m": ModelLimits(rpm=2, tpm=1000)}, clock=clock)
+        assert limiter.acquire("m", blocking=False)
+        assert limiter.acquire("m", blocking=False)
+        assert not limiter.acquire("m", blocking=False)
+        clock.now = 30  # half a minute refills one request
+        assert limiter.acquire("m", blocking=False)
+        assert not limiter.acquire("m", blocking=False)
+
+    def test_tokens_per_minute(self):
+        clock = FakeClock()
+        limiter = RateLimiter({"m": ModelLimits(rpm=100, tpm=600)}, clock=clock)
+        assert limiter.acquire("m", tokens=500, blocking=False)
+        assert not limiter.acquire("m", tokens=200, blocking=False)
+        clock.now = 10  # +100 tokens
+        assert limiter.acquire("m", tokens=200, blocking=False)
+
+    def test_oversized_request_is_admitted_on_a_full_bucket(self):
+        limiter = RateLimiter({"m": ModelLimits(rpm=100, tpm=600)}, clock=FakeClock())
+        assert limiter.acquire("m", tokens=5000, blocking=False)
+        assert not limiter.acquire("m", tokens=1, blocking=False)
+
+    def test_record_usage_reconciles_estimates(self):
+        clock = FakeClock()
+        limiter = RateLimiter({"m": ModelLimits(rpm=100, tpm=1000)}, clock=clock)
+        limiter.acquire("m", tokens=900, blocking=False)
+        assert not limiter.acquire("m", tokens=500, blocking=False)
+        limiter.record_usage("m", estimated_tokens=900, actual_tokens=300)
+        assert limiter.acquire("m", tokens=500, blocking=False)
+        assert limiter.metrics()["m"]["tokens_used"] == 300
+
+    def test_record_usage_ignores_missing_usage(self):
+        limiter = RateLimiter({"m": ModelLimits(rpm=100, tpm=1000)}, clock=FakeClock())
+        limiter.acquire("m", tokens=100, blocking=False)
+        limiter.record_usage("m", 100, None)
+        assert limiter.metrics()["m"]["tokens_used"] == 0
+
+    def test_unknown_models_use_default_limits(self):
+        limiter = RateLimiter({}, default_limits=ModelLimits(rpm=1, tpm=1000), clock=FakeClock())
+        assert limiter.acquire("other", blocking=False)
+        assert not limiter.acquire("other", blocking=False)
+        assert limiter.metrics()["other"]["rpm_limit"] == 1
+
+    def test_snapshots_share_their_base_model_bucket(self):
+        limiter = RateLimiter({"gpt-4o": ModelLimits(rpm=2, tpm=1000)}, clock=FakeClock())
+        assert limiter.acquire("gpt-4o-2024-08-06", blocking=False)
+        assert limiter.acquire("gpt-4o", blocking=False)
+        assert not limiter.acquire("gpt-4o-2024-11-20", blocking=False)
+        assert list(limiter.metrics()) == ["gpt-4o"]
+
+
+class TestQueueing:
+    """Blocking acquisition, priorities and timeouts."""
+
+    def test_interactive_requests_are_served_before_scheduled(self):
+        limiter = RateLimiter({"m": ModelLimits(rpm=1200, tpm=1_000_000)})  # one request per 50 ms
+        _drain(limiter, "m")
+        order = []
+
+        def worker(priority, label):
+            limiter.acquire("m", priority=priority)
+            order.append(label)
+
+        threads = [threading.Thread(target=worker, args=(Priority.SCHEDULED, f"scheduled-{i}")) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.02)
+        interactive = threading.Thread(target=worker, args=(Priority.INTERACTIVE, "interactive"))
+        interactive.start()
+        for thread in threads + [interactive]:
+            thread.join(5)
+
+        assert order[0] == "interactive"
+        assert order[1:] == ["scheduled-0", "scheduled-1"]
+
+    def test_timeout_raises_and_leaves_the_queue(self):
+        limiter = RateLimiter({"m": ModelLimits(rpm=1, tpm=1000)})
+        limiter.acquire("m")
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire("m", timeout=0.05)
+        metrics = limiter.metrics()["m"]["priorities"]["interactive"]
+        assert metrics["queued"] == 0
+        assert metrics["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_acquire_waits_without_blocking_the_loop(self):
+        limiter = RateLimiter({"m": ModelLimits(rpm=1200, tpm=1_000_000)})
+        _drain(limiter, "m")
+        ticks = []
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        results = await asyncio.gather(limiter.aacquire("m"), ticker())
+        assert results[0] is True
+        assert len(ticks) == 3
+        assert limiter.metrics()["m"]["priorities"]["interactive"]["max_wait_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_async_timeout(self):
+        limiter = RateLimiter({"m": ModelLimits(rpm=1, tpm=1000)})
+        await limiter.aacquire("m")
+        with pytest.raises(RateLimitTimeout):
+            await limiter.aacquire("m", timeout=0.05)
+
+
+class TestPriorityContext:
+    """request_priority() scoping."""
+
+    def test_context_manager_sets_default_priority(self):
+        limiter = RateLimiter({"m": ModelLimits(rpm=100, tpm=1000)}, clock=FakeClock())
+        with request_priority(Priority.SCHEDULED):
+            limiter.acquire("m", blocking=False)
+        limiter.acquire("m", blocking=False)
+        priorities = limiter.metrics()["m"]["priorities"]
+        assert priorities["scheduled"]["granted"] == 1
+        assert priorities["interactive"]["granted"] == 1
+
+    def test_priority_follows_guarded_calls_onto_the_pool(self):
+        guard = LLMGuard(budget=1.0, breaker=CircuitBreaker())
+        with request_priority(Priority.SCHEDULED):
+            seen = guard.call(current_priority, fallback=lambda error: None)
+        assert seen == Priority.SCHEDULED
+        assert current_priority() == Priority.INTERACTIVE
+
+
+@pytest.mark.parametrize("model, base", [
+    ("gpt-4o-2024-08-06", "gpt-4o"),
+    ("gpt-4-0613", "gpt-4"),
+    ("gpt-4o-mini", "gpt-4o-mini"),
+    ("gpt-4o", "gpt-4o"),
+])
+def test_base_model(model, base):
+    assert base_model(model) == base
+
+
+class TestRateLimitSettings:
+    """Test cases for the rate_limits section of settings.yaml."""
+
+    def test_defaults(self):
+        settings = RateLimitSettings.from_settings({})
+        assert dict(settings.models)["gpt-4o"] == ModelLimits(rpm=500, tpm=30_000)
+        assert settings == RateLimitSettings()
+
+    def test_overrides(self):
+        settings = RateLimitSettings.from_settings({
+            "default": {"rpm": 10, "tpm": 100},
+            "models": {"gpt-4o-2024-08-06": {"rpm": 5000, "tpm": 800_000}},
+        })
+        assert dict(settings.models)["gpt-4o"] == ModelLimits(rpm=5000, tpm=800_000)
+        assert settings.default == ModelLimits(rpm=10, tpm=100)
+
+    @pytest.mark.parametrize("section", [
+        {"per_minute": 5},
+        {"models": ["gpt-4o"]},
+        {"default": {"rpm": 0, "tpm": 100}},
+        {"default": {"rpm": 10}},
+        {"models": {"gpt-4o": {"rpm": "fast", "tpm": 100}}},
+    ])
+    def test_invalid(self, section):
+        with pytest.raises(ValueError):
+            RateLimitSettings.from_settings(section)
+
+
+def test_estimate_tokens():
+    messages = [{"role": "user", "content": "x" * 400}]
+    assert estimate_tokens(messages, max_tokens=20) == 100 + 4 + 20
+
+
+def test_langchain_adapter_draws_from_the_shared_limiter():
+    limiter = RateLimiter({"gpt-4o": ModelLimits(rpm=100, tpm=10_000)}, clock=FakeClock())
+    adapter = LangChainRateLimiter(limiter, "gpt-4o", tokens_per_request=4000)
+    assert adapter.acquire()
+    assert adapter.acquire()
+    assert not adapter.acquire(blocking=False)
+    assert limiter.metrics()["gpt-4o"]["tokens_reserved"] == 8000
+
+
+def test_langchain_reservations_are_reconciled_with_usage():
+    """The flat per-call reservation is replaced by the usage the response reports."""
+    from langchain_openai import ChatOpenAI
+    from openai_stub import OpenAIStubServer, StubConfig
+
+    limiter = RateLimiter({"gpt-4o": ModelLimits(rpm=100, tpm=10_000)})
+    adapter = LangChainRateLimiter(limiter, "gpt-4o", tokens_per_request=4000)
+    with OpenAIStubServer(StubConfig()) as server:
+        llm = ChatOpenAI(model="gpt-4o", api_key="sk-test", base_url=server.base_url, max_retries=0,
+                         rate_limiter=adapter, callbacks=[adapter.usage_callback])
+        response = llm.invoke("Summarise this post")
+
+    metrics = limiter.metrics()["gpt-4o"]
+    assert metrics["tokens_reserved"] == 4000
+    assert metrics["tokens_used"] == response.usage_metadata["total_tokens"] > 0
+    assert metrics["tokens_available"] > 10_000 - 4000
@@ -0,0 +1,94 @@
+"""
+Tests for the persistent seen-post index.
+"""
+
+import pytest
+
+from models import FetchedPost
+from post_batch import PostBatch
+from seen_posts import SeenPostIndex, post_key
+
+URN = "urn:li:activity:7200000000000000001"
+
+
+@pytest.fixture
+def index():
+    with SeenPostIndex(":memory:") as index:
+        yield index
+
+
+def _post(i):
+    return FetchedPost(post_id=f"urn:li:activity:{7200000000000000000 + i}",
+                       post_url=f"https://www.linkedin.com/feed/update/urn:li:activity:{7200000000000000000 + i}/",
+                       author_name="Jane Doe", content_text=f"Post {i}")
+
+
+class TestPostKey:
+    """Test cases for post id canonicalisation."""
+
+    @pytest.mark.parametrize("post_id", [
+        URN,
+        f"https://www.linkedin.com/feed/update/{URN}/",
+        "URN:LI:ACTIVITY:7200000000000000001",
+        f"  {URN} ",
+    ])
+    def test_variants_share_a_key(self, post_id):
+        assert post_key(post_id) == URN
+
+    def test_other_urn_kinds_and_plain_ids(self):
+        assert post_key("urn:li:ugcpost:42") == "urn:li:ugcPost:42"
+        assert post_key("urn:li:share:42") == "urn:li:share:42"
+        assert post_key(" post-7 ") == "post-7"
+
+
+class TestSeenPostIndex:
+    """Test cases for recording and querying seen posts."""
+
+    def test_mark_seen(self, index):
+        assert index.mark_seen([URN, "b", URN], seen_at=100.0) == 2
+        assert URN in index and f"https://www.linkedin.com/feed/update/{URN}/" in index
+        assert "c" not in index
+        assert index.mark_seen(["b", "c"], seen_at=200.0) == 1
+        assert len(index) == 3
+
+        history = index.get("b")
+        assert (history.first_seen, history.last_seen, history.seen_count) == (100.0, 200.0, 2)
+        assert index.get("never") is None
+
+    def test_actions(self, index):
+        index.record_action(URN, "like", acted_at=10.0)
+        index.record_action(URN, "comment", detail="Great point!", acted_at=20.0)
+        assert URN in index
+        assert index.has_acted(URN) and index.has_acted(URN, "comment")
+        assert not index.has_acted(URN, "share") and not index.has_acted("other")
+        assert index.get(URN).actions == [("like", 10.0), ("comment", 20.0)]
+
+    def test_filter_unseen(self, index):
+        posts = [_post(i) for i in range(3)]
+        new, old = index.filter_unseen(posts[:2])
+        assert (new, old) == (posts[:2], [])
+        new, old = index.filter_unseen(posts + [{"post_id": posts[0].post_id}])
+        assert new == [posts[2]]
+        assert old == [posts[0], posts[1], {"post_id": posts[0].post_id}]
+        assert index.get(posts[0].post_id).seen_count == 2
+
+    def test_filter_unseen_without_marking(self, index):
+        index.filter_unseen([_post(0)], mark=False)
+        assert len(index) == 0
+
+    def test_seen_mask_filters_batches(self, index):
+        posts = [_post(i) for i in range(4)]
+        index.mark_seen([posts[1].post_id, posts[3].post_id])
+        batch = PostBatch.from_posts(posts)
+        unseen = batch.filter(~index.seen_mask(batch.column("post_id").values()))
+        assert unseen.to_posts() == [posts[0], posts[2]]
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "seen.sqlite3")
+        with SeenPostIndex(path) as index:
+            index.mark_seen([URN], seen_at=1.0)
+            index.record_action(URN, "comment", acted_at=2.0)
+        with SeenPostIndex(path) as reopened:
+            assert URN in reopened
+            assert reopened.has_acted(URN, "comment")
+            assert reopened.get(URN).first_seen == 1.0
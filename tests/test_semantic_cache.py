@@ -0,0 +1,82 @@
+"""
+Tests for the semantic near-duplicate prompt cache.
+"""
+
+import pytest
+
+from semantic_cache import SemanticCache, content_terms, prompt_signature
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache."""
+
+    def setup_method(self):
+        self.cache = SemanticCache()
+        self.cache.put("parameters", "Like 5 posts about AI", {"count": 5, "keywords": ["AI"]})
+        self.cache.put("parameters", "Comment on posts about fintech", {"keywords": ["fintech"]})
+
+    @pytest.mark.parametrize("paraphrase", [
+        "like 5 posts about AI",
+        "Like 5 AI posts",
+        "Please like 5 posts on AI",
+    ])
+    def test_paraphrases_hit(self, paraphrase):
+        assert self.cache.get("parameters", paraphrase) == {"count": 5, "keywords": ["AI"]}
+
+    @pytest.mark.parametrize("different", [
+        "Like 5 posts about blockchain",
+        "Like 6 posts about AI",
+        "Comment on posts about healthcare",
+    ])
+    def test_different_requests_miss(self, different):
+        assert self.cache.get("parameters", different) is None
+
+    def test_namespaces_are_isolated(self):
+        assert self.cache.get("intent", "Like 5 posts about AI") is None
+
+    def test_returned_values_are_copies(self):
+        value = self.cache.get("parameters", "Like 5 AI posts")
+        value["keywords"].append("mutated")
+        assert self.cache.get("parameters", "Like 5 AI posts")["keywords"] == ["AI"]
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SemanticCache(max_entries=2)
+        cache.put("intent", "Like posts about AI", "post_engagement")
+        cache.put("intent", "Follow founders in fintech", "connect_follow")
+        cache.get("intent", "Like posts about AI")
+        cache.put("intent", "Scroll my feed", "feed_collection")
+
+        assert len(cache) == 2
+        assert cache.get("intent", "Like posts about AI") == "post_engagement"
+        assert cache.get("intent", "Follow founders in fintech") is None
+
+    def test_updating_same_prompt_does_not_grow_cache(self):
+        self.cache.put("parameters", "Like 5 posts about AI", {"count": 5})
+        assert len(self.cache) == 2
+        assert self.cache.get("parameters", "Like 5 posts about AI") == {"count": 5}
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        path = str(tmp_path / "semantic_cache.npz")
+        self.cache.save(path)
+
+        restored = SemanticCache(path=path)
+        assert len(restored) == 2
+        assert restored.get("parameters", "Like 5 AI posts") == {"count": 5, "keywords": ["AI"]}
+        assert restored.get("parameters", "Comment on fintech posts") == {"keywords": ["fintech"]}
+
+    def test_stats_track_hits_and_misses(self):
+        self.cache.get("parameters", "Like 5 AI posts")
+        self.cache.get("parameters", "Tell me a joke")
+        assert self.cache.stats() == {"entries": 2, "hits": 1, "misses": 1}
+
+    def test_invalid_threshold_rejected(self):
+        with pytest.raises(ValueError):
+            SemanticCache(threshold=0)
+
+
+def test_content_terms_drop_function_words():
+    assert content_terms("Find 10 posts about startups") == "find 10 post startup"
+
+
+def test_prompt_signature_captures_numbers_and_quotes():
+    assert prompt_signature("Comment 'Great insights!' on 3 posts") == "'great insights!'\x1f3"
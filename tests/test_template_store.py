@@ -0,0 +1,144 @@
+"""
+Tests for the compiled YAML template store.
+"""
+
+import os
+import time
+
+import pytest
+
+from intent_registry import build_default_registry
+from template_store import (
+    GENERIC_PLAN,
+    TEMPLATE_DIR,
+    TemplateStore,
+    compile_template,
+    template_renderer,
+)
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+def _touch_later(path):
+    # Guarantee a new mtime even on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestCompileTemplate:
+    """Test cases for compile_template()."""
+
+    def test_unconditional_steps_are_numbered(self):
+        render = compile_template(["Open {page}", "Read {count} posts"], defaults={"page": "feed", "count": 1})
+        assert render({"count": 3}) == "1. Open feed\n2. Read 3 posts"
+
+    def test_list_values_are_joined(self):
+        render = compile_template(["Find posts about {keywords}"], defaults={"keywords": ["content"]})
+        assert render({}) == "1. Find posts about content"
+        assert render({"keywords": ["AI", "startups"]}) == "1. Find posts about AI and startups"
+
+    def test_conditional_steps_are_renumbered(self):
+        render = compile_template([
+            "Open feed",
+            {"text": "Filter by {target_person}", "when": "target_person"},
+            {"text": "Filter by topic", "unless": "target_person"},
+            "Like posts",
+        ])
+        assert render({}) == "1. Open feed\n2. Filter by topic\n3. Like posts"
+        assert render({"target_person": "Jane Doe"}) == "1. Open feed\n2. Filter by Jane Doe\n3. Like posts"
+
+    def test_none_values_use_defaults(self):
+        render = compile_template(["Read {count} posts"], defaults={"count": 5})
+        assert render({"count": None}) == "1. Read 5 posts"
+
+    def test_undefined_placeholder_is_rejected_at_compile_time(self):
+        with pytest.raises(ValueError, match="target_person"):
+            compile_template(["Visit {target_person}"], name="visit")
+
+    def test_malformed_steps_are_rejected(self):
+        with pytest.raises(ValueError):
+            compile_template([{"when": "count"}])
+        with pytest.raises(ValueError):
+            compile_template([])
+
+
+class TestBundledTemplates:
+    """The bundled config/templates directory covers every intent."""
+
+    def test_every_registered_intent_has_a_template(self):
+        store = TemplateStore(TEMPLATE_DIR)
+        assert store.intents == build_default_registry().names
+
+    def test_post_engagement_plan(self):
+        store = TemplateStore(TEMPLATE_DIR)
+        assert store.render("post_engagement", {"count": 5, "keywords": ["AI"], "target_person": "Sundar Pichai"}) == (
+            "1. Navigate to LinkedIn feed\n"
+            "2. Search for 5 posts about AI from Sundar Pichai\n"
+            "3. Click the like button on each relevant post\n"
+            "4. Verify the like was successful\n"
+            "5. Wait briefly between actions to avoid rate limiting"
+        )
+
+    def test_comment_post_plan(self):
+        store = TemplateStore(TEMPLATE_DIR)
+        rendered = store.render("comment_post", {"keywords": ["AI"]})
+        assert '4. Type comment: "Great insights!"' in rendered
+        assert rendered.endswith("7. Verify comment was posted successfully")
+
+    def test_missing_template_uses_generic_plan(self):
+        assert template_renderer("no_such_intent")({}) == GENERIC_PLAN
+
+
+class TestTemplateStoreReload:
+    """Test cases for loading and hot-reloading template files."""
+
+    def test_changed_file_is_recompiled(self, tmp_path):
+        path = tmp_path / "greet.yaml"
+        _write(path, "intent: greet\nsteps:\n  - Say hello\n")
+        store = TemplateStore(str(tmp_path), check_interval=0)
+        assert store.render("greet", {}) == "1. Say hello"
+
+        _write(path, "intent: greet\nsteps:\n  - Say hi\n  - Wave\n")
+        _touch_later(path)
+        assert store.render("greet", {}) == "1. Say hi\n2. Wave"
+
+    def test_unchanged_files_are_not_reparsed(self, tmp_path):
+        _write(tmp_path / "greet.yaml", "steps:\n  - Say hello\n")
+        store = TemplateStore(str(tmp_path), check_interval=0)
+        assert store.reload() is False
+        # The intent name defaults to the file name
+        assert "greet" in store
+
+    def test_added_and_removed_files(self, tmp_path):
+        store = TemplateStore(str(tmp_path), check_interval=0)
+        assert store.get("greet") is None
+
+        path = tmp_path / "greet.yml"
+        _write(path, "steps:\n  - Say hello\n")
+        assert store.render("greet", {}) == "1. Say hello"
+
+        os.remove(path)
+        assert store.get("greet") is None
+
+    def test_broken_edit_keeps_last_good_template(self, tmp_path):
+        path = tmp_path / "greet.yaml"
+        _write(path, "steps:\n  - Say hello\n")
+        store = TemplateStore(str(tmp_path), check_interval=0)
+
+        _write(path, "steps:\n  - Say hello to {nobody}\n")
+        _touch_later(path)
+        assert store.render("greet", {}) == "1. Say hello"
+
+    def test_check_interval_limits_stat_calls(self, tmp_path):
+        path = tmp_path / "greet.yaml"
+        _write(path, "steps:\n  - Say hello\n")
+        store = TemplateStore(str(tmp_path), check_interval=3600)
+
+        _write(path, "steps:\n  - Say hi\n")
+        _touch_later(path)
+        assert store.render("greet", {}) == "1. Say hello"
+        assert store.reload() is True
+        assert store.render("greet", {}) == "1. Say hi"
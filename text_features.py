@@ -0,0 +1,97 @@
+"""
+Hashed text features for local prompt models.
+
+Turns short prompts into fixed-width NumPy vectors using the hashing trick
+(word n-grams plus character n-grams) so local models need no vocabulary
+file and no external service. Hashes use CRC32, which is stable across
+processes, so vectors can be persisted and compared between runs.
+"""
+
+import re
+import zlib
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase a prompt and split it into alphanumeric word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class HashingVectorizer:
+    """
+    Stateless text vectorizer based on the hashing trick.
+
+    Each prompt becomes a vector of n-gram counts over ``n_features``
+    buckets. Word n-grams capture phrasing ("thumbs up", "collect posts");
+    character n-grams inside words tolerate inflections ("liking", "likes").
+    """
+
+    def __init__(self, n_features: int = 2 ** 14, word_ngrams: Tuple[int, int] = (1, 2),
+                 char_ngrams: Tuple[int, int] = (3, 4), char_weight: float = 1.0):
+        if n_features <= 0 or n_features & (n_features - 1):
+            raise ValueError("n_features must be a positive power of two")
+        self.n_features = n_features
+        self.word_ngrams = word_ngrams
+        self.char_ngrams = char_ngrams
+        self.char_weight = char_weight
+        self._mask = n_features - 1
+
+    def features(self, text: str) -> List[Tuple[int, float]]:
+        """Return (bucket, weight) pairs for every n-gram in the text."""
+        tokens = tokenize(text)
+        mask = self._mask
+        pairs = []
+
+        low, high = self.word_ngrams
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                gram = "w:" + " ".join(tokens[i:i + n])
+                pairs.append((zlib.crc32(gram.encode()) & mask, 1.0))
+
+        if self.char_ngrams and self.char_weight:
+            low, high = self.char_ngrams
+            for token in tokens:
+                padded = f"<{token}>"
+                for n in range(low, high + 1):
+                    for i in range(len(padded) - n + 1):
+                        gram = "c:" + padded[i:i + n]
+                        pairs.append((zlib.crc32(gram.encode()) & mask, self.char_weight))
+
+        return pairs
+
+    def sparse(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (buckets, weights) arrays for a prompt without building a dense vector."""
+        pairs = self.features(text)
+        if not pairs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        buckets, weights = zip(*pairs)
+        return np.asarray(buckets, dtype=np.int64), np.asarray(weights, dtype=np.float32)
+
+    def transform_one(self, text: str) -> np.ndarray:
+        """Vectorize a single prompt into a dense float32 count vector."""
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        buckets, weights = self.sparse(text)
+        np.add.at(vector, buckets, weights)
+        return vector
+
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        """Vectorize a sequence of prompts into an (n_texts, n_features) matrix."""
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            pairs = self.features(text)
+            if pairs:
+                buckets, weights = zip(*pairs)
+                np.add.at(matrix[row], np.asarray(buckets, dtype=np.int64), np.asarray(weights, dtype=np.float32))
+        return matrix
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows (or a single vector) to unit length, leaving zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms